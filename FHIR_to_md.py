@@ -14,6 +14,8 @@ from typing import Dict, List, Optional, Tuple
 import argparse
 import html
 
+from html_conversion import convert_files, default_workers, resolve_parser
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -25,16 +27,18 @@ logger = logging.getLogger(__name__)
 class FHIRHTMLToMarkdownConverter:
     """Convert FHIR HTML documentation to Markdown format."""
     
-    def __init__(self, input_dir: str, output_dir: str):
+    def __init__(self, input_dir: str, output_dir: str, parser: str = 'auto'):
         """
         Initialize converter with input and output directories.
         
         Args:
             input_dir: Directory containing HTML files
             output_dir: Directory where Markdown files will be saved
+            parser: BeautifulSoup parser; 'auto' uses lxml when installed
         """
         self.input_dir = Path(input_dir)
         self.output_dir = Path(output_dir)
+        self.parser = resolve_parser(parser)
         
         # Create output directory if it doesn't exist
         self.output_dir.mkdir(parents=True, exist_ok=True)
@@ -94,7 +98,7 @@ class FHIRHTMLToMarkdownConverter:
                         for code in code_tags:
                             li_text = li_text.replace(str(code), f"`{code.get_text()}`")
                         # Parse the modified text
-                        temp_soup = BeautifulSoup(li_text, 'html.parser')
+                        temp_soup = BeautifulSoup(li_text, self.parser)
                         text = self.clean_text(temp_soup.get_text())
                     else:
                         # Check for links
@@ -271,7 +275,7 @@ class FHIRHTMLToMarkdownConverter:
                 html_content = f.read()
                 
             # Parse HTML
-            soup = BeautifulSoup(html_content, 'html.parser')
+            soup = BeautifulSoup(html_content, self.parser)
             
             # Extract components
             title = self.extract_title(soup)
@@ -340,14 +344,18 @@ class FHIRHTMLToMarkdownConverter:
             logger.error(traceback.format_exc())
             return False
     
-    def convert_all(self) -> Tuple[int, int]:
+    def convert_all(self, workers: int = 1, incremental: bool = True) -> Tuple[int, int]:
         """
         Convert all HTML files in the input directory.
         
+        Args:
+            workers: Number of worker processes to convert files in parallel
+            incremental: Skip files that are unchanged since the last run
+            
         Returns:
             Tuple of (successful_count, failed_count)
         """
-        html_files = list(self.input_dir.glob('*.html'))
+        html_files = sorted(self.input_dir.glob('*.html'))
         
         if not html_files:
             logger.warning(f"No HTML files found in {self.input_dir}")
@@ -355,16 +363,7 @@ class FHIRHTMLToMarkdownConverter:
             
         logger.info(f"Found {len(html_files)} HTML files to process")
         
-        successful = 0
-        failed = 0
-        
-        for html_file in html_files:
-            if self.convert_file(html_file):
-                successful += 1
-            else:
-                failed += 1
-                
-        return successful, failed
+        return convert_files(self, html_files, workers=workers, incremental=incremental)
 
 
 def main():
@@ -385,6 +384,23 @@ def main():
         action='store_true',
         help='Enable verbose logging'
     )
+    parser.add_argument(
+        '--workers', '-j',
+        type=int,
+        default=default_workers(),
+        help='Number of worker processes (default: CPU count)'
+    )
+    parser.add_argument(
+        '--force',
+        action='store_true',
+        help='Reconvert every file, even if unchanged since the last run'
+    )
+    parser.add_argument(
+        '--parser',
+        choices=['auto', 'lxml', 'html.parser'],
+        default='auto',
+        help='HTML parser to use (default: lxml when installed)'
+    )
     
     args = parser.parse_args()
     
@@ -392,8 +408,8 @@ def main():
         logging.getLogger().setLevel(logging.DEBUG)
     
     # Create converter and process files
-    converter = FHIRHTMLToMarkdownConverter(args.input_dir, args.output_dir)
-    successful, failed = converter.convert_all()
+    converter = FHIRHTMLToMarkdownConverter(args.input_dir, args.output_dir, parser=args.parser)
+    successful, failed = converter.convert_all(workers=args.workers, incremental=not args.force)
     
     # Print summary
     print(f"\nConversion complete!")
@@ -1,5 +1,5 @@
 from states import UserInputState, QuestionState, DataState, AnswerState
-from bigquery_tools import execute_sql_query, get_table_schema, list_tables # Import BQ tools
+from bigquery_tools import preview_sql_query, execute_sql_queries, get_table_schema, list_tables # Import BQ tools
 from typing import List, Any # For type hinting
 import re # For keyword extraction
 
@@ -52,6 +52,8 @@ def retrieve_data_agent(state: QuestionState) -> DataState:
     """
     Retrieves data based on the generated questions.
     Uses updated bigquery_tools.py for more dynamic simulation.
+    The per-question queries run concurrently, so latency is that of the slowest query.
+    Only a small preview of each result is kept in the state; "handle" streams the rest.
     `can_answer` is true if any simulated query returns a non-empty result.
     """
     print(f"DEBUG: retrieve_data_agent received questions: {state.questions}")
@@ -62,6 +64,7 @@ def retrieve_data_agent(state: QuestionState) -> DataState:
     # Get simulated table list to help form more "realistic" simulated queries
     available_tables = list_tables().get("tables", [])
 
+    simulated_queries = []
     for q_text in state.questions:
         q_text_lower = q_text.lower()
         # Attempt to make a slightly more relevant simulated query
@@ -84,13 +87,19 @@ def retrieve_data_agent(state: QuestionState) -> DataState:
             simulated_query = f"SELECT * FROM customer_details LIMIT 2"
 
         print(f"DEBUG: retrieve_data_agent attempting simulated query: '{simulated_query}' for question: '{q_text}'")
-        query_result_dict = execute_sql_query(simulated_query)
+        simulated_queries.append(simulated_query)
+
+    # Fan out all questions' queries at once; results come back in question order.
+    query_results = execute_sql_queries(simulated_queries, run_query=preview_sql_query)
+
+    for q_text, simulated_query, query_result_dict in zip(state.questions, simulated_queries, query_results):
         actual_data_from_query = query_result_dict.get("result", [])
         
         current_question_data = {
             "question": q_text,
             "query_attempted": simulated_query,
-            "data": actual_data_from_query if actual_data_from_query else "No specific data found from simulation."
+            "data": actual_data_from_query if actual_data_from_query else "No specific data found from simulation.",
+            "handle": query_result_dict.get("handle"),
         }
         retrieved_data_for_all_questions.append(current_question_data)
 
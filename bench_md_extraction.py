@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark the single-pass DocumentIndex used by convert_to_md2.py.
+
+Each page in the input directory is parsed once, then converted to Markdown two ways:
+- find-per-lookup: every section lookup does its own soup.find() tree walk and
+  sibling scan, which is what the extract_* helpers did before DocumentIndex
+- indexed: one DocumentIndex traversal per page, shared by every extract_* helper
+
+Both produce the same Markdown; only the time spent on lookups differs.
+On the bundled mcc_documentation_html_files pages the indexed path measures about
+1.2-1.3x faster with lxml and 1.3-1.5x with html.parser, with noticeable run-to-run
+variance; use --repeat to steady the numbers.
+
+Usage:
+    python bench_md_extraction.py [input_dir] [--repeat N] [--parser html.parser|lxml]
+"""
+
+import argparse
+import logging
+import time
+from pathlib import Path
+from typing import Callable, List, Optional
+
+from bs4 import BeautifulSoup, Tag
+
+from convert_to_md2 import UnifiedHTMLToMarkdownConverter
+from html_conversion import DocumentIndex, resolve_parser
+
+
+class FindPerLookupDocument(DocumentIndex):
+    """DocumentIndex look-alike that re-walks the tree on every lookup, with no index."""
+
+    def __init__(self, soup: BeautifulSoup):
+        self.soup = soup
+
+    def first(self, name: str) -> Optional[Tag]:
+        return self.soup.find(name)
+
+    def by_id(self, name: str, element_id: str) -> Optional[Tag]:
+        return self.soup.find(name, {'id': element_id})
+
+    def section_siblings(self, section_id: str) -> List[Tag]:
+        siblings = []
+        section = self.section(section_id)
+        if section is not None:
+            for sibling in section.find_next_siblings():
+                if sibling.name == 'h2':
+                    break
+                siblings.append(sibling)
+        return siblings
+
+
+def time_pages(soups: List[BeautifulSoup], make_doc: Callable[[BeautifulSoup], DocumentIndex],
+               converter: UnifiedHTMLToMarkdownConverter, repeat: int) -> float:
+    """Best-of-repeat seconds to build the Markdown for every page."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for soup in soups:
+            converter.build_markdown(make_doc(soup))
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('input_dir', nargs='?', default='mcc_documentation_html_files',
+                        help='Directory containing HTML files')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed repetitions (best is reported)')
+    parser.add_argument('--parser', choices=['auto', 'lxml', 'html.parser'], default='auto',
+                        help='HTML parser used to build the soups')
+    args = parser.parse_args()
+
+    # The converter logs every page; keep the benchmark output readable
+    logging.disable(logging.INFO)
+
+    html_files = sorted(Path(args.input_dir).glob('*.html'))
+    if not html_files:
+        raise SystemExit(f"No HTML files found in {args.input_dir}")
+
+    parser_name = resolve_parser(args.parser)
+    soups = [BeautifulSoup(f.read_text(encoding='utf-8'), parser_name) for f in html_files]
+    converter = UnifiedHTMLToMarkdownConverter(args.input_dir, '/tmp', parser=parser_name)
+
+    # Sanity check: both strategies must produce the same Markdown
+    for soup, html_file in zip(soups, html_files):
+        if converter.build_markdown(DocumentIndex(soup)) != converter.build_markdown(FindPerLookupDocument(soup)):
+            raise SystemExit(f"Output mismatch for {html_file.name}")
+
+    baseline = time_pages(soups, FindPerLookupDocument, converter, args.repeat)
+    indexed = time_pages(soups, DocumentIndex, converter, args.repeat)
+
+    print(f"{len(html_files)} pages from {args.input_dir} (parser: {parser_name}, best of {args.repeat})")
+    print(f"  find-per-lookup: {baseline * 1000:8.1f} ms")
+    print(f"  indexed:         {indexed * 1000:8.1f} ms")
+    print(f"  speedup:         {baseline / indexed:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,24 @@
-from typing import Dict, List, Any
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Dict, List, Any, Awaitable, Callable, Iterator, Mapping, NamedTuple, Optional, Sequence, Tuple
+import asyncio
+import hashlib
 import json
 import os
+import queue
+import re
+import threading
+import time
 from google.cloud import bigquery
 from google.cloud.exceptions import GoogleCloudError
+from langgraph.cache.base import BaseCache, FullKey, Namespace
+from langgraph.checkpoint.serde.base import SerializerProtocol
 
 # Global variable to cache the parsed JSON schema
 _MAYODB_SCHEMA = None
+# Global variable to cache the SchemaCatalog built from it
+_MAYODB_CATALOG = None
 
 def _get_mayodb_schema() -> Dict[str, Any]:
     """
@@ -39,71 +52,562 @@ def _get_mayodb_schema() -> Dict[str, Any]:
         return None
 
 
+class _CatalogEntry(NamedTuple):
+    """A single table in the SchemaCatalog, with its column map precomputed."""
+    project_id: str
+    qualified_name: str  # "dataset.table"
+    schema: Dict[str, str]
+    error: Optional[str]
+
+
+class SchemaCatalog:
+    """
+    Hash-indexed view of the parsed MayoDB schema JSON.
+
+    The JSON is laid out as project -> tables -> "dataset.table", which forces
+    a scan over every project and table for each lookup. The catalog walks it
+    once and keeps:
+      - an index by fully-qualified name ("dataset.table" and "project.dataset.table")
+      - an index by bare table name (a list, since names can repeat across datasets)
+      - an index by dataset holding that dataset's sorted table names
+      - the sorted list of every "dataset.table"
+    """
+
+    def __init__(self, parsed_json: Dict[str, Any]):
+        self._by_qualified_name: Dict[str, _CatalogEntry] = {}
+        self._by_table_name: Dict[str, List[str]] = {}
+        self._by_dataset: Dict[str, Tuple[str, ...]] = {}
+
+        dataset_tables: Dict[str, set] = {}
+        for project_id, project_data in parsed_json.items():
+            if not isinstance(project_data, dict) or "tables" not in project_data:
+                continue
+            for fq_table_name, table_data in project_data["tables"].items():
+                schema, error = _column_schema(fq_table_name, table_data)
+                entry = _CatalogEntry(project_id, fq_table_name, schema, error)
+                self._by_qualified_name[f"{project_id}.{fq_table_name}"] = entry
+                # The first project to define a "dataset.table" owns the short
+                # alias, matching the original project iteration order.
+                if fq_table_name in self._by_qualified_name:
+                    continue
+                self._by_qualified_name[fq_table_name] = entry
+
+                dataset, _, bare_name = fq_table_name.rpartition('.')
+                self._by_table_name.setdefault(bare_name, []).append(fq_table_name)
+                dataset_tables.setdefault(dataset, set()).add(bare_name)
+
+        for names in self._by_table_name.values():
+            names.sort()
+        self._by_dataset = {
+            dataset: tuple(sorted(names)) for dataset, names in dataset_tables.items()
+        }
+        self.all_tables: Tuple[str, ...] = tuple(
+            sorted({entry.qualified_name for entry in self._by_qualified_name.values()})
+        )
+
+    def lookup(self, qualified_name: str) -> Optional[_CatalogEntry]:
+        """Returns the entry for 'dataset.table' or 'project.dataset.table', if any."""
+        return self._by_qualified_name.get(qualified_name)
+
+    def find_by_table_name(self, table_name: str) -> List[str]:
+        """Returns every 'dataset.table' whose table part equals table_name."""
+        return list(self._by_table_name.get(table_name, ()))
+
+    def tables_in_dataset(self, dataset_id: str) -> Tuple[str, ...]:
+        """Returns the sorted bare table names in dataset_id."""
+        return self._by_dataset.get(dataset_id, ())
+
+
+def _column_schema(table_name: str, table_data: Any) -> Tuple[Dict[str, str], Optional[str]]:
+    """Builds the {column: data_type} map for a table, or an error message if malformed."""
+    if not isinstance(table_data, dict) or "columns" not in table_data:
+        return {}, f"Table {table_name} not found in schema JSON"
+    try:
+        return {col['name']: col['data_type'] for col in table_data['columns']}, None
+    except TypeError: # If col is not a dict or 'name'/'data_type' are missing
+        return {}, f"Malformed column data for table {table_name} in schema JSON"
+    except KeyError: # If 'name' or 'data_type' key is missing in a column entry
+        return {}, f"Missing 'name' or 'data_type' in column data for table {table_name} in schema JSON"
+
+
+def _get_schema_catalog() -> Optional[SchemaCatalog]:
+    """
+    Returns the SchemaCatalog for mayo_structure_parsed.json, building it once
+    alongside the first schema load.
+    """
+    global _MAYODB_CATALOG
+    if _MAYODB_CATALOG is None:
+        parsed_json = _get_mayodb_schema()
+        if parsed_json is None:
+            return None
+        _MAYODB_CATALOG = SchemaCatalog(parsed_json)
+    return _MAYODB_CATALOG
+
+
 # Consistent list of tables for simulation - This will be replaced by actual BQ calls or JSON parsing
 SIMULATED_TABLES = ["capitals_data", "schema_info", "order_summary", "customer_details"] # Keep for now, may be removed later
 
+# Upper bound on queries run at once by execute_sql_queries/aexecute_sql_queries.
+# Also the default size of the client pool, so every in-flight query has a client.
+MAX_CONCURRENT_QUERIES = 8
+
+
+class BigQueryClientPool:
+    """
+    Process-wide pool of reusable BigQuery clients.
+
+    Creating a bigquery.Client resolves credentials and opens a new HTTP session,
+    so clients are created lazily up to max_size and handed back to the pool
+    after each query. client_factory is pluggable so tests can run offline
+    against a fake client exposing `query(sql).result()`.
+    """
+
+    def __init__(self, client_factory: Optional[Callable[[], Any]] = None, max_size: int = MAX_CONCURRENT_QUERIES):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self._client_factory = client_factory or bigquery.Client
+        self._idle: "queue.LifoQueue[Any]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._lock = threading.Lock()
+        self._closed = False
+        self.max_size = max_size
+
+    @contextmanager
+    def client(self) -> Iterator[Any]:
+        """Borrows a client for the duration of the block, creating one if none is idle."""
+        with self._slots:
+            try:
+                client = self._idle.get_nowait()
+            except queue.Empty:
+                client = self._client_factory()
+            try:
+                yield client
+            finally:
+                with self._lock:
+                    if not self._closed:
+                        self._idle.put(client)
+                        client = None
+                if client is not None:
+                    # The pool was closed while the client was borrowed.
+                    _close_client(client)
+
+    def close(self) -> None:
+        """Closes every idle client, and every borrowed client once it is returned."""
+        with self._lock:
+            self._closed = True
+        while True:
+            try:
+                client = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            _close_client(client)
+
+
+def _close_client(client: Any) -> None:
+    close = getattr(client, "close", None)
+    if close is not None:
+        close()
+
+
+_CLIENT_POOL: Optional[BigQueryClientPool] = None
+_CLIENT_POOL_LOCK = threading.Lock()
+
+
+def get_client_pool() -> BigQueryClientPool:
+    """Returns the process-wide BigQueryClientPool, creating it on first use."""
+    global _CLIENT_POOL
+    if _CLIENT_POOL is None:
+        with _CLIENT_POOL_LOCK:
+            if _CLIENT_POOL is None:
+                _CLIENT_POOL = BigQueryClientPool()
+    return _CLIENT_POOL
+
+
+def configure_client_pool(client_factory: Optional[Callable[[], Any]] = None, max_size: int = MAX_CONCURRENT_QUERIES) -> BigQueryClientPool:
+    """
+    Replaces the process-wide client pool, closing the previous one.
+    Use it to pin a project/credentials (e.g. `lambda: bigquery.Client(project=...)`)
+    or to plug in a fake client when testing offline.
+    """
+    global _CLIENT_POOL
+    with _CLIENT_POOL_LOCK:
+        previous = _CLIENT_POOL
+        _CLIENT_POOL = BigQueryClientPool(client_factory, max_size)
+    if previous is not None:
+        previous.close()
+    return _CLIENT_POOL
+
+
+# Default TTL (seconds) for cached query results.
+DEFAULT_QUERY_CACHE_TTL = 300
+# Default byte budget for QueryResultCache.
+DEFAULT_QUERY_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+_QUERY_CACHE_NAMESPACE = ("bigquery", "query_results")
+_SQL_WHITESPACE = re.compile(r"\s+")
+_SQL_QUOTED_SEGMENT = re.compile(r"""('(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*"|`[^`]*`)""")
+
+
+class QueryResultCache(BaseCache[Dict[str, Any]]):
+    """
+    Local LRU cache for query results, bounded by the total size of the
+    serialized results rather than the number of entries.
+
+    Implements langgraph's BaseCache, so execute_sql_query can be pointed at
+    this, an InMemoryCache, or any shared BaseCache backend interchangeably.
+    Entries honour the per-entry TTL passed to `set`.
+    """
+
+    def __init__(self, *, max_bytes: int = DEFAULT_QUERY_CACHE_MAX_BYTES, serde: Optional[SerializerProtocol] = None):
+        super().__init__(serde=serde)
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[FullKey, Tuple[str, bytes, Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, keys: Sequence[FullKey]) -> Dict[FullKey, Dict[str, Any]]:
+        """Get the cached values for the given keys, refreshing their LRU position."""
+        values: Dict[FullKey, Dict[str, Any]] = {}
+        now = time.monotonic()
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is None:
+                    continue
+                enc, data, expiry = entry
+                if expiry is not None and now >= expiry:
+                    self._remove(key)
+                    continue
+                self._entries.move_to_end(key)
+                values[key] = (enc, data)
+        # Deserialize outside the lock, so large results don't block other threads.
+        return {key: self.serde.loads_typed(value) for key, value in values.items()}
+
+    async def aget(self, keys: Sequence[FullKey]) -> Dict[FullKey, Dict[str, Any]]:
+        """Asynchronously get the cached values for the given keys."""
+        return self.get(keys)
+
+    def set(self, pairs: Mapping[FullKey, Tuple[Dict[str, Any], Optional[int]]]) -> None:
+        """Set the cached values for the given keys and TTLs, evicting least recently used entries."""
+        encoded = {key: (self.serde.dumps_typed(value), ttl) for key, (value, ttl) in pairs.items()}
+        now = time.monotonic()
+        with self._lock:
+            for key, ((enc, data), ttl) in encoded.items():
+                self._remove(key)
+                if len(data) > self.max_bytes:
+                    # Never cache a single result larger than the whole budget.
+                    continue
+                expiry = now + ttl if ttl is not None else None
+                self._entries[key] = (enc, data, expiry)
+                self.total_bytes += len(data)
+            while self.total_bytes > self.max_bytes and self._entries:
+                _, (_, data, _) = self._entries.popitem(last=False)
+                self.total_bytes -= len(data)
+                self.evictions += 1
+
+    async def aset(self, pairs: Mapping[FullKey, Tuple[Dict[str, Any], Optional[int]]]) -> None:
+        """Asynchronously set the cached values for the given keys and TTLs."""
+        self.set(pairs)
+
+    def clear(self, namespaces: Optional[Sequence[Namespace]] = None) -> None:
+        """Delete the cached values for the given namespaces, or all values if none are given."""
+        with self._lock:
+            if namespaces is None:
+                self._entries.clear()
+                self.total_bytes = 0
+                return
+            targets = set(namespaces)
+            for key in [key for key in self._entries if key[0] in targets]:
+                self._remove(key)
+
+    async def aclear(self, namespaces: Optional[Sequence[Namespace]] = None) -> None:
+        """Asynchronously delete the cached values for the given namespaces."""
+        self.clear(namespaces)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, key: FullKey) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.total_bytes -= len(entry[1])
+
+
+_QUERY_CACHE: Optional[BaseCache] = None
+_QUERY_CACHE_TTL: Optional[int] = DEFAULT_QUERY_CACHE_TTL
+_QUERY_CACHE_STATS = {"hits": 0, "misses": 0}
+_QUERY_CACHE_STATS_LOCK = threading.Lock()
+
+
+def enable_query_cache(cache: Optional[BaseCache] = None, ttl: Optional[int] = DEFAULT_QUERY_CACHE_TTL) -> BaseCache:
+    """
+    Puts a result cache in front of execute_sql_query.
+    Defaults to a QueryResultCache; pass any BaseCache (e.g. InMemoryCache or a
+    shared backend) to use that instead. ttl is in seconds, None means no expiry.
+    """
+    global _QUERY_CACHE, _QUERY_CACHE_TTL
+    _QUERY_CACHE = cache if cache is not None else QueryResultCache()
+    _QUERY_CACHE_TTL = ttl
+    reset_query_cache_stats()
+    return _QUERY_CACHE
+
+
+def disable_query_cache() -> None:
+    """Removes the result cache from in front of execute_sql_query."""
+    global _QUERY_CACHE
+    _QUERY_CACHE = None
+
+
+def get_query_cache_stats() -> Dict[str, int]:
+    """Returns the hit/miss counters of the query result cache."""
+    with _QUERY_CACHE_STATS_LOCK:
+        return dict(_QUERY_CACHE_STATS)
+
+
+def reset_query_cache_stats() -> None:
+    with _QUERY_CACHE_STATS_LOCK:
+        _QUERY_CACHE_STATS.update(hits=0, misses=0)
+
+
+def normalize_sql(query: str) -> str:
+    """
+    Normalizes SQL text for use as a cache key: collapses whitespace outside of
+    quoted strings/identifiers and drops trailing semicolons. Literals are kept
+    verbatim, so queries differing only in a string value never collide.
+    """
+    parts = _SQL_QUOTED_SEGMENT.split(query)
+    for i in range(0, len(parts), 2):
+        parts[i] = _SQL_WHITESPACE.sub(" ", parts[i])
+    return "".join(parts).strip().rstrip(";").rstrip()
+
+
+def _query_cache_key(query: str) -> FullKey:
+    digest = hashlib.sha256(normalize_sql(query).encode("utf-8")).hexdigest()
+    return (_QUERY_CACHE_NAMESPACE, digest)
+
+
+def _count_query_cache(hit: bool) -> None:
+    with _QUERY_CACHE_STATS_LOCK:
+        _QUERY_CACHE_STATS["hits" if hit else "misses"] += 1
+
+
 def execute_sql_query(query: str) -> Dict[str, Any]:
     """
-    Executes a SQL query against BigQuery.
+    Executes a SQL query against BigQuery, using a client from the shared pool.
+    If a query cache is enabled, successful results are served from and stored in it.
     """
-    client = bigquery.Client()
+    return _cached_query(query, lambda: _run_sql_query(query))
+
+
+def _cached_query(cache_sql: str, run: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+    """Serves run()'s result from the query cache, if enabled, keyed by cache_sql."""
+    cache = _QUERY_CACHE
+    if cache is None:
+        return run()
+
+    key = _query_cache_key(cache_sql)
+    cached = cache.get([key])
+    if key in cached:
+        _count_query_cache(hit=True)
+        return cached[key]
+    _count_query_cache(hit=False)
+    result = run()
+    if "error" not in result:
+        cache.set({key: (result, _QUERY_CACHE_TTL)})
+    return result
+
+
+def _run_sql_query(query: str) -> Dict[str, Any]:
     try:
-        query_job = client.query(query)
-        results = query_job.result()  # Waits for the job to complete
-        formatted_results = [dict(row) for row in results]
+        with get_client_pool().client() as client:
+            query_job = client.query(query)
+            results = query_job.result()  # Waits for the job to complete
+            formatted_results = [dict(row) for row in results]
         return {"result": formatted_results}
-    except GoogleCloudError as e:
+    except Exception as e:
+        return _query_error_result(e)
+
+
+def _query_error_result(e: Exception) -> Dict[str, Any]:
+    if isinstance(e, GoogleCloudError):
         print(f"BigQuery query failed: {e}")
         return {"error": str(e), "result": []}
-    except Exception as e: # Catch any other unexpected errors
-        print(f"An unexpected error occurred during query execution: {e}")
-        return {"error": f"An unexpected error occurred: {str(e)}", "result": []}
+    # Any other unexpected error
+    print(f"An unexpected error occurred during query execution: {e}")
+    return {"error": f"An unexpected error occurred: {str(e)}", "result": []}
+
+
+# Rows fetched per page by stream_sql_query.
+DEFAULT_PAGE_SIZE = 500
+# Rows kept inline by preview_sql_query; the rest stay behind a QueryResultHandle.
+DEFAULT_PREVIEW_ROWS = 5
+
+
+def _project_columns(query: str, columns: Sequence[str]) -> str:
+    """Wraps query so BigQuery only returns (and bills) the requested columns."""
+    for column in columns:
+        if not column or '`' in column:
+            raise ValueError(f"Invalid column name for projection: {column!r}")
+    projection = ", ".join(f"`{column}`" for column in columns)
+    return f"SELECT {projection} FROM ({query.strip().rstrip(';')})"
+
+
+def stream_sql_query(
+    query: str,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    max_rows: Optional[int] = None,
+    columns: Optional[Sequence[str]] = None,
+    start_index: int = 0,
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Executes a SQL query and yields the result one page (list of row dicts) at a time,
+    so only a single page is held in memory however large the result is.
+    max_rows caps the total number of rows, columns projects the result server-side,
+    and start_index skips that many leading rows. Errors are raised, not returned.
+    """
+    if columns:
+        query = _project_columns(query, columns)
+    # Pages are fetched lazily as the generator is consumed, so the client stays
+    # borrowed until the generator is exhausted or closed.
+    with get_client_pool().client() as client:
+        rows = client.query(query).result(
+            page_size=page_size, max_results=max_rows, start_index=start_index or None
+        )
+        for page in rows.pages:
+            yield [dict(row) for row in page]
+
+
+class QueryResultHandle(NamedTuple):
+    """
+    Reference to the rows of a finished query job beyond its preview. It holds no
+    rows itself, so it is cheap to keep in graph state; the rest is paged on demand
+    from the job's result table, without running the query again. BigQuery keeps
+    that table for about a day.
+    """
+    job_id: str
+    project: Optional[str]
+    location: Optional[str]
+    offset: int  # Rows already returned in the preview
+
+    def pages(self, page_size: int = DEFAULT_PAGE_SIZE, max_rows: Optional[int] = None) -> Iterator[List[Dict[str, Any]]]:
+        """Streams the remaining rows page by page."""
+        with get_client_pool().client() as client:
+            job = client.get_job(self.job_id, project=self.project, location=self.location)
+            rows = job.result(page_size=page_size, max_results=max_rows, start_index=self.offset or None)
+            for page in rows.pages:
+                yield [dict(row) for row in page]
+
+    def rows(self, page_size: int = DEFAULT_PAGE_SIZE, max_rows: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """Streams the remaining rows one at a time."""
+        for page in self.pages(page_size, max_rows):
+            yield from page
+
+
+def preview_sql_query(
+    query: str,
+    preview_rows: int = DEFAULT_PREVIEW_ROWS,
+    columns: Optional[Sequence[str]] = None,
+) -> Dict[str, Any]:
+    """
+    Executes a SQL query but only materializes its first preview_rows rows.
+    Returns {"result": preview, "handle": QueryResultHandle | None}; the handle is
+    set only when more rows are available and streams them on demand.
+    If a query cache is enabled, previews are served from and stored in it.
+    """
+    cache_sql = f"-- preview {preview_rows} {list(columns or ())}\n{query}"
+    return _cached_query(cache_sql, lambda: _run_preview_query(query, preview_rows, columns))
+
+
+def _run_preview_query(query: str, preview_rows: int, columns: Optional[Sequence[str]]) -> Dict[str, Any]:
+    try:
+        if columns:
+            query = _project_columns(query, columns)
+        with get_client_pool().client() as client:
+            job = client.query(query)
+            # Fetch one extra row to learn whether anything is left without reading it all.
+            rows = [dict(row) for row in job.result(max_results=preview_rows + 1)]
+    except Exception as e:
+        return {**_query_error_result(e), "handle": None}
+    handle = None
+    if len(rows) > preview_rows:
+        handle = QueryResultHandle(job.job_id, job.project, job.location, preview_rows)
+    return {"result": rows[:preview_rows], "handle": handle}
+
+
+async def aexecute_sql_query(query: str) -> Dict[str, Any]:
+    """
+    Async variant of execute_sql_query. The BigQuery client is blocking, so the
+    query runs in a worker thread instead of on the event loop.
+    """
+    return await asyncio.to_thread(execute_sql_query, query)
+
+
+def execute_sql_queries(
+    queries: List[str],
+    max_concurrency: int = MAX_CONCURRENT_QUERIES,
+    run_query: Optional[Callable[[str], Dict[str, Any]]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Runs several queries concurrently, at most max_concurrency at a time, and
+    returns their results in the same order as `queries`. Wall time is bounded
+    by the slowest query rather than the sum of all of them.
+    run_query defaults to execute_sql_query and can be swapped for another backend.
+    """
+    run_query = run_query or execute_sql_query
+    if len(queries) <= 1 or max_concurrency <= 1:
+        return [run_query(query) for query in queries]
+    with ThreadPoolExecutor(max_workers=min(max_concurrency, len(queries))) as executor:
+        return list(executor.map(run_query, queries))
+
+
+async def aexecute_sql_queries(
+    queries: List[str],
+    max_concurrency: int = MAX_CONCURRENT_QUERIES,
+    run_query: Optional[Callable[[str], Awaitable[Dict[str, Any]]]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Async variant of execute_sql_queries, bounded by a semaphore.
+    run_query defaults to aexecute_sql_query and can be swapped for another backend.
+    """
+    run_query = run_query or aexecute_sql_query
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def _run(query: str) -> Dict[str, Any]:
+        async with semaphore:
+            return await run_query(query)
+
+    return list(await asyncio.gather(*(_run(query) for query in queries)))
 
 def get_table_schema(table_name: str) -> Dict[str, Any]:
     """
     Retrieves the schema for a table from the loaded mayo_structure_parsed.json.
+    Accepts 'project.dataset.table', 'dataset.table' or a bare 'table' name.
+    A bare name that exists in more than one dataset is reported as ambiguous,
+    with every candidate listed under "matches".
     """
-    parsed_json = _get_mayodb_schema()
-    if parsed_json is None:
+    catalog = _get_schema_catalog()
+    if catalog is None:
         return {"schema": {}, "error": "Failed to load schema JSON"}
 
-    # table_name might be dataset.table or just table.
-    # The JSON structure is project -> tables -> dataset.table.
-    # We need to find the table across all projects if no project is specified.
-    
-    found_table_data = None
-    for project_id, project_data in parsed_json.items():
-        if "tables" in project_data:
-            # Scenario 1: table_name is fully qualified like "dataset_id.table_id"
-            if '.' in table_name and table_name in project_data["tables"]:
-                found_table_data = project_data["tables"][table_name]
-                break
-            # Scenario 2: table_name is just "table_id", try to find it in any dataset
-            # This is less precise and might lead to ambiguity if multiple tables have the same name in different datasets.
-            # For this implementation, we'll prioritize fully qualified names.
-            # If you need to support unqualified table names, you might need to iterate
-            # and if multiple are found, decide on a strategy (e.g., return first, or error).
-            elif '.' not in table_name:
-                for fq_table_name, table_data in project_data["tables"].items():
-                    if fq_table_name.endswith('.' + table_name):
-                        found_table_data = table_data
-                        # To avoid ambiguity, let's print a warning if we find an unqualified name.
-                        # A more robust solution might involve knowing the current dataset context.
-                        print(f"Warning: Matched unqualified table name '{table_name}' to '{fq_table_name}'. Provide 'dataset.table' for precision.")
-                        break # Found a match
-                if found_table_data:
-                    break # Exit project loop as well
-
-    if found_table_data and "columns" in found_table_data:
-        try:
-            db_schema = {col['name']: col['data_type'] for col in found_table_data['columns']}
-            return {"schema": db_schema}
-        except TypeError: # If col is not a dict or 'name'/'data_type' are missing
-            return {"schema": {}, "error": f"Malformed column data for table {table_name} in schema JSON"}
-        except KeyError: # If 'name' or 'data_type' key is missing in a column entry
-             return {"schema": {}, "error": f"Missing 'name' or 'data_type' in column data for table {table_name} in schema JSON"}
-
-    return {"schema": {}, "error": f"Table {table_name} not found in schema JSON"}
+    if '.' in table_name:
+        matches = [table_name] if catalog.lookup(table_name) is not None else []
+    else:
+        matches = catalog.find_by_table_name(table_name)
+
+    if not matches:
+        return {"schema": {}, "error": f"Table {table_name} not found in schema JSON"}
+    if len(matches) > 1:
+        return {
+            "schema": {},
+            "error": f"Ambiguous table name '{table_name}' matches {len(matches)} tables. Provide 'dataset.table' for precision.",
+            "matches": matches,
+        }
+
+    entry = catalog.lookup(matches[0])
+    if entry.error is not None:
+        return {"schema": {}, "error": entry.error}
+    return {"schema": dict(entry.schema)}
 
 
 def list_tables(dataset_id: str = None) -> Dict[str, List[str]]:
@@ -112,22 +616,13 @@ def list_tables(dataset_id: str = None) -> Dict[str, List[str]]:
     If dataset_id is provided, filters tables by that dataset (returning only table names).
     Otherwise, lists all tables from all datasets (returning 'dataset.table' identifiers).
     """
-    parsed_json = _get_mayodb_schema()
-    if parsed_json is None:
+    catalog = _get_schema_catalog()
+    if catalog is None:
         return {"tables": [], "error": "Failed to load schema JSON"}
 
-    all_tables = []
-    for project_data in parsed_json.values(): # Iterate through projects
-        if "tables" in project_data:
-            for fq_table_name in project_data["tables"].keys(): # fq_table_name is "dataset.table"
-                current_dataset_id, _, current_table_name = fq_table_name.partition('.')
-                if dataset_id:
-                    if current_dataset_id == dataset_id:
-                        all_tables.append(current_table_name) # Add only table name
-                else:
-                    all_tables.append(fq_table_name) # Add "dataset.table"
-    
-    return {"tables": sorted(list(set(all_tables)))}
+    if dataset_id:
+        return {"tables": list(catalog.tables_in_dataset(dataset_id))}
+    return {"tables": list(catalog.all_tables)}
 
 if __name__ == '__main__':
     # Ensure the schema is loaded once at the beginning if tests are run
@@ -141,9 +636,9 @@ if __name__ == '__main__':
     print("Query costs may apply.")
     print("-----------------\n")
 
-    # Ensure the schema is loaded once at the beginning if tests are run,
+    # Ensure the schema is loaded and indexed once at the beginning if tests are run,
     # as list_tables and get_table_schema depend on it.
-    _get_mayodb_schema()
+    _get_schema_catalog()
 
     print("\n--- Testing execute_sql_query ---")
     query1 = "SELECT DATE_DK, DAY_NAME FROM `ml-mps-adl-intudp-phi-p-d5cb.phi_udpwh_etl_us_p.DIM_DATE` LIMIT 2"
@@ -13,6 +13,8 @@ import logging
 from typing import Dict, List, Optional, Tuple
 import argparse
 
+from html_conversion import convert_files, default_workers, resolve_parser
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -24,16 +26,18 @@ logger = logging.getLogger(__name__)
 class HTMLToMarkdownConverter:
     """Convert HTML documentation to Markdown format."""
     
-    def __init__(self, input_dir: str, output_dir: str):
+    def __init__(self, input_dir: str, output_dir: str, parser: str = 'auto'):
         """
         Initialize converter with input and output directories.
         
         Args:
             input_dir: Directory containing HTML files
             output_dir: Directory where Markdown files will be saved
+            parser: BeautifulSoup parser; 'auto' uses lxml when installed
         """
         self.input_dir = Path(input_dir)
         self.output_dir = Path(output_dir)
+        self.parser = resolve_parser(parser)
         
         # Create output directory if it doesn't exist
         self.output_dir.mkdir(parents=True, exist_ok=True)
@@ -291,7 +295,7 @@ class HTMLToMarkdownConverter:
                 html_content = f.read()
                 
             # Parse HTML
-            soup = BeautifulSoup(html_content, 'html.parser')
+            soup = BeautifulSoup(html_content, self.parser)
             
             # Extract components
             title = self.extract_title(soup)
@@ -372,14 +376,18 @@ class HTMLToMarkdownConverter:
             logger.error(f"Error processing {html_file.name}: {str(e)}")
             return False
     
-    def convert_all(self) -> Tuple[int, int]:
+    def convert_all(self, workers: int = 1, incremental: bool = True) -> Tuple[int, int]:
         """
         Convert all HTML files in the input directory.
         
+        Args:
+            workers: Number of worker processes to convert files in parallel
+            incremental: Skip files that are unchanged since the last run
+            
         Returns:
             Tuple of (successful_count, failed_count)
         """
-        html_files = list(self.input_dir.glob('*.html'))
+        html_files = sorted(self.input_dir.glob('*.html'))
         
         if not html_files:
             logger.warning(f"No HTML files found in {self.input_dir}")
@@ -387,16 +395,7 @@ class HTMLToMarkdownConverter:
             
         logger.info(f"Found {len(html_files)} HTML files to process")
         
-        successful = 0
-        failed = 0
-        
-        for html_file in html_files:
-            if self.convert_file(html_file):
-                successful += 1
-            else:
-                failed += 1
-                
-        return successful, failed
+        return convert_files(self, html_files, workers=workers, incremental=incremental)
 
 
 def main():
@@ -417,6 +416,23 @@ def main():
         action='store_true',
         help='Enable verbose logging'
     )
+    parser.add_argument(
+        '--workers', '-j',
+        type=int,
+        default=default_workers(),
+        help='Number of worker processes (default: CPU count)'
+    )
+    parser.add_argument(
+        '--force',
+        action='store_true',
+        help='Reconvert every file, even if unchanged since the last run'
+    )
+    parser.add_argument(
+        '--parser',
+        choices=['auto', 'lxml', 'html.parser'],
+        default='auto',
+        help='HTML parser to use (default: lxml when installed)'
+    )
     
     args = parser.parse_args()
     
@@ -424,8 +440,8 @@ def main():
         logging.getLogger().setLevel(logging.DEBUG)
     
     # Create converter and process files
-    converter = HTMLToMarkdownConverter(args.input_dir, args.output_dir)
-    successful, failed = converter.convert_all()
+    converter = HTMLToMarkdownConverter(args.input_dir, args.output_dir, parser=args.parser)
+    successful, failed = converter.convert_all(workers=args.workers, incremental=not args.force)
     
     # Print summary
     print(f"\nConversion complete!")
@@ -9,10 +9,12 @@ import re
 from pathlib import Path
 from bs4 import BeautifulSoup, NavigableString
 import logging
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple, Union
 import argparse
 import html
 
+from html_conversion import DocumentIndex, convert_files, default_workers, resolve_parser
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -24,16 +26,18 @@ logger = logging.getLogger(__name__)
 class UnifiedHTMLToMarkdownConverter:
     """Convert various HTML documentation styles to Markdown format."""
     
-    def __init__(self, input_dir: str, output_dir: str):
+    def __init__(self, input_dir: str, output_dir: str, parser: str = 'auto'):
         """
         Initialize converter with input and output directories.
         
         Args:
             input_dir: Directory containing HTML files
             output_dir: Directory where Markdown files will be saved
+            parser: BeautifulSoup parser; 'auto' uses lxml when installed
         """
         self.input_dir = Path(input_dir)
         self.output_dir = Path(output_dir)
+        self.parser = resolve_parser(parser)
         
         # Create output directory if it doesn't exist
         self.output_dir.mkdir(parents=True, exist_ok=True)
@@ -49,54 +53,53 @@ class UnifiedHTMLToMarkdownConverter:
         text = text.replace('&nbsp;', ' ')
         return text
     
-    def detect_document_type(self, soup: BeautifulSoup) -> str:
+    def detect_document_type(self, doc: Union[DocumentIndex, BeautifulSoup]) -> str:
         """Detect if this is a Data Mart or FHIR documentation."""
+        doc = DocumentIndex.of(doc)
         # Check for typical Data Mart sections
-        if soup.find('h2', {'id': 'dataset-information'}) and soup.find('h2', {'id': 'example-query'}):
+        if doc.section('dataset-information') and doc.section('example-query'):
             return 'datamart'
         # Check for typical FHIR sections
-        elif soup.find('h2', {'id': 'supported-attributes'}) or soup.find('h2', {'id': 'characteristics'}):
+        elif doc.section('supported-attributes') or doc.section('characteristics'):
             return 'fhir'
         else:
             # Default to datamart style
             return 'datamart'
     
-    def extract_title(self, soup: BeautifulSoup) -> str:
+    def extract_title(self, doc: Union[DocumentIndex, BeautifulSoup]) -> str:
         """Extract the main title from H1 tag."""
-        h1 = soup.find('h1')
+        h1 = DocumentIndex.of(doc).first('h1')
         if h1:
             return self.clean_text(h1.get_text())
         return "Documentation"
     
-    def extract_description(self, soup: BeautifulSoup) -> Optional[str]:
+    def extract_description(self, doc: Union[DocumentIndex, BeautifulSoup]) -> Optional[str]:
         """Extract the description."""
+        doc = DocumentIndex.of(doc)
         # For FHIR docs, it's the paragraph after H1
-        h1 = soup.find('h1')
+        h1 = doc.first('h1')
         if h1:
             next_sibling = h1.find_next_sibling()
             if next_sibling and next_sibling.name == 'p':
                 return self.clean_text(next_sibling.get_text())
                 
         # For Data Mart docs, look for description section
-        desc_section = soup.find('h2', {'id': 'description'})
+        desc_section = doc.section('description')
         if desc_section:
-            return self.extract_section(soup, 'description')
+            return self.extract_section(doc, 'description')
             
         return None
     
-    def extract_section(self, soup: BeautifulSoup, section_id: str) -> Optional[str]:
+    def extract_section(self, doc: Union[DocumentIndex, BeautifulSoup], section_id: str) -> Optional[str]:
         """Extract content from a specific section by ID."""
-        section = soup.find('h2', {'id': section_id})
-        if not section:
+        doc = DocumentIndex.of(doc)
+        if not doc.section(section_id):
             return None
             
         content = []
         
         # Get all siblings until the next h2
-        for sibling in section.find_next_siblings():
-            if sibling.name == 'h2':
-                break
-                
+        for sibling in doc.section_siblings(section_id):
             if sibling.name == 'p':
                 content.append(self.clean_text(sibling.get_text()))
             elif sibling.name == 'ul':
@@ -169,19 +172,16 @@ class UnifiedHTMLToMarkdownConverter:
                     
         return '\n'.join(rows) if rows else None
     
-    def extract_dataset_info(self, soup: BeautifulSoup) -> Optional[str]:
+    def extract_dataset_info(self, doc: Union[DocumentIndex, BeautifulSoup]) -> Optional[str]:
         """Extract dataset information section for Data Mart docs."""
-        section = soup.find('h2', {'id': 'dataset-information'})
-        if not section:
+        doc = DocumentIndex.of(doc)
+        if not doc.section('dataset-information'):
             return None
             
         content = []
         
         # Process the content after the h2
-        for sibling in section.find_next_siblings():
-            if sibling.name == 'h2':
-                break
-                
+        for sibling in doc.section_siblings('dataset-information'):
             if sibling.name == 'ul':
                 for li in sibling.find_all('li', recursive=False):
                     # Extract main text
@@ -235,19 +235,16 @@ class UnifiedHTMLToMarkdownConverter:
                             
         return '\n'.join(content) if content else None
     
-    def extract_diagram(self, soup: BeautifulSoup) -> Optional[str]:
+    def extract_diagram(self, doc: Union[DocumentIndex, BeautifulSoup]) -> Optional[str]:
         """Extract diagram section with image and link."""
-        section = soup.find('h2', {'id': 'diagram'})
-        if not section:
+        doc = DocumentIndex.of(doc)
+        if not doc.section('diagram'):
             return None
             
         content = []
         
         # Look for the image link
-        for sibling in section.find_next_siblings():
-            if sibling.name == 'h2':
-                break
-                
+        for sibling in doc.section_siblings('diagram'):
             if sibling.name == 'p':
                 link = sibling.find('a')
                 if link:
@@ -262,13 +259,12 @@ class UnifiedHTMLToMarkdownConverter:
                         
         return '\n'.join(content) if content else None
     
-    def extract_example_query(self, soup: BeautifulSoup) -> Optional[Dict[str, str]]:
+    def extract_example_query(self, doc: Union[DocumentIndex, BeautifulSoup]) -> Optional[Dict[str, str]]:
         """Extract example query section including indexed columns and sample queries."""
+        doc = DocumentIndex.of(doc)
         # Try both singular and plural forms
-        section = soup.find('h2', {'id': 'example-query'})
-        if not section:
-            section = soup.find('h2', {'id': 'example-queries'})
-        if not section:
+        section_id = 'example-query' if doc.section('example-query') else 'example-queries'
+        if not doc.section(section_id):
             return None
             
         result = {
@@ -277,10 +273,7 @@ class UnifiedHTMLToMarkdownConverter:
         }
         
         # Process content after h2
-        for sibling in section.find_next_siblings():
-            if sibling.name == 'h2':
-                break
-                
+        for sibling in doc.section_siblings(section_id):
             if sibling.name == 'p':
                 text = self.clean_text(sibling.get_text())
                 if 'Fact Table Indexed Columns' in text:
@@ -344,7 +337,7 @@ class UnifiedHTMLToMarkdownConverter:
                         child_html = str(child)
                         for code in code_tags:
                             child_html = child_html.replace(str(code), f"`{code.get_text()}`")
-                        temp_soup = BeautifulSoup(child_html, 'html.parser')
+                        temp_soup = BeautifulSoup(child_html, self.parser)
                         value = self.clean_text(temp_soup.get_text())
                     else:
                         value = self.clean_text(child.get_text())
@@ -360,19 +353,17 @@ class UnifiedHTMLToMarkdownConverter:
                         
         return result
     
-    def extract_supported_attributes(self, soup: BeautifulSoup) -> Optional[str]:
+    def extract_supported_attributes(self, doc: Union[DocumentIndex, BeautifulSoup]) -> Optional[str]:
         """Extract and format the supported attributes table (FHIR docs)."""
-        section = soup.find('h2', {'id': 'supported-attributes'})
-        if not section:
+        doc = DocumentIndex.of(doc)
+        if not doc.section('supported-attributes'):
             return None
             
         content = []
         
         # Find the table
         table = None
-        for sibling in section.find_next_siblings():
-            if sibling.name == 'h2':
-                break
+        for sibling in doc.section_siblings('supported-attributes'):
             if sibling.name == 'table':
                 table = sibling
                 break
@@ -416,17 +407,15 @@ class UnifiedHTMLToMarkdownConverter:
                             
         return '\n'.join(content) if content else None
     
-    def extract_section_with_table(self, soup: BeautifulSoup, section_id: str) -> Optional[str]:
+    def extract_section_with_table(self, doc: Union[DocumentIndex, BeautifulSoup], section_id: str) -> Optional[str]:
         """Extract a section that contains a table."""
-        section = soup.find('h2', {'id': section_id})
-        if not section:
+        doc = DocumentIndex.of(doc)
+        if not doc.section(section_id):
             return None
             
         # Find the next table after this section
         table = None
-        for sibling in section.find_next_siblings():
-            if sibling.name == 'h2':
-                break
+        for sibling in doc.section_siblings(section_id):
             if sibling.name == 'table':
                 table = sibling
                 break
@@ -435,19 +424,16 @@ class UnifiedHTMLToMarkdownConverter:
             return self.extract_table(table)
         return None
     
-    def extract_section_with_code_in_list(self, soup: BeautifulSoup, section_id: str) -> Optional[str]:
+    def extract_section_with_code_in_list(self, doc: Union[DocumentIndex, BeautifulSoup], section_id: str) -> Optional[str]:
         """Extract section content that includes code tags within lists (FHIR notes)."""
-        section = soup.find('h2', {'id': section_id})
-        if not section:
+        doc = DocumentIndex.of(doc)
+        if not doc.section(section_id):
             return None
             
         content = []
         
         # Get all siblings until the next h2
-        for sibling in section.find_next_siblings():
-            if sibling.name == 'h2':
-                break
-                
+        for sibling in doc.section_siblings(section_id):
             if sibling.name == 'p':
                 text = self.clean_text(sibling.get_text())
                 if text:
@@ -463,7 +449,7 @@ class UnifiedHTMLToMarkdownConverter:
                         for code in code_tags:
                             li_html = li_html.replace(str(code), f"`{code.get_text()}`")
                         # Parse the modified text
-                        temp_soup = BeautifulSoup(li_html, 'html.parser')
+                        temp_soup = BeautifulSoup(li_html, self.parser)
                         text = self.clean_text(temp_soup.get_text())
                     else:
                         # Check for links
@@ -480,154 +466,166 @@ class UnifiedHTMLToMarkdownConverter:
                         
         return '\n'.join(content) if content else None
     
-    def convert_file(self, html_file: Path) -> bool:
+    def build_markdown(self, doc: DocumentIndex) -> str:
         """
-        Convert a single HTML file to Markdown.
+        Build the Markdown for an indexed document.
         
         Args:
-            html_file: Path to the HTML file
+            doc: Union[DocumentIndex, BeautifulSoup] of the parsed HTML page
             
         Returns:
-            True if successful, False otherwise
+            The Markdown content
         """
-        try:
-            logger.info(f"Processing: {html_file.name}")
+        # Detect document type
+        doc_type = self.detect_document_type(doc)
+        logger.info(f"Detected document type: {doc_type}")
+        
+        # Extract components
+        title = self.extract_title(doc)
+        
+        # Build Markdown content
+        md_content = [f"# {title}"]
+        
+        if doc_type == 'fhir':
+            # FHIR document processing
+            description = self.extract_description(doc)
+            if description:
+                md_content.append(f"\n{description}")
             
-            # Read HTML content
-            with open(html_file, 'r', encoding='utf-8') as f:
-                html_content = f.read()
-                
-            # Parse HTML
-            soup = BeautifulSoup(html_content, 'html.parser')
+            # Extract Characteristics table
+            characteristics = self.extract_section_with_table(doc, 'characteristics')
+            if characteristics:
+                md_content.append("\n## Characteristics\n")
+                md_content.append(characteristics)
             
-            # Detect document type
-            doc_type = self.detect_document_type(soup)
-            logger.info(f"Detected document type: {doc_type}")
+            # Extract Notes section with code formatting
+            notes = self.extract_section_with_code_in_list(doc, 'notes')
+            if notes:
+                md_content.append("\n## Notes\n")
+                md_content.append(notes)
             
-            # Extract components
-            title = self.extract_title(soup)
+            # Extract Supported Attributes
+            supported_attrs = self.extract_supported_attributes(doc)
+            if supported_attrs:
+                md_content.append("\n## Supported Attributes")
+                md_content.append(supported_attrs)
             
-            # Build Markdown content
-            md_content = [f"# {title}"]
+            # Extract Unsupported Attributes
+            unsupported = self.extract_section_with_table(doc, 'unsupported-attributes')
+            if unsupported:
+                md_content.append("\n## Unsupported Attributes\n")
+                md_content.append(unsupported)
+            else:
+                # Check if section exists but has no table
+                if doc.section('unsupported-attributes'):
+                    # Check for content after section
+                    has_content = False
+                    for sibling in doc.section_siblings('unsupported-attributes'):
+                        if sibling.name and sibling.get_text().strip():
+                            has_content = True
+                            break
+                    if not has_content:
+                        md_content.append("\n## Unsupported Attributes\n")
+                        md_content.append("None")
             
-            if doc_type == 'fhir':
-                # FHIR document processing
-                description = self.extract_description(soup)
-                if description:
-                    md_content.append(f"\n{description}")
+            # Extract Known Issues
+            known_issues = self.extract_section(doc, 'known-issues')
+            if known_issues:
+                md_content.append("\n## Known Issues\n")
+                md_content.append(known_issues)
                 
-                # Extract Characteristics table
-                characteristics = self.extract_section_with_table(soup, 'characteristics')
-                if characteristics:
-                    md_content.append("\n## Characteristics\n")
-                    md_content.append(characteristics)
+        else:
+            # Data Mart document processing
+            description = self.extract_section(doc, 'description')
+            if description:
+                md_content.append("\n## Description\n")
+                md_content.append(description)
                 
-                # Extract Notes section with code formatting
-                notes = self.extract_section_with_code_in_list(soup, 'notes')
-                if notes:
-                    md_content.append("\n## Notes\n")
-                    md_content.append(notes)
+            diagram = self.extract_diagram(doc)
+            if diagram:
+                md_content.append("\n## Diagram\n")
+                md_content.append(diagram)
                 
-                # Extract Supported Attributes
-                supported_attrs = self.extract_supported_attributes(soup)
-                if supported_attrs:
-                    md_content.append("\n## Supported Attributes")
-                    md_content.append(supported_attrs)
+            dataset_info = self.extract_dataset_info(doc)
+            if dataset_info:
+                md_content.append("\n## Dataset Information\n")
+                md_content.append(dataset_info)
                 
-                # Extract Unsupported Attributes
-                unsupported = self.extract_section_with_table(soup, 'unsupported-attributes')
-                if unsupported:
-                    md_content.append("\n## Unsupported Attributes\n")
-                    md_content.append(unsupported)
+            mapping_specs = self.extract_section(doc, 'mapping-specifications')
+            if mapping_specs:
+                md_content.append("\n## Mapping Specifications\n")
+                md_content.append(mapping_specs)
+                
+            example_query = self.extract_example_query(doc)
+            if example_query:
+                # Count code blocks to determine title
+                code_blocks = [block for block in example_query.get('content_blocks', []) if block['type'] == 'code']
+                if len(code_blocks) > 1:
+                    md_content.append("\n## Example Queries")
                 else:
-                    # Check if section exists but has no table
-                    section = soup.find('h2', {'id': 'unsupported-attributes'})
-                    if section:
-                        # Check for content after section
-                        has_content = False
-                        for sibling in section.find_next_siblings():
-                            if sibling.name == 'h2':
-                                break
-                            if sibling.name and sibling.get_text().strip():
-                                has_content = True
-                                break
-                        if not has_content:
-                            md_content.append("\n## Unsupported Attributes\n")
-                            md_content.append("None")
+                    md_content.append("\n## Example Query")
                 
-                # Extract Known Issues
-                known_issues = self.extract_section(soup, 'known-issues')
-                if known_issues:
-                    md_content.append("\n## Known Issues\n")
-                    md_content.append(known_issues)
-                    
-            else:
-                # Data Mart document processing
-                description = self.extract_section(soup, 'description')
-                if description:
-                    md_content.append("\n## Description\n")
-                    md_content.append(description)
-                    
-                diagram = self.extract_diagram(soup)
-                if diagram:
-                    md_content.append("\n## Diagram\n")
-                    md_content.append(diagram)
-                    
-                dataset_info = self.extract_dataset_info(soup)
-                if dataset_info:
-                    md_content.append("\n## Dataset Information\n")
-                    md_content.append(dataset_info)
+                if example_query.get('indexed_columns_intro'):
+                    md_content.append(f"\n### Fact Table Indexed Columns\n")
+                    md_content.append("**Note:** Subject to changes. Please use the following column(s) in your query filter for faster and more efficient data retrieval.\n")
                     
-                mapping_specs = self.extract_section(soup, 'mapping-specifications')
-                if mapping_specs:
-                    md_content.append("\n## Mapping Specifications\n")
-                    md_content.append(mapping_specs)
+                if example_query.get('indexed_columns'):
+                    md_content.append('\n'.join(example_query['indexed_columns']))
                     
-                example_query = self.extract_example_query(soup)
-                if example_query:
-                    # Count code blocks to determine title
-                    code_blocks = [block for block in example_query.get('content_blocks', []) if block['type'] == 'code']
-                    if len(code_blocks) > 1:
-                        md_content.append("\n## Example Queries")
-                    else:
-                        md_content.append("\n## Example Query")
-                    
-                    if example_query.get('indexed_columns_intro'):
-                        md_content.append(f"\n### Fact Table Indexed Columns\n")
-                        md_content.append("**Note:** Subject to changes. Please use the following column(s) in your query filter for faster and more efficient data retrieval.\n")
-                        
-                    if example_query.get('indexed_columns'):
-                        md_content.append('\n'.join(example_query['indexed_columns']))
+                # Process content blocks in order
+                query_count = 0
+                for block in example_query.get('content_blocks', []):
+                    if block['type'] == 'text':
+                        md_content.append(f"\n{block['content']}\n")
+                    elif block['type'] == 'code':
+                        query_count += 1
+                        if len(code_blocks) > 1:
+                            md_content.append(f"\n### Sample Query {query_count}\n")
+                        else:
+                            md_content.append("\n### Sample Query\n")
                         
-                    # Process content blocks in order
-                    query_count = 0
-                    for block in example_query.get('content_blocks', []):
-                        if block['type'] == 'text':
-                            md_content.append(f"\n{block['content']}\n")
-                        elif block['type'] == 'code':
-                            query_count += 1
-                            if len(code_blocks) > 1:
-                                md_content.append(f"\n### Sample Query {query_count}\n")
-                            else:
-                                md_content.append("\n### Sample Query\n")
+                        # Add intro text for first query if not already present
+                        if query_count == 1 and not any('Sample Query:' in b.get('content', '') for b in example_query.get('content_blocks', []) if b['type'] == 'text'):
+                            md_content.append("This is a sample query to get you started. Query you need for your use case may be different than this sample.\n")
                             
-                            # Add intro text for first query if not already present
-                            if query_count == 1 and not any('Sample Query:' in b.get('content', '') for b in example_query.get('content_blocks', []) if b['type'] == 'text'):
-                                md_content.append("This is a sample query to get you started. Query you need for your use case may be different than this sample.\n")
-                                
-                            md_content.append("```sql")
-                            md_content.append(block['content'])
-                            md_content.append("```")
-                        
-                key_points = self.extract_section(soup, 'key-points')
-                if key_points:
-                    md_content.append("\n## Key Points\n")
-                    md_content.append(key_points)
+                        md_content.append("```sql")
+                        md_content.append(block['content'])
+                        md_content.append("```")
                     
+            key_points = self.extract_section(doc, 'key-points')
+            if key_points:
+                md_content.append("\n## Key Points\n")
+                md_content.append(key_points)
+        
+        return '\n'.join(md_content)
+    
+    def convert_file(self, html_file: Path) -> bool:
+        """
+        Convert a single HTML file to Markdown.
+        
+        Args:
+            html_file: Path to the HTML file
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            logger.info(f"Processing: {html_file.name}")
+            
+            # Read HTML content
+            with open(html_file, 'r', encoding='utf-8') as f:
+                html_content = f.read()
+                
+            # Parse HTML
+            soup = BeautifulSoup(html_content, self.parser)
+            
+            # Index the document once; every extract_* helper reads from it
+            md_text = self.build_markdown(DocumentIndex(soup))
+            
             # Write Markdown file
             output_file = self.output_dir / f"{html_file.stem}.md"
             with open(output_file, 'w', encoding='utf-8') as f:
-                f.write('\n'.join(md_content))
+                f.write(md_text)
                 
             logger.info(f"Successfully converted: {html_file.name} -> {output_file.name}")
             return True
@@ -638,14 +636,18 @@ class UnifiedHTMLToMarkdownConverter:
             logger.error(traceback.format_exc())
             return False
     
-    def convert_all(self) -> Tuple[int, int]:
+    def convert_all(self, workers: int = 1, incremental: bool = True) -> Tuple[int, int]:
         """
         Convert all HTML files in the input directory.
         
+        Args:
+            workers: Number of worker processes to convert files in parallel
+            incremental: Skip files that are unchanged since the last run
+            
         Returns:
             Tuple of (successful_count, failed_count)
         """
-        html_files = list(self.input_dir.glob('*.html'))
+        html_files = sorted(self.input_dir.glob('*.html'))
         
         if not html_files:
             logger.warning(f"No HTML files found in {self.input_dir}")
@@ -653,16 +655,7 @@ class UnifiedHTMLToMarkdownConverter:
             
         logger.info(f"Found {len(html_files)} HTML files to process")
         
-        successful = 0
-        failed = 0
-        
-        for html_file in html_files:
-            if self.convert_file(html_file):
-                successful += 1
-            else:
-                failed += 1
-                
-        return successful, failed
+        return convert_files(self, html_files, workers=workers, incremental=incremental)
 
 
 def main():
@@ -683,6 +676,23 @@ def main():
         action='store_true',
         help='Enable verbose logging'
     )
+    parser.add_argument(
+        '--workers', '-j',
+        type=int,
+        default=default_workers(),
+        help='Number of worker processes (default: CPU count)'
+    )
+    parser.add_argument(
+        '--force',
+        action='store_true',
+        help='Reconvert every file, even if unchanged since the last run'
+    )
+    parser.add_argument(
+        '--parser',
+        choices=['auto', 'lxml', 'html.parser'],
+        default='auto',
+        help='HTML parser to use (default: lxml when installed)'
+    )
     
     args = parser.parse_args()
     
@@ -690,8 +700,8 @@ def main():
         logging.getLogger().setLevel(logging.DEBUG)
     
     # Create converter and process files
-    converter = UnifiedHTMLToMarkdownConverter(args.input_dir, args.output_dir)
-    successful, failed = converter.convert_all()
+    converter = UnifiedHTMLToMarkdownConverter(args.input_dir, args.output_dir, parser=args.parser)
+    successful, failed = converter.convert_all(workers=args.workers, incremental=not args.force)
     
     # Print summary
     print(f"\nConversion complete!")
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Shared conversion engine for the HTML-to-Markdown converters
+(convert_to_md.py, convert_to_md2.py and FHIR_to_md.py).
+
+It adds three things on top of a converter's `convert_file`:
+- an incremental mode backed by a content-hash manifest, so unchanged inputs are skipped
+- a process-pool mode that converts files in parallel
+- selection of the fastest available BeautifulSoup parser (lxml when installed)
+
+It also provides DocumentIndex, a one-pass index of a parsed document that the
+converters' extract_* helpers read from instead of each re-walking the tree.
+"""
+
+import hashlib
+import inspect
+import json
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from bs4 import BeautifulSoup, Tag
+
+logger = logging.getLogger(__name__)
+
+# Name of the manifest file kept in each output directory
+MANIFEST_NAME = ".conversion_manifest.json"
+MANIFEST_VERSION = 1
+
+
+def _lxml_available() -> bool:
+    try:
+        import lxml  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def resolve_parser(parser: str = "auto") -> str:
+    """
+    Resolve a parser name for BeautifulSoup.
+    'auto' picks the C-backed 'lxml' parser when installed and falls back to
+    Python's built-in 'html.parser' otherwise.
+    """
+    if parser == "auto":
+        return "lxml" if _lxml_available() else "html.parser"
+    if parser == "lxml" and not _lxml_available():
+        logger.warning("lxml is not installed, falling back to html.parser")
+        return "html.parser"
+    return parser
+
+
+def file_digest(path: Path) -> str:
+    """Return the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def converter_fingerprint(converter: Any) -> str:
+    """
+    Identify the converter class, its source code, this engine's source code and
+    the parser, so that a code change or a parser switch invalidates every manifest
+    entry it produced.
+    """
+    cls = type(converter)
+    # The module may be '__main__' when run as a script, so use its file instead
+    name = cls.__qualname__
+    source_hash = "unknown"
+    try:
+        source_file = inspect.getsourcefile(cls)
+    except TypeError:
+        source_file = None
+    if source_file:
+        name = f"{Path(source_file).stem}.{name}"
+        source_hash = file_digest(Path(source_file))[:16]
+    engine_hash = file_digest(Path(__file__))[:16]
+    parser = getattr(converter, 'parser', 'html.parser')
+    return f"{name}:{source_hash}:{engine_hash}:{parser}"
+
+
+class ConversionManifest:
+    """
+    Record of which inputs have already been converted, keyed by file name.
+
+    Each entry stores the input's SHA-256 plus its size and mtime. A file whose
+    size and mtime are unchanged is trusted without re-hashing; otherwise its
+    contents are hashed and compared, so touching a file doesn't trigger a rebuild.
+    """
+
+    def __init__(self, path: Path, fingerprint: str):
+        self.path = path
+        self.fingerprint = fingerprint
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable manifest {self.path}: {e}")
+            return
+        if data.get('version') == MANIFEST_VERSION and data.get('fingerprint') == self.fingerprint:
+            self.entries = data.get('files', {})
+        else:
+            logger.info("Converter or parser changed since the last run, rebuilding all files")
+
+    def is_current(self, html_file: Path, output_file: Path) -> Tuple[bool, Dict[str, Any]]:
+        """
+        Check whether html_file is unchanged since its last conversion.
+        Returns the verdict and the file's current entry, for `record`.
+        """
+        stat = html_file.stat()
+        entry = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+        previous = self.entries.get(html_file.name)
+        if previous is None or not output_file.exists():
+            entry['sha256'] = file_digest(html_file)
+            return False, entry
+        if previous.get('size') == entry['size'] and previous.get('mtime_ns') == entry['mtime_ns']:
+            entry['sha256'] = previous.get('sha256')
+            return True, entry
+        entry['sha256'] = file_digest(html_file)
+        return entry['sha256'] == previous.get('sha256'), entry
+
+    def record(self, html_file: Path, entry: Dict[str, Any]) -> None:
+        self.entries[html_file.name] = entry
+
+    def discard(self, html_file: Path) -> None:
+        self.entries.pop(html_file.name, None)
+
+    def prune(self, html_files: List[Path]) -> None:
+        """Drop entries for inputs that no longer exist."""
+        names = {html_file.name for html_file in html_files}
+        for name in [name for name in self.entries if name not in names]:
+            del self.entries[name]
+
+    def save(self) -> None:
+        data = {'version': MANIFEST_VERSION, 'fingerprint': self.fingerprint, 'files': self.entries}
+        tmp_path = self.path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+
+class DocumentIndex:
+    """
+    Index of a parsed HTML document, built in a single traversal.
+
+    Records the first element of every tag name and the first element for every
+    (tag name, id) pair, i.e. what `soup.find(name)` and `soup.find(name, {'id': ...})`
+    would return, plus the sibling elements that make up each h2 section.
+    """
+
+    def __init__(self, soup: BeautifulSoup):
+        self.soup = soup
+        self._first_by_name: Dict[str, Tag] = {}
+        self._by_id: Dict[Tuple[str, str], Tag] = {}
+        self._section_siblings: Dict[str, List[Tag]] = {}
+        for element in soup.descendants:
+            if not isinstance(element, Tag):
+                continue
+            self._first_by_name.setdefault(element.name, element)
+            element_id = element.get('id')
+            if element_id is not None:
+                self._by_id.setdefault((element.name, element_id), element)
+
+    @classmethod
+    def of(cls, doc: Union[BeautifulSoup, "DocumentIndex"]) -> "DocumentIndex":
+        """Return doc itself if already indexed, otherwise index it."""
+        return doc if isinstance(doc, DocumentIndex) else cls(doc)
+
+    def first(self, name: str) -> Optional[Tag]:
+        """First element with the given tag name, in document order."""
+        return self._first_by_name.get(name)
+
+    def by_id(self, name: str, element_id: str) -> Optional[Tag]:
+        """First element with the given tag name and id."""
+        return self._by_id.get((name, element_id))
+
+    def section(self, section_id: str) -> Optional[Tag]:
+        """The h2 heading with the given id."""
+        return self.by_id('h2', section_id)
+
+    def section_siblings(self, section_id: str) -> List[Tag]:
+        """Elements following the h2 with the given id, up to the next h2."""
+        siblings = self._section_siblings.get(section_id)
+        if siblings is None:
+            siblings = []
+            section = self.section(section_id)
+            if section is not None:
+                for sibling in section.find_next_siblings():
+                    if sibling.name == 'h2':
+                        break
+                    siblings.append(sibling)
+            self._section_siblings[section_id] = siblings
+        return siblings
+
+
+def _convert_in_worker(converter: Any, html_file: Path) -> bool:
+    """Process-pool entry point; module level so it can be pickled."""
+    return converter.convert_file(html_file)
+
+
+def convert_files(
+    converter: Any,
+    html_files: List[Path],
+    workers: int = 1,
+    incremental: bool = True,
+) -> Tuple[int, int]:
+    """
+    Convert html_files with converter.convert_file.
+
+    Args:
+        converter: One of the HTML-to-Markdown converters; needs `output_dir` and `convert_file`
+        html_files: HTML files to convert
+        workers: Number of worker processes; 1 converts in this process
+        incremental: Skip files whose content hash matches the manifest
+
+    Returns:
+        Tuple of (successful_count, failed_count); skipped files count as neither
+    """
+    output_dir = Path(converter.output_dir)
+    manifest = ConversionManifest(output_dir / MANIFEST_NAME, converter_fingerprint(converter))
+    manifest.prune(html_files)
+
+    pending: List[Tuple[Path, Dict[str, Any]]] = []
+    for html_file in html_files:
+        current, entry = manifest.is_current(html_file, output_dir / f"{html_file.stem}.md")
+        if incremental and current:
+            # Keep the entry's size and mtime up to date, so a touched file is only re-hashed once
+            manifest.record(html_file, entry)
+            continue
+        pending.append((html_file, entry))
+
+    skipped = len(html_files) - len(pending)
+    if skipped:
+        logger.info(f"Skipping {skipped} unchanged files")
+    if not pending:
+        manifest.save()
+        return 0, 0
+
+    files = [html_file for html_file, _ in pending]
+    if workers > 1 and len(files) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(files))) as executor:
+            results = list(executor.map(_convert_in_worker, [converter] * len(files), files))
+    else:
+        results = [converter.convert_file(html_file) for html_file in files]
+
+    successful = 0
+    failed = 0
+    for (html_file, entry), ok in zip(pending, results):
+        if ok:
+            manifest.record(html_file, entry)
+            successful += 1
+        else:
+            # Make sure a failed file is retried next run
+            manifest.discard(html_file)
+            failed += 1
+    manifest.save()
+    return successful, failed
+
+
+def default_workers() -> int:
+    """Default process count for the --workers option."""
+    return os.cpu_count() or 1
@@ -1,7 +1,9 @@
+import concurrent.futures
+import logging
 import threading
 from collections.abc import Iterator, Sequence
 from contextlib import contextmanager
-from typing import Any, Optional
+from typing import Any, List, Optional  # noqa: UP035
 
 from langchain_core.runnables import RunnableConfig
 from psycopg import Capabilities, Connection, Cursor, Pipeline
@@ -15,6 +17,7 @@ from langgraph.checkpoint.base import (
     Checkpoint,
     CheckpointMetadata,
     CheckpointTuple,
+    RetentionPolicy,
     get_checkpoint_id,
     get_checkpoint_metadata,
 )
@@ -25,6 +28,8 @@ from langgraph.checkpoint.serde.base import SerializerProtocol
 
 Conn = _internal.Conn  # For backward compatibility
 
+logger = logging.getLogger(__name__)
+
 
 class PostgresSaver(BasePostgresSaver):
     """Checkpointer that stores checkpoints in a Postgres database."""
@@ -36,8 +41,10 @@ class PostgresSaver(BasePostgresSaver):
         conn: _internal.Conn,
         pipe: Optional[Pipeline] = None,
         serde: Optional[SerializerProtocol] = None,
+        *,
+        retention: Optional[RetentionPolicy] = None,
     ) -> None:
-        super().__init__(serde=serde)
+        super().__init__(serde=serde, retention=retention)
         if isinstance(conn, ConnectionPool) and pipe is not None:
             raise ValueError(
                 "Pipeline should be used only with a single Connection, not ConnectionPool."
@@ -47,17 +54,24 @@ class PostgresSaver(BasePostgresSaver):
         self.pipe = pipe
         self.lock = threading.Lock()
         self.supports_pipeline = Capabilities().has_pipeline()
+        self._compactor_thread: Optional[threading.Thread] = None
+        self._compact_stop_event = threading.Event()
 
     @classmethod
     @contextmanager
     def from_conn_string(
-        cls, conn_string: str, *, pipeline: bool = False
+        cls,
+        conn_string: str,
+        *,
+        pipeline: bool = False,
+        retention: Optional[RetentionPolicy] = None,
     ) -> Iterator["PostgresSaver"]:
         """Create a new PostgresSaver instance from a connection string.
 
         Args:
             conn_string: The Postgres connection info string.
             pipeline: whether to use Pipeline
+            retention: Which checkpoints to keep when compacting the database.
 
         Returns:
             PostgresSaver: A new PostgresSaver instance.
@@ -67,9 +81,9 @@ class PostgresSaver(BasePostgresSaver):
         ) as conn:
             if pipeline:
                 with conn.pipeline() as pipe:
-                    yield cls(conn, pipe)
+                    yield cls(conn, pipe, retention=retention)
             else:
-                yield cls(conn)
+                yield cls(conn, retention=retention)
 
     def setup(self) -> None:
         """Set up the checkpoint database asynchronously.
@@ -173,6 +187,40 @@ class PostgresSaver(BasePostgresSaver):
                     self._load_writes(value["pending_writes"]),
                 )
 
+    def list_metadata(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        """List checkpoints from the database, without loading them.
+
+        Only the config, metadata and parent config of each checkpoint are fetched,
+        instead of all of their channel values and writes. The checkpoint and its
+        pending writes are loaded on first access.
+
+        Args:
+            config: The config to use for listing the checkpoints.
+            filter: Additional filtering criteria for metadata. Defaults to None.
+            before: If provided, only checkpoints before the specified checkpoint ID are returned. Defaults to None.
+            limit: The maximum number of checkpoints to return. Defaults to None.
+
+        Yields:
+            Iterator[CheckpointTuple]: An iterator of lazily loaded checkpoint tuples.
+        """
+        where, args = self._search_where(config, filter, before)
+        query = self.SELECT_METADATA_SQL + where + " ORDER BY checkpoint_id DESC"
+        if limit:
+            query += f" LIMIT {limit}"
+        # fetch all rows first, so the checkpoints can be loaded while iterating
+        with self._cursor() as cur:
+            cur.execute(query, args, binary=True)
+            rows = cur.fetchall()
+        for value in rows:
+            yield self._load_lazy_checkpoint_tuple(value)
+
     def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
         """Get a checkpoint tuple from the database.
 
@@ -254,6 +302,28 @@ class PostgresSaver(BasePostgresSaver):
                     self._load_writes(value["pending_writes"]),
                 )
 
+    def get_tuples(
+        self, configs: Sequence[RunnableConfig]
+    ) -> List[Optional[CheckpointTuple]]:
+        """Get the checkpoint tuples for many configs from the database at once.
+
+        This method retrieves the checkpoints of all configs, with their channel values
+        and pending writes, in a single query. Configs without a "checkpoint_id" key
+        resolve to the latest checkpoint of their thread, as in `get_tuple`.
+
+        Args:
+            configs: The configs to use for retrieving the checkpoints.
+
+        Returns:
+            List[Optional[CheckpointTuple]]: The retrieved checkpoint tuples, in the order of `configs`, with None for checkpoints that were not found.
+        """
+        if not configs:
+            return []
+        with self._cursor() as cur:
+            cur.execute(self.SELECT_TUPLES_SQL, self._tuples_args(configs), binary=True)
+            values = cur.fetchall()
+        return self._load_checkpoint_tuples(configs, values)
+
     def put(
         self,
         config: RunnableConfig,
@@ -302,16 +372,22 @@ class PostgresSaver(BasePostgresSaver):
             }
         }
 
+        blobs, refs = self._dump_blobs(
+            thread_id,
+            checkpoint_ns,
+            copy.pop("channel_values"),  # type: ignore[misc]
+            new_versions,
+        )
         with self._cursor(pipeline=True) as cur:
-            cur.executemany(
-                self.UPSERT_CHECKPOINT_BLOBS_SQL,
-                self._dump_blobs(
-                    thread_id,
-                    checkpoint_ns,
-                    copy.pop("channel_values"),  # type: ignore[misc]
-                    new_versions,
-                ),
-            )
+            cur.executemany(self.UPSERT_CHECKPOINT_BLOBS_SQL, blobs)
+            if refs:
+                cur.execute(
+                    self.INSERT_CHECKPOINT_BLOB_REFS_SQL,
+                    self._blob_refs_params(thread_id, checkpoint_ns, refs),
+                )
+                if unstored := self._unstored_refs(refs, cur.fetchall()):
+                    # the version referred to is gone, store the bytes instead
+                    cur.executemany(self.UPSERT_CHECKPOINT_BLOBS_SQL, unstored)
             cur.execute(
                 self.UPSERT_CHECKPOINTS_SQL,
                 (
@@ -381,6 +457,169 @@ class PostgresSaver(BasePostgresSaver):
                 "DELETE FROM checkpoint_writes WHERE thread_id = %s",
                 (str(thread_id),),
             )
+        self.blob_dedupe.clear(str(thread_id))
+
+    def compact(self, retention: Optional[RetentionPolicy] = None) -> int:
+        """Delete the checkpoints that the retention policy does not keep.
+
+        Checkpoints are deleted together with their writes in batches of at most
+        `batch_size`, followed by the channel values no remaining checkpoint refers
+        to, in batches of the same size. Each batch only touches a few rows, so the
+        tables are never locked for long.
+
+        Args:
+            retention: The policy to apply. Defaults to the saver's `retention`.
+
+        Returns:
+            int: The number of deleted checkpoints.
+        """
+        policy = retention if retention is not None else self.retention
+        if policy is None:
+            raise ValueError("No retention policy to compact checkpoints with.")
+        query, params = self._compaction_query(policy)
+        batch_size = policy.get("batch_size", 1000)
+        deleted = 0
+        after: Optional[str] = None
+        while True:
+            with self._cursor() as cur:
+                cur.execute(self.SELECT_COMPACT_THREADS_SQL, (after, after, batch_size))
+                threads = [row["thread_id"] for row in cur.fetchall()]
+            if not threads:
+                break
+            while True:
+                with self._cursor() as cur:
+                    cur.execute(query, (threads[0], threads[-1], *params))
+                    rows = cur.fetchall()
+                checkpoints, namespaces = self._compacted_params(rows)
+                if rows:
+                    with self._cursor(pipeline=True) as cur:
+                        cur.executemany(
+                            self.DELETE_COMPACTED_CHECKPOINT_SQL,
+                            [
+                                (
+                                    row["thread_id"],
+                                    row["checkpoint_ns"],
+                                    row["checkpoint_id"],
+                                )
+                                for row in rows
+                            ],
+                        )
+                        cur.executemany(self.DELETE_COMPACTED_WRITES_SQL, checkpoints)
+                    for thread_id, checkpoint_ns in namespaces:
+                        while True:
+                            with self._cursor() as cur:
+                                cur.execute(
+                                    self.DELETE_COMPACTED_BLOBS_SQL,
+                                    (thread_id, checkpoint_ns, batch_size),
+                                )
+                                if cur.rowcount < batch_size:
+                                    break
+                deleted += len(rows)
+                if len(rows) < batch_size:
+                    break
+            if len(threads) < batch_size:
+                break
+            after = threads[-1]
+        return deleted
+
+    def start_compactor(
+        self, compact_interval_minutes: Optional[float] = None
+    ) -> concurrent.futures.Future[None]:
+        """Periodically compact the database in a background thread.
+
+        Args:
+            compact_interval_minutes: Minutes between runs. Defaults to the policy's
+                `compact_interval_minutes`, or 60.
+
+        Returns:
+            Future that can be waited on or cancelled.
+        """
+        if self.retention is None:
+            future: concurrent.futures.Future[None] = concurrent.futures.Future()
+            future.set_result(None)
+            return future
+
+        if self._compactor_thread and self._compactor_thread.is_alive():
+            logger.info("Checkpoint compactor thread is already running")
+            # Return a future that can be used to cancel the existing thread
+            future = concurrent.futures.Future()
+            future.add_done_callback(
+                lambda f: self._compact_stop_event.set() if f.cancelled() else None
+            )
+            return future
+
+        self._compact_stop_event.clear()
+
+        interval = float(
+            compact_interval_minutes
+            or self.retention.get("compact_interval_minutes")
+            or 60
+        )
+        logger.info(f"Starting checkpoint compactor with interval {interval} minutes")
+
+        future = concurrent.futures.Future()
+
+        def _compact_loop() -> None:
+            try:
+                while not self._compact_stop_event.is_set():
+                    if self._compact_stop_event.wait(interval * 60):
+                        break
+
+                    try:
+                        deleted = self.compact()
+                        if deleted > 0:
+                            logger.info(f"Compacted {deleted} checkpoints")
+                    except Exception as exc:
+                        logger.exception(
+                            "Checkpoint compaction iteration failed", exc_info=exc
+                        )
+                future.set_result(None)
+            except Exception as exc:
+                future.set_exception(exc)
+
+        thread = threading.Thread(
+            target=_compact_loop, daemon=True, name="checkpoint-compactor"
+        )
+        self._compactor_thread = thread
+        thread.start()
+
+        future.add_done_callback(
+            lambda f: self._compact_stop_event.set() if f.cancelled() else None
+        )
+        return future
+
+    def stop_compactor(self, timeout: Optional[float] = None) -> bool:
+        """Stop the compactor thread if it's running.
+
+        Args:
+            timeout: Maximum time to wait for the thread to stop, in seconds.
+                If None, wait indefinitely.
+
+        Returns:
+            bool: True if the thread was successfully stopped or wasn't running,
+                False if the timeout was reached before the thread stopped.
+        """
+        if not self._compactor_thread or not self._compactor_thread.is_alive():
+            return True
+
+        logger.info("Stopping checkpoint compactor thread")
+        self._compact_stop_event.set()
+
+        self._compactor_thread.join(timeout)
+        success = not self._compactor_thread.is_alive()
+
+        if success:
+            self._compactor_thread = None
+            logger.info("Checkpoint compactor thread stopped")
+        else:
+            logger.warning("Timed out waiting for checkpoint compactor thread to stop")
+
+        return success
+
+    def __del__(self) -> None:
+        """Ensure the compactor thread is stopped when the object is garbage collected."""
+        if hasattr(self, "_compact_stop_event") and hasattr(self, "_compactor_thread"):
+            self.stop_compactor(timeout=0.1)
 
     @contextmanager
     def _cursor(self, *, pipeline: bool = False) -> Iterator[Cursor[DictRow]]:
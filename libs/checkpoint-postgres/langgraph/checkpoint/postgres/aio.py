@@ -1,7 +1,8 @@
 import asyncio
+import logging
 from collections.abc import AsyncIterator, Iterator, Sequence
 from contextlib import asynccontextmanager
-from typing import Any, Optional
+from typing import Any, List, Optional  # noqa: UP035
 
 from langchain_core.runnables import RunnableConfig
 from psycopg import AsyncConnection, AsyncCursor, AsyncPipeline, Capabilities
@@ -10,11 +11,11 @@ from psycopg.types.json import Jsonb
 from psycopg_pool import AsyncConnectionPool
 
 from langgraph.checkpoint.base import (
-    WRITES_IDX_MAP,
     ChannelVersions,
     Checkpoint,
     CheckpointMetadata,
     CheckpointTuple,
+    RetentionPolicy,
     get_checkpoint_id,
     get_checkpoint_metadata,
 )
@@ -25,6 +26,8 @@ from langgraph.checkpoint.serde.base import SerializerProtocol
 
 Conn = _ainternal.Conn  # For backward compatibility
 
+logger = logging.getLogger(__name__)
+
 
 class AsyncPostgresSaver(BasePostgresSaver):
     """Asynchronous checkpointer that stores checkpoints in a Postgres database."""
@@ -36,8 +39,10 @@ class AsyncPostgresSaver(BasePostgresSaver):
         conn: _ainternal.Conn,
         pipe: Optional[AsyncPipeline] = None,
         serde: Optional[SerializerProtocol] = None,
+        *,
+        retention: Optional[RetentionPolicy] = None,
     ) -> None:
-        super().__init__(serde=serde)
+        super().__init__(serde=serde, retention=retention)
         if isinstance(conn, AsyncConnectionPool) and pipe is not None:
             raise ValueError(
                 "Pipeline should be used only with a single AsyncConnection, not AsyncConnectionPool."
@@ -48,6 +53,8 @@ class AsyncPostgresSaver(BasePostgresSaver):
         self.lock = asyncio.Lock()
         self.loop = asyncio.get_running_loop()
         self.supports_pipeline = Capabilities().has_pipeline()
+        self._compactor_task: Optional[asyncio.Task[None]] = None
+        self._compact_stop_event = asyncio.Event()
 
     @classmethod
     @asynccontextmanager
@@ -57,12 +64,14 @@ class AsyncPostgresSaver(BasePostgresSaver):
         *,
         pipeline: bool = False,
         serde: Optional[SerializerProtocol] = None,
+        retention: Optional[RetentionPolicy] = None,
     ) -> AsyncIterator["AsyncPostgresSaver"]:
         """Create a new AsyncPostgresSaver instance from a connection string.
 
         Args:
             conn_string: The Postgres connection info string.
             pipeline: whether to use AsyncPipeline
+            retention: Which checkpoints to keep when compacting the database.
 
         Returns:
             AsyncPostgresSaver: A new AsyncPostgresSaver instance.
@@ -72,9 +81,9 @@ class AsyncPostgresSaver(BasePostgresSaver):
         ) as conn:
             if pipeline:
                 async with conn.pipeline() as pipe:
-                    yield cls(conn=conn, pipe=pipe, serde=serde)
+                    yield cls(conn=conn, pipe=pipe, serde=serde, retention=retention)
             else:
-                yield cls(conn=conn, serde=serde)
+                yield cls(conn=conn, serde=serde, retention=retention)
 
     async def setup(self) -> None:
         """Set up the checkpoint database asynchronously.
@@ -161,6 +170,40 @@ class AsyncPostgresSaver(BasePostgresSaver):
                     await asyncio.to_thread(self._load_writes, value["pending_writes"]),
                 )
 
+    async def alist_metadata(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        """List checkpoints from the database asynchronously, without loading them.
+
+        Only the config, metadata and parent config of each checkpoint are fetched,
+        instead of all of their channel values and writes. The checkpoint and its
+        pending writes are loaded with `await tup.ahydrate()`.
+
+        Args:
+            config: Base configuration for filtering checkpoints.
+            filter: Additional filtering criteria for metadata.
+            before: If provided, only checkpoints before the specified checkpoint ID are returned. Defaults to None.
+            limit: Maximum number of checkpoints to return.
+
+        Yields:
+            AsyncIterator[CheckpointTuple]: An asynchronous iterator of lazily loaded checkpoint tuples.
+        """
+        where, args = self._search_where(config, filter, before)
+        query = self.SELECT_METADATA_SQL + where + " ORDER BY checkpoint_id DESC"
+        if limit:
+            query += f" LIMIT {limit}"
+        # fetch all rows first, so the checkpoints can be loaded while iterating
+        async with self._cursor() as cur:
+            await cur.execute(query, args, binary=True)
+            rows = await cur.fetchall()
+        for value in rows:
+            yield self._load_lazy_checkpoint_tuple(value)
+
     async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
         """Get a checkpoint tuple from the database asynchronously.
 
@@ -222,6 +265,30 @@ class AsyncPostgresSaver(BasePostgresSaver):
                     await asyncio.to_thread(self._load_writes, value["pending_writes"]),
                 )
 
+    async def aget_tuples(
+        self, configs: Sequence[RunnableConfig]
+    ) -> List[Optional[CheckpointTuple]]:
+        """Get the checkpoint tuples for many configs from the database at once.
+
+        This method retrieves the checkpoints of all configs, with their channel values
+        and pending writes, in a single query. Configs without a "checkpoint_id" key
+        resolve to the latest checkpoint of their thread, as in `aget_tuple`.
+
+        Args:
+            configs: The configs to use for retrieving the checkpoints.
+
+        Returns:
+            List[Optional[CheckpointTuple]]: The retrieved checkpoint tuples, in the order of `configs`, with None for checkpoints that were not found.
+        """
+        if not configs:
+            return []
+        async with self._cursor() as cur:
+            await cur.execute(
+                self.SELECT_TUPLES_SQL, self._tuples_args(configs), binary=True
+            )
+            values = await cur.fetchall()
+        return await asyncio.to_thread(self._load_checkpoint_tuples, configs, values)
+
     async def aput(
         self,
         config: RunnableConfig,
@@ -259,17 +326,23 @@ class AsyncPostgresSaver(BasePostgresSaver):
             }
         }
 
+        blobs, refs = await asyncio.to_thread(
+            self._dump_blobs,
+            thread_id,
+            checkpoint_ns,
+            copy.pop("channel_values"),  # type: ignore[misc]
+            new_versions,
+        )
         async with self._cursor(pipeline=True) as cur:
-            await cur.executemany(
-                self.UPSERT_CHECKPOINT_BLOBS_SQL,
-                await asyncio.to_thread(
-                    self._dump_blobs,
-                    thread_id,
-                    checkpoint_ns,
-                    copy.pop("channel_values"),  # type: ignore[misc]
-                    new_versions,
-                ),
-            )
+            await cur.executemany(self.UPSERT_CHECKPOINT_BLOBS_SQL, blobs)
+            if refs:
+                await cur.execute(
+                    self.INSERT_CHECKPOINT_BLOB_REFS_SQL,
+                    self._blob_refs_params(thread_id, checkpoint_ns, refs),
+                )
+                if unstored := self._unstored_refs(refs, await cur.fetchall()):
+                    # the version referred to is gone, store the bytes instead
+                    await cur.executemany(self.UPSERT_CHECKPOINT_BLOBS_SQL, unstored)
             await cur.execute(
                 self.UPSERT_CHECKPOINTS_SQL,
                 (
@@ -299,22 +372,25 @@ class AsyncPostgresSaver(BasePostgresSaver):
             writes: List of writes to store, each as (channel, value) pair.
             task_id: Identifier for the task creating the writes.
         """
-        query = (
-            self.UPSERT_CHECKPOINT_WRITES_SQL
-            if all(w[0] in WRITES_IDX_MAP for w in writes)
-            else self.INSERT_CHECKPOINT_WRITES_SQL
-        )
-        params = await asyncio.to_thread(
-            self._dump_writes,
-            config["configurable"]["thread_id"],
-            config["configurable"]["checkpoint_ns"],
-            config["configurable"]["checkpoint_id"],
-            task_id,
-            task_path,
-            writes,
-        )
+        await self.aput_writes_batch(config, [(writes, task_id, task_path)])
+
+    async def aput_writes_batch(
+        self,
+        config: RunnableConfig,
+        batch: Sequence[tuple[Sequence[tuple[str, Any]], str, str]],
+    ) -> None:
+        """Store intermediate writes of many tasks linked to a checkpoint asynchronously.
+
+        All writes are sent to the database in a single pipeline.
+
+        Args:
+            config: Configuration of the related checkpoint.
+            batch: Writes to store, each as a (writes, task_id, task_path) tuple.
+        """
+        groups = await asyncio.to_thread(self._dump_writes_batch, config, batch)
         async with self._cursor(pipeline=True) as cur:
-            await cur.executemany(query, params)
+            for query, params in groups:
+                await cur.executemany(query, params)
 
     async def adelete_thread(self, thread_id: str) -> None:
         """Delete all checkpoints and writes associated with a thread ID.
@@ -338,6 +414,163 @@ class AsyncPostgresSaver(BasePostgresSaver):
                 "DELETE FROM checkpoint_writes WHERE thread_id = %s",
                 (str(thread_id),),
             )
+        self.blob_dedupe.clear(str(thread_id))
+
+    async def acompact(self, retention: Optional[RetentionPolicy] = None) -> int:
+        """Delete the checkpoints that the retention policy does not keep.
+
+        Checkpoints are deleted together with their writes in batches of at most
+        `batch_size`, followed by the channel values no remaining checkpoint refers
+        to, in batches of the same size. Each batch only touches a few rows, so the
+        tables are never locked for long.
+
+        Args:
+            retention: The policy to apply. Defaults to the saver's `retention`.
+
+        Returns:
+            int: The number of deleted checkpoints.
+        """
+        policy = retention if retention is not None else self.retention
+        if policy is None:
+            raise ValueError("No retention policy to compact checkpoints with.")
+        query, params = self._compaction_query(policy)
+        batch_size = policy.get("batch_size", 1000)
+        deleted = 0
+        after: Optional[str] = None
+        while True:
+            async with self._cursor() as cur:
+                await cur.execute(
+                    self.SELECT_COMPACT_THREADS_SQL, (after, after, batch_size)
+                )
+                threads = [row["thread_id"] for row in await cur.fetchall()]
+            if not threads:
+                break
+            while True:
+                async with self._cursor() as cur:
+                    await cur.execute(query, (threads[0], threads[-1], *params))
+                    rows = await cur.fetchall()
+                checkpoints, namespaces = self._compacted_params(rows)
+                if rows:
+                    async with self._cursor(pipeline=True) as cur:
+                        await cur.executemany(
+                            self.DELETE_COMPACTED_CHECKPOINT_SQL,
+                            [
+                                (
+                                    row["thread_id"],
+                                    row["checkpoint_ns"],
+                                    row["checkpoint_id"],
+                                )
+                                for row in rows
+                            ],
+                        )
+                        await cur.executemany(
+                            self.DELETE_COMPACTED_WRITES_SQL, checkpoints
+                        )
+                    for thread_id, checkpoint_ns in namespaces:
+                        while True:
+                            async with self._cursor() as cur:
+                                await cur.execute(
+                                    self.DELETE_COMPACTED_BLOBS_SQL,
+                                    (thread_id, checkpoint_ns, batch_size),
+                                )
+                                if cur.rowcount < batch_size:
+                                    break
+                deleted += len(rows)
+                if len(rows) < batch_size:
+                    break
+            if len(threads) < batch_size:
+                break
+            after = threads[-1]
+        return deleted
+
+    async def start_compactor(
+        self, compact_interval_minutes: Optional[float] = None
+    ) -> asyncio.Task[None]:
+        """Periodically compact the database in a background task.
+
+        Args:
+            compact_interval_minutes: Minutes between runs. Defaults to the policy's
+                `compact_interval_minutes`, or 60.
+
+        Returns:
+            Task that can be awaited or cancelled.
+        """
+        if self.retention is None:
+            return asyncio.create_task(asyncio.sleep(0))
+
+        if self._compactor_task is not None and not self._compactor_task.done():
+            return self._compactor_task
+
+        self._compact_stop_event.clear()
+
+        interval = float(
+            compact_interval_minutes
+            or self.retention.get("compact_interval_minutes")
+            or 60
+        )
+        logger.info(f"Starting checkpoint compactor with interval {interval} minutes")
+
+        async def _compact_loop() -> None:
+            while not self._compact_stop_event.is_set():
+                try:
+                    try:
+                        await asyncio.wait_for(
+                            self._compact_stop_event.wait(),
+                            timeout=interval * 60,
+                        )
+                        break
+                    except asyncio.TimeoutError:
+                        pass
+
+                    deleted = await self.acompact()
+                    if deleted > 0:
+                        logger.info(f"Compacted {deleted} checkpoints")
+                except asyncio.CancelledError:
+                    break
+                except Exception as exc:
+                    logger.exception(
+                        "Checkpoint compaction iteration failed", exc_info=exc
+                    )
+
+        task = asyncio.create_task(_compact_loop())
+        task.set_name("checkpoint_compactor")
+        self._compactor_task = task
+        return task
+
+    async def stop_compactor(self, timeout: Optional[float] = None) -> bool:
+        """Stop the compactor task if it's running.
+
+        Args:
+            timeout: Maximum time to wait for the task to stop, in seconds.
+                If None, wait indefinitely.
+
+        Returns:
+            bool: True if the task was successfully stopped or wasn't running,
+                False if the timeout was reached before the task stopped.
+        """
+        if self._compactor_task is None or self._compactor_task.done():
+            return True
+
+        logger.info("Stopping checkpoint compactor task")
+        self._compact_stop_event.set()
+
+        if timeout is not None:
+            try:
+                await asyncio.wait_for(self._compactor_task, timeout=timeout)
+                success = True
+            except asyncio.TimeoutError:
+                success = False
+        else:
+            await self._compactor_task
+            success = True
+
+        if success:
+            self._compactor_task = None
+            logger.info("Checkpoint compactor task stopped")
+        else:
+            logger.warning("Timed out waiting for checkpoint compactor task to stop")
+
+        return success
 
     @asynccontextmanager
     async def _cursor(
@@ -430,6 +663,49 @@ class AsyncPostgresSaver(BasePostgresSaver):
             except StopAsyncIteration:
                 break
 
+    def list_metadata(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        """List checkpoints from the database, without loading them.
+
+        See `alist_metadata`.
+
+        Args:
+            config: Base configuration for filtering checkpoints.
+            filter: Additional filtering criteria for metadata.
+            before: If provided, only checkpoints before the specified checkpoint ID are returned. Defaults to None.
+            limit: Maximum number of checkpoints to return.
+
+        Yields:
+            Iterator[CheckpointTuple]: An iterator of lazily loaded checkpoint tuples.
+        """
+        try:
+            # check if we are in the main thread, only bg threads can block
+            # we don't check in other methods to avoid the overhead
+            if asyncio.get_running_loop() is self.loop:
+                raise asyncio.InvalidStateError(
+                    "Synchronous calls to AsyncPostgresSaver are only allowed from a "
+                    "different thread. From the main thread, use the async interface. "
+                    "For example, use `checkpointer.alist_metadata(...)` or `await "
+                    "graph.ainvoke(...)`."
+                )
+        except RuntimeError:
+            pass
+        aiter_ = self.alist_metadata(config, filter=filter, before=before, limit=limit)
+        while True:
+            try:
+                yield asyncio.run_coroutine_threadsafe(
+                    anext(aiter_),  # noqa: F821
+                    self.loop,
+                ).result()
+            except StopAsyncIteration:
+                break
+
     def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
         """Get a checkpoint tuple from the database.
 
@@ -460,6 +736,33 @@ class AsyncPostgresSaver(BasePostgresSaver):
             self.aget_tuple(config), self.loop
         ).result()
 
+    def get_tuples(
+        self, configs: Sequence[RunnableConfig]
+    ) -> List[Optional[CheckpointTuple]]:
+        """Get the checkpoint tuples for many configs from the database at once.
+
+        Args:
+            configs: The configs to use for retrieving the checkpoints.
+
+        Returns:
+            List[Optional[CheckpointTuple]]: The retrieved checkpoint tuples, in the order of `configs`, with None for checkpoints that were not found.
+        """
+        try:
+            # check if we are in the main thread, only bg threads can block
+            # we don't check in other methods to avoid the overhead
+            if asyncio.get_running_loop() is self.loop:
+                raise asyncio.InvalidStateError(
+                    "Synchronous calls to AsyncPostgresSaver are only allowed from a "
+                    "different thread. From the main thread, use the async interface. "
+                    "For example, use `await checkpointer.aget_tuples(...)` or `await "
+                    "graph.ainvoke(...)`."
+                )
+        except RuntimeError:
+            pass
+        return asyncio.run_coroutine_threadsafe(
+            self.aget_tuples(configs), self.loop
+        ).result()
+
     def put(
         self,
         config: RunnableConfig,
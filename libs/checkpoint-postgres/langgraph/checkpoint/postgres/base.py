@@ -11,8 +11,14 @@ from langgraph.checkpoint.base import (
     ChannelVersions,
     Checkpoint,
     CheckpointMetadata,
+    CheckpointTuple,
+    LazyCheckpointTuple,
+    RetentionPolicy,
     get_checkpoint_id,
+    get_retention_cutoff,
 )
+from langgraph.checkpoint.serde.base import SerializerProtocol
+from langgraph.checkpoint.serde.dedupe import BlobDedupe
 from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
 from langgraph.checkpoint.serde.types import TASKS, ChannelProtocol
 
@@ -70,6 +76,7 @@ MIGRATIONS = [
     CREATE INDEX CONCURRENTLY IF NOT EXISTS checkpoint_writes_thread_id_idx ON checkpoint_writes(thread_id);
     """,
     """ALTER TABLE checkpoint_writes ADD COLUMN task_path TEXT NOT NULL DEFAULT '';""",
+    """ALTER TABLE checkpoint_blobs ADD COLUMN IF NOT EXISTS same_as TEXT;""",
 ]
 
 SELECT_SQL = f"""
@@ -81,13 +88,19 @@ select
     parent_checkpoint_id,
     metadata,
     (
-        select array_agg(array[bl.channel::bytea, bl.type::bytea, bl.blob])
+        select array_agg(array[bl.channel::bytea, bl.type::bytea, coalesce(src.blob, bl.blob)])
         from jsonb_each_text(checkpoint -> 'channel_versions')
         inner join checkpoint_blobs bl
             on bl.thread_id = checkpoints.thread_id
             and bl.checkpoint_ns = checkpoints.checkpoint_ns
             and bl.channel = jsonb_each_text.key
             and bl.version = jsonb_each_text.value
+        left join checkpoint_blobs src
+            on bl.same_as is not null
+            and src.thread_id = bl.thread_id
+            and src.checkpoint_ns = bl.checkpoint_ns
+            and src.channel = bl.channel
+            and src.version = bl.same_as
     ) as channel_values,
     (
         select
@@ -107,12 +120,54 @@ select
     ) as pending_sends
 from checkpoints """
 
+# the checkpoints of many configs at once, each resolved as in get_tuple
+SELECT_TUPLES_SQL = f"""
+select wanted.pos, found.*
+from unnest(%s::text[], %s::text[], %s::text[]) with ordinality
+    as wanted(thread_id, checkpoint_ns, checkpoint_id, pos)
+cross join lateral ({SELECT_SQL}
+    where checkpoints.thread_id = wanted.thread_id
+        and checkpoints.checkpoint_ns = wanted.checkpoint_ns
+        and (
+            wanted.checkpoint_id is null
+            or checkpoints.checkpoint_id = wanted.checkpoint_id
+        )
+    order by checkpoints.checkpoint_id desc
+    limit 1
+) found"""
+
+SELECT_METADATA_SQL = """
+select
+    thread_id,
+    checkpoint_ns,
+    checkpoint_id,
+    parent_checkpoint_id,
+    metadata
+from checkpoints """
+
 UPSERT_CHECKPOINT_BLOBS_SQL = """
     INSERT INTO checkpoint_blobs (thread_id, checkpoint_ns, channel, version, type, blob)
     VALUES (%s, %s, %s, %s, %s, %s)
     ON CONFLICT (thread_id, checkpoint_ns, channel, version) DO NOTHING
 """
 
+# versions with the same bytes as a stored version of the channel, stored as a
+# reference to it. Only inserted if that version is still stored, returns the
+# channels inserted.
+INSERT_CHECKPOINT_BLOB_REFS_SQL = """
+    INSERT INTO checkpoint_blobs (thread_id, checkpoint_ns, channel, version, type, blob, same_as)
+    SELECT src.thread_id, src.checkpoint_ns, src.channel, ref.version, src.type, NULL, src.version
+    FROM unnest(%s::text[], %s::text[], %s::text[]) AS ref(channel, version, same_as)
+    INNER JOIN checkpoint_blobs src
+        ON src.thread_id = %s
+        AND src.checkpoint_ns = %s
+        AND src.channel = ref.channel
+        AND src.version = ref.same_as
+        AND src.same_as IS NULL
+    ON CONFLICT (thread_id, checkpoint_ns, channel, version) DO NOTHING
+    RETURNING channel
+"""
+
 UPSERT_CHECKPOINTS_SQL = """
     INSERT INTO checkpoints (thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, checkpoint, metadata)
     VALUES (%s, %s, %s, %s, %s, %s)
@@ -138,16 +193,102 @@ INSERT_CHECKPOINT_WRITES_SQL = """
 """
 
 
+SELECT_COMPACT_THREADS_SQL = """
+    SELECT DISTINCT thread_id FROM checkpoints
+    WHERE %s::text IS NULL OR thread_id > %s
+    ORDER BY thread_id
+    LIMIT %s
+"""
+
+DELETE_COMPACTED_CHECKPOINT_SQL = """
+    DELETE FROM checkpoints
+    WHERE thread_id = %s AND checkpoint_ns = %s AND checkpoint_id = %s
+"""
+
+# writes of deleted checkpoints, except the sends a remaining child checkpoint
+# still reads from its parent
+DELETE_COMPACTED_WRITES_SQL = f"""
+    DELETE FROM checkpoint_writes cw
+    WHERE cw.thread_id = %s AND cw.checkpoint_ns = %s AND cw.checkpoint_id = %s
+        AND NOT EXISTS (
+            SELECT 1 FROM checkpoints c
+            WHERE c.thread_id = cw.thread_id
+                AND c.checkpoint_ns = cw.checkpoint_ns
+                AND c.checkpoint_id = cw.checkpoint_id
+        )
+        AND (
+            cw.channel <> '{TASKS}'
+            OR NOT EXISTS (
+                SELECT 1 FROM checkpoints c
+                WHERE c.thread_id = cw.thread_id
+                    AND c.checkpoint_ns = cw.checkpoint_ns
+                    AND c.parent_checkpoint_id = cw.checkpoint_id
+            )
+        )
+"""
+
+# channel values no checkpoint or other value refers to, at most %s at a time.
+# Values are only deleted once a checkpoint refers to a newer version of the
+# channel, so the values of a checkpoint that is still being saved are left alone.
+DELETE_COMPACTED_BLOBS_SQL = """
+    DELETE FROM checkpoint_blobs
+    WHERE ctid IN (
+        SELECT bl.ctid FROM checkpoint_blobs bl
+        WHERE bl.thread_id = %s AND bl.checkpoint_ns = %s
+            AND NOT EXISTS (
+                SELECT 1 FROM checkpoints c
+                WHERE c.thread_id = bl.thread_id
+                    AND c.checkpoint_ns = bl.checkpoint_ns
+                    AND c.checkpoint -> 'channel_versions' ->> bl.channel = bl.version
+            )
+            AND EXISTS (
+                SELECT 1 FROM checkpoints c
+                WHERE c.thread_id = bl.thread_id
+                    AND c.checkpoint_ns = bl.checkpoint_ns
+                    AND c.checkpoint -> 'channel_versions' ->> bl.channel > bl.version
+            )
+            AND NOT EXISTS (
+                SELECT 1 FROM checkpoint_blobs r
+                WHERE r.thread_id = bl.thread_id
+                    AND r.checkpoint_ns = bl.checkpoint_ns
+                    AND r.channel = bl.channel
+                    AND r.same_as = bl.version
+            )
+        LIMIT %s
+    )
+"""
+
+
 class BasePostgresSaver(BaseCheckpointSaver[str]):
     SELECT_SQL = SELECT_SQL
+    SELECT_METADATA_SQL = SELECT_METADATA_SQL
+    SELECT_TUPLES_SQL = SELECT_TUPLES_SQL
     MIGRATIONS = MIGRATIONS
     UPSERT_CHECKPOINT_BLOBS_SQL = UPSERT_CHECKPOINT_BLOBS_SQL
+    INSERT_CHECKPOINT_BLOB_REFS_SQL = INSERT_CHECKPOINT_BLOB_REFS_SQL
     UPSERT_CHECKPOINTS_SQL = UPSERT_CHECKPOINTS_SQL
     UPSERT_CHECKPOINT_WRITES_SQL = UPSERT_CHECKPOINT_WRITES_SQL
     INSERT_CHECKPOINT_WRITES_SQL = INSERT_CHECKPOINT_WRITES_SQL
+    SELECT_COMPACT_THREADS_SQL = SELECT_COMPACT_THREADS_SQL
+    DELETE_COMPACTED_CHECKPOINT_SQL = DELETE_COMPACTED_CHECKPOINT_SQL
+    DELETE_COMPACTED_WRITES_SQL = DELETE_COMPACTED_WRITES_SQL
+    DELETE_COMPACTED_BLOBS_SQL = DELETE_COMPACTED_BLOBS_SQL
 
     jsonplus_serde = JsonPlusSerializer()
     supports_pipeline: bool
+    retention: Optional[RetentionPolicy]
+
+    def __init__(
+        self,
+        *,
+        serde: Optional[SerializerProtocol] = None,
+        retention: Optional[RetentionPolicy] = None,
+    ) -> None:
+        super().__init__(serde=serde)
+        self.retention = retention
+        self.blob_dedupe = BlobDedupe()
+        """Detects channel values identical to the stored version, and counts the
+        bytes written per checkpoint in `blob_dedupe.stats`."""
 
     def _load_checkpoint(
         self,
@@ -183,24 +324,70 @@ class BasePostgresSaver(BaseCheckpointSaver[str]):
         checkpoint_ns: str,
         values: dict[str, Any],
         versions: ChannelVersions,
-    ) -> list[tuple[str, str, str, str, str, Optional[bytes]]]:
+    ) -> tuple[
+        list[tuple[str, str, str, str, str, Optional[bytes]]],
+        list[tuple[tuple[str, str, str, str, str, Optional[bytes]], str]],
+    ]:
+        """Serialize the values of the new channel versions. Returns the rows to
+        store, and the rows with the same bytes as a stored version of the channel,
+        each with that version, to store as references to it."""
         if not versions:
-            return []
+            return [], []
 
-        return [
-            (
-                thread_id,
-                checkpoint_ns,
-                k,
-                cast(str, ver),
-                *(
-                    self.serde.dumps_typed(values[k])
-                    if k in values
-                    else ("empty", None)
-                ),
-            )
-            for k, ver in versions.items()
-        ]
+        blobs = self.blob_dedupe.dumps_blobs(
+            self.serde, thread_id, checkpoint_ns, values, versions
+        )
+        rows: list[tuple[str, str, str, str, str, Optional[bytes]]] = []
+        refs: list[tuple[tuple[str, str, str, str, str, Optional[bytes]], str]] = []
+        for k, ver in versions.items():
+            blob = blobs[k]
+            if blob is None:
+                rows.append(
+                    (thread_id, checkpoint_ns, k, cast(str, ver), "empty", None)
+                )
+            elif blob.same_as is None:
+                rows.append(
+                    (thread_id, checkpoint_ns, k, cast(str, ver), blob.type, blob.data)
+                )
+            else:
+                refs.append(
+                    (
+                        (
+                            thread_id,
+                            checkpoint_ns,
+                            k,
+                            cast(str, ver),
+                            blob.type,
+                            blob.data,
+                        ),
+                        cast(str, blob.same_as),
+                    )
+                )
+        return rows, refs
+
+    def _blob_refs_params(
+        self,
+        thread_id: str,
+        checkpoint_ns: str,
+        refs: Sequence[tuple[tuple[str, str, str, str, str, Optional[bytes]], str]],
+    ) -> tuple[list[str], list[str], list[str], str, str]:
+        return (
+            [row[2] for row, _ in refs],
+            [row[3] for row, _ in refs],
+            [same_as for _, same_as in refs],
+            thread_id,
+            checkpoint_ns,
+        )
+
+    def _unstored_refs(
+        self,
+        refs: Sequence[tuple[tuple[str, str, str, str, str, Optional[bytes]], str]],
+        stored: Sequence[dict[str, Any]],
+    ) -> list[tuple[str, str, str, str, str, Optional[bytes]]]:
+        """The rows of the references that weren't stored because the version they
+        refer to is gone, to store with their own bytes instead."""
+        channels = {row["channel"] for row in stored}
+        return [row for row, _ in refs if row[2] not in channels]
 
     def _load_writes(
         self, writes: list[tuple[bytes, bytes, bytes, bytes]]
@@ -241,9 +428,104 @@ class BasePostgresSaver(BaseCheckpointSaver[str]):
             for idx, (channel, value) in enumerate(writes)
         ]
 
+    def _dump_writes_batch(
+        self,
+        config: RunnableConfig,
+        batch: Sequence[tuple[Sequence[tuple[str, Any]], str, str]],
+    ) -> list[tuple[str, list[tuple[str, str, str, str, str, int, str, str, bytes]]]]:
+        # consecutive tasks stored with the same statement share one executemany
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        groups: list[
+            tuple[str, list[tuple[str, str, str, str, str, int, str, str, bytes]]]
+        ] = []
+        for writes, task_id, task_path in batch:
+            query = (
+                self.UPSERT_CHECKPOINT_WRITES_SQL
+                if all(w[0] in WRITES_IDX_MAP for w in writes)
+                else self.INSERT_CHECKPOINT_WRITES_SQL
+            )
+            if not groups or groups[-1][0] != query:
+                groups.append((query, []))
+            groups[-1][1].extend(
+                self._dump_writes(
+                    thread_id, checkpoint_ns, checkpoint_id, task_id, task_path, writes
+                )
+            )
+        return groups
+
     def _load_metadata(self, metadata: dict[str, Any]) -> CheckpointMetadata:
         return self.jsonplus_serde.loads(self.jsonplus_serde.dumps(metadata))
 
+    def _tuples_args(self, configs: Sequence[RunnableConfig]) -> tuple[list, ...]:
+        return (
+            [str(config["configurable"]["thread_id"]) for config in configs],
+            [config["configurable"].get("checkpoint_ns", "") for config in configs],
+            [get_checkpoint_id(config) for config in configs],
+        )
+
+    def _load_checkpoint_tuples(
+        self, configs: Sequence[RunnableConfig], values: Sequence[dict[str, Any]]
+    ) -> list[Optional[CheckpointTuple]]:
+        tuples: list[Optional[CheckpointTuple]] = [None] * len(configs)
+        for value in values:
+            parent_config: Optional[RunnableConfig] = (
+                {
+                    "configurable": {
+                        "thread_id": value["thread_id"],
+                        "checkpoint_ns": value["checkpoint_ns"],
+                        "checkpoint_id": value["parent_checkpoint_id"],
+                    }
+                }
+                if value["parent_checkpoint_id"]
+                else None
+            )
+            tuples[value["pos"] - 1] = CheckpointTuple(
+                {
+                    "configurable": {
+                        "thread_id": configs[value["pos"] - 1]["configurable"][
+                            "thread_id"
+                        ],
+                        "checkpoint_ns": value["checkpoint_ns"],
+                        "checkpoint_id": value["checkpoint_id"],
+                    }
+                },
+                self._load_checkpoint(
+                    value["checkpoint"],
+                    value["channel_values"],
+                    value["pending_sends"],
+                ),
+                self._load_metadata(value["metadata"]),
+                parent_config,
+                self._load_writes(value["pending_writes"]),
+            )
+        return tuples
+
+    def _load_lazy_checkpoint_tuple(self, value: dict[str, Any]) -> LazyCheckpointTuple:
+        return LazyCheckpointTuple(
+            {
+                "configurable": {
+                    "thread_id": value["thread_id"],
+                    "checkpoint_ns": value["checkpoint_ns"],
+                    "checkpoint_id": value["checkpoint_id"],
+                }
+            },
+            self._load_metadata(value["metadata"]),
+            (
+                {
+                    "configurable": {
+                        "thread_id": value["thread_id"],
+                        "checkpoint_ns": value["checkpoint_ns"],
+                        "checkpoint_id": value["parent_checkpoint_id"],
+                    }
+                }
+                if value["parent_checkpoint_id"]
+                else None
+            ),
+            self,
+        )
+
     def _dump_metadata(self, metadata: CheckpointMetadata) -> str:
         serialized_metadata = self.jsonplus_serde.dumps(metadata)
         # NOTE: we're using JSON serializer (not msgpack), so we need to remove null characters before writing
@@ -303,3 +585,56 @@ class BasePostgresSaver(BaseCheckpointSaver[str]):
             "WHERE " + " AND ".join(wheres) if wheres else "",
             param_values,
         )
+
+    def _compaction_query(self, policy: RetentionPolicy) -> tuple[str, list[Any]]:
+        """Return the query for checkpoints that `policy` does not keep.
+
+        The query takes the first and last thread ID of a page of threads, followed
+        by the returned values, and selects at most `batch_size` checkpoints.
+        """
+        wheres = ["rank > %s"]
+        param_values: list[Any] = [max(policy.get("keep_last", 1), 1)]
+        if cutoff := get_retention_cutoff(policy):
+            wheres.append("checkpoint_id < %s")
+            param_values.append(cutoff)
+        if sources := policy.get("keep_sources"):
+            wheres.append("coalesce(metadata ->> 'source', '') <> ALL(%s::text[])")
+            param_values.append(list(sources))
+        param_values.append(policy.get("batch_size", 1000))
+        query = f"""
+            SELECT thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id
+            FROM (
+                SELECT thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id,
+                    metadata,
+                    row_number() OVER (
+                        PARTITION BY thread_id, checkpoint_ns
+                        ORDER BY checkpoint_id DESC
+                    ) AS rank
+                FROM checkpoints
+                WHERE thread_id >= %s AND thread_id <= %s
+            ) ranked
+            WHERE {" AND ".join(wheres)}
+            LIMIT %s
+        """
+        return query, param_values
+
+    def _compacted_params(
+        self, rows: Sequence[dict[str, Any]]
+    ) -> tuple[list[tuple[str, str, str]], list[tuple[str, str]]]:
+        """Return the checkpoints whose writes, and the namespaces whose channel
+        values, may be orphaned by deleting `rows`.
+
+        Writes are checked for the deleted checkpoints, and for their parents, whose
+        sends are no longer needed once their last child is gone.
+        """
+        checkpoints = {
+            (row["thread_id"], row["checkpoint_ns"], row["checkpoint_id"])
+            for row in rows
+        }
+        checkpoints.update(
+            (row["thread_id"], row["checkpoint_ns"], row["parent_checkpoint_id"])
+            for row in rows
+            if row["parent_checkpoint_id"] is not None
+        )
+        namespaces = {(row["thread_id"], row["checkpoint_ns"]) for row in rows}
+        return sorted(checkpoints), sorted(namespaces)
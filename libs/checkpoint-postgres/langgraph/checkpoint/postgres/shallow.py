@@ -112,12 +112,16 @@ select
     ) as pending_sends
 from checkpoints """
 
+# blobs are keyed on channel only, so a new version with the same content as the
+# stored one is not rewritten
 UPSERT_CHECKPOINT_BLOBS_SQL = """
     INSERT INTO checkpoint_blobs (thread_id, checkpoint_ns, channel, type, blob)
     VALUES (%s, %s, %s, %s, %s)
     ON CONFLICT (thread_id, checkpoint_ns, channel) DO UPDATE SET
         type = EXCLUDED.type,
-        blob = EXCLUDED.blob;
+        blob = EXCLUDED.blob
+    WHERE (checkpoint_blobs.type, checkpoint_blobs.blob)
+        IS DISTINCT FROM (EXCLUDED.type, EXCLUDED.blob);
 """
 
 UPSERT_CHECKPOINTS_SQL = """
@@ -777,22 +781,25 @@ class AsyncShallowPostgresSaver(BasePostgresSaver):
             writes: List of writes to store, each as (channel, value) pair.
             task_id: Identifier for the task creating the writes.
         """
-        query = (
-            self.UPSERT_CHECKPOINT_WRITES_SQL
-            if all(w[0] in WRITES_IDX_MAP for w in writes)
-            else self.INSERT_CHECKPOINT_WRITES_SQL
-        )
-        params = await asyncio.to_thread(
-            self._dump_writes,
-            config["configurable"]["thread_id"],
-            config["configurable"]["checkpoint_ns"],
-            config["configurable"]["checkpoint_id"],
-            task_id,
-            task_path,
-            writes,
-        )
+        await self.aput_writes_batch(config, [(writes, task_id, task_path)])
+
+    async def aput_writes_batch(
+        self,
+        config: RunnableConfig,
+        batch: Sequence[tuple[Sequence[tuple[str, Any]], str, str]],
+    ) -> None:
+        """Store intermediate writes of many tasks linked to a checkpoint asynchronously.
+
+        All writes are sent to the database in a single pipeline.
+
+        Args:
+            config: Configuration of the related checkpoint.
+            batch: Writes to store, each as a (writes, task_id, task_path) tuple.
+        """
+        groups = await asyncio.to_thread(self._dump_writes_batch, config, batch)
         async with self._cursor(pipeline=True) as cur:
-            await cur.executemany(query, params)
+            for query, params in groups:
+                await cur.executemany(query, params)
 
     @asynccontextmanager
     async def _cursor(
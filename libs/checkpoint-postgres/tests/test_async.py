@@ -21,6 +21,7 @@ from langgraph.checkpoint.postgres.aio import (
     AsyncPostgresSaver,
     AsyncShallowPostgresSaver,
 )
+from langgraph.checkpoint.serde.types import ERROR, TASKS
 from tests.conftest import DEFAULT_POSTGRES_URI
 
 
@@ -296,3 +297,115 @@ async def test_null_chars(saver_name: str, test_data) -> None:
         assert [c async for c in saver.alist(None, filter={"my_key": "abc"})][
             0
         ].metadata["my_key"] == "abc"
+
+
+@pytest.mark.parametrize("saver_name", ["base", "pool", "pipe", "shallow"])
+async def test_aget_tuples(saver_name: str, test_data) -> None:
+    async with _saver(saver_name) as saver:
+        configs = test_data["configs"]
+        for config, checkpoint, metadata in zip(
+            configs, test_data["checkpoints"], test_data["metadata"]
+        ):
+            saved = await saver.aput(config, checkpoint, metadata, {})
+        await saver.aput_writes(saved, [("foo", "bar")], "task-1")
+
+        wanted = [
+            {"configurable": {"thread_id": "thread-2", "checkpoint_ns": "inner"}},
+            {"configurable": {"thread_id": "thread-3"}},
+            saved,
+            {"configurable": {"thread_id": "thread-1"}},
+        ]
+        tuples = await saver.aget_tuples(wanted)
+        assert tuples == [await saver.aget_tuple(config) for config in wanted]
+        assert tuples[1] is None
+        assert tuples[2].pending_writes == [("task-1", "foo", "bar")]
+
+
+@pytest.mark.parametrize("saver_name", ["base", "pool", "pipe", "shallow"])
+async def test_aput_writes_batch(saver_name: str, test_data) -> None:
+    async with _saver(saver_name) as saver:
+        config = await saver.aput(
+            test_data["configs"][0],
+            test_data["checkpoints"][0],
+            test_data["metadata"][0],
+            {},
+        )
+        await saver.aput_writes(config, [(ERROR, "first")], "task-2")
+        await saver.aput_writes_batch(
+            config,
+            [
+                ([("foo", 1), ("bar", 2)], "task-1", ""),
+                ([(ERROR, "second")], "task-2", ""),
+                ([("foo", 3)], "task-3", "~__pregel_push, 0"),
+            ],
+        )
+
+        saved = await saver.aget_tuple(config)
+        assert sorted(saved.pending_writes) == [
+            ("task-1", "bar", 2),
+            ("task-1", "foo", 1),
+            ("task-2", ERROR, "second"),
+            ("task-3", "foo", 3),
+        ]
+
+
+@pytest.mark.parametrize("saver_name", ["base", "pool", "pipe"])
+async def test_acompact(saver_name: str) -> None:
+    async with _saver(saver_name) as saver:
+        config = {"configurable": {"thread_id": "a", "checkpoint_ns": ""}}
+        ids, version = [], None
+        for step in range(4):
+            version = saver.get_next_version(version, None)
+            checkpoint = empty_checkpoint()
+            checkpoint["channel_values"] = {"foo": step}
+            checkpoint["channel_versions"] = {"foo": version}
+            config = await saver.aput(config, checkpoint, {}, {"foo": version})
+            await saver.aput_writes(config, [("foo", step), (TASKS, step)], "task")
+            ids.append(config["configurable"]["checkpoint_id"])
+
+        assert await saver.acompact({"keep_last": 2, "batch_size": 1}) == 2
+        assert [
+            c.config["configurable"]["checkpoint_id"] async for c in saver.alist(None)
+        ] == ids[:1:-1]
+        tup = await saver.aget_tuple(config)
+        assert tup.checkpoint["channel_values"] == {"foo": 3}
+        async with saver._cursor() as cur:
+            await cur.execute("SELECT count(*) AS n FROM checkpoint_blobs")
+            assert (await cur.fetchone())["n"] == 2
+            await cur.execute(
+                "SELECT count(*) AS n FROM checkpoint_writes WHERE checkpoint_id = %s",
+                (ids[0],),
+            )
+            assert (await cur.fetchone())["n"] == 0
+
+
+@pytest.mark.parametrize("saver_name", ["base", "pool", "pipe"])
+async def test_ablob_refs(saver_name: str) -> None:
+    async with _saver(saver_name) as saver:
+        config = {"configurable": {"thread_id": "a", "checkpoint_ns": ""}}
+        ids, versions, version = [], [], None
+        for value in ["x", "x", "x", "y"]:
+            version = saver.get_next_version(version, None)
+            checkpoint = empty_checkpoint()
+            checkpoint["channel_values"] = {"foo": value}
+            checkpoint["channel_versions"] = {"foo": version}
+            config = await saver.aput(config, checkpoint, {}, {"foo": version})
+            ids.append(config["configurable"]["checkpoint_id"])
+            versions.append(version)
+
+        async with saver._cursor() as cur:
+            await cur.execute(
+                "SELECT version, same_as FROM checkpoint_blobs WHERE blob IS NULL "
+                "ORDER BY version"
+            )
+            assert [(r["version"], r["same_as"]) for r in await cur.fetchall()] == [
+                (versions[1], versions[0]),
+                (versions[2], versions[0]),
+            ]
+        assert saver.blob_dedupe.stats.duplicates == 2
+
+        assert await saver.acompact({"keep_last": 2}) == 2
+        tup = await saver.aget_tuple(
+            {"configurable": {"thread_id": "a", "checkpoint_id": ids[2]}}
+        )
+        assert tup.checkpoint["channel_values"] == {"foo": "x"}
@@ -19,6 +19,7 @@ from langgraph.checkpoint.base import (
     empty_checkpoint,
 )
 from langgraph.checkpoint.postgres import PostgresSaver, ShallowPostgresSaver
+from langgraph.checkpoint.serde.types import TASKS
 from tests.conftest import DEFAULT_POSTGRES_URI
 
 
@@ -279,6 +280,125 @@ def test_null_chars(saver_name: str, test_data) -> None:
         )
 
 
+@pytest.mark.parametrize("saver_name", ["base", "pool", "pipe", "shallow"])
+def test_get_tuples(saver_name: str, test_data) -> None:
+    with _saver(saver_name) as saver:
+        configs = test_data["configs"]
+        for config, checkpoint, metadata in zip(
+            configs, test_data["checkpoints"], test_data["metadata"]
+        ):
+            saved = saver.put(config, checkpoint, metadata, {})
+        saver.put_writes(saved, [("foo", "bar")], "task-1")
+
+        wanted = [
+            {"configurable": {"thread_id": "thread-2", "checkpoint_ns": "inner"}},
+            {"configurable": {"thread_id": "thread-3"}},
+            saved,
+            {"configurable": {"thread_id": "thread-1"}},
+        ]
+        tuples = saver.get_tuples(wanted)
+        assert tuples == [saver.get_tuple(config) for config in wanted]
+        assert tuples[1] is None
+        assert tuples[2].pending_writes == [("task-1", "foo", "bar")]
+
+
+@pytest.mark.parametrize("saver_name", ["base", "pool", "pipe"])
+def test_compact(saver_name: str) -> None:
+    with _saver(saver_name) as saver:
+        config = {"configurable": {"thread_id": "a", "checkpoint_ns": ""}}
+        ids, version = [], None
+        for step in range(4):
+            version = saver.get_next_version(version, None)
+            checkpoint = empty_checkpoint()
+            checkpoint["channel_values"] = {"foo": step}
+            checkpoint["channel_versions"] = {"foo": version}
+            config = saver.put(config, checkpoint, {}, {"foo": version})
+            saver.put_writes(config, [("foo", step), (TASKS, step)], "task")
+            ids.append(config["configurable"]["checkpoint_id"])
+
+        assert saver.compact({"max_age_minutes": 60}) == 0
+        assert saver.compact({"keep_last": 2, "batch_size": 1}) == 2
+        assert [
+            c.config["configurable"]["checkpoint_id"] for c in saver.list(None)
+        ] == ids[:1:-1]
+        # the values of the kept checkpoints are intact
+        assert saver.get_tuple(config).checkpoint["channel_values"] == {"foo": 3}
+        with saver._cursor() as cur:
+            cur.execute("SELECT count(*) AS n FROM checkpoint_blobs")
+            assert cur.fetchone()["n"] == 2
+            cur.execute(
+                "SELECT checkpoint_id, channel FROM checkpoint_writes "
+                "ORDER BY checkpoint_id, channel"
+            )
+            assert [(r["checkpoint_id"], r["channel"]) for r in cur.fetchall()] == [
+                (ids[1], TASKS),
+                (ids[2], TASKS),
+                (ids[2], "foo"),
+                (ids[3], TASKS),
+                (ids[3], "foo"),
+            ]
+
+
+@pytest.mark.parametrize("saver_name", ["base", "pool", "pipe"])
+def test_blob_refs(saver_name: str) -> None:
+    with _saver(saver_name) as saver:
+        config = {"configurable": {"thread_id": "a", "checkpoint_ns": ""}}
+        ids, versions, version = [], [], None
+        for value in ["x", "x", "x", "y"]:
+            version = saver.get_next_version(version, None)
+            checkpoint = empty_checkpoint()
+            checkpoint["channel_values"] = {"foo": value}
+            checkpoint["channel_versions"] = {"foo": version}
+            config = saver.put(config, checkpoint, {}, {"foo": version})
+            ids.append(config["configurable"]["checkpoint_id"])
+            versions.append(version)
+
+        # identical versions are stored as references to the first one
+        with saver._cursor() as cur:
+            cur.execute(
+                "SELECT version, blob IS NULL AS ref, same_as FROM checkpoint_blobs "
+                "ORDER BY version"
+            )
+            assert [(r["version"], r["ref"], r["same_as"]) for r in cur] == [
+                (versions[0], False, None),
+                (versions[1], True, versions[0]),
+                (versions[2], True, versions[0]),
+                (versions[3], False, None),
+            ]
+        assert saver.blob_dedupe.stats.duplicates == 2
+        tup = saver.get_tuple(
+            {"configurable": {"thread_id": "a", "checkpoint_id": ids[2]}}
+        )
+        assert tup.checkpoint["channel_values"] == {"foo": "x"}
+
+        # compaction keeps the versions that are referred to
+        assert saver.compact({"keep_last": 2}) == 2
+        tup = saver.get_tuple(
+            {"configurable": {"thread_id": "a", "checkpoint_id": ids[2]}}
+        )
+        assert tup.checkpoint["channel_values"] == {"foo": "x"}
+        with saver._cursor() as cur:
+            cur.execute("SELECT version FROM checkpoint_blobs ORDER BY version")
+            assert [r["version"] for r in cur] == [
+                versions[0],
+                versions[2],
+                versions[3],
+            ]
+
+        # a reference to a version that is gone is stored with its own bytes
+        with saver._cursor() as cur:
+            cur.execute(
+                "DELETE FROM checkpoint_blobs WHERE version = %s", (versions[3],)
+            )
+        version = saver.get_next_version(version, None)
+        checkpoint = empty_checkpoint()
+        checkpoint["channel_values"] = {"foo": "y"}
+        checkpoint["channel_versions"] = {"foo": version}
+        config = saver.put(config, checkpoint, {}, {"foo": version})
+        assert saver.blob_dedupe.stats.duplicates == 3
+        assert saver.get_tuple(config).checkpoint["channel_values"] == {"foo": "y"}
+
+
 def test_nonnull_migrations() -> None:
     _leading_comment_remover = re.compile(r"^/\*.*?\*/")
     for migration in PostgresSaver.MIGRATIONS:
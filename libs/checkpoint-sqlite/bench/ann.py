@@ -0,0 +1,124 @@
+"""Compare approximate and exact vector search of the stores.
+
+Fills a store with clustered random vectors, searches it with and without an
+IVFFlat index, and reports recall and latency for several numbers of probed
+lists. Run with `python -m bench.ann --help` from this directory.
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager
+from typing import Any, Optional
+
+import numpy as np
+
+from langgraph.store.base import BaseStore, PutOp
+from langgraph.store.memory import InMemoryStore
+from langgraph.store.sqlite import SqliteStore
+
+NAMESPACE = ("docs",)
+
+
+def clustered_vectors(
+    n: int, dims: int, clusters: int, rng: np.random.Generator
+) -> np.ndarray:
+    centers = rng.normal(size=(clusters, dims)) / np.sqrt(dims)
+    noise = rng.normal(size=(n, dims)) * 0.05
+    return (centers[rng.integers(0, clusters, n)] + noise).astype(np.float32)
+
+
+@contextmanager
+def make_store(
+    kind: str, vectors: dict[str, list[float]], ann: Optional[dict[str, Any]]
+) -> Iterator[BaseStore]:
+    def embed(texts: Sequence[str]) -> list[list[float]]:
+        return [vectors[t] for t in texts]
+
+    dims = len(next(iter(vectors.values())))
+    index: dict[str, Any] = {"dims": dims, "embed": embed}
+    # the stores name the embedded fields differently
+    index["fields" if kind == "memory" else "text_fields"] = ["text"]
+    if ann:
+        index["ann_index_config"] = ann
+    if kind == "memory":
+        yield InMemoryStore(index=index)  # type: ignore[arg-type]
+        return
+    fd, path = tempfile.mkstemp(suffix=".sqlite")
+    os.close(fd)
+    try:
+        with SqliteStore.from_conn_string(path, index=index) as store:  # type: ignore[arg-type]
+            store.setup()
+            yield store
+    finally:
+        os.unlink(path)
+
+
+def fill(store: BaseStore, n: int, batch_size: int = 1000) -> None:
+    for start in range(0, n, batch_size):
+        store.batch(
+            [
+                PutOp(NAMESPACE, str(i), {"text": f"doc{i}"})
+                for i in range(start, min(n, start + batch_size))
+            ]
+        )
+
+
+def search(store: BaseStore, queries: int, k: int) -> tuple[list[set[str]], float]:
+    found: list[set[str]] = []
+    latencies: list[float] = []
+    for i in range(queries):
+        start = time.perf_counter()
+        results = store.search(NAMESPACE, query=f"query{i}", limit=k)
+        latencies.append(time.perf_counter() - start)
+        found.append({r.key for r in results})
+    return found, statistics.median(latencies) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--store", choices=["memory", "sqlite"], default="memory")
+    parser.add_argument("--docs", type=int, default=20_000)
+    parser.add_argument("--dims", type=int, default=256)
+    parser.add_argument("--clusters", type=int, default=100)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--nlist", type=int, default=100)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 5, 10, 20])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    docs = clustered_vectors(args.docs, args.dims, args.clusters, rng)
+    queries = clustered_vectors(args.queries, args.dims, args.clusters, rng)
+    vectors = {f"doc{i}": v.tolist() for i, v in enumerate(docs)}
+    vectors.update({f"query{i}": v.tolist() for i, v in enumerate(queries)})
+
+    with make_store(args.store, vectors, None) as store:
+        fill(store, args.docs)
+        expected, exact_ms = search(store, args.queries, args.k)
+    print(f"{'':<12}{'recall':>8}{'p50 ms':>10}")
+    print(f"{'exact':<12}{1:>8.3f}{exact_ms:>10.2f}")
+
+    ann = {"kind": "ivfflat", "nlist": args.nlist}
+    with make_store(args.store, vectors, ann) as store:
+        fill(store, args.docs)
+        for nprobe in args.nprobe:
+            # the config is read when the store is created
+            if isinstance(store, InMemoryStore):
+                store._ann = (args.nlist, nprobe)
+            else:
+                store.index_config["__ann"] = (args.nlist, nprobe)  # type: ignore[index]
+            # the first search trains the index
+            store.search(NAMESPACE, query="query0", limit=args.k)
+            found, ann_ms = search(store, args.queries, args.k)
+            recall = statistics.fmean(
+                len(f & e) / max(1, len(e)) for f, e in zip(found, expected)
+            )
+            print(f"{f'nprobe={nprobe}':<12}{recall:>8.3f}{ann_ms:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,107 @@
 from __future__ import annotations
 
 import asyncio
-import datetime
 import sqlite3
 import threading
-from collections.abc import Mapping, Sequence
+import time
+from collections.abc import Iterator, Mapping, Sequence
+from typing import Any, TypeVar
 
 from langgraph.cache.base import BaseCache, FullKey, Namespace, ValueT
 from langgraph.checkpoint.serde.base import SerializerProtocol
 
+T = TypeVar("T")
+
+# Schema: (ns, key) -> (expiry, encoding, value), with expiry indexed
+# so that expired entries can be deleted without a full scan
+SETUP_SQL = """
+PRAGMA journal_mode=WAL;
+CREATE TABLE IF NOT EXISTS cache (
+    ns TEXT,
+    key TEXT,
+    expiry REAL,
+    encoding TEXT NOT NULL,
+    val BLOB NOT NULL,
+    PRIMARY KEY (ns, key)
+);
+CREATE INDEX IF NOT EXISTS cache_expiry_idx ON cache (expiry)
+    WHERE expiry IS NOT NULL;
+"""
+
+UPSERT_SQL = (
+    "INSERT OR REPLACE INTO cache (ns, key, expiry, encoding, val) "
+    "VALUES (?, ?, ?, ?, ?)"
+)
+
+# only deletes the row if it is still expired, so that a value set concurrently by
+# another connection is kept
+DELETE_KEY_SQL = (
+    "DELETE FROM cache WHERE ns = ? AND key = ? AND expiry IS NOT NULL AND expiry <= ?"
+)
+
+DELETE_EXPIRED_SQL = "DELETE FROM cache WHERE expiry IS NOT NULL AND expiry <= ?"
+
+# SQLite limits the number of host parameters per statement, 999 in older builds
+MAX_PARAMS = 999
+
+
+def _chunks(items: Sequence[T], size: int) -> Iterator[Sequence[T]]:
+    for i in range(0, len(items), size):
+        yield items[i : i + size]
+
+
+def _select_sql(n_keys: int) -> str:
+    placeholders = ",".join("(?, ?)" for _ in range(n_keys))
+    return (
+        "SELECT ns, key, expiry, encoding, val FROM cache "
+        f"WHERE (ns, key) IN ({placeholders})"
+    )
+
+
+def _clear_sql(n_namespaces: int) -> str:
+    placeholders = ",".join("?" for _ in range(n_namespaces))
+    return f"DELETE FROM cache WHERE ns IN ({placeholders})"
+
+
+def _key_params(keys: Sequence[FullKey]) -> list[str]:
+    params: list[str] = []
+    for ns_tuple, key in keys:
+        params.extend((",".join(ns_tuple), key))
+    return params
+
+
+def _dump_rows(
+    serde: SerializerProtocol, mapping: Mapping[FullKey, tuple[Any, int | None]]
+) -> list[tuple[str, str, float | None, str, bytes]]:
+    now = time.time()
+    rows = []
+    for (ns, key), (value, ttl) in mapping.items():
+        encoding, raw = serde.dumps_typed(value)
+        expiry = now + ttl if ttl is not None else None
+        rows.append((",".join(ns), key, expiry, encoding, raw))
+    return rows
+
+
+def _split_expired(
+    rows: Sequence[tuple[str, str, float | None, str, bytes]], now: float
+) -> tuple[list[tuple[str, str, str, bytes]], list[tuple[str, str, float]]]:
+    live = []
+    expired = []
+    for ns, key, expiry, encoding, raw in rows:
+        if expiry is not None and now > expiry:
+            expired.append((ns, key, now))
+        else:
+            live.append((ns, key, encoding, raw))
+    return live, expired
+
 
 class SqliteCache(BaseCache[ValueT]):
-    """File-based cache using SQLite."""
+    """File-based cache using SQLite.
+
+    The cache file can be shared by several processes on the same host. Lookups and
+    writes for many keys are batched into as few statements as possible, and values
+    are serialized outside of the connection lock.
+    """
 
     def __init__(
         self,
@@ -28,48 +118,27 @@ class SqliteCache(BaseCache[ValueT]):
         )
         # Serialize access to the shared connection across threads
         self._lock = threading.RLock()
-        # Better concurrency & atomicity
-        self._conn.execute("PRAGMA journal_mode=WAL;")
-        # Schema: key -> (expiry, encoding, value)
-        self._conn.execute(
-            """CREATE TABLE IF NOT EXISTS cache (
-                ns TEXT,
-                key TEXT,
-                expiry REAL,
-                encoding TEXT NOT NULL,
-                val BLOB NOT NULL,
-                PRIMARY KEY (ns, key)
-            )"""
-        )
-        self._conn.commit()
+        with self._lock:
+            self._conn.executescript(SETUP_SQL)
+            self._conn.commit()
 
     def get(self, keys: Sequence[FullKey]) -> dict[FullKey, ValueT]:
         """Get the cached values for the given keys."""
+        if not keys:
+            return {}
+        rows: list[Any] = []
         with self._lock, self._conn:
-            now = datetime.datetime.now(datetime.timezone.utc).timestamp()
-            if not keys:
-                return {}
-            placeholders = ",".join("(?, ?)" for _ in keys)
-            params: list[str] = []
-            for ns_tuple, key in keys:
-                params.extend((",".join(ns_tuple), key))
-            cursor = self._conn.execute(
-                f"SELECT ns, key, expiry, encoding, val FROM cache WHERE (ns, key) IN ({placeholders})",
-                tuple(params),
-            )
-            values: dict[FullKey, ValueT] = {}
-            rows = cursor.fetchall()
-            for ns, key, expiry, encoding, raw in rows:
-                if expiry is not None and now > expiry:
-                    # purge expired entry
-                    self._conn.execute(
-                        "DELETE FROM cache WHERE (ns, key) = (?, ?)", (ns, key)
-                    )
-                    continue
-                values[(tuple(ns.split(",")), key)] = self.serde.loads_typed(
-                    (encoding, raw)
-                )
-            return values
+            for chunk in _chunks(keys, MAX_PARAMS // 2):
+                cursor = self._conn.execute(_select_sql(len(chunk)), _key_params(chunk))
+                rows.extend(cursor.fetchall())
+            live, expired = _split_expired(rows, time.time())
+            if expired:
+                # purge expired entries
+                self._conn.executemany(DELETE_KEY_SQL, expired)
+        return {
+            (tuple(ns.split(",")), key): self.serde.loads_typed((encoding, raw))
+            for ns, key, encoding, raw in live
+        }
 
     async def aget(self, keys: Sequence[FullKey]) -> dict[FullKey, ValueT]:
         """Asynchronously get the cached values for the given keys."""
@@ -77,19 +146,11 @@ class SqliteCache(BaseCache[ValueT]):
 
     def set(self, mapping: Mapping[FullKey, tuple[ValueT, int | None]]) -> None:
         """Set the cached values for the given keys and TTLs."""
+        rows = _dump_rows(self.serde, mapping)
+        if not rows:
+            return
         with self._lock, self._conn:
-            now = datetime.datetime.now(datetime.timezone.utc)
-            for key, (value, ttl) in mapping.items():
-                if ttl is not None:
-                    delta = datetime.timedelta(seconds=ttl)
-                    expiry: float | None = (now + delta).timestamp()
-                else:
-                    expiry = None
-                encoding, raw = self.serde.dumps_typed(value)
-                self._conn.execute(
-                    "INSERT OR REPLACE INTO cache (ns, key, expiry, encoding, val) VALUES (?, ?, ?, ?, ?)",
-                    (",".join(key[0]), key[1], expiry, encoding, raw),
-                )
+            self._conn.executemany(UPSERT_SQL, rows)
 
     async def aset(self, mapping: Mapping[FullKey, tuple[ValueT, int | None]]) -> None:
         """Asynchronously set the cached values for the given keys and TTLs."""
@@ -102,17 +163,25 @@ class SqliteCache(BaseCache[ValueT]):
             if namespaces is None:
                 self._conn.execute("DELETE FROM cache")
             else:
-                placeholders = ",".join("?" for _ in namespaces)
-                self._conn.execute(
-                    f"DELETE FROM cache WHERE (ns) IN ({placeholders})",
-                    tuple(",".join(key) for key in namespaces),
-                )
+                for chunk in _chunks(namespaces, MAX_PARAMS):
+                    self._conn.execute(
+                        _clear_sql(len(chunk)), tuple(",".join(ns) for ns in chunk)
+                    )
 
     async def aclear(self, namespaces: Sequence[Namespace] | None = None) -> None:
         """Asynchronously delete the cached values for the given namespaces.
         If no namespaces are provided, clear all cached values."""
         await asyncio.to_thread(self.clear, namespaces)
 
+    def sweep(self) -> int:
+        """Delete all expired entries. Returns the number of entries deleted."""
+        with self._lock, self._conn:
+            return self._conn.execute(DELETE_EXPIRED_SQL, (time.time(),)).rowcount
+
+    async def asweep(self) -> int:
+        """Asynchronously delete all expired entries."""
+        return await asyncio.to_thread(self.sweep)
+
     def __del__(self) -> None:
         try:
             self._conn.close()
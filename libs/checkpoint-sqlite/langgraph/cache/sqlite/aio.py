@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import AsyncIterator, Coroutine, Mapping, Sequence
+from contextlib import asynccontextmanager
+from typing import Any, TypeVar
+
+import aiosqlite
+from langgraph.cache.base import BaseCache, FullKey, Namespace, ValueT
+from langgraph.checkpoint.serde.base import SerializerProtocol
+
+from langgraph.cache.sqlite import (
+    DELETE_EXPIRED_SQL,
+    DELETE_KEY_SQL,
+    MAX_PARAMS,
+    SETUP_SQL,
+    UPSERT_SQL,
+    _chunks,
+    _clear_sql,
+    _dump_rows,
+    _key_params,
+    _select_sql,
+    _split_expired,
+)
+
+T = TypeVar("T")
+
+
+class AsyncSqliteCache(BaseCache[ValueT]):
+    """Asynchronous file-based cache using SQLite.
+
+    Uses the same schema as `SqliteCache`, so both can share a cache file. Queries
+    run on aiosqlite's background thread, so cache lookups from `AsyncPregelLoop`
+    don't block the event loop.
+
+    Tip:
+        Requires the [aiosqlite](https://pypi.org/project/aiosqlite/) package.
+
+    Examples:
+
+        ```python
+        async with AsyncSqliteCache.from_conn_string("cache.sqlite") as cache:
+            graph = builder.compile(cache=cache)
+            await graph.ainvoke(...)
+        ```
+    """
+
+    lock: asyncio.Lock
+    is_setup: bool
+
+    def __init__(
+        self,
+        conn: aiosqlite.Connection,
+        *,
+        serde: SerializerProtocol | None = None,
+    ) -> None:
+        super().__init__(serde=serde)
+        self.conn = conn
+        self.lock = asyncio.Lock()
+        self.loop = asyncio.get_running_loop()
+        self.is_setup = False
+
+    @classmethod
+    @asynccontextmanager
+    async def from_conn_string(
+        cls, conn_string: str, *, serde: SerializerProtocol | None = None
+    ) -> AsyncIterator[AsyncSqliteCache]:
+        """Create a new AsyncSqliteCache instance from a connection string.
+
+        Args:
+            conn_string: The SQLite connection string.
+            serde: The serializer to use for the cached values.
+
+        Yields:
+            AsyncSqliteCache: A new AsyncSqliteCache instance.
+        """
+        async with aiosqlite.connect(conn_string) as conn:
+            yield cls(conn, serde=serde)
+
+    async def setup(self) -> None:
+        """Create the cache table if it doesn't already exist. It is called
+        automatically when needed and should not be called directly by the user."""
+        async with self.lock:
+            if self.is_setup:
+                return
+            if not self.conn.is_alive():
+                await self.conn
+            await self.conn.executescript(SETUP_SQL)
+            await self.conn.commit()
+            self.is_setup = True
+
+    def _run_sync(self, coro: Coroutine[Any, Any, T]) -> T:
+        try:
+            # check if we are in the main thread, only bg threads can block
+            if asyncio.get_running_loop() is self.loop:
+                coro.close()
+                raise asyncio.InvalidStateError(
+                    "Synchronous calls to AsyncSqliteCache are only allowed from a "
+                    "different thread. From the main thread, use the async interface."
+                )
+        except RuntimeError:
+            pass
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+    async def aget(self, keys: Sequence[FullKey]) -> dict[FullKey, ValueT]:
+        """Asynchronously get the cached values for the given keys."""
+        if not keys:
+            return {}
+        await self.setup()
+        rows: list[Any] = []
+        async with self.lock:
+            for chunk in _chunks(keys, MAX_PARAMS // 2):
+                async with self.conn.execute(
+                    _select_sql(len(chunk)), _key_params(chunk)
+                ) as cursor:
+                    rows.extend(await cursor.fetchall())
+            live, expired = _split_expired(rows, time.time())
+            if expired:
+                # purge expired entries
+                await self.conn.executemany(DELETE_KEY_SQL, expired)
+                await self.conn.commit()
+        return {
+            (tuple(ns.split(",")), key): self.serde.loads_typed((encoding, raw))
+            for ns, key, encoding, raw in live
+        }
+
+    def get(self, keys: Sequence[FullKey]) -> dict[FullKey, ValueT]:
+        """Get the cached values for the given keys."""
+        return self._run_sync(self.aget(keys))
+
+    async def aset(self, mapping: Mapping[FullKey, tuple[ValueT, int | None]]) -> None:
+        """Asynchronously set the cached values for the given keys and TTLs."""
+        rows = _dump_rows(self.serde, mapping)
+        if not rows:
+            return
+        await self.setup()
+        async with self.lock:
+            await self.conn.executemany(UPSERT_SQL, rows)
+            await self.conn.commit()
+
+    def set(self, mapping: Mapping[FullKey, tuple[ValueT, int | None]]) -> None:
+        """Set the cached values for the given keys and TTLs."""
+        return self._run_sync(self.aset(mapping))
+
+    async def aclear(self, namespaces: Sequence[Namespace] | None = None) -> None:
+        """Asynchronously delete the cached values for the given namespaces.
+        If no namespaces are provided, clear all cached values."""
+        await self.setup()
+        async with self.lock:
+            if namespaces is None:
+                await self.conn.execute("DELETE FROM cache")
+            else:
+                for chunk in _chunks(namespaces, MAX_PARAMS):
+                    await self.conn.execute(
+                        _clear_sql(len(chunk)), tuple(",".join(ns) for ns in chunk)
+                    )
+            await self.conn.commit()
+
+    def clear(self, namespaces: Sequence[Namespace] | None = None) -> None:
+        """Delete the cached values for the given namespaces.
+        If no namespaces are provided, clear all cached values."""
+        return self._run_sync(self.aclear(namespaces))
+
+    async def asweep(self) -> int:
+        """Asynchronously delete all expired entries. Returns the number of entries
+        deleted."""
+        await self.setup()
+        async with self.lock:
+            async with self.conn.execute(DELETE_EXPIRED_SQL, (time.time(),)) as cursor:
+                deleted = cursor.rowcount
+            await self.conn.commit()
+        return deleted
+
+    def sweep(self) -> int:
+        """Delete all expired entries. Returns the number of entries deleted."""
+        return self._run_sync(self.asweep())
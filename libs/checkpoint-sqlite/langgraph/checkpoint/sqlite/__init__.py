@@ -1,9 +1,11 @@
+import concurrent.futures
+import logging
 import random
 import sqlite3
 import threading
 from collections.abc import AsyncIterator, Iterator, Sequence
 from contextlib import closing, contextmanager
-from typing import Any, Optional, cast
+from typing import Any, List, Optional, cast  # noqa: UP035
 
 from langchain_core.runnables import RunnableConfig
 
@@ -14,13 +16,29 @@ from langgraph.checkpoint.base import (
     Checkpoint,
     CheckpointMetadata,
     CheckpointTuple,
+    LazyCheckpointTuple,
+    RetentionPolicy,
     SerializerProtocol,
     get_checkpoint_id,
     get_checkpoint_metadata,
 )
 from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
 from langgraph.checkpoint.serde.types import ChannelProtocol
-from langgraph.checkpoint.sqlite.utils import search_where
+from langgraph.checkpoint.sqlite.utils import (
+    DELETE_COMPACTED_CHECKPOINT_SQL,
+    DELETE_COMPACTED_WRITES_SQL,
+    SELECT_COMPACT_THREADS_SQL,
+    SELECT_TUPLES_SQL,
+    SELECT_TUPLES_WRITES_SQL,
+    compacted_writes_params,
+    compaction_query,
+    found_param,
+    load_tuples,
+    search_where,
+    tuples_param,
+)
+
+logger = logging.getLogger(__name__)
 
 _AIO_ERROR_MSG = (
     "The SqliteSaver does not support async methods. "
@@ -46,6 +64,7 @@ class SqliteSaver(BaseCheckpointSaver[str]):
     Args:
         conn (sqlite3.Connection): The SQLite database connection.
         serde (Optional[SerializerProtocol]): The serializer to use for serializing and deserializing checkpoints. Defaults to JsonPlusSerializerCompat.
+        retention (Optional[RetentionPolicy]): Which checkpoints to keep when compacting the database with `compact()` or `start_compactor()`.
 
     Examples:
 
@@ -78,20 +97,27 @@ class SqliteSaver(BaseCheckpointSaver[str]):
         conn: sqlite3.Connection,
         *,
         serde: Optional[SerializerProtocol] = None,
+        retention: Optional[RetentionPolicy] = None,
     ) -> None:
         super().__init__(serde=serde)
         self.jsonplus_serde = JsonPlusSerializer()
         self.conn = conn
         self.is_setup = False
         self.lock = threading.Lock()
+        self.retention = retention
+        self._compactor_thread: Optional[threading.Thread] = None
+        self._compact_stop_event = threading.Event()
 
     @classmethod
     @contextmanager
-    def from_conn_string(cls, conn_string: str) -> Iterator["SqliteSaver"]:
+    def from_conn_string(
+        cls, conn_string: str, *, retention: Optional[RetentionPolicy] = None
+    ) -> Iterator["SqliteSaver"]:
         """Create a new SqliteSaver instance from a connection string.
 
         Args:
             conn_string: The SQLite connection string.
+            retention: Which checkpoints to keep when compacting the database.
 
         Yields:
             SqliteSaver: A new SqliteSaver instance.
@@ -115,7 +141,7 @@ class SqliteSaver(BaseCheckpointSaver[str]):
                 check_same_thread=False,
             )
         ) as conn:
-            yield cls(conn)
+            yield cls(conn, retention=retention)
 
     def setup(self) -> None:
         """Set up the checkpoint database.
@@ -285,6 +311,35 @@ class SqliteSaver(BaseCheckpointSaver[str]):
                     ],
                 )
 
+    def get_tuples(
+        self, configs: Sequence[RunnableConfig]
+    ) -> List[Optional[CheckpointTuple]]:
+        """Get the checkpoint tuples for many configs from the database at once.
+
+        This method retrieves the checkpoints of all configs with one query, and their
+        pending writes with another. Configs without a "checkpoint_id" key resolve to
+        the latest checkpoint of their thread, as in `get_tuple`.
+
+        Args:
+            configs: The configs to use for retrieving the checkpoints.
+
+        Returns:
+            list[Optional[CheckpointTuple]]: The retrieved checkpoint tuples, in the order of `configs`, with None for checkpoints that were not found.
+
+        Examples:
+
+            >>> configs = [{"configurable": {"thread_id": str(i)}} for i in range(3)]
+            >>> checkpoint_tuples = memory.get_tuples(configs)
+        """  # noqa
+        if not configs:
+            return []
+        with self.cursor(transaction=False) as cur:
+            cur.execute(SELECT_TUPLES_SQL, (tuples_param(configs),))
+            rows = cur.fetchall()
+            cur.execute(SELECT_TUPLES_WRITES_SQL, (found_param(rows),))
+            writes = cur.fetchall()
+        return load_tuples(configs, rows, writes, self.serde, self.jsonplus_serde)
+
     def list(
         self,
         config: Optional[RunnableConfig],
@@ -378,6 +433,72 @@ class SqliteSaver(BaseCheckpointSaver[str]):
                     ],
                 )
 
+    def list_metadata(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        """List checkpoints from the database, without loading them.
+
+        Only the config, metadata and parent config of each checkpoint are fetched,
+        the checkpoint and its pending writes are loaded on first access.
+
+        Args:
+            config: The config to use for listing the checkpoints.
+            filter: Additional filtering criteria for metadata. Defaults to None.
+            before: If provided, only checkpoints before the specified checkpoint ID are returned. Defaults to None.
+            limit: The maximum number of checkpoints to return. Defaults to None.
+
+        Yields:
+            Iterator[CheckpointTuple]: An iterator of lazily loaded checkpoint tuples.
+        """
+        where, param_values = search_where(config, filter, before)
+        query = f"""SELECT thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, metadata
+        FROM checkpoints
+        {where}
+        ORDER BY checkpoint_id DESC"""
+        if limit:
+            query += f" LIMIT {limit}"
+        # fetch all rows first, so the checkpoints can be loaded while iterating
+        with self.cursor(transaction=False) as cur:
+            cur.execute(query, param_values)
+            rows = cur.fetchall()
+        for (
+            thread_id,
+            checkpoint_ns,
+            checkpoint_id,
+            parent_checkpoint_id,
+            metadata,
+        ) in rows:
+            yield LazyCheckpointTuple(
+                {
+                    "configurable": {
+                        "thread_id": thread_id,
+                        "checkpoint_ns": checkpoint_ns,
+                        "checkpoint_id": checkpoint_id,
+                    }
+                },
+                cast(
+                    CheckpointMetadata,
+                    self.jsonplus_serde.loads(metadata) if metadata is not None else {},
+                ),
+                (
+                    {
+                        "configurable": {
+                            "thread_id": thread_id,
+                            "checkpoint_ns": checkpoint_ns,
+                            "checkpoint_id": parent_checkpoint_id,
+                        }
+                    }
+                    if parent_checkpoint_id
+                    else None
+                ),
+                self,
+            )
+
     def put(
         self,
         config: RunnableConfig,
@@ -494,6 +615,149 @@ class SqliteSaver(BaseCheckpointSaver[str]):
                 (str(thread_id),),
             )
 
+    def compact(self, retention: Optional[RetentionPolicy] = None) -> int:
+        """Delete the checkpoints that the retention policy does not keep.
+
+        Checkpoints are deleted together with their writes in batches of at most
+        `batch_size`, each in a short transaction of its own, so graphs using the
+        database are never blocked for long.
+
+        Args:
+            retention: The policy to apply. Defaults to the saver's `retention`.
+
+        Returns:
+            int: The number of deleted checkpoints.
+        """
+        policy = retention if retention is not None else self.retention
+        if policy is None:
+            raise ValueError("No retention policy to compact checkpoints with.")
+        query, params = compaction_query(policy)
+        batch_size = policy.get("batch_size", 1000)
+        deleted = 0
+        after: Optional[str] = None
+        while True:
+            with self.cursor(transaction=False) as cur:
+                cur.execute(SELECT_COMPACT_THREADS_SQL, (after, after, batch_size))
+                threads = [row[0] for row in cur.fetchall()]
+            if not threads:
+                break
+            while True:
+                with self.cursor() as cur:
+                    cur.execute(query, (threads[0], threads[-1], *params))
+                    rows = cur.fetchall()
+                    cur.executemany(
+                        DELETE_COMPACTED_CHECKPOINT_SQL, [row[:3] for row in rows]
+                    )
+                    cur.executemany(
+                        DELETE_COMPACTED_WRITES_SQL, compacted_writes_params(rows)
+                    )
+                deleted += len(rows)
+                if len(rows) < batch_size:
+                    break
+            if len(threads) < batch_size:
+                break
+            after = threads[-1]
+        return deleted
+
+    def start_compactor(
+        self, compact_interval_minutes: Optional[float] = None
+    ) -> concurrent.futures.Future[None]:
+        """Periodically compact the database in a background thread.
+
+        Args:
+            compact_interval_minutes: Minutes between runs. Defaults to the policy's
+                `compact_interval_minutes`, or 60.
+
+        Returns:
+            Future that can be waited on or cancelled.
+        """
+        if self.retention is None:
+            future: concurrent.futures.Future[None] = concurrent.futures.Future()
+            future.set_result(None)
+            return future
+
+        if self._compactor_thread and self._compactor_thread.is_alive():
+            logger.info("Checkpoint compactor thread is already running")
+            # Return a future that can be used to cancel the existing thread
+            future = concurrent.futures.Future()
+            future.add_done_callback(
+                lambda f: self._compact_stop_event.set() if f.cancelled() else None
+            )
+            return future
+
+        self._compact_stop_event.clear()
+
+        interval = float(
+            compact_interval_minutes
+            or self.retention.get("compact_interval_minutes")
+            or 60
+        )
+        logger.info(f"Starting checkpoint compactor with interval {interval} minutes")
+
+        future = concurrent.futures.Future()
+
+        def _compact_loop() -> None:
+            try:
+                while not self._compact_stop_event.is_set():
+                    if self._compact_stop_event.wait(interval * 60):
+                        break
+
+                    try:
+                        deleted = self.compact()
+                        if deleted > 0:
+                            logger.info(f"Compacted {deleted} checkpoints")
+                    except Exception as exc:
+                        logger.exception(
+                            "Checkpoint compaction iteration failed", exc_info=exc
+                        )
+                future.set_result(None)
+            except Exception as exc:
+                future.set_exception(exc)
+
+        thread = threading.Thread(
+            target=_compact_loop, daemon=True, name="checkpoint-compactor"
+        )
+        self._compactor_thread = thread
+        thread.start()
+
+        future.add_done_callback(
+            lambda f: self._compact_stop_event.set() if f.cancelled() else None
+        )
+        return future
+
+    def stop_compactor(self, timeout: Optional[float] = None) -> bool:
+        """Stop the compactor thread if it's running.
+
+        Args:
+            timeout: Maximum time to wait for the thread to stop, in seconds.
+                If None, wait indefinitely.
+
+        Returns:
+            bool: True if the thread was successfully stopped or wasn't running,
+                False if the timeout was reached before the thread stopped.
+        """
+        if not self._compactor_thread or not self._compactor_thread.is_alive():
+            return True
+
+        logger.info("Stopping checkpoint compactor thread")
+        self._compact_stop_event.set()
+
+        self._compactor_thread.join(timeout)
+        success = not self._compactor_thread.is_alive()
+
+        if success:
+            self._compactor_thread = None
+            logger.info("Checkpoint compactor thread stopped")
+        else:
+            logger.warning("Timed out waiting for checkpoint compactor thread to stop")
+
+        return success
+
+    def __del__(self) -> None:
+        """Ensure the compactor thread is stopped when the object is garbage collected."""
+        if hasattr(self, "_compact_stop_event") and hasattr(self, "_compactor_thread"):
+            self.stop_compactor(timeout=0.1)
+
     async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
         """Get a checkpoint tuple from the database asynchronously.
 
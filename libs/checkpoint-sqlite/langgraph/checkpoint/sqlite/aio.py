@@ -1,8 +1,10 @@
 import asyncio
+import logging
 import random
 from collections.abc import AsyncIterator, Iterator, Sequence
 from contextlib import asynccontextmanager
-from typing import Any, Callable, Optional, TypeVar, cast
+from itertools import groupby
+from typing import Any, Callable, List, Optional, TypeVar, cast  # noqa: UP035
 
 import aiosqlite
 from langchain_core.runnables import RunnableConfig
@@ -14,15 +16,30 @@ from langgraph.checkpoint.base import (
     Checkpoint,
     CheckpointMetadata,
     CheckpointTuple,
+    LazyCheckpointTuple,
+    RetentionPolicy,
     SerializerProtocol,
     get_checkpoint_id,
     get_checkpoint_metadata,
 )
 from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
 from langgraph.checkpoint.serde.types import ChannelProtocol
-from langgraph.checkpoint.sqlite.utils import search_where
+from langgraph.checkpoint.sqlite.utils import (
+    DELETE_COMPACTED_CHECKPOINT_SQL,
+    DELETE_COMPACTED_WRITES_SQL,
+    SELECT_COMPACT_THREADS_SQL,
+    SELECT_TUPLES_SQL,
+    SELECT_TUPLES_WRITES_SQL,
+    compacted_writes_params,
+    compaction_query,
+    found_param,
+    load_tuples,
+    search_where,
+    tuples_param,
+)
 
 T = TypeVar("T", bound=Callable)
+logger = logging.getLogger(__name__)
 
 
 class AsyncSqliteSaver(BaseCheckpointSaver[str]):
@@ -35,6 +52,7 @@ class AsyncSqliteSaver(BaseCheckpointSaver[str]):
     Attributes:
         conn (aiosqlite.Connection): The asynchronous SQLite database connection.
         serde (SerializerProtocol): The serializer used for encoding/decoding checkpoints.
+        retention (Optional[RetentionPolicy]): Which checkpoints to keep when compacting the database with `acompact()` or `start_compactor()`.
 
     Tip:
         Requires the [aiosqlite](https://pypi.org/project/aiosqlite/) package.
@@ -110,6 +128,7 @@ class AsyncSqliteSaver(BaseCheckpointSaver[str]):
         conn: aiosqlite.Connection,
         *,
         serde: Optional[SerializerProtocol] = None,
+        retention: Optional[RetentionPolicy] = None,
     ):
         super().__init__(serde=serde)
         self.jsonplus_serde = JsonPlusSerializer()
@@ -117,22 +136,26 @@ class AsyncSqliteSaver(BaseCheckpointSaver[str]):
         self.lock = asyncio.Lock()
         self.loop = asyncio.get_running_loop()
         self.is_setup = False
+        self.retention = retention
+        self._compactor_task: Optional[asyncio.Task[None]] = None
+        self._compact_stop_event = asyncio.Event()
 
     @classmethod
     @asynccontextmanager
     async def from_conn_string(
-        cls, conn_string: str
+        cls, conn_string: str, *, retention: Optional[RetentionPolicy] = None
     ) -> AsyncIterator["AsyncSqliteSaver"]:
         """Create a new AsyncSqliteSaver instance from a connection string.
 
         Args:
             conn_string: The SQLite connection string.
+            retention: Which checkpoints to keep when compacting the database.
 
         Yields:
             AsyncSqliteSaver: A new AsyncSqliteSaver instance.
         """
         async with aiosqlite.connect(conn_string) as conn:
-            yield cls(conn)
+            yield cls(conn, retention=retention)
 
     def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
         """Get a checkpoint tuple from the database.
@@ -164,6 +187,33 @@ class AsyncSqliteSaver(BaseCheckpointSaver[str]):
             self.aget_tuple(config), self.loop
         ).result()
 
+    def get_tuples(
+        self, configs: Sequence[RunnableConfig]
+    ) -> List[Optional[CheckpointTuple]]:
+        """Get the checkpoint tuples for many configs from the database at once.
+
+        Args:
+            configs: The configs to use for retrieving the checkpoints.
+
+        Returns:
+            list[Optional[CheckpointTuple]]: The retrieved checkpoint tuples, in the order of `configs`, with None for checkpoints that were not found.
+        """
+        try:
+            # check if we are in the main thread, only bg threads can block
+            # we don't check in other methods to avoid the overhead
+            if asyncio.get_running_loop() is self.loop:
+                raise asyncio.InvalidStateError(
+                    "Synchronous calls to AsyncSqliteSaver are only allowed from a "
+                    "different thread. From the main thread, use the async interface. "
+                    "For example, use `await checkpointer.aget_tuples(...)` or `await "
+                    "graph.ainvoke(...)`."
+                )
+        except RuntimeError:
+            pass
+        return asyncio.run_coroutine_threadsafe(
+            self.aget_tuples(configs), self.loop
+        ).result()
+
     def list(
         self,
         config: Optional[RunnableConfig],
@@ -208,6 +258,49 @@ class AsyncSqliteSaver(BaseCheckpointSaver[str]):
             except StopAsyncIteration:
                 break
 
+    def list_metadata(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        """List checkpoints from the database, without loading them.
+
+        See `alist_metadata`.
+
+        Args:
+            config: Base configuration for filtering checkpoints.
+            filter: Additional filtering criteria for metadata.
+            before: If provided, only checkpoints before the specified checkpoint ID are returned. Defaults to None.
+            limit: Maximum number of checkpoints to return.
+
+        Yields:
+            Iterator[CheckpointTuple]: An iterator of lazily loaded checkpoint tuples.
+        """
+        try:
+            # check if we are in the main thread, only bg threads can block
+            # we don't check in other methods to avoid the overhead
+            if asyncio.get_running_loop() is self.loop:
+                raise asyncio.InvalidStateError(
+                    "Synchronous calls to AsyncSqliteSaver are only allowed from a "
+                    "different thread. From the main thread, use the async interface. "
+                    "For example, use `checkpointer.alist_metadata(...)` or `await "
+                    "graph.ainvoke(...)`."
+                )
+        except RuntimeError:
+            pass
+        aiter_ = self.alist_metadata(config, filter=filter, before=before, limit=limit)
+        while True:
+            try:
+                yield asyncio.run_coroutine_threadsafe(
+                    anext(aiter_),  # noqa: F821
+                    self.loop,
+                ).result()
+            except StopAsyncIteration:
+                break
+
     def put(
         self,
         config: RunnableConfig,
@@ -397,6 +490,31 @@ class AsyncSqliteSaver(BaseCheckpointSaver[str]):
                     ],
                 )
 
+    async def aget_tuples(
+        self, configs: Sequence[RunnableConfig]
+    ) -> List[Optional[CheckpointTuple]]:
+        """Get the checkpoint tuples for many configs from the database at once.
+
+        This method retrieves the checkpoints of all configs with one query, and their
+        pending writes with another. Configs without a "checkpoint_id" key resolve to
+        the latest checkpoint of their thread, as in `aget_tuple`.
+
+        Args:
+            configs: The configs to use for retrieving the checkpoints.
+
+        Returns:
+            list[Optional[CheckpointTuple]]: The retrieved checkpoint tuples, in the order of `configs`, with None for checkpoints that were not found.
+        """
+        if not configs:
+            return []
+        await self.setup()
+        async with self.lock, self.conn.cursor() as cur:
+            await cur.execute(SELECT_TUPLES_SQL, (tuples_param(configs),))
+            rows = await cur.fetchall()
+            await cur.execute(SELECT_TUPLES_WRITES_SQL, (found_param(rows),))
+            writes = await cur.fetchall()
+        return load_tuples(configs, rows, writes, self.serde, self.jsonplus_serde)
+
     async def alist(
         self,
         config: Optional[RunnableConfig],
@@ -477,6 +595,72 @@ class AsyncSqliteSaver(BaseCheckpointSaver[str]):
                     ],
                 )
 
+    async def alist_metadata(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        """List checkpoints from the database asynchronously, without loading them.
+
+        Only the config, metadata and parent config of each checkpoint are fetched,
+        the checkpoint and its pending writes are loaded with `await tup.ahydrate()`.
+
+        Args:
+            config: Base configuration for filtering checkpoints.
+            filter: Additional filtering criteria for metadata.
+            before: If provided, only checkpoints before the specified checkpoint ID are returned. Defaults to None.
+            limit: Maximum number of checkpoints to return.
+
+        Yields:
+            AsyncIterator[CheckpointTuple]: An asynchronous iterator of lazily loaded checkpoint tuples.
+        """
+        await self.setup()
+        where, params = search_where(config, filter, before)
+        query = f"""SELECT thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, metadata
+        FROM checkpoints
+        {where}
+        ORDER BY checkpoint_id DESC"""
+        if limit:
+            query += f" LIMIT {limit}"
+        # fetch all rows first, so the checkpoints can be loaded while iterating
+        async with self.lock, self.conn.execute(query, params) as cur:
+            rows = await cur.fetchall()
+        for (
+            thread_id,
+            checkpoint_ns,
+            checkpoint_id,
+            parent_checkpoint_id,
+            metadata,
+        ) in rows:
+            yield LazyCheckpointTuple(
+                {
+                    "configurable": {
+                        "thread_id": thread_id,
+                        "checkpoint_ns": checkpoint_ns,
+                        "checkpoint_id": checkpoint_id,
+                    }
+                },
+                cast(
+                    CheckpointMetadata,
+                    self.jsonplus_serde.loads(metadata) if metadata is not None else {},
+                ),
+                (
+                    {
+                        "configurable": {
+                            "thread_id": thread_id,
+                            "checkpoint_ns": checkpoint_ns,
+                            "checkpoint_id": parent_checkpoint_id,
+                        }
+                    }
+                    if parent_checkpoint_id
+                    else None
+                ),
+                self,
+            )
+
     async def aput(
         self,
         config: RunnableConfig,
@@ -546,28 +730,51 @@ class AsyncSqliteSaver(BaseCheckpointSaver[str]):
             task_id: Identifier for the task creating the writes.
             task_path: Path of the task creating the writes.
         """
-        query = (
-            "INSERT OR REPLACE INTO writes (thread_id, checkpoint_ns, checkpoint_id, task_id, idx, channel, type, value) VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
-            if all(w[0] in WRITES_IDX_MAP for w in writes)
-            else "INSERT OR IGNORE INTO writes (thread_id, checkpoint_ns, checkpoint_id, task_id, idx, channel, type, value) VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
-        )
+        await self.aput_writes_batch(config, [(writes, task_id, task_path)])
+
+    async def aput_writes_batch(
+        self,
+        config: RunnableConfig,
+        batch: Sequence[tuple[Sequence[tuple[str, Any]], str, str]],
+    ) -> None:
+        """Store intermediate writes of many tasks linked to a checkpoint asynchronously.
+
+        All writes are stored in a single transaction, with consecutive tasks that
+        use the same insert statement sent in one `executemany` call.
+
+        Args:
+            config: Configuration of the related checkpoint.
+            batch: Writes to store, each as a (writes, task_id, task_path) tuple.
+        """
+        replace = "INSERT OR REPLACE INTO writes (thread_id, checkpoint_ns, checkpoint_id, task_id, idx, channel, type, value) VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+        ignore = "INSERT OR IGNORE INTO writes (thread_id, checkpoint_ns, checkpoint_id, task_id, idx, channel, type, value) VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+        thread_id = str(config["configurable"]["thread_id"])
+        checkpoint_ns = str(config["configurable"]["checkpoint_ns"])
+        checkpoint_id = str(config["configurable"]["checkpoint_id"])
         await self.setup()
         async with self.lock, self.conn.cursor() as cur:
-            await cur.executemany(
-                query,
-                [
-                    (
-                        str(config["configurable"]["thread_id"]),
-                        str(config["configurable"]["checkpoint_ns"]),
-                        str(config["configurable"]["checkpoint_id"]),
-                        task_id,
-                        WRITES_IDX_MAP.get(channel, idx),
-                        channel,
-                        *self.serde.dumps_typed(value),
-                    )
-                    for idx, (channel, value) in enumerate(writes)
-                ],
-            )
+            for query, tasks in groupby(
+                batch,
+                lambda t: (
+                    replace if all(w[0] in WRITES_IDX_MAP for w in t[0]) else ignore
+                ),
+            ):
+                await cur.executemany(
+                    query,
+                    [
+                        (
+                            thread_id,
+                            checkpoint_ns,
+                            checkpoint_id,
+                            task_id,
+                            WRITES_IDX_MAP.get(channel, idx),
+                            channel,
+                            *self.serde.dumps_typed(value),
+                        )
+                        for writes, task_id, _ in tasks
+                        for idx, (channel, value) in enumerate(writes)
+                    ],
+                )
             await self.conn.commit()
 
     async def adelete_thread(self, thread_id: str) -> None:
@@ -590,6 +797,146 @@ class AsyncSqliteSaver(BaseCheckpointSaver[str]):
             )
             await self.conn.commit()
 
+    async def acompact(self, retention: Optional[RetentionPolicy] = None) -> int:
+        """Delete the checkpoints that the retention policy does not keep.
+
+        Checkpoints are deleted together with their writes in batches of at most
+        `batch_size`, each in a short transaction of its own, so graphs using the
+        database are never blocked for long.
+
+        Args:
+            retention: The policy to apply. Defaults to the saver's `retention`.
+
+        Returns:
+            int: The number of deleted checkpoints.
+        """
+        policy = retention if retention is not None else self.retention
+        if policy is None:
+            raise ValueError("No retention policy to compact checkpoints with.")
+        await self.setup()
+        query, params = compaction_query(policy)
+        batch_size = policy.get("batch_size", 1000)
+        deleted = 0
+        after: Optional[str] = None
+        while True:
+            async with (
+                self.lock,
+                self.conn.execute(
+                    SELECT_COMPACT_THREADS_SQL, (after, after, batch_size)
+                ) as cur,
+            ):
+                threads = [row[0] for row in await cur.fetchall()]
+            if not threads:
+                break
+            while True:
+                async with self.lock, self.conn.cursor() as cur:
+                    await cur.execute(query, (threads[0], threads[-1], *params))
+                    rows = await cur.fetchall()
+                    await cur.executemany(
+                        DELETE_COMPACTED_CHECKPOINT_SQL, [row[:3] for row in rows]
+                    )
+                    await cur.executemany(
+                        DELETE_COMPACTED_WRITES_SQL,
+                        compacted_writes_params(rows),  # type: ignore[arg-type]
+                    )
+                    await self.conn.commit()
+                deleted += len(rows)
+                if len(rows) < batch_size:
+                    break
+            if len(threads) < batch_size:
+                break
+            after = threads[-1]
+        return deleted
+
+    async def start_compactor(
+        self, compact_interval_minutes: Optional[float] = None
+    ) -> asyncio.Task[None]:
+        """Periodically compact the database in a background task.
+
+        Args:
+            compact_interval_minutes: Minutes between runs. Defaults to the policy's
+                `compact_interval_minutes`, or 60.
+
+        Returns:
+            Task that can be awaited or cancelled.
+        """
+        if self.retention is None:
+            return asyncio.create_task(asyncio.sleep(0))
+
+        if self._compactor_task is not None and not self._compactor_task.done():
+            return self._compactor_task
+
+        self._compact_stop_event.clear()
+
+        interval = float(
+            compact_interval_minutes
+            or self.retention.get("compact_interval_minutes")
+            or 60
+        )
+        logger.info(f"Starting checkpoint compactor with interval {interval} minutes")
+
+        async def _compact_loop() -> None:
+            while not self._compact_stop_event.is_set():
+                try:
+                    try:
+                        await asyncio.wait_for(
+                            self._compact_stop_event.wait(),
+                            timeout=interval * 60,
+                        )
+                        break
+                    except asyncio.TimeoutError:
+                        pass
+
+                    deleted = await self.acompact()
+                    if deleted > 0:
+                        logger.info(f"Compacted {deleted} checkpoints")
+                except asyncio.CancelledError:
+                    break
+                except Exception as exc:
+                    logger.exception(
+                        "Checkpoint compaction iteration failed", exc_info=exc
+                    )
+
+        task = asyncio.create_task(_compact_loop())
+        task.set_name("checkpoint_compactor")
+        self._compactor_task = task
+        return task
+
+    async def stop_compactor(self, timeout: Optional[float] = None) -> bool:
+        """Stop the compactor task if it's running.
+
+        Args:
+            timeout: Maximum time to wait for the task to stop, in seconds.
+                If None, wait indefinitely.
+
+        Returns:
+            bool: True if the task was successfully stopped or wasn't running,
+                False if the timeout was reached before the task stopped.
+        """
+        if self._compactor_task is None or self._compactor_task.done():
+            return True
+
+        logger.info("Stopping checkpoint compactor task")
+        self._compact_stop_event.set()
+
+        if timeout is not None:
+            try:
+                await asyncio.wait_for(self._compactor_task, timeout=timeout)
+                success = True
+            except asyncio.TimeoutError:
+                success = False
+        else:
+            await self._compactor_task
+            success = True
+
+        if success:
+            self._compactor_task = None
+            logger.info("Checkpoint compactor task stopped")
+        else:
+            logger.warning("Timed out waiting for checkpoint compactor task to stop")
+
+        return success
+
     def get_next_version(self, current: Optional[str], channel: ChannelProtocol) -> str:
         """Generate the next version ID for a channel.
 
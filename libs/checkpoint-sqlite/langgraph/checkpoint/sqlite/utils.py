@@ -1,10 +1,85 @@
 import json
-from collections.abc import Sequence
-from typing import Any, Optional
+from collections import defaultdict
+from collections.abc import Iterable, Sequence
+from typing import Any, Optional, cast
 
 from langchain_core.runnables import RunnableConfig
 
-from langgraph.checkpoint.base import get_checkpoint_id
+from langgraph.checkpoint.base import (
+    CheckpointMetadata,
+    CheckpointTuple,
+    PendingWrite,
+    RetentionPolicy,
+    SerializerProtocol,
+    get_checkpoint_id,
+    get_retention_cutoff,
+)
+from langgraph.checkpoint.serde.types import TASKS
+
+# the requested checkpoints, passed as a JSON array of
+# [thread_id, checkpoint_ns, checkpoint_id or null]
+_WANTED_CTE = """
+WITH wanted AS (
+    SELECT key AS pos,
+        json_extract(value, '$[0]') AS thread_id,
+        json_extract(value, '$[1]') AS checkpoint_ns,
+        json_extract(value, '$[2]') AS checkpoint_id
+    FROM json_each(?)
+)"""
+
+SELECT_TUPLES_SQL = f"""{_WANTED_CTE}
+SELECT wanted.pos, c.thread_id, c.checkpoint_ns, c.checkpoint_id,
+    c.parent_checkpoint_id, c.type, c.checkpoint, c.metadata
+FROM wanted
+JOIN checkpoints c
+    ON c.thread_id = wanted.thread_id
+    AND c.checkpoint_ns = wanted.checkpoint_ns
+    AND c.checkpoint_id = coalesce(wanted.checkpoint_id, (
+        SELECT max(latest.checkpoint_id) FROM checkpoints latest
+        WHERE latest.thread_id = wanted.thread_id
+            AND latest.checkpoint_ns = wanted.checkpoint_ns
+    ))"""
+
+SELECT_TUPLES_WRITES_SQL = f"""{_WANTED_CTE}
+SELECT w.thread_id, w.checkpoint_ns, w.checkpoint_id, w.task_id, w.channel,
+    w.type, w.value
+FROM (SELECT DISTINCT thread_id, checkpoint_ns, checkpoint_id FROM wanted) found
+JOIN writes w
+    ON w.thread_id = found.thread_id
+    AND w.checkpoint_ns = found.checkpoint_ns
+    AND w.checkpoint_id = found.checkpoint_id
+ORDER BY w.task_id, w.idx"""
+
+SELECT_COMPACT_THREADS_SQL = """
+SELECT DISTINCT thread_id FROM checkpoints
+WHERE ? IS NULL OR thread_id > ?
+ORDER BY thread_id
+LIMIT ?"""
+
+DELETE_COMPACTED_CHECKPOINT_SQL = """
+DELETE FROM checkpoints
+WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?"""
+
+# writes of deleted checkpoints, except the sends a remaining child checkpoint
+# still reads from its parent
+DELETE_COMPACTED_WRITES_SQL = f"""
+DELETE FROM writes
+WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?
+    AND NOT EXISTS (
+        SELECT 1 FROM checkpoints c
+        WHERE c.thread_id = writes.thread_id
+            AND c.checkpoint_ns = writes.checkpoint_ns
+            AND c.checkpoint_id = writes.checkpoint_id
+    )
+    AND (
+        writes.channel != '{TASKS}'
+        OR NOT EXISTS (
+            SELECT 1 FROM checkpoints c
+            WHERE c.thread_id = writes.thread_id
+                AND c.checkpoint_ns = writes.checkpoint_ns
+                AND c.parent_checkpoint_id = writes.checkpoint_id
+        )
+    )"""
 
 
 def _metadata_predicate(
@@ -92,3 +167,140 @@ def search_where(
         param_values.append(get_checkpoint_id(before))
 
     return ("WHERE " + " AND ".join(wheres) if wheres else "", param_values)
+
+
+def compaction_query(policy: RetentionPolicy) -> tuple[str, Sequence[Any]]:
+    """Return the query for checkpoints that `policy` does not keep.
+
+    The query takes the first and last thread ID of a page of threads, followed by
+    the returned values, and selects at most `batch_size` checkpoints as
+    (thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id) rows.
+    """
+    wheres = ["rank > ?"]
+    param_values: list[Any] = [max(policy.get("keep_last", 1), 1)]
+    if cutoff := get_retention_cutoff(policy):
+        wheres.append("checkpoint_id < ?")
+        param_values.append(cutoff)
+    if sources := policy.get("keep_sources"):
+        wheres.append(
+            "coalesce(json_extract(CAST(metadata AS TEXT), '$.source'), '') "
+            f"NOT IN ({', '.join('?' for _ in sources)})"
+        )
+        param_values.extend(sources)
+    param_values.append(policy.get("batch_size", 1000))
+    query = f"""
+SELECT thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id FROM (
+    SELECT thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, metadata,
+        row_number() OVER (
+            PARTITION BY thread_id, checkpoint_ns ORDER BY checkpoint_id DESC
+        ) AS rank
+    FROM checkpoints
+    WHERE thread_id >= ? AND thread_id <= ?
+)
+WHERE {" AND ".join(wheres)}
+LIMIT ?"""
+    return query, param_values
+
+
+def compacted_writes_params(
+    rows: Sequence[tuple[str, str, str, Optional[str]]],
+) -> list[tuple[str, str, str]]:
+    """Return the checkpoints whose writes may be orphaned by deleting `rows`.
+
+    Those are the deleted checkpoints, and their parents, whose sends are no longer
+    needed once their last child is gone.
+    """
+    params = {(thread_id, ns, id) for thread_id, ns, id, _ in rows}
+    params.update(
+        (thread_id, ns, parent_id)
+        for thread_id, ns, _, parent_id in rows
+        if parent_id is not None
+    )
+    return sorted(params)
+
+
+def tuples_param(configs: Sequence[RunnableConfig]) -> str:
+    """Return the configs as the JSON array that `SELECT_TUPLES_SQL` takes."""
+    return json.dumps(
+        [
+            [
+                str(config["configurable"]["thread_id"]),
+                config["configurable"].get("checkpoint_ns", ""),
+                get_checkpoint_id(config),
+            ]
+            for config in configs
+        ]
+    )
+
+
+def found_param(rows: Sequence[Sequence[Any]]) -> str:
+    """Return the checkpoints found by `SELECT_TUPLES_SQL` as the JSON array that
+    `SELECT_TUPLES_WRITES_SQL` takes."""
+    return json.dumps([[row[1], row[2], row[3]] for row in rows])
+
+
+def load_tuples(
+    configs: Sequence[RunnableConfig],
+    rows: Iterable[Sequence[Any]],
+    writes: Iterable[Sequence[Any]],
+    serde: SerializerProtocol,
+    jsonplus_serde: SerializerProtocol,
+) -> list[Optional[CheckpointTuple]]:
+    """Return the checkpoint tuples for `configs` from the rows of
+    `SELECT_TUPLES_SQL` and `SELECT_TUPLES_WRITES_SQL`."""
+    pending_writes: defaultdict[tuple[str, str, str], list[PendingWrite]] = defaultdict(
+        list
+    )
+    for (
+        thread_id,
+        checkpoint_ns,
+        checkpoint_id,
+        task_id,
+        channel,
+        type,
+        value,
+    ) in writes:
+        pending_writes[(thread_id, checkpoint_ns, checkpoint_id)].append(
+            (task_id, channel, serde.loads_typed((type, value)))
+        )
+    tuples: list[Optional[CheckpointTuple]] = [None] * len(configs)
+    for (
+        pos,
+        thread_id,
+        checkpoint_ns,
+        checkpoint_id,
+        parent_checkpoint_id,
+        type,
+        checkpoint,
+        metadata,
+    ) in rows:
+        config = configs[pos]
+        if not get_checkpoint_id(config):
+            config = {
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": checkpoint_id,
+                }
+            }
+        tuples[pos] = CheckpointTuple(
+            config,
+            serde.loads_typed((type, checkpoint)),
+            cast(
+                CheckpointMetadata,
+                jsonplus_serde.loads(metadata) if metadata is not None else {},
+            ),
+            (
+                {
+                    "configurable": {
+                        "thread_id": thread_id,
+                        "checkpoint_ns": checkpoint_ns,
+                        "checkpoint_id": parent_checkpoint_id,
+                    }
+                }
+                if parent_checkpoint_id
+                else None
+            ),
+            pending_writes[(thread_id, checkpoint_ns, checkpoint_id)],
+        )
+    return tuples
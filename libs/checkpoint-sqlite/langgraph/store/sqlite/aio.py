@@ -21,14 +21,22 @@ from langgraph.store.base import (
 )
 from langgraph.store.base.batch import AsyncBatchedBaseStore
 from langgraph.store.sqlite.base import (
+    _IVF_ASSIGN_QUERY,
+    _IVF_INSERT_CENTROID_QUERY,
+    _IVF_MIN_VECTORS_PER_LIST,
+    _IVF_SAMPLE_QUERY,
+    _IVF_SAMPLES_PER_LIST,
+    _IVF_VECTORS_QUERY,
     _PLACEHOLDER,
     BaseSqliteStore,
     SqliteIndexConfig,
+    _assign_lists,
     _decode_ns_text,
     _ensure_index_config,
     _group_ops,
     _row_to_item,
     _row_to_search_item,
+    _train_centroids,
 )
 
 logger = logging.getLogger(__name__)
@@ -494,6 +502,34 @@ class AsyncSqliteStore(AsyncBatchedBaseStore, BaseSqliteStore):
         for query, params in queries:
             await cur.execute(query, params)
 
+    async def _train_ann_index(self, cur: aiosqlite.Cursor) -> bool:
+        """Train the IVFFlat index, if there are enough vectors. Returns whether
+        the index is trained."""
+        assert self.index_config is not None
+        nlist = self.index_config["__ann"][0]
+        await cur.execute("SELECT EXISTS (SELECT 1 FROM store_vectors_centroids)")
+        if (await cur.fetchone())[0]:  # type: ignore[index]
+            # trained already, eg. by another connection
+            return True
+        await cur.execute("SELECT COUNT(*) FROM store_vectors")
+        if (await cur.fetchone())[0] < _IVF_MIN_VECTORS_PER_LIST * nlist:  # type: ignore[index]
+            return False
+        await cur.execute(_IVF_SAMPLE_QUERY, (_IVF_SAMPLES_PER_LIST * nlist,))
+        centroids = _train_centroids([row[0] for row in await cur.fetchall()], nlist)
+        await cur.executemany(_IVF_INSERT_CENTROID_QUERY, enumerate(centroids))
+        last_rowid = -1
+        while True:
+            await cur.execute(_IVF_VECTORS_QUERY, (last_rowid, 8192))
+            rows = await cur.fetchall()
+            if not rows:
+                break
+            await cur.executemany(
+                _IVF_ASSIGN_QUERY,
+                _assign_lists(centroids, cast(Sequence[tuple[int, bytes]], rows)),
+            )
+            last_rowid = rows[-1][0]
+        return True
+
     async def _batch_search_ops(
         self,
         search_ops: Sequence[tuple[int, SearchOp]],
@@ -507,6 +543,13 @@ class AsyncSqliteStore(AsyncBatchedBaseStore, BaseSqliteStore):
             results: List to store results in.
             cur: Database cursor.
         """
+        if (
+            self.index_config
+            and self.index_config.get("__ann")
+            and not self._ann_trained
+            and any(op.query for _, op in search_ops)
+        ):
+            self._ann_trained = await self._train_ann_index(cur)
         queries, embedding_requests = self._prepare_batch_search_queries(search_ops)
 
         # Setup dot_product function if it doesn't exist
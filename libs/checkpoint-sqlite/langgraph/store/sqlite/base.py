@@ -1,12 +1,13 @@
 import concurrent.futures
 import datetime
+import importlib.util
 import logging
 import sqlite3
 import threading
 from collections import defaultdict
 from collections.abc import Iterable, Iterator, Sequence
 from contextlib import contextmanager
-from typing import Any, Callable, Literal, NamedTuple, Optional, Union, cast
+from typing import Any, Callable, Literal, NamedTuple, Optional, TypedDict, Union, cast
 
 import orjson
 import sqlite_vec  # type: ignore[import-untyped]
@@ -81,14 +82,68 @@ CREATE TABLE IF NOT EXISTS store_vectors (
     PRIMARY KEY (prefix, key, field_name),
     FOREIGN KEY (prefix, key) REFERENCES store(prefix, key) ON DELETE CASCADE
 );
+""",
+    """
+-- List of each vector in the IVFFlat index, see IVFFlatConfig
+ALTER TABLE store_vectors ADD COLUMN list_id INTEGER;
+""",
+    """
+CREATE INDEX IF NOT EXISTS store_vectors_list_id_idx ON store_vectors (list_id);
+""",
+    """
+CREATE TABLE IF NOT EXISTS store_vectors_centroids (
+    list_id INTEGER PRIMARY KEY,
+    centroid BLOB NOT NULL
+);
+""",
+    """
+-- Once the index is trained, add new vectors to the list with the closest centroid
+CREATE TRIGGER IF NOT EXISTS store_vectors_assign_list
+AFTER INSERT ON store_vectors
+WHEN EXISTS (SELECT 1 FROM store_vectors_centroids)
+BEGIN
+    UPDATE store_vectors SET list_id = (
+        SELECT list_id FROM store_vectors_centroids
+        ORDER BY vec_distance_cosine(centroid, NEW.embedding)
+        LIMIT 1
+    )
+    WHERE rowid = NEW.rowid;
+END;
 """,
 ]
 
 
-class SqliteIndexConfig(IndexConfig):
+class IVFFlatConfig(TypedDict, total=False):
+    """Configuration for an approximate nearest neighbor index. IVFFlat divides
+    the vectors into lists, and searches only the lists closest to the query vector.
+
+    The lists are trained on the first search once the store has 40 vectors per
+    list, and kept in the database. New vectors are added to the list with the
+    closest centroid. Vectors are divided by cosine distance. Requires numpy.
+    """
+
+    kind: Literal["ivfflat"]
+    nlist: int
+    """Number of lists. Default is 100.
+
+    A good place to start is the number of vectors / 1000, up to 1M vectors,
+    and its square root above that.
+    """
+    nprobe: int
+    """Number of lists searched per query. Default is 10.
+
+    Higher is better for recall, lower is better for speed. A good place to
+    start is the square root of nlist. Filtered searches only return the
+    matching items in these lists.
+    """
+
+
+class SqliteIndexConfig(IndexConfig, total=False):
     """Configuration for vector embeddings in SQLite store."""
 
-    pass
+    ann_index_config: IVFFlatConfig
+    """Approximate nearest neighbor index for vector search, instead of comparing
+    the query to every vector."""
 
 
 def _namespace_to_text(
@@ -198,6 +253,8 @@ class BaseSqliteStore:
     supports_ttl = True
     index_config: Optional[SqliteIndexConfig] = None
     ttl_config: Optional[TTLConfig] = None
+    # whether store_vectors_centroids has been filled in
+    _ann_trained: bool = False
 
     def _get_batch_GET_ops_queries(
         self, get_ops: Sequence[tuple[int, GetOp]]
@@ -441,6 +498,15 @@ class BaseSqliteStore:
                     if not filter_conditions
                     else " AND " + " AND ".join(filter_conditions)
                 )
+                ann_params: list = []
+                if self._ann_trained:
+                    # only the vectors in the lists closest to the query
+                    filter_str += """ AND sv.list_id IN (
+                        SELECT list_id FROM store_vectors_centroids
+                        ORDER BY vec_distance_cosine(centroid, ?)
+                        LIMIT ?
+                    )"""
+                    ann_params = [_PLACEHOLDER, self.index_config["__ann"][1]]
                 if op.namespace_prefix:
                     prefix_filter_str = f"WHERE s.prefix LIKE ? {filter_str} "
                     ns_args: Sequence = (f"{_namespace_to_text(op.namespace_prefix)}%",)
@@ -478,6 +544,7 @@ class BaseSqliteStore:
                     _PLACEHOLDER,  # Vector placeholder
                     *ns_args,
                     *filter_params,
+                    *ann_params,
                     op.limit * 2,  # Expanded limit for better results
                     op.limit,
                     op.offset,
@@ -1313,6 +1380,13 @@ class SqliteStore(BaseSqliteStore, BaseStore):
         results: list[Result],
         cur: sqlite3.Cursor,
     ) -> None:
+        if (
+            self.index_config
+            and self.index_config.get("__ann")
+            and not self._ann_trained
+            and any(op.query for _, op in search_ops)
+        ):
+            self._ann_trained = self._train_ann_index(cur)
         queries, embedding_requests = self._prepare_batch_search_queries(search_ops)
 
         # Setup similarity functions if they don't exist
@@ -1369,6 +1443,31 @@ class SqliteStore(BaseSqliteStore, BaseStore):
 
             results[idx] = items
 
+    def _train_ann_index(self, cur: sqlite3.Cursor) -> bool:
+        """Train the IVFFlat index, if there are enough vectors. Returns whether
+        the index is trained."""
+        assert self.index_config is not None
+        nlist = self.index_config["__ann"][0]
+        cur.execute("SELECT EXISTS (SELECT 1 FROM store_vectors_centroids)")
+        if cur.fetchone()[0]:
+            # trained already, eg. by another connection
+            return True
+        cur.execute("SELECT COUNT(*) FROM store_vectors")
+        if cur.fetchone()[0] < _IVF_MIN_VECTORS_PER_LIST * nlist:
+            return False
+        cur.execute(_IVF_SAMPLE_QUERY, (_IVF_SAMPLES_PER_LIST * nlist,))
+        centroids = _train_centroids([row[0] for row in cur.fetchall()], nlist)
+        cur.executemany(_IVF_INSERT_CENTROID_QUERY, enumerate(centroids))
+        last_rowid = -1
+        while True:
+            cur.execute(_IVF_VECTORS_QUERY, (last_rowid, 8192))
+            rows = cur.fetchall()
+            if not rows:
+                break
+            cur.executemany(_IVF_ASSIGN_QUERY, _assign_lists(centroids, rows))
+            last_rowid = rows[-1][0]
+        return True
+
     def _batch_list_namespaces_ops(
         self,
         list_ops: Sequence[tuple[int, ListNamespacesOp]],
@@ -1413,10 +1512,83 @@ def _ensure_index_config(
             tot += len(toks)
     index_config["__tokenized_fields"] = tokenized
     index_config["__estimated_num_vectors"] = tot
+    if ann := index_config.get("ann_index_config"):
+        if ann.get("kind", "ivfflat") != "ivfflat":
+            raise ValueError(
+                f"Unsupported ANN index kind: {ann['kind']}, only 'ivfflat' is supported"
+            )
+        if importlib.util.find_spec("numpy") is None:
+            logger.warning(
+                "NumPy not found in the current Python environment. "
+                "The IVFFlat index needs it to be trained, searches will compare "
+                "the query to every vector. Install NumPy: pip install numpy"
+            )
+        else:
+            index_config["__ann"] = (ann.get("nlist", 100), ann.get("nprobe", 10))
     embeddings = ensure_embeddings(
         index_config.get("embed"),
     )
     return embeddings, index_config
 
 
+# the IVFFlat index is trained once there are this many vectors per list
+_IVF_MIN_VECTORS_PER_LIST = 40
+# and the centroids are trained on a sample of this many vectors per list
+_IVF_SAMPLES_PER_LIST = 64
+
+_IVF_SAMPLE_QUERY = "SELECT embedding FROM store_vectors ORDER BY RANDOM() LIMIT ?"
+_IVF_INSERT_CENTROID_QUERY = (
+    "INSERT INTO store_vectors_centroids (list_id, centroid) VALUES (?, ?)"
+)
+_IVF_VECTORS_QUERY = """
+    SELECT rowid, embedding FROM store_vectors
+    WHERE rowid > ?
+    ORDER BY rowid
+    LIMIT ?
+"""
+_IVF_ASSIGN_QUERY = "UPDATE store_vectors SET list_id = ? WHERE rowid = ?"
+
+
+def _train_centroids(
+    embeddings: Sequence[bytes], nlist: int, iterations: int = 10
+) -> list[bytes]:
+    """Centroids of nlist clusters of the embeddings, by spherical k-means."""
+    import numpy as np  # type: ignore[import-not-found]
+
+    vectors = _normalized(embeddings)
+    rng = np.random.default_rng(0)
+    centroids = vectors[rng.choice(len(vectors), min(nlist, len(vectors)), False)]
+    for _ in range(iterations):
+        labels = np.argmax(vectors @ centroids.T, axis=1)
+        order = np.argsort(labels, kind="stable")
+        clusters, starts = np.unique(labels[order], return_index=True)
+        # clusters left empty keep their centroid
+        centroids[clusters] = np.add.reduceat(vectors[order], starts)
+        norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+        np.divide(centroids, norms, out=centroids, where=norms != 0)
+    return [c.tobytes() for c in centroids]
+
+
+def _assign_lists(
+    centroids: list[bytes], rows: Sequence[tuple[int, bytes]]
+) -> list[tuple[int, int]]:
+    """(list_id, rowid) of each (rowid, embedding), by the closest centroid."""
+    import numpy as np  # type: ignore[import-not-found]
+
+    closest = np.argmax(
+        _normalized([row[1] for row in rows]) @ _normalized(centroids).T, axis=1
+    )
+    return [(list_id, row[0]) for list_id, row in zip(closest.tolist(), rows)]
+
+
+def _normalized(embeddings: Sequence[bytes]) -> Any:
+    import numpy as np  # type: ignore[import-not-found]
+
+    vectors = np.frombuffer(b"".join(embeddings), dtype=np.float32).reshape(
+        len(embeddings), -1
+    )
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms != 0)
+
+
 _PLACEHOLDER = object()
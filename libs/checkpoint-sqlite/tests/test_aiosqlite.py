@@ -1,3 +1,4 @@
+import asyncio
 from typing import Any
 
 import pytest
@@ -6,9 +7,11 @@ from langchain_core.runnables import RunnableConfig
 from langgraph.checkpoint.base import (
     Checkpoint,
     CheckpointMetadata,
+    LazyCheckpointTuple,
     create_checkpoint,
     empty_checkpoint,
 )
+from langgraph.checkpoint.serde.types import ERROR, TASKS
 from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
 
 
@@ -75,6 +78,104 @@ class TestAsyncSqliteSaver:
                 "run_id": "my_run_id",
             }
 
+    async def test_alist_metadata(self) -> None:
+        async with AsyncSqliteSaver.from_conn_string(":memory:") as saver:
+            await saver.aput(self.config_1, self.chkpnt_1, self.metadata_1, {})
+            saved = await saver.aput(self.config_2, self.chkpnt_2, self.metadata_2, {})
+            await saver.aput(self.config_3, self.chkpnt_3, self.metadata_3, {})
+            await saver.aput_writes(saved, [("foo", "bar")], "task-1")
+
+            full = [c async for c in saver.alist(None)]
+            lazy = [c async for c in saver.alist_metadata(None)]
+            assert len(lazy) == 3
+            for t, expected in zip(lazy, full):
+                assert isinstance(t, LazyCheckpointTuple)
+                assert t.config == expected.config
+                assert t.metadata == expected.metadata
+                assert t.parent_config == expected.parent_config
+                assert await t.ahydrate() == expected
+
+    async def test_aget_tuples(self) -> None:
+        async with AsyncSqliteSaver.from_conn_string(":memory:") as saver:
+            await saver.aput(self.config_1, self.chkpnt_1, self.metadata_1, {})
+            saved = await saver.aput(self.config_2, self.chkpnt_2, self.metadata_2, {})
+            await saver.aput(self.config_3, self.chkpnt_3, self.metadata_3, {})
+            await saver.aput_writes(saved, [("foo", "bar")], "task-1")
+
+            configs: list[RunnableConfig] = [
+                {"configurable": {"thread_id": "thread-2", "checkpoint_ns": "inner"}},
+                {"configurable": {"thread_id": "thread-3"}},
+                {"configurable": {"thread_id": "thread-2"}},
+            ]
+            tuples = await saver.aget_tuples(configs)
+            assert tuples == [await saver.aget_tuple(config) for config in configs]
+            assert tuples[1] is None
+            assert tuples[2] is not None
+            assert tuples[2].pending_writes == [("task-1", "foo", "bar")]
+
+    async def test_aput_writes_batch(self) -> None:
+        async with AsyncSqliteSaver.from_conn_string(":memory:") as saver:
+            config = await saver.aput(self.config_1, self.chkpnt_1, self.metadata_1, {})
+            await saver.aput_writes(config, [(ERROR, "first")], "task-2")
+            await saver.aput_writes_batch(
+                config,
+                [
+                    ([("foo", 1), ("bar", 2)], "task-1", ""),
+                    ([(ERROR, "second")], "task-2", ""),
+                    ([("foo", 3)], "task-3", "~__pregel_push, 0"),
+                ],
+            )
+
+            saved = await saver.aget_tuple(config)
+            assert saved is not None
+            assert sorted(saved.pending_writes) == [
+                ("task-1", "bar", 2),
+                ("task-1", "foo", 1),
+                ("task-2", ERROR, "second"),
+                ("task-3", "foo", 3),
+            ]
+
+    async def test_acompact(self) -> None:
+        async with AsyncSqliteSaver.from_conn_string(
+            ":memory:", retention={"keep_last": 2, "compact_interval_minutes": 0.001}
+        ) as saver:
+            config: RunnableConfig = {
+                "configurable": {"thread_id": "a", "checkpoint_ns": ""}
+            }
+            ids = []
+            for step in range(4):
+                config = await saver.aput(config, empty_checkpoint(), {}, {})
+                await saver.aput_writes(config, [("foo", step), (TASKS, step)], "task")
+                ids.append(config["configurable"]["checkpoint_id"])
+
+            assert await saver.acompact({"max_age_minutes": 60}) == 0
+            assert await saver.acompact() == 2
+            assert [
+                c.config["configurable"]["checkpoint_id"]
+                async for c in saver.alist(None)
+            ] == ids[:1:-1]
+            async with saver.conn.execute(
+                "SELECT checkpoint_id, channel FROM writes ORDER BY checkpoint_id, channel"
+            ) as cur:
+                assert await cur.fetchall() == [
+                    (ids[1], TASKS),
+                    (ids[2], TASKS),
+                    (ids[2], "foo"),
+                    (ids[3], TASKS),
+                    (ids[3], "foo"),
+                ]
+
+            # the background compactor applies the saver's policy
+            saver.retention = {"compact_interval_minutes": 0.001}
+            task = await saver.start_compactor()
+            for _ in range(100):
+                if len([c async for c in saver.alist(None)]) == 1:
+                    break
+                await asyncio.sleep(0.05)
+            assert len([c async for c in saver.alist(None)]) == 1
+            assert await saver.stop_compactor(timeout=5)
+            assert task.done()
+
     async def test_asearch(self) -> None:
         async with AsyncSqliteSaver.from_conn_string(":memory:") as saver:
             await saver.aput(self.config_1, self.chkpnt_1, self.metadata_1, {})
@@ -449,6 +449,41 @@ async def test_vector_search_edge_cases(fake_embeddings: CharacterEmbeddings) ->
         assert len(results) == 1
 
 
+async def test_vector_search_ivfflat_index(conn_string: str) -> None:
+    """The IVFFlat index is trained on the first search, and kept in the database."""
+    pytest.importorskip("numpy")
+    fake_embeddings = CharacterEmbeddings(dims=16)
+    index_config: SqliteIndexConfig = {
+        "dims": fake_embeddings.dims,
+        "embed": fake_embeddings,
+        "ann_index_config": {"kind": "ivfflat", "nlist": 2, "nprobe": 2},
+    }
+    words = [f"{a}{b}{c}" for a in "abcde" for b in "fghij" for c in "klmn"]
+    async with create_vector_store(fake_embeddings) as exact:
+        async with AsyncSqliteStore.from_conn_string(
+            conn_string, index=index_config
+        ) as store:
+            await store.setup()
+            for i, word in enumerate(words):
+                await store.aput(("docs",), word, {"text": word, "i": i})
+                await exact.aput(("docs",), word, {"text": word, "i": i})
+            expected = await exact.asearch(("docs",), query="afk", limit=20)
+            results = await store.asearch(("docs",), query="afk", limit=20)
+            assert store._ann_trained
+            assert [(r.key, round(r.score, 5)) for r in results] == [
+                (r.key, round(r.score, 5)) for r in expected
+            ]
+
+        if conn_string != ":memory:":
+            async with AsyncSqliteStore.from_conn_string(
+                conn_string, index=index_config
+            ) as store:
+                await store.setup()
+                results = await store.asearch(("docs",), query="afk", limit=20)
+                assert store._ann_trained
+                assert [r.key for r in results] == [r.key for r in expected]
+
+
 async def test_embed_with_path(
     fake_embeddings: CharacterEmbeddings,
 ) -> None:
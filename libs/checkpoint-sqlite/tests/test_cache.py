@@ -0,0 +1,109 @@
+import asyncio
+import sqlite3
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+import langgraph.cache.sqlite as sqlite_cache
+from langgraph.cache.sqlite import SqliteCache
+from langgraph.cache.sqlite.aio import AsyncSqliteCache
+
+
+def test_sqlite_cache_batched_get_set(tmp_path: Path) -> None:
+    cache: SqliteCache[int] = SqliteCache(path=str(tmp_path / "cache.db"))
+    # more keys than SQLite allows parameters in one statement
+    keys = {(("ns", "a"), str(i)): (i, None) for i in range(1200)}
+    cache.set(keys)
+
+    values = cache.get(list(keys) + [(("ns", "a"), "missing")])
+    assert values == {key: value for key, (value, _) in keys.items()}
+
+
+def test_sqlite_cache_ttl(tmp_path: Path) -> None:
+    path = str(tmp_path / "cache.db")
+    cache: SqliteCache[int] = SqliteCache(path=path)
+    cache.set({(("a",), "1"): (1, 0), (("a",), "2"): (2, 0), (("a",), "3"): (3, 60)})
+
+    # expired entries are not returned, and are purged when read
+    assert cache.get([(("a",), "1"), (("a",), "3")]) == {(("a",), "3"): 3}
+    assert cache.sweep() == 1
+    assert cache.sweep() == 0
+
+    # the expiry column is indexed
+    with sqlite3.connect(path) as conn:
+        plan = conn.execute(
+            "EXPLAIN QUERY PLAN DELETE FROM cache "
+            "WHERE expiry IS NOT NULL AND expiry <= 0"
+        ).fetchall()
+    assert any("cache_expiry_idx" in row[-1] for row in plan)
+
+
+def test_sqlite_cache_clear_namespaces(tmp_path: Path) -> None:
+    cache: SqliteCache[int] = SqliteCache(path=str(tmp_path / "cache.db"))
+    cache.set(
+        {(("a",), "1"): (1, None), (("b",), "1"): (2, None), (("c",), "1"): (3, None)}
+    )
+
+    cache.clear([("a",), ("b",)])
+    assert cache.get([(("a",), "1"), (("b",), "1"), (("c",), "1")]) == {
+        (("c",), "1"): 3
+    }
+    cache.clear()
+    assert cache.get([(("c",), "1")]) == {}
+
+
+def test_sqlite_cache_shared_between_connections(tmp_path: Path) -> None:
+    path = str(tmp_path / "cache.db")
+    writer: SqliteCache[str] = SqliteCache(path=path)
+    reader: SqliteCache[str] = SqliteCache(path=path)
+
+    writer.set({(("a",), "1"): ("value", None)})
+    assert reader.get([(("a",), "1")]) == {(("a",), "1"): "value"}
+
+
+def test_sqlite_cache_purge_keeps_refreshed_entries(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    path = str(tmp_path / "cache.db")
+    cache: SqliteCache[int] = SqliteCache(path=path)
+    other: SqliteCache[int] = SqliteCache(path=path)
+    cache.set({(("a",), "1"): (1, 0)})
+
+    split_expired = sqlite_cache._split_expired
+
+    def refresh_then_split(rows: Any, now: float) -> Any:
+        # another connection sets the key again after it was read as expired
+        other.set({(("a",), "1"): (2, 60)})
+        return split_expired(rows, now)
+
+    monkeypatch.setattr(sqlite_cache, "_split_expired", refresh_then_split)
+    assert cache.get([(("a",), "1")]) == {}
+    monkeypatch.undo()
+
+    assert cache.get([(("a",), "1")]) == {(("a",), "1"): 2}
+
+
+async def test_async_sqlite_cache(tmp_path: Path) -> None:
+    path = str(tmp_path / "cache.db")
+    async with AsyncSqliteCache.from_conn_string(path) as cache:
+        keys = {(("ns",), str(i)): (i, None) for i in range(600)}
+        await cache.aset({**keys, (("ns",), "old"): (-1, 0)})
+
+        assert await cache.aget(list(keys) + [(("ns",), "old")]) == {
+            key: value for key, (value, _) in keys.items()
+        }
+        assert await cache.asweep() == 0
+
+        # sync calls are allowed from other threads
+        assert await asyncio.to_thread(cache.get, [(("ns",), "1")]) == {
+            (("ns",), "1"): 1
+        }
+        with pytest.raises(asyncio.InvalidStateError):
+            cache.get([(("ns",), "1")])
+
+        await cache.aclear([("ns",)])
+        assert await cache.aget([(("ns",), "1")]) == {}
+
+    # the sync and async caches share the same schema
+    assert SqliteCache(path=path).get([(("ns",), "1")]) == {}
@@ -1,3 +1,4 @@
+import time
 from typing import Any, cast
 
 import pytest
@@ -6,9 +7,11 @@ from langchain_core.runnables import RunnableConfig
 from langgraph.checkpoint.base import (
     Checkpoint,
     CheckpointMetadata,
+    LazyCheckpointTuple,
     create_checkpoint,
     empty_checkpoint,
 )
+from langgraph.checkpoint.serde.types import TASKS
 from langgraph.checkpoint.sqlite import SqliteSaver
 from langgraph.checkpoint.sqlite.utils import _metadata_predicate, search_where
 
@@ -126,6 +129,132 @@ class TestSqliteSaver:
 
             # TODO: test before and limit params
 
+    def test_list_metadata(self) -> None:
+        with SqliteSaver.from_conn_string(":memory:") as saver:
+            saver.put(self.config_1, self.chkpnt_1, self.metadata_1, {})
+            saved = saver.put(self.config_2, self.chkpnt_2, self.metadata_2, {})
+            saver.put(self.config_3, self.chkpnt_3, self.metadata_3, {})
+            saver.put_writes(saved, [("foo", "bar")], "task-1")
+
+            for filter in ({"source": "input"}, {"step": 1}, {}):
+                full = list(saver.list(None, filter=filter))
+                lazy = list(saver.list_metadata(None, filter=filter))
+                assert all(isinstance(t, LazyCheckpointTuple) for t in lazy)
+                assert [(t.config, t.metadata, t.parent_config) for t in lazy] == [
+                    (t.config, t.metadata, t.parent_config) for t in full
+                ]
+                # checkpoints and writes are loaded on first access
+                assert [tuple(t) for t in lazy] == [tuple(t) for t in full]
+
+            lazy = list(saver.list_metadata(saved, limit=1))
+            assert lazy[0].pending_writes == [("task-1", "foo", "bar")]
+
+    def test_get_tuples(self) -> None:
+        with SqliteSaver.from_conn_string(":memory:") as saver:
+            saver.put(self.config_1, self.chkpnt_1, self.metadata_1, {})
+            saved = saver.put(self.config_2, self.chkpnt_2, self.metadata_2, {})
+            saver.put(self.config_3, self.chkpnt_3, self.metadata_3, {})
+            saver.put_writes(saved, [("foo", "bar"), ("baz", 1)], "task-1")
+
+            configs: list[RunnableConfig] = [
+                {"configurable": {"thread_id": "thread-2"}},
+                {"configurable": {"thread_id": "thread-2", "checkpoint_ns": "inner"}},
+                saved,
+                {"configurable": {"thread_id": "thread-3"}},
+                {"configurable": {"thread_id": "thread-1", "checkpoint_id": "x"}},
+                {"configurable": {"thread_id": "thread-2"}},
+            ]
+            tuples = saver.get_tuples(configs)
+            assert tuples == [saver.get_tuple(config) for config in configs]
+            assert tuples[0] is not None
+            assert tuples[0].pending_writes == [
+                ("task-1", "foo", "bar"),
+                ("task-1", "baz", 1),
+            ]
+            assert tuples[3] is None and tuples[4] is None
+            assert saver.get_tuples([]) == []
+
+    def test_compact(self) -> None:
+        with SqliteSaver.from_conn_string(":memory:") as saver:
+            ids: dict[str, list[str]] = {"a": [], "b": []}
+            for thread_id, sources in (
+                ("a", ["input"] + ["loop"] * 4),
+                ("b", ["input"]),
+            ):
+                config: RunnableConfig = {
+                    "configurable": {"thread_id": thread_id, "checkpoint_ns": ""}
+                }
+                for step, source in enumerate(sources):
+                    config = saver.put(
+                        config, empty_checkpoint(), {"source": source, "step": step}, {}
+                    )
+                    saver.put_writes(config, [("foo", step), (TASKS, step)], "task")
+                    ids[thread_id].append(config["configurable"]["checkpoint_id"])
+
+            def remaining() -> tuple[list[str], list[tuple[str, str]]]:
+                checkpoints = [
+                    c.config["configurable"]["checkpoint_id"]
+                    for c in saver.list({"configurable": {"thread_id": "a"}})
+                ]
+                writes = saver.conn.execute(
+                    "SELECT checkpoint_id, channel FROM writes WHERE thread_id = 'a' "
+                    "ORDER BY checkpoint_id, channel"
+                ).fetchall()
+                return checkpoints[::-1], writes
+
+            # nothing is old enough to delete
+            assert saver.compact({"max_age_minutes": 60}) == 0
+
+            # the input checkpoint is kept, the latest two are kept, and the sends
+            # of the deleted parent of the oldest kept checkpoint are kept
+            assert (
+                saver.compact(
+                    {"keep_last": 2, "keep_sources": ["input"], "batch_size": 1}
+                )
+                == 2
+            )
+            a = ids["a"]
+            assert remaining() == (
+                [a[0], a[3], a[4]],
+                [
+                    (a[0], TASKS),
+                    (a[0], "foo"),
+                    (a[2], TASKS),
+                    (a[3], TASKS),
+                    (a[3], "foo"),
+                    (a[4], TASKS),
+                    (a[4], "foo"),
+                ],
+            )
+
+            # the latest checkpoint of each thread is always kept
+            saver.retention = {}
+            assert saver.compact() == 2
+            assert remaining() == (
+                [a[4]],
+                [(a[3], TASKS), (a[4], TASKS), (a[4], "foo")],
+            )
+            assert len(list(saver.list({"configurable": {"thread_id": "b"}}))) == 1
+
+    def test_compactor(self) -> None:
+        with SqliteSaver.from_conn_string(
+            ":memory:", retention={"compact_interval_minutes": 0.001}
+        ) as saver:
+            config: RunnableConfig = {
+                "configurable": {"thread_id": "a", "checkpoint_ns": ""}
+            }
+            for _ in range(3):
+                config = saver.put(config, empty_checkpoint(), {}, {})
+
+            future = saver.start_compactor()
+            for _ in range(100):
+                if len(list(saver.list(None))) == 1:
+                    break
+                time.sleep(0.05)
+            assert len(list(saver.list(None))) == 1
+            assert saver.stop_compactor(timeout=5)
+            assert future.result(timeout=5) is None
+
     def test_search_where(self) -> None:
         # call method / assertions
         expected_predicate_1 = "WHERE json_extract(CAST(metadata AS TEXT), '$.source') = ? AND json_extract(CAST(metadata AS TEXT), '$.step') = ? AND json_extract(CAST(metadata AS TEXT), '$.writes') = ? AND json_extract(CAST(metadata AS TEXT), '$.score') = ? AND checkpoint_id < ?"
@@ -817,6 +817,52 @@ def test_scores(
         assert results[0].score == pytest.approx(similarities[0], abs=1e-3)
 
 
+def test_vector_search_ivfflat_index() -> None:
+    """Searches probing every list of the IVFFlat index match exact searches."""
+    pytest.importorskip("numpy")
+    fake_embeddings = CharacterEmbeddings(dims=16)
+    index_config: SqliteIndexConfig = {
+        "dims": fake_embeddings.dims,
+        "embed": fake_embeddings,
+        "ann_index_config": {"kind": "ivfflat", "nlist": 2, "nprobe": 2},
+    }
+    words = [f"{a}{b}{c}" for a in "abcde" for b in "fghij" for c in "klmn"]
+    exact_store = create_vector_store(fake_embeddings)
+    with SqliteStore.from_conn_string(":memory:", index=index_config) as store:
+        with exact_store as exact:
+            store.setup()
+            for i, word in enumerate(words[:80]):
+                for s in (store, exact):
+                    s.put(("docs", str(i % 2)), word, {"text": word, "i": i})
+
+            def results(s: SqliteStore, **kwargs: Any) -> list:
+                return [
+                    (r.key, round(r.score, 5)) for r in s.search(("docs",), **kwargs)
+                ]
+
+            for query in ["afk", "jjj", "deep", "mink"]:
+                assert results(store, query=query) == results(exact, query=query)
+            assert store._ann_trained
+            with store._cursor() as cur:
+                cur.execute("SELECT COUNT(*) FROM store_vectors_centroids")
+                assert cur.fetchone()[0] == 2
+
+            # new vectors are added to the closest list
+            for i, word in enumerate(words[80:], 80):
+                for s in (store, exact):
+                    s.put(("docs", "new"), word, {"text": word, "i": i})
+            with store._cursor() as cur:
+                cur.execute("SELECT COUNT(*) FROM store_vectors WHERE list_id IS NULL")
+                assert cur.fetchone()[0] == 0
+            for query in ["afk", "elm"]:
+                kwargs = {"query": query, "filter": {"i": {"$gte": 70}}, "limit": 5}
+                assert results(store, **kwargs) == results(exact, **kwargs)
+
+            # probing fewer lists returns fewer of the matching items
+            store.index_config["__ann"] = (2, 1)
+            assert 0 < len(store.search(("docs",), query="afk", limit=100)) < 100
+
+
 def test_nonnull_migrations() -> None:
     """Test that all migration statements are non-null."""
     _leading_comment_remover = re.compile(r"^/\*.*?\*/")
@@ -1,35 +1,247 @@
 from __future__ import annotations
 
-import datetime
+import itertools
 import threading
-from collections.abc import Mapping, Sequence
+import time
+import weakref
+from collections import OrderedDict
+from collections.abc import Iterator, Mapping, Sequence
+from dataclasses import dataclass
+from typing import Literal
 
 from langgraph.cache.base import BaseCache, FullKey, Namespace, ValueT
 from langgraph.checkpoint.serde.base import SerializerProtocol
 
+EvictionPolicy = Literal["lru", "lfu"]
+
+
+@dataclass
+class CacheStats:
+    """Counters for one namespace of an `InMemoryCache`."""
+
+    hits: int = 0
+    """Number of lookups that found a live entry."""
+    misses: int = 0
+    """Number of lookups that found no entry, or an expired one."""
+    evictions: int = 0
+    """Number of entries dropped to stay within the size limits."""
+    expirations: int = 0
+    """Number of entries dropped because their TTL elapsed."""
+    entries: int = 0
+    """Number of entries currently stored."""
+    bytes: int = 0
+    """Size of the serialized values currently stored."""
+
+
+class _Entry:
+    __slots__ = ("enc", "data", "expiry", "hits", "tick")
+
+    def __init__(self, enc: str, data: bytes, expiry: float | None, tick: int) -> None:
+        self.enc = enc
+        self.data = data
+        self.expiry = expiry
+        self.hits = 0
+        self.tick = tick
+
+
+class _LRUOrder:
+    """Orders the keys of a namespace from least to most recently used."""
+
+    def __init__(self) -> None:
+        self._keys: OrderedDict[str, None] = OrderedDict()
+
+    def add(self, key: str, entry: _Entry) -> None:
+        self._keys[key] = None
+
+    def touch(self, key: str, entry: _Entry) -> None:
+        self._keys.move_to_end(key)
+
+    def remove(self, key: str, entry: _Entry) -> None:
+        del self._keys[key]
+
+    def victim(self) -> str | None:
+        return next(iter(self._keys), None)
+
+
+class _LFUOrder:
+    """Orders the keys of a namespace by hit count, then from least to most
+    recently used among keys with the same hit count."""
+
+    def __init__(self) -> None:
+        self._buckets: dict[int, OrderedDict[str, None]] = {}
+        self._min_hits = 0
+
+    def add(self, key: str, entry: _Entry) -> None:
+        self._buckets.setdefault(entry.hits, OrderedDict())[key] = None
+        if len(self._buckets) == 1 or entry.hits < self._min_hits:
+            self._min_hits = entry.hits
+
+    def touch(self, key: str, entry: _Entry) -> None:
+        # entry.hits was already incremented by the caller
+        self._discard(key, entry.hits - 1)
+        self.add(key, entry)
+
+    def remove(self, key: str, entry: _Entry) -> None:
+        self._discard(key, entry.hits)
+
+    def _discard(self, key: str, hits: int) -> None:
+        bucket = self._buckets[hits]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[hits]
+            if hits == self._min_hits and self._buckets:
+                self._min_hits = min(self._buckets)
+
+    def victim(self) -> str | None:
+        if bucket := self._buckets.get(self._min_hits):
+            return next(iter(bucket))
+        return None
+
+
+class _NamespaceStore:
+    """The entries of one namespace, in eviction order, with their stats."""
+
+    def __init__(self, eviction: EvictionPolicy) -> None:
+        self.entries: dict[str, _Entry] = {}
+        self.order = _LFUOrder() if eviction == "lfu" else _LRUOrder()
+        self.stats = CacheStats()
+
+    def put(self, key: str, entry: _Entry) -> _Entry | None:
+        previous = self.pop(key)
+        self.entries[key] = entry
+        self.order.add(key, entry)
+        self.stats.entries += 1
+        self.stats.bytes += len(entry.data)
+        return previous
+
+    def pop(self, key: str) -> _Entry | None:
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.order.remove(key, entry)
+            self.stats.entries -= 1
+            self.stats.bytes -= len(entry.data)
+        return entry
+
+    def touch(self, key: str, entry: _Entry, tick: int) -> None:
+        entry.hits += 1
+        entry.tick = tick
+        self.order.touch(key, entry)
+
+    def victim(self) -> tuple[tuple[int, int], str] | None:
+        """The next key to evict, and its rank against other namespaces' victims."""
+        key = self.order.victim()
+        if key is None:
+            return None
+        entry = self.entries[key]
+        return (entry.hits if isinstance(self.order, _LFUOrder) else 0, entry.tick), key
+
+
+class _Shard:
+    __slots__ = ("lock", "namespaces")
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.namespaces: dict[Namespace, _NamespaceStore] = {}
+
 
 class InMemoryCache(BaseCache[ValueT]):
-    def __init__(self, *, serde: SerializerProtocol | None = None):
+    """An in-memory cache, optionally bounded in size.
+
+    Entries are grouped by namespace. Each namespace is kept in one of several
+    shards, each with its own lock, so that threads using different namespaces
+    don't wait on each other. Values are serialized and deserialized outside
+    the locks.
+
+    Args:
+        serde: The serializer to use for the cached values.
+        max_entries: Maximum number of entries across all namespaces.
+        max_bytes: Maximum size of the serialized values across all namespaces.
+        max_entries_per_namespace: Maximum number of entries in each namespace.
+        max_bytes_per_namespace: Maximum size of the serialized values in each
+            namespace.
+        eviction: Which entries to evict when a limit is reached: the least
+            recently used ("lru"), or the least frequently used ("lfu"), with ties
+            broken by least recent use.
+        sweep_interval: If set, expired entries are removed every `sweep_interval`
+            seconds by a background thread. Otherwise they are only removed when
+            read, or by calling `sweep()`.
+        shards: Number of lock shards to spread the namespaces over.
+
+    All limits default to None, for no limit. A value larger than a limit on its
+    own is not cached. The global limits are enforced without holding every shard
+    lock, so concurrent writers may briefly exceed them by one entry each.
+    """
+
+    def __init__(
+        self,
+        *,
+        serde: SerializerProtocol | None = None,
+        max_entries: int | None = None,
+        max_bytes: int | None = None,
+        max_entries_per_namespace: int | None = None,
+        max_bytes_per_namespace: int | None = None,
+        eviction: EvictionPolicy = "lru",
+        sweep_interval: float | None = None,
+        shards: int = 16,
+    ):
         super().__init__(serde=serde)
-        self._cache: dict[Namespace, dict[str, tuple[str, bytes, float | None]]] = {}
-        self._lock = threading.RLock()
+        if eviction not in ("lru", "lfu"):
+            raise ValueError(f"Unknown eviction policy: {eviction}")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_entries_per_namespace = max_entries_per_namespace
+        self.max_bytes_per_namespace = max_bytes_per_namespace
+        self.eviction = eviction
+        self._shards = tuple(_Shard() for _ in range(max(1, shards)))
+        self._ticks = itertools.count()
+        self._totals_lock = threading.Lock()
+        self._total_entries = 0
+        self._total_bytes = 0
+        self._sweeper: _Sweeper | None = None
+        if sweep_interval is not None:
+            self._sweeper = _Sweeper(self, sweep_interval)
+            self._sweeper.start()
+
+    def _shard(self, ns: Namespace) -> _Shard:
+        return self._shards[hash(ns) % len(self._shards)]
+
+    def _add_totals(self, entries: int, size: int) -> None:
+        with self._totals_lock:
+            self._total_entries += entries
+            self._total_bytes += size
 
     def get(self, keys: Sequence[FullKey]) -> dict[FullKey, ValueT]:
         """Get the cached values for the given keys."""
-        with self._lock:
-            if not keys:
-                return {}
-            now = datetime.datetime.now(datetime.timezone.utc).timestamp()
-            values: dict[FullKey, ValueT] = {}
-            for ns_tuple, key in keys:
-                ns = Namespace(ns_tuple)
-                if ns in self._cache and key in self._cache[ns]:
-                    enc, val, expiry = self._cache[ns][key]
-                    if expiry is None or now < expiry:
-                        values[(ns, key)] = self.serde.loads_typed((enc, val))
-                    else:
-                        del self._cache[ns][key]
-            return values
+        if not keys:
+            return {}
+        now = time.time()
+        found: list[tuple[FullKey, str, bytes]] = []
+        for ns_tuple, key in keys:
+            ns = Namespace(ns_tuple)
+            shard = self._shard(ns)
+            expired = None
+            with shard.lock:
+                store = shard.namespaces.get(ns)
+                if store is None:
+                    # nothing was ever set in this namespace, don't track it
+                    continue
+                entry = store.entries.get(key)
+                if entry is None:
+                    store.stats.misses += 1
+                elif entry.expiry is not None and now >= entry.expiry:
+                    expired = store.pop(key)
+                    store.stats.misses += 1
+                    store.stats.expirations += 1
+                else:
+                    store.stats.hits += 1
+                    store.touch(key, entry, next(self._ticks))
+                    found.append(((ns, key), entry.enc, entry.data))
+            if expired is not None:
+                self._add_totals(-1, -len(expired.data))
+        return {
+            full_key: self.serde.loads_typed((enc, data))
+            for full_key, enc, data in found
+        }
 
     async def aget(self, keys: Sequence[FullKey]) -> dict[FullKey, ValueT]:
         """Asynchronously get the cached values for the given keys."""
@@ -37,37 +249,213 @@ class InMemoryCache(BaseCache[ValueT]):
 
     def set(self, keys: Mapping[FullKey, tuple[ValueT, int | None]]) -> None:
         """Set the cached values for the given keys."""
-        with self._lock:
-            now = datetime.datetime.now(datetime.timezone.utc)
-            for (ns, key), (value, ttl) in keys.items():
-                if ttl is not None:
-                    delta = datetime.timedelta(seconds=ttl)
-                    expiry: float | None = (now + delta).timestamp()
-                else:
-                    expiry = None
-                if ns not in self._cache:
-                    self._cache[ns] = {}
-                self._cache[ns][key] = (
-                    *self.serde.dumps_typed(value),
-                    expiry,
-                )
+        now = time.time()
+        for (ns_tuple, key), (value, ttl) in keys.items():
+            ns = Namespace(ns_tuple)
+            enc, data = self.serde.dumps_typed(value)
+            size = len(data)
+            shard = self._shard(ns)
+            # drop the previous value first, so it doesn't count against the limits
+            with shard.lock:
+                store = shard.namespaces.get(ns)
+                previous = store.pop(key) if store is not None else None
+            if previous is not None:
+                self._add_totals(-1, -len(previous.data))
+            if (self.max_bytes is not None and size > self.max_bytes) or (
+                self.max_bytes_per_namespace is not None
+                and size > self.max_bytes_per_namespace
+            ):
+                # too large to ever fit
+                continue
+            # make room for the new entry before adding it, so that it isn't
+            # evicted right away when using the LFU policy
+            self._evict_global(1, size)
+            entry = _Entry(
+                enc, data, now + ttl if ttl is not None else None, next(self._ticks)
+            )
+            entries_delta, bytes_delta = 1, size
+            with shard.lock:
+                store = shard.namespaces.get(ns)
+                if store is None:
+                    shard.namespaces[ns] = store = _NamespaceStore(self.eviction)
+                while (
+                    self.max_entries_per_namespace is not None
+                    and store.stats.entries + 1 > self.max_entries_per_namespace
+                ) or (
+                    self.max_bytes_per_namespace is not None
+                    and store.stats.bytes + size > self.max_bytes_per_namespace
+                ):
+                    victim = store.victim()
+                    if victim is None:
+                        break
+                    evicted = store.pop(victim[1])
+                    if evicted is not None:
+                        store.stats.evictions += 1
+                        entries_delta -= 1
+                        bytes_delta -= len(evicted.data)
+                if previous := store.put(key, entry):
+                    # set concurrently by another thread
+                    entries_delta -= 1
+                    bytes_delta -= len(previous.data)
+            self._add_totals(entries_delta, bytes_delta)
 
     async def aset(self, keys: Mapping[FullKey, tuple[ValueT, int | None]]) -> None:
         """Asynchronously set the cached values for the given keys."""
         self.set(keys)
 
+    def _over_global_limits(self, entries: int, size: int) -> bool:
+        with self._totals_lock:
+            return (
+                self.max_entries is not None
+                and self._total_entries + entries > self.max_entries
+            ) or (
+                self.max_bytes is not None and self._total_bytes + size > self.max_bytes
+            )
+
+    def _evict_global(self, entries: int, size: int) -> None:
+        """Evict entries across all namespaces until another `entries` entries
+        totalling `size` bytes fit within the global limits."""
+        if self.max_entries is None and self.max_bytes is None:
+            return
+        while self._over_global_limits(entries, size):
+            # find the namespace holding the best eviction candidate,
+            # holding one shard lock at a time
+            best: tuple[tuple[int, int], _Shard, Namespace, str] | None = None
+            for shard in self._shards:
+                with shard.lock:
+                    for ns, store in shard.namespaces.items():
+                        candidate = store.victim()
+                        if candidate is not None and (
+                            best is None or candidate[0] < best[0]
+                        ):
+                            best = (candidate[0], shard, ns, candidate[1])
+            if best is None:
+                return
+            _, shard, ns, key = best
+            with shard.lock:
+                store = shard.namespaces.get(ns)
+                evicted = store.pop(key) if store is not None else None
+                if evicted is not None and store is not None:
+                    store.stats.evictions += 1
+            if evicted is not None:
+                self._add_totals(-1, -len(evicted.data))
+
+    def sweep(self) -> int:
+        """Remove all expired entries. Returns the number of entries removed."""
+        now = time.time()
+        removed = 0
+        removed_bytes = 0
+        for shard in self._shards:
+            with shard.lock:
+                for store in shard.namespaces.values():
+                    expired = [
+                        key
+                        for key, entry in store.entries.items()
+                        if entry.expiry is not None and now >= entry.expiry
+                    ]
+                    for key in expired:
+                        entry = store.pop(key)
+                        if entry is not None:
+                            store.stats.expirations += 1
+                            removed += 1
+                            removed_bytes += len(entry.data)
+        if removed:
+            self._add_totals(-removed, -removed_bytes)
+        return removed
+
+    def stats(
+        self, namespaces: Sequence[Namespace] | None = None
+    ) -> dict[Namespace, CacheStats]:
+        """Get a copy of the stats of the given namespaces, or of all namespaces."""
+        result: dict[Namespace, CacheStats] = {}
+        for ns, store, shard in self._stores(namespaces):
+            with shard.lock:
+                result[ns] = CacheStats(**vars(store.stats))
+        return result
+
+    def _stores(
+        self, namespaces: Sequence[Namespace] | None
+    ) -> Iterator[tuple[Namespace, _NamespaceStore, _Shard]]:
+        if namespaces is None:
+            for shard in self._shards:
+                with shard.lock:
+                    items = list(shard.namespaces.items())
+                for ns, store in items:
+                    yield ns, store, shard
+        else:
+            for ns_tuple in namespaces:
+                ns = Namespace(ns_tuple)
+                shard = self._shard(ns)
+                with shard.lock:
+                    store = shard.namespaces.get(ns)
+                if store is not None:
+                    yield ns, store, shard
+
+    @property
+    def total_entries(self) -> int:
+        """Number of entries across all namespaces."""
+        with self._totals_lock:
+            return self._total_entries
+
+    @property
+    def total_bytes(self) -> int:
+        """Size of the serialized values across all namespaces."""
+        with self._totals_lock:
+            return self._total_bytes
+
     def clear(self, namespaces: Sequence[Namespace] | None = None) -> None:
         """Delete the cached values for the given namespaces.
         If no namespaces are provided, clear all cached values."""
-        with self._lock:
-            if namespaces is None:
-                self._cache.clear()
-            else:
-                for ns in namespaces:
-                    if ns in self._cache:
-                        del self._cache[ns]
+        removed = 0
+        removed_bytes = 0
+        if namespaces is None:
+            for shard in self._shards:
+                with shard.lock:
+                    for store in shard.namespaces.values():
+                        removed += store.stats.entries
+                        removed_bytes += store.stats.bytes
+                    shard.namespaces.clear()
+        else:
+            for ns_tuple in namespaces:
+                ns = Namespace(ns_tuple)
+                shard = self._shard(ns)
+                with shard.lock:
+                    store = shard.namespaces.pop(ns, None)
+                if store is not None:
+                    removed += store.stats.entries
+                    removed_bytes += store.stats.bytes
+        if removed:
+            self._add_totals(-removed, -removed_bytes)
 
     async def aclear(self, namespaces: Sequence[Namespace] | None = None) -> None:
         """Asynchronously delete the cached values for the given namespaces.
         If no namespaces are provided, clear all cached values."""
         self.clear(namespaces)
+
+    def close(self) -> None:
+        """Stop the background expiry sweeper, if running."""
+        if self._sweeper is not None:
+            self._sweeper.stop()
+            self._sweeper = None
+
+
+class _Sweeper(threading.Thread):
+    """Daemon thread calling `InMemoryCache.sweep()` periodically. It only holds a
+    weak reference to the cache, and exits once the cache is garbage collected."""
+
+    def __init__(self, cache: InMemoryCache, interval: float) -> None:
+        super().__init__(name="InMemoryCacheSweeper", daemon=True)
+        self.cache = weakref.ref(cache)
+        self.interval = interval
+        self.stopped = threading.Event()
+
+    def run(self) -> None:
+        while not self.stopped.wait(self.interval):
+            cache = self.cache()
+            if cache is None:
+                return
+            cache.sweep()
+            del cache
+
+    def stop(self) -> None:
+        self.stopped.set()
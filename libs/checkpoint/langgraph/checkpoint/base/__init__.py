@@ -1,4 +1,7 @@
+import asyncio
+import time
 from collections.abc import AsyncIterator, Iterator, Mapping, Sequence
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from typing import (  # noqa: UP035
     Any,
@@ -16,7 +19,7 @@ from typing import (  # noqa: UP035
 
 from langchain_core.runnables import ConfigurableFieldSpec, RunnableConfig
 
-from langgraph.checkpoint.base.id import uuid6
+from langgraph.checkpoint.base.id import min_uuid6, uuid6
 from langgraph.checkpoint.serde.base import SerializerProtocol, maybe_add_typed_methods
 from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
 from langgraph.checkpoint.serde.types import (
@@ -168,6 +171,66 @@ class CheckpointTuple(NamedTuple):
     pending_writes: Optional[List[PendingWrite]] = None
 
 
+class LazyCheckpointTuple(CheckpointTuple):
+    """A checkpoint tuple listed with only its config, metadata and parent config.
+
+    The checkpoint and pending writes are fetched from the checkpointer the first
+    time they are accessed. Accessing them is a synchronous call to the
+    checkpointer, so in async code use `await tup.ahydrate()` instead.
+    """
+
+    def __new__(
+        cls,
+        config: RunnableConfig,
+        metadata: CheckpointMetadata,
+        parent_config: Optional[RunnableConfig],
+        saver: "BaseCheckpointSaver",
+    ) -> "LazyCheckpointTuple":
+        self = super().__new__(cls, config, None, metadata, parent_config, None)  # type: ignore[arg-type]
+        self._saver = saver
+        self._hydrated: Optional[CheckpointTuple] = None
+        return self
+
+    def hydrate(self) -> CheckpointTuple:
+        """Fetch the full checkpoint tuple, once."""
+        if self._hydrated is None:
+            self._hydrated = _hydrated(self, self._saver.get_tuple(self.config))
+        return self._hydrated
+
+    async def ahydrate(self) -> CheckpointTuple:
+        """Asynchronously fetch the full checkpoint tuple, once."""
+        if self._hydrated is None:
+            self._hydrated = _hydrated(self, await self._saver.aget_tuple(self.config))
+        return self._hydrated
+
+    @property  # type: ignore[override]
+    def checkpoint(self) -> Checkpoint:
+        return self.hydrate().checkpoint
+
+    @property  # type: ignore[override]
+    def pending_writes(self) -> Optional[List[PendingWrite]]:
+        return self.hydrate().pending_writes
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self.hydrate())
+
+    def __getitem__(self, index: Any) -> Any:
+        return self.hydrate()[index]
+
+    def _replace(self, **kwargs: Any) -> CheckpointTuple:
+        return self.hydrate()._replace(**kwargs)
+
+
+def _hydrated(
+    lazy: LazyCheckpointTuple, tup: Optional[CheckpointTuple]
+) -> CheckpointTuple:
+    if tup is None:
+        raise ValueError(
+            f"Checkpoint {lazy.config['configurable'].get('checkpoint_id')} not found"
+        )
+    return tup
+
+
 CheckpointThreadId = ConfigurableFieldSpec(
     id="thread_id",
     annotation=str,
@@ -196,6 +259,27 @@ CheckpointId = ConfigurableFieldSpec(
 )
 
 
+class RetentionPolicy(TypedDict, total=False):
+    """Which checkpoints a checkpoint saver keeps when it is compacted.
+
+    A checkpoint is kept if any of the rules keeps it, and the latest checkpoint of
+    each thread and namespace is always kept, so an empty policy keeps only that one.
+    Compacting also deletes the writes and channel values that only the deleted
+    checkpoints refer to.
+    """
+
+    keep_last: int
+    """Keep the latest N checkpoints of each thread and namespace."""
+    max_age_minutes: float
+    """Keep checkpoints created less than this many minutes ago."""
+    keep_sources: Sequence[str]
+    """Keep checkpoints whose `metadata.source` is one of these, e.g. `["input"]`."""
+    compact_interval_minutes: float
+    """Minutes between runs of the background compactor. Defaults to 60."""
+    batch_size: int
+    """Most checkpoints deleted in one transaction. Defaults to 1000."""
+
+
 class BaseCheckpointSaver(Generic[V]):
     """Base class for creating a graph checkpointer.
 
@@ -254,6 +338,28 @@ class BaseCheckpointSaver(Generic[V]):
         """
         raise NotImplementedError
 
+    def get_tuples(
+        self, configs: Sequence[RunnableConfig]
+    ) -> List[Optional[CheckpointTuple]]:
+        """Fetch the checkpoint tuples for many configurations at once.
+
+        Each configuration is resolved as in `get_tuple`, e.g. to the latest
+        checkpoint of its thread. The default implementation calls `get_tuple`
+        concurrently in a thread pool; savers backed by a database should override
+        it to fetch all tuples in a single query.
+
+        Args:
+            configs: Configurations specifying which checkpoints to retrieve.
+
+        Returns:
+            list[Optional[CheckpointTuple]]: The requested checkpoint tuples, in the
+                order of `configs`, with None for checkpoints that were not found.
+        """
+        if len(configs) <= 1:
+            return [self.get_tuple(config) for config in configs]
+        with ThreadPoolExecutor() as executor:
+            return list(executor.map(self.get_tuple, configs))
+
     def list(
         self,
         config: Optional[RunnableConfig],
@@ -278,6 +384,33 @@ class BaseCheckpointSaver(Generic[V]):
         """
         raise NotImplementedError
 
+    def list_metadata(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        """List checkpoints that match the given criteria, without loading them.
+
+        Like `list`, but checkpoint savers that implement it only fetch the config,
+        metadata and parent config of each checkpoint, and return
+        `LazyCheckpointTuple`s that fetch the rest on first access. Use it to list
+        long histories when most checkpoints are never looked at. The default
+        implementation falls back to `list`.
+
+        Args:
+            config: Base configuration for filtering checkpoints.
+            filter: Additional filtering criteria.
+            before: List checkpoints created before this configuration.
+            limit: Maximum number of checkpoints to return.
+
+        Returns:
+            Iterator[CheckpointTuple]: Iterator of matching checkpoint tuples.
+        """
+        return self.list(config, filter=filter, before=before, limit=limit)
+
     def put(
         self,
         config: RunnableConfig,
@@ -321,6 +454,24 @@ class BaseCheckpointSaver(Generic[V]):
         """
         raise NotImplementedError
 
+    def put_writes_batch(
+        self,
+        config: RunnableConfig,
+        batch: Sequence[Tuple[Sequence[Tuple[str, Any]], str, str]],
+    ) -> None:
+        """Store intermediate writes of many tasks linked to the same checkpoint.
+
+        The default implementation calls `put_writes` for each task in order;
+        savers backed by a database should override it to store all writes in a
+        single round trip.
+
+        Args:
+            config: Configuration of the related checkpoint.
+            batch: Writes to store, each as a (writes, task_id, task_path) tuple.
+        """
+        for writes, task_id, task_path in batch:
+            self.put_writes(config, writes, task_id, task_path)
+
     def delete_thread(
         self,
         thread_id: str,
@@ -358,6 +509,23 @@ class BaseCheckpointSaver(Generic[V]):
         """
         raise NotImplementedError
 
+    async def aget_tuples(
+        self, configs: Sequence[RunnableConfig]
+    ) -> List[Optional[CheckpointTuple]]:
+        """Asynchronously fetch the checkpoint tuples for many configurations at once.
+
+        See `get_tuples`. The default implementation awaits `aget_tuple` for all
+        configurations concurrently.
+
+        Args:
+            configs: Configurations specifying which checkpoints to retrieve.
+
+        Returns:
+            list[Optional[CheckpointTuple]]: The requested checkpoint tuples, in the
+                order of `configs`, with None for checkpoints that were not found.
+        """
+        return list(await asyncio.gather(*(self.aget_tuple(c) for c in configs)))
+
     async def alist(
         self,
         config: Optional[RunnableConfig],
@@ -383,6 +551,31 @@ class BaseCheckpointSaver(Generic[V]):
         raise NotImplementedError
         yield
 
+    async def alist_metadata(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        """Asynchronously list checkpoints that match the given criteria, without
+        loading them.
+
+        See `list_metadata`. The default implementation falls back to `alist`.
+
+        Args:
+            config: Base configuration for filtering checkpoints.
+            filter: Additional filtering criteria for metadata.
+            before: List checkpoints created before this configuration.
+            limit: Maximum number of checkpoints to return.
+
+        Returns:
+            AsyncIterator[CheckpointTuple]: Async iterator of matching checkpoint tuples.
+        """
+        async for tup in self.alist(config, filter=filter, before=before, limit=limit):
+            yield tup
+
     async def aput(
         self,
         config: RunnableConfig,
@@ -426,6 +619,28 @@ class BaseCheckpointSaver(Generic[V]):
         """
         raise NotImplementedError
 
+    async def aput_writes_batch(
+        self,
+        config: RunnableConfig,
+        batch: Sequence[Tuple[Sequence[Tuple[str, Any]], str, str]],
+    ) -> None:
+        """Asynchronously store intermediate writes of many tasks linked to the same checkpoint.
+
+        See `put_writes_batch`. The default implementation calls `aput_writes`
+        for all tasks concurrently; savers backed by a database should override it
+        to store all writes in a single round trip.
+
+        Args:
+            config: Configuration of the related checkpoint.
+            batch: Writes to store, each as a (writes, task_id, task_path) tuple.
+        """
+        await asyncio.gather(
+            *(
+                self.aput_writes(config, writes, task_id, task_path)
+                for writes, task_id, task_path in batch
+            )
+        )
+
     async def adelete_thread(
         self,
         thread_id: str,
@@ -472,6 +687,17 @@ def get_checkpoint_id(config: RunnableConfig) -> Optional[str]:
     )
 
 
+def get_retention_cutoff(policy: RetentionPolicy) -> Optional[str]:
+    """Get the checkpoint ID that checkpoints older than `max_age_minutes` sort before.
+
+    Checkpoint IDs are time-ordered UUIDs, so comparing IDs compares creation times.
+    """
+    if policy.get("max_age_minutes") is None:
+        return None
+    age_ns = int(policy["max_age_minutes"] * 60 * 1_000_000_000)
+    return str(min_uuid6(time.time_ns() - age_ns))
+
+
 def get_checkpoint_metadata(
     config: RunnableConfig, metadata: CheckpointMetadata
 ) -> CheckpointMetadata:
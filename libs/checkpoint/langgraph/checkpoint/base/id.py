@@ -106,3 +106,14 @@ def uuid6(node: Optional[int] = None, clock_seq: Optional[int] = None) -> UUID:
     uuid_int |= (clock_seq & 0x3FFF) << 48
     uuid_int |= node & 0xFFFFFFFFFFFF
     return UUID(int=uuid_int, version=6)
+
+
+def min_uuid6(nanoseconds: int) -> UUID:
+    r"""The smallest UUID version 6 for a time in nanoseconds since the Unix epoch.
+
+    UUIDs generated by `uuid6` at or after that time compare greater than it, both
+    as UUIDs and as strings."""
+    timestamp = nanoseconds // 100 + 0x01B21DD213814000
+    uuid_int = ((timestamp >> 12) & 0xFFFFFFFFFFFF) << 80
+    uuid_int |= (timestamp & 0x0FFF) << 64
+    return UUID(int=uuid_int, version=6)
@@ -3,11 +3,12 @@ import os
 import pickle
 import random
 import shutil
+from bisect import bisect_left, insort
 from collections import defaultdict
 from collections.abc import AsyncIterator, Iterator, Sequence
 from contextlib import AbstractAsyncContextManager, AbstractContextManager, ExitStack
 from types import TracebackType
-from typing import Any, Optional, Union
+from typing import Any, List, Optional, Union  # noqa: UP035
 
 from langchain_core.runnables import RunnableConfig
 
@@ -18,10 +19,12 @@ from langgraph.checkpoint.base import (
     Checkpoint,
     CheckpointMetadata,
     CheckpointTuple,
+    LazyCheckpointTuple,
     SerializerProtocol,
     get_checkpoint_id,
     get_checkpoint_metadata,
 )
+from langgraph.checkpoint.serde.dedupe import BlobDedupe
 from langgraph.checkpoint.serde.types import TASKS, ChannelProtocol
 
 logger = logging.getLogger(__name__)
@@ -79,6 +82,14 @@ class InMemorySaver(
         ],  # thread id, checkpoint ns, channel, version
         tuple[str, bytes],
     ]
+    # thread ID -> checkpoint NS -> sorted checkpoint IDs, the last one being the
+    # latest checkpoint
+    _ids: defaultdict[str, dict[str, list[str]]]
+    # thread ID -> (checkpoint NS, checkpoint ID) -> sorted sends written to the
+    # checkpoint, as (task path, task ID, write idx, serialized send)
+    _sends: defaultdict[
+        str, dict[tuple[str, str], list[tuple[str, str, int, tuple[str, bytes]]]]
+    ]
 
     def __init__(
         self,
@@ -90,6 +101,9 @@ class InMemorySaver(
         self.storage = factory(lambda: defaultdict(dict))
         self.writes = factory(dict)
         self.blobs = factory()
+        self.blob_dedupe = BlobDedupe()
+        self._ids = defaultdict(dict)
+        self._sends = defaultdict(dict)
         self.stack = ExitStack()
         if factory is not defaultdict:
             self.stack.enter_context(self.storage)  # type: ignore[arg-type]
@@ -130,6 +144,66 @@ class InMemorySaver(
                     channel_values[k] = self.serde.loads_typed(vv)
         return channel_values
 
+    def _checkpoint_ids(self, thread_id: str, checkpoint_ns: str) -> list[str]:
+        """Return the sorted IDs of the checkpoints of a thread and namespace."""
+        checkpoints = self.storage[thread_id][checkpoint_ns]
+        ids = self._ids[thread_id].get(checkpoint_ns)
+        if ids is None or len(ids) != len(checkpoints):
+            # the storage was changed other than through put(), e.g. loaded from disk
+            ids = self._ids[thread_id][checkpoint_ns] = sorted(checkpoints)
+        return ids
+
+    def _pending_sends(
+        self, thread_id: str, checkpoint_ns: str, checkpoint_id: str
+    ) -> list[tuple[str, str, int, tuple[str, bytes]]]:
+        """Return the sorted sends written to a checkpoint."""
+        sends = self._sends[thread_id].get((checkpoint_ns, checkpoint_id))
+        if sends is None:
+            writes = self.writes.get((thread_id, checkpoint_ns, checkpoint_id), {})
+            sends = self._sends[thread_id][(checkpoint_ns, checkpoint_id)] = sorted(
+                (task_path, task_id, idx, value)
+                for (_, idx), (task_id, channel, value, task_path) in writes.items()
+                if channel == TASKS
+            )
+        return sends
+
+    def _load_tuple(
+        self,
+        config: RunnableConfig,
+        thread_id: str,
+        checkpoint_ns: str,
+        checkpoint_id: str,
+        checkpoint: tuple[str, bytes],
+        metadata: CheckpointMetadata,
+        parent_checkpoint_id: Optional[str],
+    ) -> CheckpointTuple:
+        writes = self.writes.get((thread_id, checkpoint_ns, checkpoint_id), {})
+        sends = (
+            self._pending_sends(thread_id, checkpoint_ns, parent_checkpoint_id)
+            if parent_checkpoint_id
+            else []
+        )
+        checkpoint_: Checkpoint = self.serde.loads_typed(checkpoint)
+        return CheckpointTuple(
+            config=config,
+            checkpoint={
+                **checkpoint_,
+                "channel_values": self._load_blobs(
+                    thread_id, checkpoint_ns, checkpoint_["channel_versions"]
+                ),
+                "pending_sends": [self.serde.loads_typed(s[3]) for s in sends],
+            },
+            metadata=metadata,
+            pending_writes=[
+                (id, c, self.serde.loads_typed(v)) for id, c, v, _ in writes.values()
+            ],
+            parent_config=(
+                _checkpoint_config(thread_id, checkpoint_ns, parent_checkpoint_id)
+                if parent_checkpoint_id
+                else None
+            ),
+        )
+
     def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
         """Get a checkpoint tuple from the in-memory storage.
 
@@ -146,101 +220,40 @@ class InMemorySaver(
         """
         thread_id: str = config["configurable"]["thread_id"]
         checkpoint_ns: str = config["configurable"].get("checkpoint_ns", "")
-        if checkpoint_id := get_checkpoint_id(config):
-            if saved := self.storage[thread_id][checkpoint_ns].get(checkpoint_id):
-                checkpoint, metadata, parent_checkpoint_id = saved
-                writes = self.writes[(thread_id, checkpoint_ns, checkpoint_id)].values()
-                if parent_checkpoint_id:
-                    sends = sorted(
-                        (
-                            (*w, k[1])
-                            for k, w in self.writes[
-                                (thread_id, checkpoint_ns, parent_checkpoint_id)
-                            ].items()
-                            if w[1] == TASKS
-                        ),
-                        key=lambda w: (w[3], w[0], w[4]),
-                    )
-                else:
-                    sends = []
-                checkpoint_: Checkpoint = self.serde.loads_typed(checkpoint)
-                return CheckpointTuple(
-                    config=config,
-                    checkpoint={
-                        **checkpoint_,
-                        "channel_values": self._load_blobs(
-                            thread_id, checkpoint_ns, checkpoint_["channel_versions"]
-                        ),
-                        "pending_sends": [self.serde.loads_typed(s[2]) for s in sends],
-                    },
-                    metadata=self.serde.loads_typed(metadata),
-                    pending_writes=[
-                        (id, c, self.serde.loads_typed(v)) for id, c, v, _ in writes
-                    ],
-                    parent_config=(
-                        {
-                            "configurable": {
-                                "thread_id": thread_id,
-                                "checkpoint_ns": checkpoint_ns,
-                                "checkpoint_id": parent_checkpoint_id,
-                            }
-                        }
-                        if parent_checkpoint_id
-                        else None
-                    ),
-                )
-        else:
-            if checkpoints := self.storage[thread_id][checkpoint_ns]:
-                checkpoint_id = max(checkpoints.keys())
-                checkpoint, metadata, parent_checkpoint_id = checkpoints[checkpoint_id]
-                writes = self.writes[(thread_id, checkpoint_ns, checkpoint_id)].values()
-                if parent_checkpoint_id:
-                    sends = sorted(
-                        (
-                            (*w, k[1])
-                            for k, w in self.writes[
-                                (thread_id, checkpoint_ns, parent_checkpoint_id)
-                            ].items()
-                            if w[1] == TASKS
-                        ),
-                        key=lambda w: (w[3], w[0], w[4]),
-                    )
-                else:
-                    sends = []
-
-                checkpoint_ = self.serde.loads_typed(checkpoint)
-
-                return CheckpointTuple(
-                    config={
-                        "configurable": {
-                            "thread_id": thread_id,
-                            "checkpoint_ns": checkpoint_ns,
-                            "checkpoint_id": checkpoint_id,
-                        }
-                    },
-                    checkpoint={
-                        **checkpoint_,
-                        "channel_values": self._load_blobs(
-                            thread_id, checkpoint_ns, checkpoint_["channel_versions"]
-                        ),
-                        "pending_sends": [self.serde.loads_typed(s[2]) for s in sends],
-                    },
-                    metadata=self.serde.loads_typed(metadata),
-                    pending_writes=[
-                        (id, c, self.serde.loads_typed(v)) for id, c, v, _ in writes
-                    ],
-                    parent_config=(
-                        {
-                            "configurable": {
-                                "thread_id": thread_id,
-                                "checkpoint_ns": checkpoint_ns,
-                                "checkpoint_id": parent_checkpoint_id,
-                            }
-                        }
-                        if parent_checkpoint_id
-                        else None
-                    ),
-                )
+        if not (checkpoint_id := get_checkpoint_id(config)):
+            # the latest checkpoint is the last one in the sorted index
+            if not (ids := self._checkpoint_ids(thread_id, checkpoint_ns)):
+                return None
+            checkpoint_id = ids[-1]
+            config = _checkpoint_config(thread_id, checkpoint_ns, checkpoint_id)
+        if saved := self.storage[thread_id][checkpoint_ns].get(checkpoint_id):
+            checkpoint, metadata, parent_checkpoint_id = saved
+            return self._load_tuple(
+                config,
+                thread_id,
+                checkpoint_ns,
+                checkpoint_id,
+                checkpoint,
+                self.serde.loads_typed(metadata),
+                parent_checkpoint_id,
+            )
+        return None
+
+    def get_tuples(
+        self, configs: Sequence[RunnableConfig]
+    ) -> List[Optional[CheckpointTuple]]:
+        """Get the checkpoint tuples for many configs from the in-memory storage.
+
+        Lookups are in-memory, so they are done one after the other, without the
+        thread pool of the default implementation.
+
+        Args:
+            configs: The configs to use for retrieving the checkpoints.
+
+        Returns:
+            list[Optional[CheckpointTuple]]: The retrieved checkpoint tuples, in the order of `configs`, with None for checkpoints that were not found.
+        """
+        return [self.get_tuple(config) for config in configs]
 
     def list(
         self,
@@ -264,39 +277,116 @@ class InMemorySaver(
         Yields:
             Iterator[CheckpointTuple]: An iterator of matching checkpoint tuples.
         """
+        for (
+            thread_id,
+            checkpoint_ns,
+            checkpoint_id,
+            checkpoint,
+            metadata,
+            parent_checkpoint_id,
+        ) in self._search(config, filter=filter, before=before, limit=limit):
+            yield self._load_tuple(
+                _checkpoint_config(thread_id, checkpoint_ns, checkpoint_id),
+                thread_id,
+                checkpoint_ns,
+                checkpoint_id,
+                checkpoint,
+                metadata,
+                parent_checkpoint_id,
+            )
+
+    def list_metadata(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        """List checkpoints from the in-memory storage, without loading them.
+
+        Only the metadata of each checkpoint is deserialized, the checkpoint and
+        pending writes are loaded on first access.
+
+        Args:
+            config: Base configuration for filtering checkpoints.
+            filter: Additional filtering criteria for metadata.
+            before: List checkpoints created before this configuration.
+            limit: Maximum number of checkpoints to return.
+
+        Yields:
+            Iterator[CheckpointTuple]: An iterator of lazily loaded checkpoint tuples.
+        """
+        for (
+            thread_id,
+            checkpoint_ns,
+            checkpoint_id,
+            _,
+            metadata,
+            parent_checkpoint_id,
+        ) in self._search(config, filter=filter, before=before, limit=limit):
+            yield LazyCheckpointTuple(
+                _checkpoint_config(thread_id, checkpoint_ns, checkpoint_id),
+                metadata,
+                (
+                    _checkpoint_config(thread_id, checkpoint_ns, parent_checkpoint_id)
+                    if parent_checkpoint_id
+                    else None
+                ),
+                self,
+            )
+
+    def _search(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[dict[str, Any]],
+        before: Optional[RunnableConfig],
+        limit: Optional[int],
+    ) -> Iterator[
+        tuple[str, str, str, tuple[str, bytes], CheckpointMetadata, Optional[str]]
+    ]:
+        """Yield (thread ID, checkpoint NS, checkpoint ID, serialized checkpoint,
+        metadata, parent checkpoint ID) of the checkpoints matching the criteria."""
         thread_ids = (config["configurable"]["thread_id"],) if config else self.storage
         config_checkpoint_ns = (
             config["configurable"].get("checkpoint_ns") if config else None
         )
         config_checkpoint_id = get_checkpoint_id(config) if config else None
+        before_checkpoint_id = get_checkpoint_id(before) if before else None
         for thread_id in thread_ids:
-            for checkpoint_ns in self.storage[thread_id].keys():
+            for checkpoint_ns in list(self.storage[thread_id].keys()):
                 if (
                     config_checkpoint_ns is not None
                     and checkpoint_ns != config_checkpoint_ns
                 ):
                     continue
 
-                for checkpoint_id, (
-                    checkpoint,
-                    metadata_b,
-                    parent_checkpoint_id,
-                ) in sorted(
-                    self.storage[thread_id][checkpoint_ns].items(),
-                    key=lambda x: x[0],
-                    reverse=True,
-                ):
-                    # filter by checkpoint ID from config
-                    if config_checkpoint_id and checkpoint_id != config_checkpoint_id:
-                        continue
-
-                    # filter by checkpoint ID from `before` config
-                    if (
-                        before
-                        and (before_checkpoint_id := get_checkpoint_id(before))
-                        and checkpoint_id >= before_checkpoint_id
-                    ):
+                checkpoints = self.storage[thread_id][checkpoint_ns]
+                # filter by checkpoint ID from config
+                if config_checkpoint_id:
+                    ids = (
+                        [config_checkpoint_id]
+                        if config_checkpoint_id in checkpoints
+                        else []
+                    )
+                else:
+                    ids = self._checkpoint_ids(thread_id, checkpoint_ns)
+
+                # filter by checkpoint ID from `before` config, then walk the index
+                # backwards, finding the position of each checkpoint anew in case
+                # checkpoints are added in the meantime
+                pos = (
+                    bisect_left(ids, before_checkpoint_id)
+                    if before_checkpoint_id
+                    else len(ids)
+                )
+                while pos > 0:
+                    checkpoint_id = ids[pos - 1]
+                    pos = bisect_left(ids, checkpoint_id)
+                    if (saved := checkpoints.get(checkpoint_id)) is None:
                         continue
+                    checkpoint, metadata_b, parent_checkpoint_id = saved
 
                     # filter by metadata
                     metadata = self.serde.loads_typed(metadata_b)
@@ -312,60 +402,13 @@ class InMemorySaver(
                     elif limit is not None:
                         limit -= 1
 
-                    writes = self.writes[
-                        (thread_id, checkpoint_ns, checkpoint_id)
-                    ].values()
-
-                    if parent_checkpoint_id:
-                        sends = sorted(
-                            (
-                                (*w, k[1])
-                                for k, w in self.writes[
-                                    (thread_id, checkpoint_ns, parent_checkpoint_id)
-                                ].items()
-                                if w[1] == TASKS
-                            ),
-                            key=lambda w: (w[3], w[0], w[4]),
-                        )
-                    else:
-                        sends = []
-
-                    checkpoint_: Checkpoint = self.serde.loads_typed(checkpoint)
-
-                    yield CheckpointTuple(
-                        config={
-                            "configurable": {
-                                "thread_id": thread_id,
-                                "checkpoint_ns": checkpoint_ns,
-                                "checkpoint_id": checkpoint_id,
-                            }
-                        },
-                        checkpoint={
-                            **checkpoint_,
-                            "channel_values": self._load_blobs(
-                                thread_id,
-                                checkpoint_ns,
-                                checkpoint_["channel_versions"],
-                            ),
-                            "pending_sends": [
-                                self.serde.loads_typed(s[2]) for s in sends
-                            ],
-                        },
-                        metadata=metadata,
-                        parent_config=(
-                            {
-                                "configurable": {
-                                    "thread_id": thread_id,
-                                    "checkpoint_ns": checkpoint_ns,
-                                    "checkpoint_id": parent_checkpoint_id,
-                                }
-                            }
-                            if parent_checkpoint_id
-                            else None
-                        ),
-                        pending_writes=[
-                            (id, c, self.serde.loads_typed(v)) for id, c, v, _ in writes
-                        ],
+                    yield (
+                        thread_id,
+                        checkpoint_ns,
+                        checkpoint_id,
+                        checkpoint,
+                        metadata,
+                        parent_checkpoint_id,
                     )
 
     def put(
@@ -394,11 +437,24 @@ class InMemorySaver(
         thread_id = config["configurable"]["thread_id"]
         checkpoint_ns = config["configurable"]["checkpoint_ns"]
         values: dict[str, Any] = c.pop("channel_values")  # type: ignore[misc]
+        blobs = self.blob_dedupe.dumps_blobs(
+            self.serde, thread_id, checkpoint_ns, values, new_versions
+        )
         for k, v in new_versions.items():
-            self.blobs[(thread_id, checkpoint_ns, k, v)] = (
-                self.serde.dumps_typed(values[k]) if k in values else ("empty", b"")
-            )
-        self.storage[thread_id][checkpoint_ns].update(
+            blob = blobs[k]
+            if blob is None:
+                self.blobs[(thread_id, checkpoint_ns, k, v)] = ("empty", b"")
+                continue
+            if blob.same_as is not None:
+                # identical to a stored version, share its bytes
+                previous = self.blobs.get((thread_id, checkpoint_ns, k, blob.same_as))
+                if previous is not None:
+                    self.blobs[(thread_id, checkpoint_ns, k, v)] = previous
+                    continue
+            self.blobs[(thread_id, checkpoint_ns, k, v)] = (blob.type, blob.data)
+        checkpoints = self.storage[thread_id][checkpoint_ns]
+        is_new = checkpoint["id"] not in checkpoints
+        checkpoints.update(
             {
                 checkpoint["id"]: (
                     self.serde.dumps_typed(c),
@@ -407,6 +463,9 @@ class InMemorySaver(
                 )
             }
         )
+        if is_new and (ids := self._ids[thread_id].get(checkpoint_ns)) is not None:
+            # new checkpoints sort last, so this is an append
+            insort(ids, checkpoint["id"])
         return {
             "configurable": {
                 "thread_id": thread_id,
@@ -441,17 +500,16 @@ class InMemorySaver(
         checkpoint_id = config["configurable"]["checkpoint_id"]
         outer_key = (thread_id, checkpoint_ns, checkpoint_id)
         outer_writes_ = self.writes.get(outer_key)
+        sends = self._sends[thread_id].get((checkpoint_ns, checkpoint_id))
         for idx, (c, v) in enumerate(writes):
             inner_key = (task_id, WRITES_IDX_MAP.get(c, idx))
             if inner_key[1] >= 0 and outer_writes_ and inner_key in outer_writes_:
                 continue
 
-            self.writes[outer_key][inner_key] = (
-                task_id,
-                c,
-                self.serde.dumps_typed(v),
-                task_path,
-            )
+            value = self.serde.dumps_typed(v)
+            self.writes[outer_key][inner_key] = (task_id, c, value, task_path)
+            if c == TASKS and sends is not None:
+                insort(sends, (task_path, task_id, inner_key[1], value))
 
     def delete_thread(self, thread_id: str) -> None:
         """Delete all checkpoints and writes associated with a thread ID.
@@ -464,12 +522,15 @@ class InMemorySaver(
         """
         if thread_id in self.storage:
             del self.storage[thread_id]
+        self._ids.pop(thread_id, None)
+        self._sends.pop(thread_id, None)
         for k in list(self.writes.keys()):
             if k[0] == thread_id:
                 del self.writes[k]
         for k in list(self.blobs.keys()):
             if k[0] == thread_id:
                 del self.blobs[k]
+        self.blob_dedupe.clear(thread_id)
 
     async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
         """Asynchronous version of get_tuple.
@@ -485,6 +546,19 @@ class InMemorySaver(
         """
         return self.get_tuple(config)
 
+    async def aget_tuples(
+        self, configs: Sequence[RunnableConfig]
+    ) -> List[Optional[CheckpointTuple]]:
+        """Asynchronous version of get_tuples.
+
+        Args:
+            configs: The configs to use for retrieving the checkpoints.
+
+        Returns:
+            list[Optional[CheckpointTuple]]: The retrieved checkpoint tuples, in the order of `configs`, with None for checkpoints that were not found.
+        """
+        return self.get_tuples(configs)
+
     async def alist(
         self,
         config: Optional[RunnableConfig],
@@ -507,6 +581,27 @@ class InMemorySaver(
         for item in self.list(config, filter=filter, before=before, limit=limit):
             yield item
 
+    async def alist_metadata(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        """Asynchronous version of list_metadata.
+
+        Args:
+            config: The config to use for listing the checkpoints.
+
+        Yields:
+            AsyncIterator[CheckpointTuple]: An asynchronous iterator of lazily loaded checkpoint tuples.
+        """
+        for item in self.list_metadata(
+            config, filter=filter, before=before, limit=limit
+        ):
+            yield item
+
     async def aput(
         self,
         config: RunnableConfig,
@@ -576,6 +671,18 @@ class InMemorySaver(
 MemorySaver = InMemorySaver  # Kept for backwards compatibility
 
 
+def _checkpoint_config(
+    thread_id: str, checkpoint_ns: str, checkpoint_id: str
+) -> RunnableConfig:
+    return {
+        "configurable": {
+            "thread_id": thread_id,
+            "checkpoint_ns": checkpoint_ns,
+            "checkpoint_id": checkpoint_id,
+        }
+    }
+
+
 class PersistentDict(defaultdict):
     """Persistent dictionary with an API compatible with shelve and anydbm.
 
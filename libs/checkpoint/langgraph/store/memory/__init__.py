@@ -102,12 +102,16 @@ Tip:
 import asyncio
 import concurrent.futures as cf
 import functools
+import heapq
 import logging
+import operator
+from bisect import bisect_left, bisect_right
 from collections import defaultdict
-from collections.abc import Iterable
+from collections.abc import Callable, Iterable, Iterator
 from datetime import datetime, timezone
 from importlib import util
-from typing import Any, Optional
+from itertools import islice
+from typing import Any, Literal, Optional, TypedDict
 
 from langchain_core.embeddings import Embeddings
 
@@ -131,6 +135,64 @@ from langgraph.store.base import (
 logger = logging.getLogger(__name__)
 
 
+class IVFFlatConfig(TypedDict, total=False):
+    """Configuration for an approximate nearest neighbor index. IVFFlat divides
+    the vectors of each namespace into lists, and searches only the lists closest
+    to the query vector.
+
+    The lists of a namespace are trained once it has 40 vectors per list, from
+    the vectors it has then. Smaller namespaces are searched exactly. New vectors
+    are added to the closest list.
+    """
+
+    kind: Literal["ivfflat"]
+    nlist: int
+    """Number of lists. Default is 100.
+
+    A good place to start is the number of vectors / 1000, up to 1M vectors,
+    and its square root above that.
+    """
+    nprobe: int
+    """Number of lists searched per query. Default is 10.
+
+    Higher is better for recall, lower is better for speed. A good place to
+    start is the square root of nlist.
+    """
+
+
+class InMemoryIndexConfig(IndexConfig, total=False):
+    """Configuration for indexing documents in the in-memory store.
+
+    Extends IndexConfig with indexes on values, used by filters in search().
+    """
+
+    filter_fields: dict[str, Literal["hash", "sorted"]]
+    """Values to index for search filters, by path, with the kind of index.
+
+        - "hash": for equality filters, `{"status": "done"}` or `{"status": {"$eq": "done"}}`
+        - "sorted": for range filters with `$gt`, `$gte`, `$lt` and `$lte`
+
+    Paths use dot notation for nested fields, e.g. "metadata.rating". Filtered
+    searches look up the matching items in the indexes instead of comparing
+    every item. Other filters are applied to the items the indexes matched.
+    Vector search is only enabled if `embed` is also given.
+
+    ???+ example "Examples"
+        ```python
+        store = InMemoryStore(
+            index={"filter_fields": {"status": "hash", "metadata.rating": "sorted"}}
+        )
+        store.search(
+            ("docs",), filter={"status": "done", "metadata": {"rating": {"$gte": 4}}}
+        )
+        ```
+    """
+
+    ann_index_config: IVFFlatConfig
+    """Approximate nearest neighbor index for vector search, instead of comparing
+    the query to every vector. Requires numpy."""
+
+
 class InMemoryStore(BaseStore):
     """In-memory dictionary-backed store with optional vector search.
 
@@ -174,11 +236,17 @@ class InMemoryStore(BaseStore):
     __slots__ = (
         "_data",
         "_vectors",
+        "_namespaces",
+        "_matrices",
+        "_stacked",
+        "_ann",
+        "_filter_paths",
+        "_value_indexes",
         "index_config",
         "embeddings",
     )
 
-    def __init__(self, *, index: Optional[IndexConfig] = None) -> None:
+    def __init__(self, *, index: Optional[InMemoryIndexConfig] = None) -> None:
         # Both _data and _vectors are wrapped in the In-memory API
         # Do not change their names
         self._data: dict[tuple[str, ...], dict[str, Item]] = defaultdict(dict)
@@ -186,16 +254,47 @@ class InMemoryStore(BaseStore):
         self._vectors: dict[tuple[str, ...], dict[str, dict[str, list[float]]]] = (
             defaultdict(lambda: defaultdict(dict))
         )
+        # trie of the namespaces in _data
+        self._namespaces = _NamespaceIndex()
+        # [ns] -> normalized copy of _vectors[ns], when numpy is installed
+        self._matrices: Optional[dict[tuple[str, ...], _VectorMatrix]] = None
+        # [namespace_prefix] -> _matrices of all namespaces under it, stacked
+        self._stacked: dict[tuple[str, ...], _VectorMatrix] = {}
+        # (nlist, nprobe) of the IVF index of each matrix, if configured
+        self._ann: Optional[tuple[int, int]] = None
+        # [path] -> kind of index, from index_config["filter_fields"]
+        self._filter_paths: dict[tuple[str, ...], str] = {}
+        # [ns] -> indexes on the values of _data[ns], built on first filtered search
+        self._value_indexes: dict[tuple[str, ...], _ValueIndex] = {}
         self.index_config = index
         if self.index_config:
             self.index_config = self.index_config.copy()
-            self.embeddings: Optional[Embeddings] = ensure_embeddings(
-                self.index_config.get("embed"),
-            )
+            for path, kind in (self.index_config.get("filter_fields") or {}).items():
+                if kind not in ("hash", "sorted"):
+                    raise ValueError(
+                        f"Unsupported index kind for filter field {path!r}: {kind}"
+                    )
+                self._filter_paths[tuple(path.split("."))] = kind
+            # filter indexes can be used without embeddings
+            if "embed" in self.index_config or not self._filter_paths:
+                self.embeddings: Optional[Embeddings] = ensure_embeddings(
+                    self.index_config.get("embed"),
+                )
+            else:
+                self.embeddings = None
             self.index_config["__tokenized_fields"] = [
                 (p, tokenize_path(p)) if p != "$" else (p, p)
                 for p in (self.index_config.get("fields") or ["$"])
             ]
+            if self.embeddings and _check_numpy():
+                self._matrices = {}
+                if ann := self.index_config.get("ann_index_config"):
+                    if ann.get("kind", "ivfflat") != "ivfflat":
+                        raise ValueError(
+                            f"Unsupported ANN index kind: {ann['kind']}, "
+                            "only 'ivfflat' is supported"
+                        )
+                    self._ann = (ann.get("nlist", 100), ann.get("nprobe", 10))
 
         else:
             self.index_config = None
@@ -233,8 +332,8 @@ class InMemoryStore(BaseStore):
 
     # Helpers
 
-    def _filter_items(self, op: SearchOp) -> list[tuple[Item, list[list[float]]]]:
-        """Filter items by namespace and filter function, return items with their embeddings."""
+    def _filter_items(self, op: SearchOp) -> list[Item]:
+        """Filter items by namespace and filter function."""
         namespace_prefix = op.namespace_prefix
 
         def filter_func(item: Item) -> bool:
@@ -246,26 +345,70 @@ class InMemoryStore(BaseStore):
                 for key, filter_value in op.filter.items()
             )
 
-        filtered = []
-        for namespace in self._data:
-            if not (
-                namespace[: len(namespace_prefix)] == namespace_prefix
-                if len(namespace) >= len(namespace_prefix)
-                else False
-            ):
-                continue
+        def residual_func(item: Item) -> bool:
+            return all(
+                _compare_values(item.value.get(key), filter_value)
+                for key, filter_value in residual.items()
+            )
+
+        conditions: list[_Condition] = []
+        residual: dict[str, Any] = {}
+        if op.filter and self._filter_paths:
+            conditions, residual = _plan_filter(op.filter, self._filter_paths)
 
-            for key, item in self._data[namespace].items():
-                if filter_func(item):
-                    if op.query and (embeddings := self._vectors[namespace].get(key)):
-                        filtered.append((item, list(embeddings.values())))
+        filtered = []
+        for namespace in self._namespaces_under(namespace_prefix):
+            items = self._data[namespace]
+            if conditions and len(items) >= _MIN_INDEXED_ITEMS:
+                keys = self._value_index(namespace, items).lookup(conditions)
+                if keys is not None:
+                    matched = [items[key] for key in keys]
+                    if residual:
+                        filtered.extend(filter(residual_func, matched))
                     else:
-                        filtered.append((item, []))
+                        filtered.extend(matched)
+                    continue
+            if op.filter:
+                filtered.extend(filter(filter_func, items.values()))
+            else:
+                filtered.extend(items.values())
         return filtered
 
+    def _namespaces_under(self, prefix: tuple[str, ...]) -> Iterable[tuple[str, ...]]:
+        """Namespaces starting with prefix, in the order they were added."""
+        if not prefix:
+            return list(self._data)
+        return self._namespace_index().under(prefix)
+
+    def _namespace_index(self) -> "_NamespaceIndex":
+        if len(self._namespaces) != len(self._data):
+            # namespaces were added to _data directly
+            self._namespaces = _NamespaceIndex(self._data)
+        return self._namespaces
+
+    def _value_index(
+        self, namespace: tuple[str, ...], items: dict[str, Item]
+    ) -> "_ValueIndex":
+        index = self._value_indexes.get(namespace)
+        if index is None or len(index) != len(items):
+            # not built yet, or items were changed in _data directly
+            index = self._value_indexes[namespace] = _ValueIndex(
+                self._filter_paths, items
+            )
+        return index
+
+    def _items(self, namespace: tuple[str, ...]) -> dict[str, Item]:
+        """Return the items of a namespace, adding the namespace if it's new."""
+        items = self._data.get(namespace)
+        if items is None:
+            index = self._namespace_index()
+            items = self._data[namespace] = {}
+            index.add(namespace)
+        return items
+
     def _embed_search_queries(
         self,
-        search_ops: dict[int, tuple[SearchOp, list[tuple[Item, list[list[float]]]]]],
+        search_ops: dict[int, tuple[SearchOp, list[Item]]],
     ) -> dict[str, list[float]]:
         queryinmem_store = {}
         if self.index_config and self.embeddings and search_ops:
@@ -284,7 +427,7 @@ class InMemoryStore(BaseStore):
 
     async def _aembed_search_queries(
         self,
-        search_ops: dict[int, tuple[SearchOp, list[tuple[Item, list[list[float]]]]]],
+        search_ops: dict[int, tuple[SearchOp, list[Item]]],
     ) -> dict[str, list[float]]:
         queryinmem_store = {}
         if self.index_config and self.embeddings and search_ops:
@@ -299,50 +442,38 @@ class InMemoryStore(BaseStore):
 
     def _batch_search(
         self,
-        ops: dict[int, tuple[SearchOp, list[tuple[Item, list[list[float]]]]]],
+        ops: dict[int, tuple[SearchOp, list[Item]]],
         queryinmem_store: dict[str, list[float]],
         results: list[Result],
     ) -> None:
         """Perform batch similarity search for multiple queries."""
+        top_k = (
+            self._batch_top_k(ops, queryinmem_store)
+            if self._matrices is not None and queryinmem_store
+            else {}
+        )
         for i, (op, candidates) in ops.items():
             if not candidates:
                 results[i] = []
                 continue
             if op.query and queryinmem_store:
-                query_embedding = queryinmem_store[op.query]
-                flat_items, flat_vectors = [], []
-                scoreless = []
-                for item, vectors in candidates:
-                    for vector in vectors:
-                        flat_items.append(item)
-                        flat_vectors.append(vector)
-                    if not vectors:
-                        scoreless.append(item)
-
-                scores = _cosine_similarity(query_embedding, flat_vectors)
-                sorted_results = sorted(
-                    zip(scores, flat_items), key=lambda x: x[0], reverse=True
-                )
-                # max pooling
-                seen: set[tuple[tuple[str, ...], str]] = set()
-                kept: list[tuple[Optional[float], Item]] = []
-                for score, item in sorted_results:
-                    key = (item.namespace, item.key)
-                    if key in seen:
-                        continue
-                    ix = len(seen)
-                    seen.add(key)
-                    if ix >= op.offset + op.limit:
-                        break
-                    if ix < op.offset:
-                        continue
-
-                    kept.append((score, item))
-                if scoreless and len(kept) < op.limit:
+                if i in top_k:
+                    kept = top_k[i]
+                else:
+                    kept = _top_k_python(
+                        queryinmem_store[op.query],
+                        [(item, self._embeddings(item)) for item in candidates],
+                        op.offset,
+                        op.limit,
+                    )
+                if len(kept) < op.limit:
                     # Corner case: if we request more items than what we have embedded,
                     # fill the rest with non-scored items
+                    scoreless = (
+                        item for item in candidates if not self._embeddings(item)
+                    )
                     kept.extend(
-                        (None, item) for item in scoreless[: op.limit - len(kept)]
+                        (None, item) for item in islice(scoreless, op.limit - len(kept))
                     )
 
                 results[i] = [
@@ -365,24 +496,115 @@ class InMemoryStore(BaseStore):
                         created_at=item.created_at,
                         updated_at=item.updated_at,
                     )
-                    for (item, _) in candidates[op.offset : op.offset + op.limit]
+                    for item in candidates[op.offset : op.offset + op.limit]
+                ]
+
+    def _batch_top_k(
+        self,
+        ops: dict[int, tuple[SearchOp, list[Item]]],
+        queryinmem_store: dict[str, list[float]],
+    ) -> dict[int, list[tuple[Optional[float], Item]]]:
+        """Score the candidates of all queries against the embedding matrices,
+        with one matrix product per namespace prefix."""
+        import numpy as np  # type: ignore[import-not-found]
+
+        by_prefix: defaultdict[tuple[str, ...], list[int]] = defaultdict(list)
+        for i, (op, candidates) in ops.items():
+            if op.query and candidates:
+                by_prefix[op.namespace_prefix].append(i)
+        top_k: dict[int, list[tuple[Optional[float], Item]]] = {}
+        for prefix, idxs in by_prefix.items():
+            indexed = self._indexed_matrices(prefix) if self._ann else []
+            matrix = self._stacked_matrix(prefix)
+            if matrix is None and not indexed:
+                for i in idxs:
+                    top_k[i] = []
+                continue
+            queries = list(dict.fromkeys(ops[i][0].query for i in idxs))
+            Q = np.array([queryinmem_store[q] for q in queries], dtype=np.float32)
+            norms = np.linalg.norm(Q, axis=1, keepdims=True)
+            np.divide(Q, norms, out=Q, where=norms != 0)
+            # one column of scores per query, one row per stored vector
+            S = matrix.vectors @ Q.T if matrix is not None else None
+            for i in idxs:
+                op, candidates = ops[i]
+                j = queries.index(op.query)
+                allowed = {id(item) for item in candidates} if op.filter else None
+                if not indexed:
+                    assert matrix is not None and S is not None
+                    top_k[i] = matrix.top_k(
+                        S[:, j], self._get_item, allowed, op.offset, op.limit
+                    )
+                    continue
+                # best of each matrix, merged
+                k = op.offset + op.limit
+                found = [
+                    m.search(Q[j], self._get_item, allowed, k, self._ann[1])
+                    for m in indexed
                 ]
+                if matrix is not None and S is not None:
+                    found.append(matrix.top_k(S[:, j], self._get_item, allowed, 0, k))
+                merged = heapq.merge(*found, key=lambda r: -r[0])
+                top_k[i] = list(islice(merged, op.offset, k))
+        return top_k
+
+    def _get_item(self, namespace: tuple[str, ...], key: str) -> Optional[Item]:
+        items = self._data.get(namespace)
+        return items.get(key) if items is not None else None
+
+    def _embeddings(self, item: Item) -> Optional[dict[str, list[float]]]:
+        vectors = self._vectors.get(item.namespace)
+        return vectors.get(item.key) if vectors is not None else None
+
+    def _indexed_matrices(self, prefix: tuple[str, ...]) -> list["_VectorMatrix"]:
+        """Matrices under prefix with an IVF index, training the ones that have
+        grown large enough."""
+        assert self._matrices is not None and self._ann is not None
+        nlist = self._ann[0]
+        indexed = []
+        for ns in self._namespaces_under(prefix):
+            m = self._matrices.get(ns)
+            if m is None:
+                continue
+            if m.ivf is None and m.size >= _IVF_MIN_VECTORS_PER_LIST * nlist:
+                m.train_ivf(nlist)
+                self._stacked.clear()
+            if m.ivf is not None:
+                indexed.append(m)
+        return indexed
+
+    def _stacked_matrix(self, prefix: tuple[str, ...]) -> Optional["_VectorMatrix"]:
+        """Matrices under prefix without an IVF index, stacked."""
+        assert self._matrices is not None
+        if prefix in self._stacked:
+            return self._stacked[prefix]
+        matrices = [
+            m
+            for ns in self._namespaces_under(prefix)
+            if (m := self._matrices.get(ns)) is not None and m.size and m.ivf is None
+        ]
+        if not matrices:
+            return None
+        if len(matrices) == 1:
+            return matrices[0]
+        if len(self._stacked) >= 128:
+            self._stacked.clear()
+        stacked = self._stacked[prefix] = _VectorMatrix.stack(matrices)
+        return stacked
 
     def _prepare_ops(
         self, ops: Iterable[Op]
     ) -> tuple[
         list[Result],
         dict[tuple[tuple[str, ...], str], PutOp],
-        dict[int, tuple[SearchOp, list[tuple[Item, list[list[float]]]]]],
+        dict[int, tuple[SearchOp, list[Item]]],
     ]:
         results: list[Result] = []
         put_ops: dict[tuple[tuple[str, ...], str], PutOp] = {}
-        search_ops: dict[
-            int, tuple[SearchOp, list[tuple[Item, list[list[float]]]]]
-        ] = {}
+        search_ops: dict[int, tuple[SearchOp, list[Item]]] = {}
         for i, op in enumerate(ops):
             if isinstance(op, GetOp):
-                item = self._data[op.namespace].get(op.key)
+                item = self._items(op.namespace).get(op.key)
                 results.append(item)
             elif isinstance(op, SearchOp):
                 search_ops[i] = (op, self._filter_items(op))
@@ -399,17 +621,25 @@ class InMemoryStore(BaseStore):
 
     def _apply_put_ops(self, put_ops: dict[tuple[tuple[str, ...], str], PutOp]) -> None:
         for (namespace, key), op in put_ops.items():
+            value_index = self._value_indexes.get(namespace)
             if op.value is None:
-                self._data[namespace].pop(key, None)
-                self._vectors[namespace].pop(key, None)
+                self._items(namespace).pop(key, None)
+                if value_index is not None:
+                    value_index.delete(key)
+                paths = self._vectors[namespace].pop(key, None)
+                if paths and self._matrices and namespace in self._matrices:
+                    self._matrices[namespace].delete(namespace, key, paths)
+                    self._stacked.clear()
             else:
-                self._data[namespace][key] = Item(
+                item = self._items(namespace)[key] = Item(
                     value=op.value,
                     key=key,
                     namespace=namespace,
                     created_at=datetime.now(timezone.utc),
                     updated_at=datetime.now(timezone.utc),
                 )
+                if value_index is not None:
+                    value_index.put(item)
 
     def _extract_texts(
         self, put_ops: dict[tuple[tuple[str, ...], str], PutOp]
@@ -444,32 +674,394 @@ class InMemoryStore(BaseStore):
         to_embed: dict[str, list[tuple[tuple[str, ...], str, str]]],
         embeddings: list[list[float]],
     ) -> None:
-        indices = [index for indices in to_embed.values() for index in indices]
-        if len(indices) != len(embeddings):
+        # one embedding per distinct text, shared by all fields with that text
+        if len(to_embed) != len(embeddings):
             raise ValueError(
                 f"Number of embeddings ({len(embeddings)}) does not"
-                f" match number of indices ({len(indices)})"
+                f" match number of texts ({len(to_embed)})"
             )
-        for embedding, (ns, key, path) in zip(embeddings, indices):
-            self._vectors[ns][key][path] = embedding
+        for embedding, indices in zip(embeddings, to_embed.values()):
+            for ns, key, path in indices:
+                self._vectors[ns][key][path] = embedding
+                if self._matrices is not None:
+                    if ns not in self._matrices:
+                        self._matrices[ns] = _VectorMatrix(len(embedding))
+                    self._matrices[ns].put(ns, key, path, embedding)
+        self._stacked.clear()
 
     def _handle_list_namespaces(self, op: ListNamespacesOp) -> list[tuple[str, ...]]:
-        all_namespaces = list(
-            self._data.keys()
-        )  # Avoid collection size changing while iterating
-        namespaces = all_namespaces
-        if op.match_conditions:
-            namespaces = [
-                ns
-                for ns in namespaces
-                if all(_does_match(condition, ns) for condition in op.match_conditions)
-            ]
+        index = self._namespace_index()
+        conditions = list(op.match_conditions or ())
+        prefix = next((c for c in conditions if c.match_type == "prefix"), None)
+        if prefix is None and conditions:
+            # suffix conditions only, find the namespaces with the first suffix
+            nodes = index.suffix_nodes(conditions[0].path)
+            if 2 * sum(node.size for node in nodes) < len(index):
+                # few of them, so sort them
+                matched = [
+                    ns
+                    for node in nodes
+                    for ns in _subtree(node)
+                    if all(_does_match(c, ns) for c in conditions[1:])
+                ]
+                if op.max_depth is not None:
+                    matched = list({ns[: op.max_depth] for ns in matched})
+                return heapq.nsmallest(op.offset + op.limit, matched)[op.offset :]
+        # walk the matching subtree in sorted order, stop after offset + limit
+        conditions = [c for c in conditions if c is not prefix]
+        namespaces = index.walk(
+            prefix.path if prefix is not None else (),
+            # truncating early would drop the labels suffixes are matched on
+            None if conditions else op.max_depth,
+        )
+        if conditions:
+            namespaces = (
+                ns for ns in namespaces if all(_does_match(c, ns) for c in conditions)
+            )
+            if op.max_depth is not None:
+                namespaces = (ns[: op.max_depth] for ns in namespaces)
+        return list(islice(_unique_sorted(namespaces), op.offset, op.offset + op.limit))
+
+
+class _TrieNode:
+    __slots__ = ("children", "namespace", "size", "_sorted")
+
+    def __init__(self) -> None:
+        self.children: dict[str, _TrieNode] = {}
+        # set if a namespace ends at this node
+        self.namespace: Optional[tuple[str, ...]] = None
+        # number of namespaces in the subtree
+        self.size = 0
+        self._sorted: Optional[list[str]] = None
+
+    def child(self, label: str) -> "_TrieNode":
+        node = self.children.get(label)
+        if node is None:
+            node = self.children[label] = _TrieNode()
+            self._sorted = None
+        return node
+
+    def sorted_labels(self) -> list[str]:
+        if self._sorted is None:
+            self._sorted = sorted(self.children)
+        return self._sorted
+
+
+class _NamespaceIndex:
+    """The namespaces of an `InMemoryStore`, in a trie of their labels, and in a
+    trie of their reversed labels for suffix matches."""
+
+    __slots__ = ("prefixes", "suffixes", "order")
+
+    def __init__(self, namespaces: Iterable[tuple[str, ...]] = ()) -> None:
+        self.prefixes = _TrieNode()
+        self.suffixes = _TrieNode()
+        # namespace -> position, namespaces are listed in insertion order
+        self.order: dict[tuple[str, ...], int] = {}
+        for ns in namespaces:
+            self.add(ns)
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    def add(self, namespace: tuple[str, ...]) -> None:
+        if namespace in self.order:
+            return
+        self.order[namespace] = len(self.order)
+        for node, labels in (
+            (self.prefixes, namespace),
+            (self.suffixes, namespace[::-1]),
+        ):
+            node.size += 1
+            for label in labels:
+                node = node.child(label)
+                node.size += 1
+            node.namespace = namespace
+
+    def under(self, prefix: tuple[str, ...]) -> list[tuple[str, ...]]:
+        """Namespaces starting with prefix, in insertion order."""
+        node: Optional[_TrieNode] = self.prefixes
+        for label in prefix:
+            if node is None:
+                break
+            node = node.children.get(label)
+        if node is None:
+            return []
+        return sorted(_subtree(node), key=self.order.__getitem__)
+
+    def walk(
+        self, pattern: tuple[str, ...], max_depth: Optional[int] = None
+    ) -> Iterator[tuple[str, ...]]:
+        """Namespaces matching a prefix pattern, where "*" matches any label, in
+        sorted order. With max_depth, namespaces are truncated to that depth,
+        which may repeat a namespace if the pattern is longer."""
+        return _walk(self.prefixes, (), pattern, max_depth)
+
+    def suffix_nodes(self, pattern: tuple[str, ...]) -> list[_TrieNode]:
+        """Nodes of the suffix trie whose subtrees hold the namespaces matching a
+        suffix pattern, where "*" matches any label."""
+        nodes = [self.suffixes]
+        for label in reversed(pattern):
+            if label == "*":
+                nodes = [child for node in nodes for child in node.children.values()]
+            else:
+                nodes = [
+                    node.children[label] for node in nodes if label in node.children
+                ]
+        return nodes
+
+
+def _walk(
+    node: _TrieNode,
+    path: tuple[str, ...],
+    pattern: tuple[str, ...],
+    max_depth: Optional[int],
+) -> Iterator[tuple[str, ...]]:
+    # depth-first, a node comes before its children, and siblings in order
+    depth = len(path)
+    if depth >= len(pattern):
+        if max_depth is not None and depth >= max_depth:
+            yield path[:max_depth]
+            return
+        if node.namespace is not None:
+            yield node.namespace
+        labels: Iterable[str] = node.sorted_labels()
+    elif pattern[depth] == "*":
+        labels = node.sorted_labels()
+    elif pattern[depth] in node.children:
+        labels = (pattern[depth],)
+    else:
+        return
+    for label in labels:
+        yield from _walk(node.children[label], (*path, label), pattern, max_depth)
+
+
+def _subtree(node: _TrieNode) -> Iterator[tuple[str, ...]]:
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if node.namespace is not None:
+            yield node.namespace
+        stack.extend(node.children.values())
+
+
+def _unique_sorted(namespaces: Iterable[tuple[str, ...]]) -> Iterator[tuple[str, ...]]:
+    # drops repeats from a sorted iterable
+    previous = None
+    for ns in namespaces:
+        if ns != previous:
+            yield ns
+            previous = ns
+
 
-        if op.max_depth is not None:
-            namespaces = sorted({ns[: op.max_depth] for ns in namespaces})
+# namespaces with fewer items are scanned, without building value indexes
+_MIN_INDEXED_ITEMS = 32
+
+# (path, operator, value) of a filter condition answered by a value index
+_Condition = tuple[tuple[str, ...], str, Any]
+
+_RANGE_OPERATORS = {
+    "$gt": operator.gt,
+    "$gte": operator.ge,
+    "$lt": operator.lt,
+    "$lte": operator.le,
+}
+
+# value of a path whose parent is not an object, never matched by filters
+_UNRESOLVED = object()
+
+
+class _ValueIndex:
+    """Indexes on values of the items of one namespace, to look up the items
+    matching filter conditions."""
+
+    __slots__ = ("hashes", "sorted", "order", "_next")
+
+    def __init__(
+        self, paths: dict[tuple[str, ...], str], items: dict[str, Item]
+    ) -> None:
+        self.hashes = {p: _HashIndex() for p, kind in paths.items() if kind == "hash"}
+        self.sorted = {
+            p: _SortedIndex() for p, kind in paths.items() if kind == "sorted"
+        }
+        # key -> position, to return keys in the order of the items
+        self.order: dict[str, int] = {}
+        self._next = 0
+        for item in items.values():
+            self.put(item)
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    def put(self, item: Item) -> None:
+        key = item.key
+        if key in self.order:
+            # updated items keep their position, as in a dict
+            self._remove(key)
         else:
-            namespaces = sorted(namespaces)
-        return namespaces[op.offset : op.offset + op.limit]
+            self.order[key] = self._next
+            self._next += 1
+        for path, hashed in self.hashes.items():
+            hashed.add(key, _resolve(item.value, path))
+        for path, ordered in self.sorted.items():
+            ordered.add(key, _resolve(item.value, path))
+
+    def delete(self, key: str) -> None:
+        if self.order.pop(key, None) is not None:
+            self._remove(key)
+
+    def _remove(self, key: str) -> None:
+        for hashed in self.hashes.values():
+            hashed.remove(key)
+        for ordered in self.sorted.values():
+            ordered.remove(key)
+
+    def lookup(self, conditions: list[_Condition]) -> Optional[list[str]]:
+        """Keys of the items matching all conditions, in item order. Returns None
+        if the conditions can't be answered the same way comparing would."""
+        sources: list[tuple[int, Any]] = []
+        checks: list[Callable[[str], bool]] = []
+        ranges: defaultdict[tuple[str, ...], list[tuple[str, float]]] = defaultdict(
+            list
+        )
+        for path, op, value in conditions:
+            if op == "$eq":
+                # a frozenset, so it isn't taken for a range below
+                keys = self.hashes[path].postings.get(value, frozenset())
+                sources.append((len(keys), keys))
+                checks.append(keys.__contains__)
+            else:
+                try:
+                    ranges[path].append((op, float(value)))
+                except (TypeError, ValueError, OverflowError):
+                    return None
+        for path, ops in ranges.items():
+            ordered = self.sorted[path]
+            if ordered.invalid:
+                # comparing these raises, leave it to the scan
+                return None
+            lo, hi = ordered.range(ops)
+            sources.append((hi - lo, (ordered, lo, hi)))
+            checks.append(functools.partial(ordered.matches, ops=ops))
+        # start from the fewest keys, and check the other conditions on them
+        i = min(range(len(sources)), key=lambda i: sources[i][0])
+        source = sources[i][1]
+        if isinstance(source, tuple):
+            ordered, lo, hi = source
+            source = ordered.keys_between(lo, hi)
+        others = checks[:i] + checks[i + 1 :]
+        keys = [k for k in source if all(check(k) for check in others)]
+        keys.sort(key=self.order.__getitem__)
+        return keys
+
+
+class _HashIndex:
+    __slots__ = ("postings", "values")
+
+    def __init__(self) -> None:
+        # value -> keys of the items with that value
+        self.postings: dict[Any, set[str]] = {}
+        self.values: dict[str, Any] = {}
+
+    def add(self, key: str, value: Any) -> None:
+        # other values are never equal to the scalars looked up here
+        if _is_scalar(value):
+            self.postings.setdefault(value, set()).add(key)
+            self.values[key] = value
+
+    def remove(self, key: str) -> None:
+        if key in self.values:
+            value = self.values.pop(key)
+            keys = self.postings[value]
+            keys.discard(key)
+            if not keys:
+                del self.postings[value]
+
+
+class _SortedIndex:
+    __slots__ = ("numbers", "keys", "values", "invalid")
+
+    def __init__(self) -> None:
+        # values as numbers, sorted, and the keys of their items, sorted lazily
+        self.numbers: Optional[list[float]] = None
+        self.keys: list[str] = []
+        self.values: dict[str, float] = {}
+        # keys of the items with values that aren't numbers
+        self.invalid: set[str] = set()
+
+    def add(self, key: str, value: Any) -> None:
+        if value is _UNRESOLVED:
+            return
+        try:
+            number = float(value)
+        except (TypeError, ValueError, OverflowError):
+            self.invalid.add(key)
+            return
+        if number != number:
+            # NaN is neither greater nor less than anything
+            return
+        self.values[key] = number
+        if self.numbers is not None:
+            i = bisect_right(self.numbers, number)
+            self.numbers.insert(i, number)
+            self.keys.insert(i, key)
+
+    def remove(self, key: str) -> None:
+        self.invalid.discard(key)
+        number = self.values.pop(key, None)
+        if number is not None and self.numbers is not None:
+            lo = bisect_left(self.numbers, number)
+            i = self.keys.index(key, lo, bisect_right(self.numbers, number))
+            del self.numbers[i]
+            del self.keys[i]
+
+    def _sorted(self) -> list[float]:
+        if self.numbers is None:
+            pairs = sorted(zip(self.values.values(), self.values.keys()))
+            self.numbers = [number for number, _ in pairs]
+            self.keys = [key for _, key in pairs]
+        return self.numbers
+
+    def range(self, ops: list[tuple[str, float]]) -> tuple[int, int]:
+        """Positions of the first and past the last number matching all ops."""
+        numbers = self._sorted()
+        lo, hi = 0, len(numbers)
+        for op, bound in ops:
+            if bound != bound:
+                return 0, 0
+            if op == "$gt":
+                lo = max(lo, bisect_right(numbers, bound))
+            elif op == "$gte":
+                lo = max(lo, bisect_left(numbers, bound))
+            elif op == "$lt":
+                hi = min(hi, bisect_left(numbers, bound))
+            else:
+                hi = min(hi, bisect_right(numbers, bound))
+        return lo, max(lo, hi)
+
+    def keys_between(self, lo: int, hi: int) -> list[str]:
+        return self.keys[lo:hi]
+
+    def matches(self, key: str, ops: list[tuple[str, float]]) -> bool:
+        number = self.values.get(key)
+        return number is not None and all(
+            _RANGE_OPERATORS[op](number, bound) for op, bound in ops
+        )
+
+
+def _resolve(value: dict[str, Any], path: tuple[str, ...]) -> Any:
+    """The value at a path, as compared by filters."""
+    for key in path[:-1]:
+        value = value.get(key)
+        if not isinstance(value, dict):
+            return _UNRESOLVED
+    return value.get(path[-1])
+
+
+def _is_scalar(value: Any) -> bool:
+    return value is None or (
+        isinstance(value, (str, int, float)) and value == value  # not NaN
+    )
 
 
 @functools.lru_cache(maxsize=1)
@@ -486,6 +1078,345 @@ def _check_numpy() -> bool:
     return False
 
 
+class _VectorMatrix:
+    """Embeddings of one or more namespaces, normalized to unit length and
+    kept in a contiguous float32 matrix, with one row per embedded field."""
+
+    __slots__ = ("_vectors", "size", "fields", "rows", "_items", "ivf")
+
+    def __init__(self, dims: int, capacity: int = 16) -> None:
+        import numpy as np  # type: ignore[import-not-found]
+
+        self._vectors = np.zeros((capacity, dims), dtype=np.float32)
+        self.size = 0
+        # (namespace, key, path) of each row
+        self.fields: list[tuple[tuple[str, ...], str, str]] = []
+        self.rows: dict[tuple[tuple[str, ...], str, str], int] = {}
+        self._items: Optional[tuple[list[tuple[tuple[str, ...], str]], Any]] = None
+        self.ivf: Optional[_IVFIndex] = None
+
+    @property
+    def vectors(self) -> Any:
+        return self._vectors[: self.size]
+
+    @classmethod
+    def stack(cls, matrices: list["_VectorMatrix"]) -> "_VectorMatrix":
+        import numpy as np  # type: ignore[import-not-found]
+
+        stacked = cls.__new__(cls)
+        stacked._vectors = np.concatenate([m.vectors for m in matrices])
+        stacked.size = len(stacked._vectors)
+        stacked.fields = [f for m in matrices for f in m.fields]
+        stacked.rows = {}
+        stacked._items = None
+        stacked.ivf = None
+        return stacked
+
+    def put(
+        self, ns: tuple[str, ...], key: str, path: str, vector: list[float]
+    ) -> None:
+        import numpy as np  # type: ignore[import-not-found]
+
+        field = (ns, key, path)
+        row = self.rows.get(field)
+        if row is None:
+            if self.size == len(self._vectors):
+                grown = np.zeros(
+                    (2 * len(self._vectors), self._vectors.shape[1]), dtype=np.float32
+                )
+                grown[: self.size] = self._vectors
+                self._vectors = grown
+                if self.ivf is not None:
+                    self.ivf.grow(len(grown))
+            row = self.rows[field] = self.size
+            self.fields.append(field)
+            self.size += 1
+            self._items = None
+        v = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(v)
+        self._vectors[row] = v / norm if norm else 0
+        if self.ivf is not None:
+            self.ivf.put(row, self._vectors[row])
+
+    def delete(self, ns: tuple[str, ...], key: str, paths: Iterable[str]) -> None:
+        for path in paths:
+            row = self.rows.pop((ns, key, path), None)
+            if row is None:
+                continue
+            # move the last row into the gap
+            last = self.size - 1
+            if self.ivf is not None:
+                self.ivf.move(last, row)
+            if row != last:
+                self._vectors[row] = self._vectors[last]
+                moved = self.fields[row] = self.fields[last]
+                self.rows[moved] = row
+            self.fields.pop()
+            self.size -= 1
+        self._items = None
+
+    def train_ivf(self, nlist: int) -> None:
+        self.ivf = _IVFIndex.train(self.vectors, len(self._vectors), nlist)
+
+    def search(
+        self,
+        query: Any,
+        get_item: Callable[[tuple[str, ...], str], Optional[Item]],
+        allowed: Optional[set[int]],
+        k: int,
+        nprobe: int,
+    ) -> list[tuple[Optional[float], Item]]:
+        """Return the k items closest to a normalized query, searching the nprobe
+        closest lists of the IVF index."""
+        assert self.ivf is not None
+        scores, rows = self.ivf.search(query, nprobe)
+        found = self.top_k(scores, get_item, allowed, 0, k, rows)
+        if len(found) < k and len(found) < len(self._item_index()[0]):
+            # too few in these lists, eg. with a filter
+            found = self.top_k(self.vectors @ query, get_item, allowed, 0, k)
+        return found
+
+    def top_k(
+        self,
+        scores: Any,
+        get_item: Callable[[tuple[str, ...], str], Optional[Item]],
+        allowed: Optional[set[int]],
+        offset: int,
+        limit: int,
+        rows: Any = None,
+    ) -> list[tuple[Optional[float], Item]]:
+        """Return the items with the highest scores, where the score of an item is
+        the highest score of its rows. If `allowed` is given, only the items with
+        those ids are kept. If `rows` is given, scores are of those rows only."""
+        import numpy as np  # type: ignore[import-not-found]
+
+        items, item_of_row = self._item_index()
+        if rows is not None:
+            ids, inverse = np.unique(item_of_row[rows], return_inverse=True)
+            item_scores = np.full(len(ids), -np.inf, dtype=scores.dtype)
+            np.maximum.at(item_scores, inverse, scores)
+            items = [items[j] for j in ids.tolist()]
+        elif len(items) == self.size:
+            # one row per item, in the same order
+            item_scores = scores.copy()
+        else:
+            # max pooling
+            item_scores = np.full(len(items), -np.inf, dtype=scores.dtype)
+            np.maximum.at(item_scores, item_of_row, scores)
+        if allowed is not None:
+            excluded = np.fromiter(
+                (id(get_item(*item)) not in allowed for item in items),
+                dtype=bool,
+                count=len(items),
+            )
+            item_scores[excluded] = -np.inf
+            k = min(offset + limit, len(items) - int(np.count_nonzero(excluded)))
+        else:
+            k = min(offset + limit, len(items))
+        if k <= offset:
+            return []
+        top = np.argpartition(-item_scores, k - 1)[:k]
+        top = top[np.argsort(-item_scores[top], kind="stable")]
+        return [
+            (float(item_scores[j]), item)
+            for j in top[offset:]
+            if (item := get_item(*items[j])) is not None
+        ]
+
+    def _item_index(self) -> tuple[list[tuple[tuple[str, ...], str]], Any]:
+        if self._items is None:
+            import numpy as np  # type: ignore[import-not-found]
+
+            index: dict[tuple[tuple[str, ...], str], int] = {}
+            item_of_row = np.fromiter(
+                (index.setdefault((ns, key), len(index)) for ns, key, _ in self.fields),
+                dtype=np.intp,
+                count=self.size,
+            )
+            self._items = (list(index), item_of_row)
+        return self._items
+
+
+# lists are trained once a matrix has this many vectors per list
+_IVF_MIN_VECTORS_PER_LIST = 40
+
+
+class _IVFIndex:
+    """Rows of a `_VectorMatrix`, divided into lists by their closest centroid.
+    Each list keeps a copy of its vectors, so searching it reads them in order."""
+
+    __slots__ = ("centroids", "lists", "assigned", "slots")
+
+    def __init__(self, centroids: Any, capacity: int) -> None:
+        import numpy as np  # type: ignore[import-not-found]
+
+        self.centroids = centroids
+        self.lists = [_IVFList(centroids.shape[1]) for _ in range(len(centroids))]
+        # row -> list, -1 if none, and row -> position in the list
+        self.assigned = np.full(capacity, -1, dtype=np.intp)
+        self.slots = np.zeros(capacity, dtype=np.intp)
+
+    @classmethod
+    def train(cls, vectors: Any, capacity: int, nlist: int) -> "_IVFIndex":
+        """Train centroids on normalized vectors with spherical k-means, and
+        assign the vectors to lists."""
+        import numpy as np  # type: ignore[import-not-found]
+
+        index = cls(_kmeans(vectors, nlist), capacity)
+        closest = np.concatenate(
+            [
+                np.argmax(vectors[start : start + 8192] @ index.centroids.T, axis=1)
+                for start in range(0, len(vectors), 8192)
+            ]
+        )
+        order = np.argsort(closest, kind="stable")
+        bounds = np.searchsorted(closest[order], np.arange(len(index.lists) + 1))
+        for lst, ivf_list in enumerate(index.lists):
+            rows = order[bounds[lst] : bounds[lst + 1]]
+            ivf_list.vectors = vectors[rows]
+            ivf_list.rows = rows.copy()
+            ivf_list.size = len(rows)
+            index.slots[rows] = np.arange(len(rows))
+        index.assigned[: len(closest)] = closest
+        return index
+
+    def grow(self, capacity: int) -> None:
+        import numpy as np  # type: ignore[import-not-found]
+
+        for name in ("assigned", "slots"):
+            grown = np.full(capacity, -1, dtype=np.intp)
+            grown[: len(getattr(self, name))] = getattr(self, name)
+            setattr(self, name, grown)
+
+    def put(self, row: int, vector: Any) -> None:
+        import numpy as np  # type: ignore[import-not-found]
+
+        if self.assigned[row] >= 0:
+            self._remove(row)
+        closest = int(np.argmax(self.centroids @ vector))
+        self.assigned[row] = closest
+        self.slots[row] = self.lists[closest].append(row, vector)
+
+    def move(self, src: int, dst: int) -> None:
+        """Remove row dst, and move row src to take its place."""
+        self._remove(dst)
+        if src != dst:
+            lst, slot = self.assigned[src], self.slots[src]
+            self.lists[lst].rows[slot] = dst
+            self.assigned[dst], self.slots[dst] = lst, slot
+            self.assigned[src] = -1
+
+    def _remove(self, row: int) -> None:
+        slot = self.slots[row]
+        moved = self.lists[self.assigned[row]].remove(slot)
+        if moved is not None:
+            self.slots[moved] = slot
+        self.assigned[row] = -1
+
+    def search(self, query: Any, nprobe: int) -> tuple[Any, Any]:
+        """Scores and rows of the vectors in the nprobe lists closest to the
+        query."""
+        import numpy as np  # type: ignore[import-not-found]
+
+        scores = self.centroids @ query
+        nprobe = min(nprobe, len(scores))
+        closest = np.argpartition(-scores, nprobe - 1)[:nprobe]
+        lists = [self.lists[lst] for lst in closest]
+        return (
+            np.concatenate([lst.vectors[: lst.size] @ query for lst in lists]),
+            np.concatenate([lst.rows[: lst.size] for lst in lists]),
+        )
+
+
+class _IVFList:
+    __slots__ = ("vectors", "rows", "size")
+
+    def __init__(self, dims: int) -> None:
+        import numpy as np  # type: ignore[import-not-found]
+
+        self.vectors = np.zeros((0, dims), dtype=np.float32)
+        self.rows = np.zeros(0, dtype=np.intp)
+        self.size = 0
+
+    def append(self, row: int, vector: Any) -> int:
+        import numpy as np  # type: ignore[import-not-found]
+
+        if self.size == len(self.rows):
+            capacity = max(16, 2 * self.size)
+            vectors = np.zeros((capacity, self.vectors.shape[1]), dtype=np.float32)
+            vectors[: self.size] = self.vectors[: self.size]
+            rows = np.zeros(capacity, dtype=np.intp)
+            rows[: self.size] = self.rows[: self.size]
+            self.vectors, self.rows = vectors, rows
+        self.vectors[self.size] = vector
+        self.rows[self.size] = row
+        self.size += 1
+        return self.size - 1
+
+    def remove(self, slot: int) -> Optional[int]:
+        """Remove the vector at slot, moving the last one into the gap. Returns
+        the row of the moved vector, if any."""
+        last = self.size - 1
+        self.size = last
+        if slot == last:
+            return None
+        self.vectors[slot] = self.vectors[last]
+        moved = self.rows[slot] = self.rows[last]
+        return int(moved)
+
+
+def _kmeans(vectors: Any, k: int, iterations: int = 10) -> Any:
+    """Centroids of k clusters of normalized vectors, normalized."""
+    import numpy as np  # type: ignore[import-not-found]
+
+    rng = np.random.default_rng(0)
+    k = min(k, len(vectors))
+    # a sample is enough to place the centroids
+    sample = vectors[rng.choice(len(vectors), min(len(vectors), 64 * k), False)]
+    centroids = sample[rng.choice(len(sample), k, False)].copy()
+    for _ in range(iterations):
+        labels = np.argmax(sample @ centroids.T, axis=1)
+        order = np.argsort(labels, kind="stable")
+        clusters, starts = np.unique(labels[order], return_index=True)
+        # clusters left empty keep their centroid
+        centroids[clusters] = np.add.reduceat(sample[order], starts)
+        norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+        np.divide(centroids, norms, out=centroids, where=norms != 0)
+    return centroids
+
+
+def _top_k_python(
+    query_embedding: list[float],
+    candidates: list[tuple[Item, Optional[dict[str, list[float]]]]],
+    offset: int,
+    limit: int,
+) -> list[tuple[Optional[float], Item]]:
+    flat_items, flat_vectors = [], []
+    for item, vectors in candidates:
+        for vector in vectors.values() if vectors else ():
+            flat_items.append(item)
+            flat_vectors.append(vector)
+
+    scores = _cosine_similarity(query_embedding, flat_vectors)
+    sorted_results = sorted(zip(scores, flat_items), key=lambda x: x[0], reverse=True)
+    # max pooling
+    seen: set[tuple[tuple[str, ...], str]] = set()
+    kept: list[tuple[Optional[float], Item]] = []
+    for score, item in sorted_results:
+        key = (item.namespace, item.key)
+        if key in seen:
+            continue
+        ix = len(seen)
+        seen.add(key)
+        if ix >= offset + limit:
+            break
+        if ix < offset:
+            continue
+
+        kept.append((score, item))
+    return kept
+
+
 def _cosine_similarity(X: list[float], Y: list[list[float]]) -> list[float]:
     """
     Compute cosine similarity between a vector X and a matrix Y.
@@ -544,6 +1475,49 @@ def _does_match(match_condition: MatchCondition, key: tuple[str, ...]) -> bool:
         raise ValueError(f"Unsupported match type: {match_type}")
 
 
+def _plan_filter(
+    filter: dict[str, Any], paths: dict[tuple[str, ...], str]
+) -> tuple[list[_Condition], dict[str, Any]]:
+    """Split a filter into the conditions the value indexes can answer, and the
+    rest of the filter, to compare on the items the indexes matched."""
+    conditions: list[_Condition] = []
+    residual: dict[str, Any] = {}
+    for key, filter_value in filter.items():
+        if not _index_conditions((key,), filter_value, paths, conditions):
+            residual[key] = filter_value
+    return conditions, residual
+
+
+def _index_conditions(
+    path: tuple[str, ...],
+    filter_value: Any,
+    paths: dict[tuple[str, ...], str],
+    conditions: list[_Condition],
+) -> bool:
+    """Collect the conditions of a filter value the value indexes can answer.
+    Returns whether they match exactly the values `_compare_values` matches."""
+    kind = paths.get(path)
+    if isinstance(filter_value, dict):
+        if any(k.startswith("$") for k in filter_value):
+            exact = True
+            for op_key, op_value in filter_value.items():
+                if op_key == "$eq" and kind == "hash" and _is_scalar(op_value):
+                    conditions.append((path, op_key, op_value))
+                elif op_key in _RANGE_OPERATORS and kind == "sorted":
+                    conditions.append((path, op_key, op_value))
+                else:
+                    exact = False
+            return exact
+        exact = bool(filter_value)
+        for k, v in filter_value.items():
+            exact = _index_conditions((*path, k), v, paths, conditions) and exact
+        return exact
+    elif kind == "hash" and _is_scalar(filter_value):
+        conditions.append((path, "$eq", filter_value))
+        return True
+    return False
+
+
 def _compare_values(item_value: Any, filter_value: Any) -> bool:
     """Compare values in a JSONB-like way, handling nested objects."""
     if isinstance(filter_value, dict):
@@ -0,0 +1,154 @@
+import threading
+import time
+
+import pytest
+
+from langgraph.cache.memory import InMemoryCache
+
+
+def test_in_memory_cache_get_set_clear() -> None:
+    cache: InMemoryCache[int] = InMemoryCache()
+    cache.set({(("a",), "1"): (1, None), (("b",), "1"): (2, None)})
+
+    assert cache.get([(("a",), "1"), (("b",), "1"), (("a",), "2")]) == {
+        (("a",), "1"): 1,
+        (("b",), "1"): 2,
+    }
+    assert cache.total_entries == 2
+
+    cache.clear([("a",)])
+    assert cache.get([(("a",), "1"), (("b",), "1")]) == {(("b",), "1"): 2}
+    assert cache.total_entries == 1
+
+    cache.clear()
+    assert cache.get([(("b",), "1")]) == {}
+    assert cache.total_entries == 0
+    assert cache.total_bytes == 0
+
+
+def test_in_memory_cache_lru_per_namespace() -> None:
+    cache: InMemoryCache[int] = InMemoryCache(max_entries_per_namespace=2)
+    cache.set({(("a",), "1"): (1, None), (("a",), "2"): (2, None)})
+    cache.set({(("b",), "1"): (1, None)})
+    # use 1, so that 2 is the least recently used
+    cache.get([(("a",), "1")])
+    cache.set({(("a",), "3"): (3, None)})
+
+    assert cache.get([(("a",), "1"), (("a",), "2"), (("a",), "3")]) == {
+        (("a",), "1"): 1,
+        (("a",), "3"): 3,
+    }
+    # other namespaces are not affected
+    assert cache.get([(("b",), "1")]) == {(("b",), "1"): 1}
+    stats = cache.stats()
+    assert stats[("a",)].evictions == 1
+    assert stats[("a",)].entries == 2
+    assert stats[("a",)].hits == 3
+    assert stats[("a",)].misses == 1
+    assert stats[("b",)].evictions == 0
+
+
+def test_in_memory_cache_lfu_global() -> None:
+    cache: InMemoryCache[int] = InMemoryCache(max_entries=2, eviction="lfu")
+    cache.set({(("a",), "1"): (1, None), (("b",), "1"): (2, None)})
+    cache.get([(("a",), "1")])
+    cache.get([(("a",), "1")])
+    cache.get([(("b",), "1")])
+    cache.set({(("c",), "1"): (3, None)})
+    # b was used less often than a, and the new entry isn't evicted right away
+    cache.set({(("c",), "2"): (4, None)})
+
+    assert cache.get([(("a",), "1"), (("b",), "1"), (("c",), "1"), (("c",), "2")]) == {
+        (("a",), "1"): 1,
+        (("c",), "2"): 4,
+    }
+    assert cache.total_entries == 2
+    assert cache.stats([("b",)])[("b",)].evictions == 1
+
+
+def test_in_memory_cache_max_bytes() -> None:
+    cache: InMemoryCache[str] = InMemoryCache(max_bytes=100)
+    for i in range(10):
+        cache.set({(("a",), str(i)): ("x" * 20, None)})
+
+    assert cache.total_bytes <= 100
+    assert len(cache.get([(("a",), str(i)) for i in range(10)])) == cache.total_entries
+    # the most recent entries are kept
+    assert (("a",), "9") in cache.get([(("a",), "9")])
+
+    # values that can never fit are not cached
+    cache.set({(("a",), "big"): ("x" * 200, None)})
+    assert cache.get([(("a",), "big")]) == {}
+
+
+def test_in_memory_cache_overwrite_keeps_accounting() -> None:
+    cache: InMemoryCache[str] = InMemoryCache(max_entries_per_namespace=2)
+    cache.set({(("a",), "1"): ("x", None), (("a",), "2"): ("y", None)})
+    cache.set({(("a",), "1"): ("z" * 10, None)})
+
+    assert cache.get([(("a",), "1"), (("a",), "2")]) == {
+        (("a",), "1"): "z" * 10,
+        (("a",), "2"): "y",
+    }
+    assert cache.total_entries == 2
+    assert cache.total_bytes == cache.stats()[("a",)].bytes
+
+
+def test_in_memory_cache_expiry() -> None:
+    cache: InMemoryCache[int] = InMemoryCache()
+    cache.set({(("a",), "1"): (1, 0), (("a",), "2"): (2, None)})
+
+    assert cache.sweep() == 1
+    assert cache.total_entries == 1
+    assert cache.stats()[("a",)].expirations == 1
+    assert cache.get([(("a",), "1"), (("a",), "2")]) == {(("a",), "2"): 2}
+
+
+def test_in_memory_cache_sweeper() -> None:
+    cache: InMemoryCache[int] = InMemoryCache(sweep_interval=0.01)
+    try:
+        cache.set({(("a",), "1"): (1, 0)})
+        deadline = time.monotonic() + 5
+        while cache.total_entries and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert cache.total_entries == 0
+    finally:
+        cache.close()
+
+
+def test_in_memory_cache_invalid_eviction() -> None:
+    with pytest.raises(ValueError):
+        InMemoryCache(eviction="fifo")  # type: ignore[arg-type]
+
+
+def test_in_memory_cache_concurrent_access() -> None:
+    cache: InMemoryCache[int] = InMemoryCache(max_entries=50, shards=4)
+
+    def work(n: int) -> None:
+        for i in range(200):
+            cache.set({((f"ns{n}",), str(i)): (i, None)})
+            cache.get([((f"ns{n}",), str(i))])
+
+    threads = [threading.Thread(target=work, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = cache.stats()
+    # concurrent writers can each overshoot the global limit by one entry
+    assert cache.total_entries <= 50 + len(threads)
+    assert cache.total_entries == sum(s.entries for s in stats.values())
+    assert cache.total_bytes == sum(s.bytes for s in stats.values())
+
+
+def test_in_memory_cache_get_miss_does_not_create_namespace() -> None:
+    cache: InMemoryCache[int] = InMemoryCache()
+
+    assert cache.get([((f"ns{i}",), "1") for i in range(100)]) == {}
+    assert cache.stats() == {}
+
+    cache.set({(("a",), "1"): (1, None)})
+    assert cache.get([(("a",), "2")]) == {}
+    assert list(cache.stats()) == [("a",)]
+    assert cache.stats()[("a",)].misses == 1
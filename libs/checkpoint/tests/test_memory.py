@@ -1,15 +1,22 @@
-from typing import Any
+import asyncio
+from typing import Any, Optional
 
 import pytest
 from langchain_core.runnables import RunnableConfig
 
 from langgraph.checkpoint.base import (
+    BaseCheckpointSaver,
     Checkpoint,
     CheckpointMetadata,
+    CheckpointTuple,
+    LazyCheckpointTuple,
     create_checkpoint,
     empty_checkpoint,
 )
 from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.checkpoint.serde.dedupe import BlobDedupe
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from langgraph.checkpoint.serde.types import TASKS
 
 
 class TestMemorySaver:
@@ -143,6 +150,101 @@ class TestMemorySaver:
 
         # TODO: test before and limit params
 
+    def test_list_metadata(self) -> None:
+        saved = [
+            self.memory_saver.put(config, chkpnt, metadata, chkpnt["channel_versions"])
+            for config, chkpnt, metadata in (
+                (self.config_1, self.chkpnt_1, self.metadata_1),
+                (self.config_2, self.chkpnt_2, self.metadata_2),
+                (self.config_3, self.chkpnt_3, self.metadata_3),
+            )
+        ]
+        self.memory_saver.put_writes(saved[1], [("foo", "bar")], "task-1")
+
+        for filter in ({"source": "input"}, {"step": 1}, {}):
+            full = list(self.memory_saver.list(None, filter=filter))
+            lazy = list(self.memory_saver.list_metadata(None, filter=filter))
+            assert all(isinstance(t, LazyCheckpointTuple) for t in lazy)
+            assert [(t.config, t.metadata, t.parent_config) for t in lazy] == [
+                (t.config, t.metadata, t.parent_config) for t in full
+            ]
+            assert not any(t._hydrated for t in lazy)
+            # checkpoints and writes are loaded on first access
+            assert [(t.checkpoint, t.pending_writes) for t in lazy] == [
+                (t.checkpoint, t.pending_writes) for t in full
+            ]
+            assert [tuple(t) for t in lazy] == [tuple(t) for t in full]
+
+        lazy = list(
+            self.memory_saver.list_metadata(
+                {"configurable": {"thread_id": "thread-2", "checkpoint_ns": ""}},
+                limit=1,
+            )
+        )
+        assert len(lazy) == 1
+        assert lazy[0].pending_writes == [("task-1", "foo", "bar")]
+
+    async def test_get_tuples(self) -> None:
+        saved = [
+            self.memory_saver.put(config, chkpnt, metadata, chkpnt["channel_versions"])
+            for config, chkpnt, metadata in (
+                (self.config_1, self.chkpnt_1, self.metadata_1),
+                (self.config_2, self.chkpnt_2, self.metadata_2),
+                (self.config_3, self.chkpnt_3, self.metadata_3),
+            )
+        ]
+        self.memory_saver.put_writes(saved[1], [("foo", "bar")], "task-1")
+        configs: list[RunnableConfig] = [
+            {"configurable": {"thread_id": "thread-2"}},
+            saved[2],
+            {"configurable": {"thread_id": "thread-3"}},
+            saved[0],
+        ]
+        expected = [self.memory_saver.get_tuple(config) for config in configs]
+        assert expected[2] is None
+        assert expected[0] is not None
+        assert expected[0].pending_writes == [("task-1", "foo", "bar")]
+
+        # savers without their own implementation fan out to get_tuple
+        class FanOutSaver(BaseCheckpointSaver):
+            def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+                return memory_saver.get_tuple(config)
+
+            async def aget_tuple(
+                self, config: RunnableConfig
+            ) -> Optional[CheckpointTuple]:
+                return memory_saver.get_tuple(config)
+
+        memory_saver = self.memory_saver
+        for saver in (memory_saver, FanOutSaver()):
+            assert saver.get_tuples(configs) == expected
+            assert await saver.aget_tuples(configs) == expected
+            assert saver.get_tuples([]) == []
+
+    async def test_aput_writes_batch(self) -> None:
+        running = 0
+        max_running = 0
+
+        # savers without their own implementation store the tasks concurrently
+        class SlowSaver(InMemorySaver):
+            async def aput_writes(self, *args: Any, **kwargs: Any) -> None:
+                nonlocal running, max_running
+                running += 1
+                max_running = max(max_running, running)
+                await asyncio.sleep(0.01)
+                running -= 1
+                await super().aput_writes(*args, **kwargs)
+
+        saver = SlowSaver()
+        saved = saver.put(self.config_1, self.chkpnt_1, self.metadata_1, {})
+        await saver.aput_writes_batch(
+            saved, [([("foo", i)], f"task-{i}", "") for i in range(10)]
+        )
+        assert max_running == 10
+        tuple = await saver.aget_tuple(saved)
+        assert tuple is not None
+        assert sorted(w[2] for w in tuple.pending_writes) == list(range(10))
+
     async def test_asearch(self) -> None:
         # set up test
         # save checkpoints
@@ -208,3 +310,119 @@ def test_memory_saver() -> None:
     from langgraph.checkpoint.memory import MemorySaver
 
     assert isinstance(MemorySaver(), InMemorySaver)
+
+
+def test_memory_saver_dedupes_blobs() -> None:
+    saver = InMemorySaver()
+    config: RunnableConfig = {
+        "configurable": {"thread_id": "thread-1", "checkpoint_ns": ""}
+    }
+    messages = ["hello"] * 100
+
+    checkpoint = empty_checkpoint()
+    checkpoint["channel_values"] = {"messages": messages, "count": 1}
+    checkpoint["channel_versions"] = {"messages": 1, "count": 1}
+    saver.put(config, checkpoint, {}, {"messages": 1, "count": 1})
+    assert saver.blob_dedupe.stats.blobs == 2
+    first_step_bytes = saver.blob_dedupe.stats.last_step_bytes_written
+    assert first_step_bytes > 0
+
+    # a new version of messages, with the same content
+    checkpoint = create_checkpoint(checkpoint, None, 1)
+    checkpoint["channel_values"] = {"messages": list(messages), "count": 2}
+    checkpoint["channel_versions"] = {"messages": 2, "count": 2}
+    saver.put(config, checkpoint, {}, {"messages": 2, "count": 2})
+
+    stats = saver.blob_dedupe.stats
+    assert stats.steps == 2
+    assert stats.duplicates == 1
+    # only the count was written
+    assert 0 < stats.last_step_bytes_written < first_step_bytes
+    assert stats.bytes_written_per_step == stats.bytes_written / 2
+    # both versions share the same bytes
+    assert (
+        saver.blobs[("thread-1", "", "messages", 2)][1]
+        is saver.blobs[("thread-1", "", "messages", 1)][1]
+    )
+    assert saver.get(config)["channel_values"] == {"messages": messages, "count": 2}
+
+
+def test_memory_saver_indexes() -> None:
+    saver = InMemorySaver()
+    config: RunnableConfig = {
+        "configurable": {"thread_id": "thread-1", "checkpoint_ns": ""}
+    }
+    ids = []
+    for step in range(50):
+        config = saver.put(config, empty_checkpoint(), {"step": step}, {})
+        ids.append(config["configurable"]["checkpoint_id"])
+        if step == 10:
+            # sends are read from the parent, in task path order
+            saver.put_writes(config, [(TASKS, "b")], "task-2", "~1")
+            saver.put_writes(config, [(TASKS, "a"), ("foo", 1)], "task-1", "~0")
+            assert saver.get_tuple(config).pending_writes == [
+                ("task-2", TASKS, "b"),
+                ("task-1", TASKS, "a"),
+                ("task-1", "foo", 1),
+            ]
+
+    thread: RunnableConfig = {"configurable": {"thread_id": "thread-1"}}
+    assert saver.get_tuple(thread).config == config
+    page = list(saver.list(thread, before=_config(ids[30]), limit=5))
+    assert [c.config["configurable"]["checkpoint_id"] for c in page] == ids[29:24:-1]
+    assert saver.get_tuple(_config(ids[11])).checkpoint["pending_sends"] == ["a", "b"]
+    # sends written after they were first read are picked up
+    saver.put_writes(_config(ids[10]), [(TASKS, "c")], "task-0", "~0")
+    assert saver.get_tuple(_config(ids[11])).checkpoint["pending_sends"] == [
+        "c",
+        "a",
+        "b",
+    ]
+
+    # checkpoints stored without put() are indexed on next use
+    checkpoint = empty_checkpoint()
+    saver.storage["thread-1"][""][checkpoint["id"]] = (
+        saver.serde.dumps_typed(checkpoint),
+        saver.serde.dumps_typed({}),
+        ids[-1],
+    )
+    assert saver.get_tuple(thread).config == _config(checkpoint["id"])
+    assert len(list(saver.list(thread))) == 51
+
+    saver.delete_thread("thread-1")
+    assert saver.get_tuple(thread) is None
+    assert list(saver.list(None)) == []
+
+
+def _config(checkpoint_id: str) -> RunnableConfig:
+    return {
+        "configurable": {
+            "thread_id": "thread-1",
+            "checkpoint_ns": "",
+            "checkpoint_id": checkpoint_id,
+        }
+    }
+
+
+def test_blob_dedupe_detects_identical_versions() -> None:
+    dedupe = BlobDedupe(maxsize=1)
+    serde = JsonPlusSerializer()
+
+    first = dedupe.dumps_blobs(serde, "t", "", {"a": [1], "b": None}, {"a": 1})
+    again = dedupe.dumps_blobs(serde, "t", "", {"a": [1]}, {"a": 2, "c": 1})
+
+    assert first["a"].same_as is None
+    assert again["a"].same_as == 1
+    assert again["a"].data == first["a"].data
+    assert again["c"] is None
+    # later duplicates point at the version that was stored
+    third = dedupe.dumps_blobs(serde, "t", "", {"a": [1]}, {"a": 3})
+    assert third["a"].same_as == 1
+    assert dedupe.stats.duplicates == 2
+    assert dedupe.stats.last_step_bytes_written == 0
+    # only hashes are remembered, not values or bytes
+    assert all(isinstance(seen.digest, bytes) for seen in dedupe._seen.values())
+
+    # the least recently used channel is forgotten past maxsize
+    dedupe.dumps_blobs(serde, "t", "", {"b": 2}, {"b": 1})
+    assert dedupe.dumps_blobs(serde, "t", "", {"a": [1]}, {"a": 4})["a"].same_as is None
@@ -15,6 +15,7 @@ from langgraph.store.base import (
     Op,
     PutOp,
     Result,
+    SearchOp,
     get_text_at_path,
 )
 from langgraph.store.base.batch import AsyncBatchedBaseStore
@@ -347,6 +348,82 @@ def test_list_namespaces_no_conditions() -> None:
     assert sorted(result) == sorted(expected)
 
 
+def test_list_namespaces_index() -> None:
+    store = InMemoryStore()
+    for i in range(30):
+        store.put(("users", f"u{i:02d}", "memories"), "k", {"i": i})
+    store.put(("users", "u05", "prefs"), "k", {})
+    store.put(("users",), "k", {})
+
+    assert store.list_namespaces(prefix=("users",), max_depth=2, limit=3) == [
+        ("users",),
+        ("users", "u00"),
+        ("users", "u01"),
+    ]
+    assert store.list_namespaces(suffix=("prefs",)) == [("users", "u05", "prefs")]
+    assert store.list_namespaces(suffix=("memories",), offset=28) == [
+        ("users", "u28", "memories"),
+        ("users", "u29", "memories"),
+    ]
+    assert store.list_namespaces(prefix=("users", "*", "prefs")) == [
+        ("users", "u05", "prefs")
+    ]
+    assert [item.value for item in store.search(("users", "u05"))] == [{"i": 5}, {}]
+
+    # namespaces added to the underlying dict directly are picked up too
+    store._data[("admin",)] = {}
+    assert store.list_namespaces(max_depth=1) == [("admin",), ("users",)]
+
+
+def test_filter_indexes_match_scan() -> None:
+    indexed = InMemoryStore(
+        index={"filter_fields": {"color": "hash", "n": "sorted", "meta.r": "sorted"}}
+    )
+    plain = InMemoryStore()
+    for store in (indexed, plain):
+        for i in range(100):
+            value = {"color": ["red", "blue", None][i % 3], "n": (i * 37) % 100}
+            if i % 5:
+                value["meta"] = {"r": i % 7}
+            store.put(("docs", str(i % 2)), str(i), value)
+        store.put(("docs", "0"), "10", {"color": "blue", "n": 99.5, "meta": {"r": 1}})
+        store.delete(("docs", "1"), "11")
+
+    filters = [
+        {"color": "red"},
+        {"color": {"$eq": None}},
+        {"n": {"$gte": 20, "$lt": 60}},
+        {"color": "blue", "n": {"$gt": 50}},
+        {"meta": {"r": {"$lte": 2}}, "color": {"$ne": "red"}},
+        {"n": {"$gt": 90}, "missing": None},
+    ]
+    for filter in filters:
+        for prefix in [("docs",), ("docs", "0")]:
+            expected = [
+                (item.key, item.value)
+                for item in plain.search(prefix, filter=filter, limit=200)
+            ]
+            assert expected
+            assert [
+                (item.key, item.value)
+                for item in indexed.search(prefix, filter=filter, limit=200)
+            ] == expected
+    assert set(indexed._value_indexes) == {("docs", "0"), ("docs", "1")}
+
+    # vector search is only enabled with embeddings
+    assert indexed.embeddings is None
+
+
+def test_filter_indexes_no_match() -> None:
+    store = InMemoryStore(index={"filter_fields": {"status": "hash", "n": "sorted"}})
+    for i in range(32):
+        store.put(("docs",), str(i), {"status": "done", "n": i})
+
+    assert store.search(("docs",), filter={"status": "pending"}) == []
+    assert store.search(("docs",), filter={"status": "pending", "n": {"$gt": 3}}) == []
+    assert store.search(("docs",), filter={"status": "done", "n": {"$gt": 99}}) == []
+
+
 def test_list_namespaces_empty_store() -> None:
     store = InMemoryStore()
 
@@ -804,6 +881,94 @@ async def test_async_batched_vector_search_concurrent(
                         assert index <= value
 
 
+def test_vector_search_matches_python_scoring(
+    fake_embeddings: CharacterEmbeddings,
+) -> None:
+    """The embedding matrices give the same results as scoring each vector."""
+    store = InMemoryStore(
+        index={
+            "dims": fake_embeddings.dims,
+            "embed": fake_embeddings,
+            "fields": ["title", "body"],
+        }
+    )
+    assert store._matrices is not None
+    words = ["apple", "banana", "cherry", "dog", "egg", "fig", "grape", "hat"]
+    for i in range(60):
+        ns = ("docs", f"user{i % 3}")
+        # distinct texts, so that no two items tie
+        title, body = f"{words[i % 8]} {'z' * i}", f"{words[i * 3 % 8]} {'q' * i}"
+        value = {"title": title, "body": body, "n": i}
+        store.put(ns, f"doc{i}", value)
+    for i in range(0, 60, 7):
+        store.delete(("docs", f"user{i % 3}"), f"doc{i}")
+    store.put(("docs", "user0"), "plain", {"title": "apple", "n": -1}, index=False)
+
+    ops = [
+        SearchOp(("docs",), query="apple", limit=10),
+        SearchOp(("docs",), query="grape hat", limit=5, offset=3),
+        SearchOp(("docs", "user1"), query="cherry", limit=100),
+        SearchOp(("docs",), query="dog", filter={"n": {"$gt": 30}}, limit=7),
+        SearchOp(("docs", "user0"), query="apple", limit=100),
+        SearchOp(("other",), query="apple"),
+    ]
+    results = store.batch(ops)
+
+    # same store, scoring each vector in python
+    store._matrices = None
+    expected = store.batch(ops)
+    for result, exp in zip(results, expected):
+        assert [r.key for r in result] == [r.key for r in exp]
+        assert [r.score for r in result] == pytest.approx(
+            [r.score for r in exp], abs=1e-5
+        )
+    assert len(results[2]) == 17
+    assert results[4][-1].key == "plain" and results[4][-1].score is None
+    assert all(r.value["n"] > 30 for r in results[3])
+
+
+def test_vector_search_ivf_index(fake_embeddings: CharacterEmbeddings) -> None:
+    config = {"dims": fake_embeddings.dims, "embed": fake_embeddings}
+    exact = InMemoryStore(index=config)
+    # probing every list finds the same items as searching exactly
+    store = InMemoryStore(
+        index={**config, "ann_index_config": {"kind": "ivfflat", "nlist": 2}}
+    )
+    words = ["apple", "banana", "cherry", "dog", "egg", "fig", "grape", "hat"]
+    ops = [
+        SearchOp(("docs",), query="apple", limit=10),
+        SearchOp(("docs",), query="grape hat", limit=5, offset=3),
+        SearchOp(("docs", "big"), query="dog", filter={"n": {"$lt": 10}}, limit=5),
+    ]
+    for s in (exact, store):
+        for i in range(100):
+            value = {"text": f"{words[i % 8]} {'z' * i}", "n": i}
+            s.put(("docs", "big"), f"doc{i}", value)
+        for i in range(10):
+            s.put(("docs", "small"), f"doc{i}", {"text": f"{words[i % 8]} {'q' * i}"})
+
+    for _ in range(2):
+        results = store.batch(ops)
+        assert store._matrices is not None
+        assert store._matrices[("docs", "big")].ivf is not None
+        assert store._matrices[("docs", "small")].ivf is None
+        for result, expected in zip(results, exact.batch(ops)):
+            assert [r.key for r in result] == [r.key for r in expected]
+            assert [r.score for r in result] == pytest.approx(
+                [r.score for r in expected], abs=1e-5
+            )
+        # the index is kept up to date
+        for s in (exact, store):
+            for i in range(0, 100, 3):
+                s.delete(("docs", "big"), f"doc{i}")
+            for i in range(1, 100, 5):
+                s.put(("docs", "big"), f"doc{i}", {"text": f"hat {'y' * i}", "n": i})
+
+    # probing one list finds fewer of them
+    store._ann = (2, 1)
+    assert len(store.search(("docs", "big"), query="apple", limit=10)) == 10
+
+
 def test_vector_search_pagination(fake_embeddings: CharacterEmbeddings) -> None:
     """Test pagination with vector search."""
     store = InMemoryStore(
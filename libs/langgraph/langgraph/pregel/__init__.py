@@ -44,6 +44,7 @@ from langgraph.checkpoint.base import (
     BaseCheckpointSaver,
     Checkpoint,
     CheckpointTuple,
+    LazyCheckpointTuple,
     copy_checkpoint,
 )
 from langgraph.constants import (
@@ -82,8 +83,10 @@ from langgraph.errors import (
 )
 from langgraph.managed.base import ManagedValueSpec
 from langgraph.pregel.algo import (
+    ChannelUpdatePlan,
     PregelTaskWrites,
     apply_writes,
+    compile_channel_update_plan,
     local_read,
     prepare_next_tasks,
 )
@@ -108,6 +111,7 @@ from langgraph.types import (
     CachePolicy,
     Checkpointer,
     Interrupt,
+    LazyStateSnapshot,
     LoopProtocol,
     StateSnapshot,
     StateUpdate,
@@ -519,6 +523,8 @@ class Pregel(PregelProtocol):
 
     trigger_to_nodes: Mapping[str, Sequence[str]]
 
+    channel_update_plan: ChannelUpdatePlan | None
+
     def __init__(
         self,
         *,
@@ -543,6 +549,7 @@ class Pregel(PregelProtocol):
         input_model: type[BaseModel] | None = None,
         config: RunnableConfig | None = None,
         trigger_to_nodes: Mapping[str, Sequence[str]] | None = None,
+        channel_update_plan: ChannelUpdatePlan | None = None,
         name: str = "LangGraph",
     ) -> None:
         self.nodes = nodes
@@ -567,6 +574,7 @@ class Pregel(PregelProtocol):
         self.input_model = input_model
         self.config = config
         self.trigger_to_nodes = trigger_to_nodes or {}
+        self.channel_update_plan = channel_update_plan
         self.name = name
         if auto_validate:
             self.validate()
@@ -669,6 +677,7 @@ class Pregel(PregelProtocol):
             self.interrupt_before_nodes,
         )
         self.trigger_to_nodes = _trigger_to_nodes(self.nodes)
+        self.channel_update_plan = compile_channel_update_plan(self.channels)
         return self
 
     @property
@@ -921,6 +930,7 @@ class Pregel(PregelProtocol):
                     else None
                 ),
                 manager=None,
+                trigger_to_nodes=self.trigger_to_nodes,
             )
             # get the subgraphs
             subgraphs = dict(self.get_subgraphs())
@@ -1046,6 +1056,7 @@ class Pregel(PregelProtocol):
                     else None
                 ),
                 manager=None,
+                trigger_to_nodes=self.trigger_to_nodes,
             )
             # get the subgraphs
             subgraphs = {n: g async for n, g in self.aget_subgraphs()}
@@ -1211,8 +1222,14 @@ class Pregel(PregelProtocol):
         filter: dict[str, Any] | None = None,
         before: RunnableConfig | None = None,
         limit: int | None = None,
+        metadata_only: bool = False,
     ) -> Iterator[StateSnapshot]:
-        """Get the history of the state of the graph."""
+        """Get the history of the state of the graph.
+
+        With `metadata_only=True`, only the config, metadata and parent config of
+        each snapshot are fetched, and the other fields are loaded on first access.
+        Use it to page through long histories without loading every checkpoint.
+        """
         config = ensure_config(config)
         checkpointer: BaseCheckpointSaver | None = ensure_config(config)[CONF].get(
             CONFIG_KEY_CHECKPOINTER, self.checkpointer
@@ -1232,6 +1249,7 @@ class Pregel(PregelProtocol):
                     filter=filter,
                     before=before,
                     limit=limit,
+                    metadata_only=metadata_only,
                 )
                 return
             else:
@@ -1247,6 +1265,14 @@ class Pregel(PregelProtocol):
                 }
             },
         )
+        if metadata_only:
+            for checkpoint_tuple in list(
+                checkpointer.list_metadata(
+                    config, before=before, limit=limit, filter=filter
+                )
+            ):
+                yield self._lazy_state_snapshot(checkpoint_tuple)
+            return
         # eagerly consume list() to avoid holding up the db cursor
         for checkpoint_tuple in list(
             checkpointer.list(config, before=before, limit=limit, filter=filter)
@@ -1262,8 +1288,14 @@ class Pregel(PregelProtocol):
         filter: dict[str, Any] | None = None,
         before: RunnableConfig | None = None,
         limit: int | None = None,
+        metadata_only: bool = False,
     ) -> AsyncIterator[StateSnapshot]:
-        """Asynchronously get the history of the state of the graph."""
+        """Asynchronously get the history of the state of the graph.
+
+        With `metadata_only=True`, only the config, metadata and parent config of
+        each snapshot are fetched. Load the other fields with
+        `await snapshot.ahydrate()`.
+        """
         config = ensure_config(config)
         checkpointer: BaseCheckpointSaver | None = ensure_config(config)[CONF].get(
             CONFIG_KEY_CHECKPOINTER, self.checkpointer
@@ -1283,6 +1315,7 @@ class Pregel(PregelProtocol):
                     filter=filter,
                     before=before,
                     limit=limit,
+                    metadata_only=metadata_only,
                 ):
                     yield state
                 return
@@ -1299,6 +1332,15 @@ class Pregel(PregelProtocol):
                 }
             },
         )
+        if metadata_only:
+            for checkpoint_tuple in [
+                c
+                async for c in checkpointer.alist_metadata(
+                    config, before=before, limit=limit, filter=filter
+                )
+            ]:
+                yield self._lazy_state_snapshot(checkpoint_tuple)
+            return
         # eagerly consume list() to avoid holding up the db cursor
         for checkpoint_tuple in [
             c
@@ -1310,6 +1352,23 @@ class Pregel(PregelProtocol):
                 checkpoint_tuple.config, checkpoint_tuple
             )
 
+    def _lazy_state_snapshot(self, saved: CheckpointTuple) -> LazyStateSnapshot:
+        def load() -> StateSnapshot:
+            full = saved.hydrate() if isinstance(saved, LazyCheckpointTuple) else saved
+            return self._prepare_state_snapshot(full.config, full)
+
+        async def aload() -> StateSnapshot:
+            full = (
+                await saved.ahydrate()
+                if isinstance(saved, LazyCheckpointTuple)
+                else saved
+            )
+            return await self._aprepare_state_snapshot(full.config, full)
+
+        return LazyStateSnapshot(
+            saved.config, saved.metadata, saved.parent_config, load, aload
+        )
+
     def bulk_update_state(
         self,
         config: RunnableConfig,
@@ -1415,6 +1474,7 @@ class Pregel(PregelProtocol):
                             if isinstance(self.checkpointer, BaseCheckpointSaver)
                             else None,
                             manager=None,
+                            trigger_to_nodes=self.trigger_to_nodes,
                         )
                         # apply null writes
                         if null_writes := [
@@ -1591,6 +1651,7 @@ class Pregel(PregelProtocol):
                             else None
                         ),
                         manager=None,
+                        trigger_to_nodes=self.trigger_to_nodes,
                     )
                     # apply null writes
                     if null_writes := [
@@ -1843,6 +1904,7 @@ class Pregel(PregelProtocol):
                             if isinstance(self.checkpointer, BaseCheckpointSaver)
                             else None,
                             manager=None,
+                            trigger_to_nodes=self.trigger_to_nodes,
                         )
                         # apply null writes
                         if null_writes := [
@@ -2019,6 +2081,7 @@ class Pregel(PregelProtocol):
                             else None
                         ),
                         manager=None,
+                        trigger_to_nodes=self.trigger_to_nodes,
                     )
                     # apply null writes
                     if null_writes := [
@@ -2383,6 +2446,7 @@ class Pregel(PregelProtocol):
                 if checkpoint_during is not None
                 else config[CONF].get(CONFIG_KEY_CHECKPOINT_DURING, True),
                 trigger_to_nodes=self.trigger_to_nodes,
+                channel_update_plan=self.channel_update_plan,
                 migrate_checkpoint=self._migrate_checkpoint,
                 retry_policy=self.retry_policy,
                 cache_policy=self.cache_policy,
@@ -2611,6 +2675,7 @@ class Pregel(PregelProtocol):
                 if checkpoint_during is not None
                 else config[CONF].get(CONFIG_KEY_CHECKPOINT_DURING, True),
                 trigger_to_nodes=self.trigger_to_nodes,
+                channel_update_plan=self.channel_update_plan,
                 migrate_checkpoint=self._migrate_checkpoint,
                 retry_policy=self.retry_policy,
                 cache_policy=self.cache_policy,
@@ -25,6 +25,18 @@ from langchain_core.runnables.config import RunnableConfig
 from xxhash import xxh3_128_hexdigest
 
 from langgraph.channels.base import BaseChannel
+from langgraph.channels.binop import BinaryOperatorAggregate
+from langgraph.channels.dynamic_barrier_value import (
+    DynamicBarrierValue,
+    DynamicBarrierValueAfterFinish,
+)
+from langgraph.channels.last_value import LastValue, LastValueAfterFinish
+from langgraph.channels.named_barrier_value import (
+    NamedBarrierValue,
+    NamedBarrierValueAfterFinish,
+)
+from langgraph.channels.topic import Topic
+from langgraph.channels.untracked_value import UntrackedValue
 from langgraph.checkpoint.base import (
     BaseCheckpointSaver,
     ChannelVersions,
@@ -112,6 +124,55 @@ class PregelTaskWrites(NamedTuple):
     triggers: Sequence[str]
 
 
+# Channel types whose update(EMPTY_SEQ) is always a no-op returning False.
+# Matched on exact type, as subclasses may override update().
+STEP_NOOP_CHANNEL_TYPES: frozenset[type[BaseChannel]] = frozenset(
+    (
+        LastValue,
+        LastValueAfterFinish,
+        BinaryOperatorAggregate,
+        UntrackedValue,
+        NamedBarrierValue,
+        NamedBarrierValueAfterFinish,
+        DynamicBarrierValue,
+        DynamicBarrierValueAfterFinish,
+    )
+)
+
+
+class ChannelUpdatePlan(NamedTuple):
+    """Channels that apply_writes needs to notify at the end of a step, beyond
+    those written to. Computed once per graph, so that applying writes costs
+    O(writes) rather than O(channels) for graphs with many channels."""
+
+    on_step: tuple[str, ...]
+    """Channels that may change when notified of a new step with no updates,
+    eg. EphemeralValue, AnyValue, Topic without accumulate, or custom channels."""
+    on_finish: tuple[str, ...]
+    """Channels that implement finish(), eg. the *AfterFinish channels."""
+
+
+def compile_channel_update_plan(
+    specs: Mapping[str, Any],
+) -> ChannelUpdatePlan:
+    """Build the ChannelUpdatePlan for a graph from its channel specs.
+    Specs that aren't channels (eg. managed values) are ignored."""
+    on_step: list[str] = []
+    on_finish: list[str] = []
+    for name, spec in specs.items():
+        if not isinstance(spec, BaseChannel):
+            continue
+        cls = type(spec)
+        if cls not in STEP_NOOP_CHANNEL_TYPES and not (
+            cls is Topic and cast(Topic, spec).accumulate
+        ):
+            # includes custom channels, whose behavior we can't know ahead of time
+            on_step.append(name)
+        if cls.finish is not BaseChannel.finish:
+            on_finish.append(name)
+    return ChannelUpdatePlan(tuple(on_step), tuple(on_finish))
+
+
 class Call:
     __slots__ = ("func", "input", "retry", "cache_policy", "callbacks")
 
@@ -222,6 +283,7 @@ def apply_writes(
     tasks: Iterable[WritesProtocol],
     get_next_version: Optional[GetNextVersion],
     trigger_to_nodes: Mapping[str, Sequence[str]],
+    update_plan: Optional[ChannelUpdatePlan] = None,
 ) -> tuple[dict[str, list[Any]], set[str]]:
     """Apply writes from a set of tasks (usually the tasks from a Pregel step)
     to the checkpoint and channels, and return managed values writes to be applied
@@ -232,6 +294,10 @@ def apply_writes(
         channels: The channels to update.
         tasks: The tasks to apply writes from.
         get_next_version: Optional function to determine the next version of a channel.
+        trigger_to_nodes: Mapping of channel names to the set of nodes
+            that can be triggered by updates to that channel.
+        update_plan: Optional precompiled plan of the channels to notify of a new
+            step or of finishing. If not provided, all channels are notified.
 
     Returns:
         A tuple containing the managed values writes to be applied externally, and
@@ -240,20 +306,23 @@ def apply_writes(
     # sort tasks on path, to ensure deterministic order for update application
     # any path parts after the 3rd are ignored for sorting
     # (we use them for eg. task ids which aren't good for sorting)
-    tasks = sorted(tasks, key=lambda t: task_path_str(t.path[:3]))
+    if not isinstance(tasks, Sequence) or len(tasks) > 1:
+        tasks = sorted(tasks, key=lambda t: task_path_str(t.path[:3]))
     # if no task has triggers this is applying writes from the null task only
     # so we don't do anything other than update the channels written to
     bump_step = any(t.triggers for t in tasks)
 
     # update seen versions
+    # (replaced rather than updated in place, as they may be shared with snapshots)
     for task in tasks:
-        checkpoint["versions_seen"].setdefault(task.name, {}).update(
-            {
+        checkpoint["versions_seen"][task.name] = {
+            **checkpoint["versions_seen"].get(task.name, {}),
+            **{
                 chan: checkpoint["channel_versions"][chan]
                 for chan in task.triggers
                 if chan in checkpoint["channel_versions"]
-            }
-        )
+            },
+        }
 
     # Find the highest version of all channels
     if checkpoint["channel_versions"]:
@@ -262,6 +331,7 @@ def apply_writes(
         max_version = None
 
     # Consume all channels that were read
+    next_max_version = max_version
     for chan in {
         chan
         for task in tasks
@@ -269,10 +339,12 @@ def apply_writes(
         if chan not in RESERVED and chan in channels
     }:
         if channels[chan].consume() and get_next_version is not None:
-            checkpoint["channel_versions"][chan] = get_next_version(
-                max_version,
-                channels[chan],
-            )
+            version = get_next_version(max_version, channels[chan])
+            checkpoint["channel_versions"][chan] = version
+            # keep a running max, rather than recomputing it over all channels
+            if next_max_version is None or version > next_max_version:
+                next_max_version = version
+    max_version = next_max_version
 
     # clear pending sends
     if checkpoint["pending_sends"] and bump_step:
@@ -292,12 +364,6 @@ def apply_writes(
             else:
                 pending_writes_by_managed[chan].append(val)
 
-    # Find the highest version of all channels
-    if checkpoint["channel_versions"]:
-        max_version = max(checkpoint["channel_versions"].values())
-    else:
-        max_version = None
-
     # Apply writes to channels
     updated_channels: set[str] = set()
     for chan, vals in pending_writes_by_channel.items():
@@ -313,8 +379,12 @@ def apply_writes(
 
     # Channels that weren't updated in this step are notified of a new step
     if bump_step:
-        for chan in channels:
-            if channels[chan].is_available() and chan not in updated_channels:
+        for chan in update_plan.on_step if update_plan is not None else channels:
+            if (
+                chan in channels
+                and channels[chan].is_available()
+                and chan not in updated_channels
+            ):
                 if channels[chan].update(EMPTY_SEQ) and get_next_version is not None:
                     checkpoint["channel_versions"][chan] = get_next_version(
                         max_version,
@@ -330,8 +400,12 @@ def apply_writes(
         and not checkpoint["pending_sends"]
         and updated_channels.isdisjoint(trigger_to_nodes)
     ):
-        for chan in channels:
-            if channels[chan].finish() and get_next_version is not None:
+        for chan in update_plan.on_finish if update_plan is not None else channels:
+            if (
+                chan in channels
+                and channels[chan].finish()
+                and get_next_version is not None
+            ):
                 checkpoint["channel_versions"][chan] = get_next_version(
                     max_version,
                     channels[chan],
@@ -486,6 +560,13 @@ def prepare_next_tasks(
         candidate_nodes: Iterable[str] = sorted(triggered_nodes)
     elif not checkpoint["channel_versions"]:
         candidate_nodes = ()
+    elif trigger_to_nodes:
+        # When the updated channels are unknown (eg. when resuming from a
+        # checkpoint or after update_state), find the nodes with an unseen
+        # trigger version in one pass over the trigger channels, and keep the
+        # original node order.
+        dirty_nodes = _dirty_nodes(checkpoint, channels, trigger_to_nodes, null_version)
+        candidate_nodes = [name for name in processes if name in dirty_nodes]
     else:
         candidate_nodes = processes.keys()
 
@@ -644,9 +725,10 @@ def prepare_single_task(
         else:
             return PregelTask(task_id, name, task_path)
     elif task_path[0] == PUSH:
-        if len(task_path) == 2:
+        if len(task_path) == 2 or (len(task_path) == 3 and task_path[2] is False):
             # SEND tasks, executed in superstep n+1
-            # (PUSH, idx of pending send)
+            # (PUSH, idx of pending send), or the path of a task prepared
+            # from it, (PUSH, idx of pending send, False)
             idx = cast(int, task_path[1])
             if idx >= len(checkpoint["pending_sends"]):
                 return
@@ -685,7 +767,7 @@ def prepare_single_task(
         task_checkpoint_ns = f"{checkpoint_ns}:{task_id}"
         # we append False to the task path to indicate that a call is not being made
         # so we should return interrupts from this task
-        task_path = (*task_path[:3], False)
+        task_path = (*task_path[:2], False)
         metadata = {
             "langgraph_step": step,
             "langgraph_node": packet.node,
@@ -921,6 +1003,30 @@ def checkpoint_null_version(
     return None
 
 
+def _dirty_nodes(
+    checkpoint: Checkpoint,
+    channels: Mapping[str, BaseChannel],
+    trigger_to_nodes: Mapping[str, Sequence[str]],
+    null_version: Optional[V],
+) -> set[str]:
+    """Get the nodes that have at least one available trigger channel with a
+    version they haven't seen yet, ie. the nodes that `_triggers` would select."""
+    versions = checkpoint["channel_versions"]
+    versions_seen = checkpoint["versions_seen"]
+    dirty: set[str] = set()
+    for chan, node_ids in trigger_to_nodes.items():
+        if chan not in channels or not channels[chan].is_available():
+            continue
+        version = versions.get(chan, null_version)
+        for name in node_ids:
+            if name in dirty:
+                continue
+            seen = versions_seen.get(name)
+            if seen is None or version > seen.get(chan, null_version):  # type: ignore[operator]
+                dirty.add(name)
+    return dirty
+
+
 def _triggers(
     channels: Mapping[str, BaseChannel],
     versions: ChannelVersions,
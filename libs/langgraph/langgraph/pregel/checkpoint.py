@@ -3,7 +3,7 @@ from datetime import datetime, timezone
 from typing import Optional
 
 from langgraph.channels.base import BaseChannel
-from langgraph.checkpoint.base import Checkpoint
+from langgraph.checkpoint.base import ChannelVersions, Checkpoint
 from langgraph.checkpoint.base.id import uuid6
 from langgraph.constants import MISSING
 
@@ -28,15 +28,26 @@ def create_checkpoint(
     step: int,
     *,
     id: Optional[str] = None,
+    values_versions: Optional[ChannelVersions] = None,
 ) -> Checkpoint:
-    """Create a checkpoint for the given channels."""
+    """Create a checkpoint for the given channels.
+
+    If `values_versions` is given, it holds the channel versions at which
+    `checkpoint["channel_values"]` was last built. Channels still at that version
+    are unchanged, so their previous value is reused rather than read again."""
     ts = datetime.now(timezone.utc).isoformat()
     if channels is None:
         values = checkpoint["channel_values"]
     else:
         values = {}
+        versions = checkpoint["channel_versions"]
+        previous = checkpoint["channel_values"]
         for k in channels:
-            if k not in checkpoint["channel_versions"]:
+            if k not in versions:
+                continue
+            if values_versions is not None and values_versions.get(k) == versions[k]:
+                if k in previous:
+                    values[k] = previous[k]
                 continue
             v = channels[k].checkpoint()
             if v is not MISSING:
@@ -50,3 +61,21 @@ def create_checkpoint(
         versions_seen=checkpoint["versions_seen"],
         pending_sends=checkpoint.get("pending_sends", []),
     )
+
+
+def snapshot_checkpoint(checkpoint: Checkpoint) -> Checkpoint:
+    """Copy a checkpoint, to hand it off while the original keeps changing.
+
+    Unlike `copy_checkpoint`, the channel values and each node's versions seen are
+    shared with the original rather than copied. This relies on those never being
+    mutated in place: `create_checkpoint` builds a new `channel_values` dict, and
+    `apply_writes` replaces a node's versions seen instead of updating them."""
+    return Checkpoint(
+        v=checkpoint["v"],
+        ts=checkpoint["ts"],
+        id=checkpoint["id"],
+        channel_values=checkpoint["channel_values"],
+        channel_versions=checkpoint["channel_versions"].copy(),
+        versions_seen=checkpoint["versions_seen"].copy(),
+        pending_sends=checkpoint.get("pending_sends", []).copy(),
+    )
@@ -38,7 +38,6 @@ from langgraph.checkpoint.base import (
     CheckpointMetadata,
     CheckpointTuple,
     PendingWrite,
-    copy_checkpoint,
 )
 from langgraph.constants import (
     CONF,
@@ -80,6 +79,7 @@ from langgraph.managed.base import (
 )
 from langgraph.pregel.algo import (
     Call,
+    ChannelUpdatePlan,
     GetNextVersion,
     PregelTaskWrites,
     apply_writes,
@@ -90,7 +90,11 @@ from langgraph.pregel.algo import (
     should_interrupt,
     task_path_str,
 )
-from langgraph.pregel.checkpoint import create_checkpoint, empty_checkpoint
+from langgraph.pregel.checkpoint import (
+    create_checkpoint,
+    empty_checkpoint,
+    snapshot_checkpoint,
+)
 from langgraph.pregel.debug import (
     map_debug_checkpoint,
     map_debug_task_results,
@@ -227,6 +231,7 @@ class PregelLoop(LoopProtocol):
         retry_policy: Sequence[RetryPolicy] = (),
         cache_policy: Optional[CachePolicy] = None,
         checkpoint_during: bool = True,
+        channel_update_plan: Optional[ChannelUpdatePlan] = None,
     ) -> None:
         super().__init__(
             step=0,
@@ -253,6 +258,7 @@ class PregelLoop(LoopProtocol):
         )
         self._migrate_checkpoint = migrate_checkpoint
         self.trigger_to_nodes = trigger_to_nodes
+        self.channel_update_plan = channel_update_plan
         self.retry_policy = retry_policy
         self.cache_policy = cache_policy
         self.checkpoint_during = checkpoint_during
@@ -336,25 +342,7 @@ class PregelLoop(LoopProtocol):
                     CONFIG_KEY_CHECKPOINT_ID: self.checkpoint["id"],
                 },
             )
-            if self.checkpointer_put_writes_accepts_task_path:
-                if hasattr(self, "tasks"):
-                    task = self.tasks.get(task_id)
-                else:
-                    task = None
-                self.submit(
-                    self.checkpointer_put_writes,
-                    config,
-                    writes,
-                    task_id,
-                    task_path_str(task.path) if task else "",
-                )
-            else:
-                self.submit(
-                    self.checkpointer_put_writes,
-                    config,
-                    writes,
-                    task_id,
-                )
+            self._put_task_writes(config, writes, task_id)
         # output writes
         if hasattr(self, "tasks"):
             self.output_writes(task_id, writes)
@@ -380,24 +368,27 @@ class PregelLoop(LoopProtocol):
             by_task[task_id].append((channel, value))
         # submit writes to checkpointer
         for task_id, writes in by_task.items():
-            if self.checkpointer_put_writes_accepts_task_path and hasattr(
-                self, "tasks"
-            ):
-                task = self.tasks.get(task_id)
-                self.submit(
-                    self.checkpointer_put_writes,
-                    config,
-                    writes,
-                    task_id,
-                    task_path_str(task.path) if task else "",
-                )
-            else:
-                self.submit(
-                    self.checkpointer_put_writes,
-                    config,
-                    writes,
-                    task_id,
-                )
+            self._put_task_writes(config, writes, task_id)
+
+    def _put_task_writes(
+        self, config: RunnableConfig, writes: WritesT, task_id: str
+    ) -> None:
+        if self.checkpointer_put_writes_accepts_task_path:
+            task = self.tasks.get(task_id) if hasattr(self, "tasks") else None
+            self.submit(
+                self.checkpointer_put_writes,
+                config,
+                writes,
+                task_id,
+                task_path_str(task.path) if task else "",
+            )
+        else:
+            self.submit(
+                self.checkpointer_put_writes,
+                config,
+                writes,
+                task_id,
+            )
 
     def accept_push(
         self, task: PregelExecutableTask, write_idx: int, call: Optional[Call] = None
@@ -497,6 +488,7 @@ class PregelLoop(LoopProtocol):
                 self.tasks.values(),
                 self.checkpointer_get_next_version,
                 self.trigger_to_nodes,
+                self.channel_update_plan,
             )
             # apply writes to managed values
             for key, values in mv_writes.items():
@@ -702,16 +694,20 @@ class PregelLoop(LoopProtocol):
                 [PregelTaskWrites((), INPUT, null_writes, [])],
                 self.checkpointer_get_next_version,
                 self.trigger_to_nodes,
+                self.channel_update_plan,
             )
             for key, values in mv_writes.items():
                 self._update_mv(key, values)
         # proceed past previous checkpoint
         if is_resuming:
-            self.checkpoint["versions_seen"].setdefault(INTERRUPT, {})
-            for k in self.channels:
-                if k in self.checkpoint["channel_versions"]:
-                    version = self.checkpoint["channel_versions"][k]
-                    self.checkpoint["versions_seen"][INTERRUPT][k] = version
+            self.checkpoint["versions_seen"][INTERRUPT] = {
+                **self.checkpoint["versions_seen"].get(INTERRUPT, {}),
+                **{
+                    k: self.checkpoint["channel_versions"][k]
+                    for k in self.channels
+                    if k in self.checkpoint["channel_versions"]
+                },
+            }
             # produce values output
             self._emit(
                 "values", map_output_values, self.output_keys, True, self.channels
@@ -744,6 +740,7 @@ class PregelLoop(LoopProtocol):
                 store=None,
                 checkpointer=None,
                 manager=None,
+                trigger_to_nodes=self.trigger_to_nodes,
             )
             # apply input writes
             mv_writes, updated_channels = apply_writes(
@@ -755,6 +752,7 @@ class PregelLoop(LoopProtocol):
                 ],
                 self.checkpointer_get_next_version,
                 self.trigger_to_nodes,
+                self.channel_update_plan,
             )
             assert not mv_writes, "Can't write to SharedValues in graph input"
             # save input checkpoint
@@ -811,6 +809,7 @@ class PregelLoop(LoopProtocol):
             self.channels if do_checkpoint else None,
             self.step,
             id=self.checkpoint["id"] if exiting else None,
+            values_versions=self.checkpoint_previous_versions,
         )
         # bail if no checkpointer
         if do_checkpoint and self._checkpointer_put_after_previous is not None:
@@ -850,7 +849,7 @@ class PregelLoop(LoopProtocol):
                 self._checkpointer_put_after_previous,
                 getattr(self, "_put_checkpoint_fut", None),
                 self.checkpoint_config,
-                copy_checkpoint(self.checkpoint),
+                snapshot_checkpoint(self.checkpoint),
                 self.checkpoint_metadata,
                 new_versions,
             )
@@ -893,6 +892,7 @@ class PregelLoop(LoopProtocol):
                     self.tasks.values(),
                     self.checkpointer_get_next_version,
                     self.trigger_to_nodes,
+                    self.channel_update_plan,
                 )
                 for key, values in mv_writes.items():
                     self._update_mv(key, values)
@@ -1004,6 +1004,7 @@ class SyncPregelLoop(PregelLoop, AbstractContextManager):
         retry_policy: Sequence[RetryPolicy] = (),
         cache_policy: Optional[CachePolicy] = None,
         checkpoint_during: bool = True,
+        channel_update_plan: Optional[ChannelUpdatePlan] = None,
     ) -> None:
         super().__init__(
             input,
@@ -1026,6 +1027,7 @@ class SyncPregelLoop(PregelLoop, AbstractContextManager):
             retry_policy=retry_policy,
             cache_policy=cache_policy,
             checkpoint_during=checkpoint_during,
+            channel_update_plan=channel_update_plan,
         )
         self.stack = ExitStack()
         if checkpointer:
@@ -1178,6 +1180,11 @@ class SyncPregelLoop(PregelLoop, AbstractContextManager):
 
 
 class AsyncPregelLoop(PregelLoop, AbstractAsyncContextManager):
+    put_writes_batch_size: int = 100
+    """Maximum number of tasks whose writes are buffered before they are stored."""
+    put_writes_batch_delay: float = 0.005
+    """Maximum time, in seconds, a task's writes are buffered before they are stored."""
+
     def __init__(
         self,
         input: Optional[Any],
@@ -1201,6 +1208,7 @@ class AsyncPregelLoop(PregelLoop, AbstractAsyncContextManager):
         retry_policy: Sequence[RetryPolicy] = (),
         cache_policy: Optional[CachePolicy] = None,
         checkpoint_during: bool = True,
+        channel_update_plan: Optional[ChannelUpdatePlan] = None,
     ) -> None:
         super().__init__(
             input,
@@ -1223,8 +1231,11 @@ class AsyncPregelLoop(PregelLoop, AbstractAsyncContextManager):
             retry_policy=retry_policy,
             cache_policy=cache_policy,
             checkpoint_during=checkpoint_during,
+            channel_update_plan=channel_update_plan,
         )
         self.stack = AsyncExitStack()
+        self._put_writes_buffer: list[tuple[RunnableConfig, WritesT, str, str]] = []
+        self._put_writes_timer: Optional[asyncio.Future] = None
         if checkpointer:
             self.checkpointer_get_next_version = checkpointer.get_next_version
             self.checkpointer_put_writes = checkpointer.aput_writes
@@ -1232,11 +1243,18 @@ class AsyncPregelLoop(PregelLoop, AbstractAsyncContextManager):
                 signature(checkpointer.aput_writes).parameters.get("task_path")
                 is not None
             )
+            # only worth buffering if the checkpointer stores a batch at once
+            self.checkpointer_put_writes_batched = (
+                self.checkpointer_put_writes_accepts_task_path
+                and type(checkpointer).aput_writes_batch
+                is not BaseCheckpointSaver.aput_writes_batch
+            )
         else:
             self.checkpointer_get_next_version = increment
             self._checkpointer_put_after_previous = None  # type: ignore[assignment]
             self.checkpointer_put_writes = None
             self.checkpointer_put_writes_accepts_task_path = False
+            self.checkpointer_put_writes_batched = False
 
     async def _checkpointer_put_after_previous(
         self,
@@ -1254,6 +1272,70 @@ class AsyncPregelLoop(PregelLoop, AbstractAsyncContextManager):
                 config, checkpoint, metadata, new_versions
             )
 
+    def _put_task_writes(
+        self, config: RunnableConfig, writes: WritesT, task_id: str
+    ) -> None:
+        if not self.checkpointer_put_writes_batched:
+            return super()._put_task_writes(config, writes, task_id)
+        # buffer writes, to store those of many tasks in one call to the checkpointer
+        task = self.tasks.get(task_id) if hasattr(self, "tasks") else None
+        self._put_writes_buffer.append(
+            (config, writes, task_id, task_path_str(task.path) if task else "")
+        )
+        if len(self._put_writes_buffer) >= self.put_writes_batch_size:
+            self._flush_put_writes()
+        elif self._put_writes_timer is None:
+            self._put_writes_timer = self.submit(
+                self._flush_put_writes_later,
+                __cancel_on_exit__=True,
+                __reraise_on_exit__=False,
+            )
+
+    async def _flush_put_writes_later(self) -> None:
+        await asyncio.sleep(self.put_writes_batch_delay)
+        self._flush_put_writes()
+
+    def _flush_put_writes(self) -> None:
+        self._put_writes_timer = None
+        if not self._put_writes_buffer:
+            return
+        batch, self._put_writes_buffer = self._put_writes_buffer, []
+        # chain the writes with checkpoint saves, so that they are stored
+        # after the checkpoint they belong to and before the next one
+        self._put_checkpoint_fut = self.submit(
+            self._checkpointer_put_writes_after_previous,
+            getattr(self, "_put_checkpoint_fut", None),
+            batch,
+        )
+
+    async def _checkpointer_put_writes_after_previous(
+        self,
+        prev: Optional[asyncio.Task],
+        batch: list[tuple[RunnableConfig, WritesT, str, str]],
+    ) -> None:
+        try:
+            if prev is not None:
+                await prev
+        finally:
+            by_checkpoint: dict[tuple[str, str], tuple[RunnableConfig, list]] = {}
+            for config, writes, task_id, task_path in batch:
+                key = (
+                    config[CONF][CONFIG_KEY_CHECKPOINT_NS],
+                    config[CONF][CONFIG_KEY_CHECKPOINT_ID],
+                )
+                if key not in by_checkpoint:
+                    by_checkpoint[key] = (config, [])
+                by_checkpoint[key][1].append((writes, task_id, task_path))
+            for config, tasks in by_checkpoint.values():
+                await cast(BaseCheckpointSaver, self.checkpointer).aput_writes_batch(
+                    config, tasks
+                )
+
+    def _put_checkpoint(self, metadata: CheckpointMetadata) -> None:
+        # buffered writes must be stored before the checkpoint that follows them
+        self._flush_put_writes()
+        super()._put_checkpoint(metadata)
+
     def _update_mv(self, key: str, values: Sequence[Any]) -> None:
         managed_value = self.managed.get(key)
         if managed_value is None:
@@ -1358,6 +1440,8 @@ class AsyncPregelLoop(PregelLoop, AbstractAsyncContextManager):
         self.submit = await self.stack.enter_async_context(
             AsyncBackgroundExecutor(self.config)
         )
+        # store buffered writes before waiting for background tasks on exit
+        self.stack.callback(self._flush_put_writes)
         self.channels, self.managed = await self.stack.enter_async_context(
             AsyncChannelsManager(self.specs, self.checkpoint, self)
         )
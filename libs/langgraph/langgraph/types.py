@@ -1,7 +1,7 @@
 import dataclasses
 import sys
 from collections import deque
-from collections.abc import Hashable, Sequence
+from collections.abc import Awaitable, Hashable, Iterator, Sequence
 from typing import (
     TYPE_CHECKING,
     Any,
@@ -230,6 +230,74 @@ class StateSnapshot(NamedTuple):
     """Interrupts that occurred in this step that are pending resolution."""
 
 
+class LazyStateSnapshot(StateSnapshot):
+    """Snapshot of the state of the graph, listed with only its config, metadata and
+    parent config.
+
+    Returned by `get_state_history(..., metadata_only=True)`. The other fields are
+    loaded from the checkpointer the first time they are accessed. Accessing them
+    is a synchronous call to the checkpointer, so in async code use
+    `await snapshot.ahydrate()` instead.
+    """
+
+    def __new__(
+        cls,
+        config: RunnableConfig,
+        metadata: Optional[CheckpointMetadata],
+        parent_config: Optional[RunnableConfig],
+        load: Callable[[], StateSnapshot],
+        aload: Callable[[], Awaitable[StateSnapshot]],
+    ) -> "LazyStateSnapshot":
+        self = super().__new__(
+            cls, None, (), config, metadata, None, parent_config, (), ()
+        )
+        self._load = load
+        self._aload = aload
+        self._hydrated: Optional[StateSnapshot] = None
+        return self
+
+    def hydrate(self) -> StateSnapshot:
+        """Load the full state snapshot, once."""
+        if self._hydrated is None:
+            self._hydrated = self._load()
+        return self._hydrated
+
+    async def ahydrate(self) -> StateSnapshot:
+        """Asynchronously load the full state snapshot, once."""
+        if self._hydrated is None:
+            self._hydrated = await self._aload()
+        return self._hydrated
+
+    @property  # type: ignore[override]
+    def values(self) -> Union[dict[str, Any], Any]:
+        return self.hydrate().values
+
+    @property  # type: ignore[override]
+    def next(self) -> tuple[str, ...]:
+        return self.hydrate().next
+
+    @property  # type: ignore[override]
+    def created_at(self) -> Optional[str]:
+        return self.hydrate().created_at
+
+    @property  # type: ignore[override]
+    def tasks(self) -> tuple[PregelTask, ...]:
+        return self.hydrate().tasks
+
+    @property  # type: ignore[override]
+    def interrupts(self) -> tuple[Interrupt, ...]:
+        return self.hydrate().interrupts
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self.hydrate())
+
+    def __getitem__(self, index: Any) -> Any:
+        return self.hydrate()[index]
+
+    def _replace(self, **kwargs: Any) -> StateSnapshot:
+        return self.hydrate()._replace(**kwargs)
+
+
 class Send:
     """A message or packet to send to a specific node in the graph.
 
@@ -1,6 +1,22 @@
-from langgraph.checkpoint.base import empty_checkpoint
+import operator
+
+from langgraph.channels.binop import BinaryOperatorAggregate
+from langgraph.channels.ephemeral_value import EphemeralValue
+from langgraph.channels.last_value import LastValue, LastValueAfterFinish
+from langgraph.channels.topic import Topic
+from langgraph.checkpoint.base import copy_checkpoint, empty_checkpoint
 from langgraph.constants import PULL, PUSH
-from langgraph.pregel.algo import prepare_next_tasks, task_path_str
+from langgraph.managed.is_last_step import IsLastStep
+from langgraph.pregel import Channel, _trigger_to_nodes
+from langgraph.pregel.algo import (
+    PregelTaskWrites,
+    apply_writes,
+    compile_channel_update_plan,
+    increment,
+    prepare_next_tasks,
+    task_path_str,
+)
+from langgraph.pregel.checkpoint import create_checkpoint, snapshot_checkpoint
 from langgraph.pregel.manager import ChannelsManager
 
 
@@ -64,3 +80,145 @@ def test_tuple_str() -> None:
         f"~{PUSH}, ~{PUSH}, 0000000002, 0000000001",
         f"~{PUSH}, ~{PUSH}, ~{PUSH}, 0000000002, 0000000001, 0000000003",
     ]
+
+
+def test_compile_channel_update_plan() -> None:
+    plan = compile_channel_update_plan(
+        {
+            "value": LastValue(int),
+            "after_finish": LastValueAfterFinish(int),
+            "total": BinaryOperatorAggregate(int, operator.add),
+            "ephemeral": EphemeralValue(int),
+            "topic": Topic(int),
+            "accumulated_topic": Topic(int, accumulate=True),
+            "is_last_step": IsLastStep,
+        }
+    )
+
+    assert plan.on_step == ("ephemeral", "topic")
+    assert plan.on_finish == ("after_finish",)
+
+
+def test_apply_writes_with_update_plan() -> None:
+    specs = {
+        "value": LastValue(int),
+        "after_finish": LastValueAfterFinish(int),
+        "total": BinaryOperatorAggregate(int, operator.add),
+        "ephemeral": EphemeralValue(int),
+        "topic": Topic(int),
+    }
+    plan = compile_channel_update_plan(specs)
+    steps = [
+        [PregelTaskWrites((PULL, "a"), "a", [("ephemeral", 1), ("topic", 1)], [])],
+        [
+            PregelTaskWrites(
+                (PULL, "b"), "b", [("after_finish", 2), ("total", 2)], ["ephemeral"]
+            ),
+            PregelTaskWrites((PULL, "a"), "a", [("value", 3)], ["topic"]),
+        ],
+        [PregelTaskWrites((PULL, "c"), "c", [], ["value"])],
+    ]
+
+    results = []
+    for update_plan in (None, plan):
+        checkpoint = empty_checkpoint()
+        with ChannelsManager(specs, checkpoint, {}) as (channels, _):
+            updated = [
+                apply_writes(
+                    checkpoint,
+                    channels,
+                    tasks,
+                    increment,
+                    {"value": ["c"]},
+                    update_plan,
+                )[1]
+                for tasks in steps
+            ]
+            values = {k: v.get() for k, v in channels.items() if v.is_available()}
+        results.append((updated, values, copy_checkpoint(checkpoint)))
+
+    # the plan skips no-op channels, but must produce the same result
+    assert results[0][0] == results[1][0]
+    assert results[0][1] == results[1][1]
+    assert results[0][2]["channel_versions"] == results[1][2]["channel_versions"]
+    assert results[0][2]["versions_seen"] == results[1][2]["versions_seen"]
+    assert results[1][1] == {"value": 3, "after_finish": 2, "total": 2}
+
+
+def test_prepare_next_tasks_without_updated_channels() -> None:
+    specs = {f"c{i}": LastValue(int) for i in range(6)}
+    processes = {
+        # reversed, so that the node order differs from the sorted order
+        f"n{i}": Channel.subscribe_to([f"c{i}", f"c{(i + 1) % 6}"])
+        for i in reversed(range(6))
+    }
+    checkpoint = empty_checkpoint()
+    checkpoint["channel_values"] = {"c0": 0, "c1": 1, "c3": 3, "c4": 4}
+    checkpoint["channel_versions"] = {"c0": 2, "c1": 3, "c3": 1, "c4": 4}
+    checkpoint["versions_seen"] = {
+        "n0": {"c0": 2, "c1": 3},  # seen everything
+        "n1": {"c1": 3},  # c2 was never written
+        "n2": {"c3": 1},  # seen everything
+        "n3": {"c3": 1, "c4": 3},  # c4 has a newer version
+        # n4 and n5 have never run
+    }
+
+    with ChannelsManager(specs, checkpoint, {}) as (channels, managed):
+        tasks = [
+            prepare_next_tasks(
+                checkpoint,
+                [],
+                processes,
+                channels,
+                managed,
+                {},
+                1,
+                for_execution=False,
+                trigger_to_nodes=trigger_to_nodes,
+            )
+            for trigger_to_nodes in (None, _trigger_to_nodes(processes))
+        ]
+
+    # the trigger index selects the same tasks, in the same order
+    assert [t.name for t in tasks[0].values()] == ["n5", "n4", "n3"]
+    assert list(tasks[0]) == list(tasks[1])
+
+
+def test_create_checkpoint_reuses_unchanged_values() -> None:
+    specs = {"a": LastValue(list), "b": LastValue(list)}
+    checkpoint = empty_checkpoint()
+    with ChannelsManager(specs, checkpoint, {}) as (channels, _):
+        apply_writes(
+            checkpoint,
+            channels,
+            [PregelTaskWrites((), "__input__", [("a", [1]), ("b", [2])], [])],
+            increment,
+            {},
+        )
+        checkpoint = create_checkpoint(checkpoint, channels, 0)
+        saved = snapshot_checkpoint(checkpoint)
+        saved_versions = checkpoint["channel_versions"].copy()
+
+        apply_writes(
+            checkpoint,
+            channels,
+            [PregelTaskWrites((PULL, "n"), "n", [("b", [3])], ["a"])],
+            increment,
+            {},
+        )
+        # the snapshot isn't affected by the next step
+        assert saved["channel_versions"] == saved_versions
+        assert saved["versions_seen"] == {"__input__": {}}
+
+        next_checkpoint = create_checkpoint(
+            checkpoint, channels, 1, values_versions=saved_versions
+        )
+
+    assert next_checkpoint["channel_values"] == {"a": [1], "b": [3]}
+    # unchanged channels share their value with the previous checkpoint
+    assert next_checkpoint["channel_values"]["a"] is saved["channel_values"]["a"]
+    assert saved["channel_values"] == {"a": [1], "b": [2]}
+    assert next_checkpoint["versions_seen"] == {
+        "__input__": {},
+        "n": {"a": saved_versions["a"]},
+    }
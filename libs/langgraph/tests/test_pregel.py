@@ -61,6 +61,7 @@ from langgraph.types import (
     CachePolicy,
     Command,
     Interrupt,
+    LazyStateSnapshot,
     PregelTask,
     Send,
     StateUpdate,
@@ -748,6 +749,40 @@ def test_run_from_checkpoint_id_retains_previous_writes(
     assert _get_tasks(new_history, 1) == _get_tasks(history, 0)
 
 
+def test_get_state_history_metadata_only(
+    sync_checkpointer: BaseCheckpointSaver,
+) -> None:
+    class State(TypedDict):
+        value: Annotated[list[str], operator.add]
+
+    builder = StateGraph(State)
+    builder.add_node("one", lambda s: {"value": ["one"]})
+    builder.add_node("two", lambda s: {"value": ["two"]})
+    builder.add_edge(START, "one")
+    builder.add_edge("one", "two")
+    graph = builder.compile(checkpointer=sync_checkpointer)
+    config = {"configurable": {"thread_id": "1"}}
+    graph.invoke({"value": ["start"]}, config)
+
+    history = [*graph.get_state_history(config)]
+    lazy = [*graph.get_state_history(config, metadata_only=True)]
+    assert len(lazy) == len(history) == 4
+    for snapshot, expected in zip(lazy, history):
+        assert isinstance(snapshot, LazyStateSnapshot)
+        assert snapshot._hydrated is None
+        assert snapshot.config == expected.config
+        assert snapshot.metadata == expected.metadata
+        assert snapshot.parent_config == expected.parent_config
+    # the rest is loaded on first access
+    assert lazy[1].values == history[1].values
+    assert lazy[1].next == ("two",)
+    assert tuple(lazy[2]) == tuple(history[2])
+
+    lazy = [*graph.get_state_history(config, metadata_only=True, limit=2)]
+    assert [s.config for s in lazy] == [s.config for s in history[:2]]
+    assert [s.values for s in lazy] == [s.values for s in history[:2]]
+
+
 def test_invoke_two_processes_in_dict_out(mocker: MockerFixture) -> None:
     add_one = mocker.Mock(side_effect=lambda x: x + 1)
     one = Channel.subscribe_to("input") | add_one | Channel.write_to("inbox")
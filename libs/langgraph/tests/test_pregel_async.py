@@ -1219,6 +1219,31 @@ async def test_step_timeout_on_stream_hang(stream_hang_s: float) -> None:
     assert inner_task_cancelled
 
 
+async def test_aget_state_history_metadata_only(
+    async_checkpointer: BaseCheckpointSaver,
+) -> None:
+    class State(TypedDict):
+        value: Annotated[list[str], operator.add]
+
+    builder = StateGraph(State)
+    builder.add_node("one", lambda s: {"value": ["one"]})
+    builder.add_node("two", lambda s: {"value": ["two"]})
+    builder.add_edge(START, "one")
+    builder.add_edge("one", "two")
+    graph = builder.compile(checkpointer=async_checkpointer)
+    config = {"configurable": {"thread_id": "1"}}
+    await graph.ainvoke({"value": ["start"]}, config)
+
+    history = [s async for s in graph.aget_state_history(config)]
+    lazy = [s async for s in graph.aget_state_history(config, metadata_only=True)]
+    assert len(lazy) == len(history) == 4
+    for snapshot, expected in zip(lazy, history):
+        assert snapshot.config == expected.config
+        assert snapshot.metadata == expected.metadata
+        assert snapshot.parent_config == expected.parent_config
+        assert await snapshot.ahydrate() == expected
+
+
 async def test_cancel_graph_astream(async_checkpointer: BaseCheckpointSaver) -> None:
     class State(TypedDict):
         value: Annotated[int, operator.add]
@@ -2431,6 +2456,62 @@ async def test_concurrent_emit_sends() -> None:
     )
 
 
+async def test_put_writes_batched() -> None:
+    events: list[tuple[str, str, int]] = []
+
+    class RecordingSaver(InMemorySaver):
+        async def aput(
+            self,
+            config: RunnableConfig,
+            checkpoint: Checkpoint,
+            metadata: CheckpointMetadata,
+            new_versions: ChannelVersions,
+        ) -> RunnableConfig:
+            events.append(("checkpoint", checkpoint["id"], 0))
+            return await super().aput(config, checkpoint, metadata, new_versions)
+
+        async def aput_writes_batch(self, config, batch) -> None:
+            events.append(
+                ("writes", config["configurable"]["checkpoint_id"], len(batch))
+            )
+            await super().aput_writes_batch(config, batch)
+
+    class State(TypedDict):
+        items: Annotated[list[int], operator.add]
+
+    async def item(state: int) -> State:
+        await asyncio.sleep(0)
+        return {"items": [state]}
+
+    builder = StateGraph(State)
+    builder.add_node("item", item)
+    builder.add_conditional_edges(START, lambda _: [Send("item", i) for i in range(50)])
+    graph = builder.compile(checkpointer=RecordingSaver())
+    config = {"configurable": {"thread_id": "1"}}
+
+    result = await graph.ainvoke({"items": []}, config)
+    assert sorted(result["items"]) == list(range(50))
+
+    # writes of the fan-out were coalesced into fewer calls than tasks
+    fanout = [c async for c in graph.checkpointer.alist(config)][1]
+    assert len({w[0] for w in fanout.pending_writes}) == 50
+    batches = [
+        n
+        for kind, id, n in events
+        if kind == "writes" and id == fanout.checkpoint["id"]
+    ]
+    assert sum(batches) == 50
+    assert len(batches) < 50
+    # writes were stored after their checkpoint and before the next one
+    saved = [id for kind, id, _ in events if kind == "checkpoint"]
+    for i, (kind, id, _) in enumerate(events):
+        if kind == "writes":
+            assert ("checkpoint", id, 0) in events[:i]
+            if id != saved[-1]:
+                next_id = saved[saved.index(id) + 1]
+                assert ("checkpoint", next_id, 0) in events[i + 1 :]
+
+
 @pytest.mark.parametrize("checkpointer_name", ALL_CHECKPOINTERS_ASYNC)
 async def test_send_sequences(checkpointer_name: str) -> None:
     class Node:
@@ -0,0 +1,104 @@
+"""Compare the size and encode/decode time of scheduler message codecs.
+
+Run with `python -m bench` from this directory.
+"""
+
+import argparse
+import timeit
+from functools import partial
+from typing import Any
+from uuid import uuid4
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+import langgraph.scheduler.kafka.serde as serde
+from langgraph.scheduler.kafka.codec import MsgpackCodec
+from langgraph.scheduler.kafka.serde import JsonCodec
+from langgraph.scheduler.kafka.types import (
+    ExecutorTask,
+    MessageToExecutor,
+    MessageToOrchestrator,
+    Sendable,
+)
+
+
+def config(depth: int) -> dict[str, Any]:
+    ns_parts = [f"node_{i}:{uuid4()}" for i in range(depth)]
+    return {
+        "tags": [],
+        "metadata": {"langgraph_step": 3, "user": "someone"},
+        "recursion_limit": 25,
+        "configurable": {
+            "thread_id": str(uuid4()),
+            "checkpoint_ns": "|".join(ns_parts),
+            "checkpoint_id": str(uuid4()),
+            "checkpoint_map": {
+                "|".join(ns_parts[:i]): str(uuid4()) for i in range(depth)
+            },
+            "__pregel_dedupe_tasks": True,
+            "__pregel_ensure_latest": True,
+        },
+    }
+
+
+def executor_msg(depth: int) -> MessageToExecutor:
+    return MessageToExecutor(
+        config=config(depth),
+        task=ExecutorTask(id=str(uuid4()), path=("__pregel_pull", "agent")),
+        finally_send=None,
+    )
+
+
+def orchestrator_msg(depth: int, n_messages: int) -> MessageToOrchestrator:
+    return MessageToOrchestrator(
+        input={
+            "messages": [
+                HumanMessage(content="what's the weather in sf?" * 4, id=str(uuid4()))
+                if i % 2 == 0
+                else AIMessage(content="it's sunny, 20 degrees" * 4, id=str(uuid4()))
+                for i in range(n_messages)
+            ]
+        },
+        config=config(depth),
+        finally_send=[Sendable(topic="executor", value=executor_msg(depth), key=None)],
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--number", type=int, default=2000)
+    args = parser.parse_args()
+
+    codecs = {
+        "json": JsonCodec(),
+        "msgpack": MsgpackCodec(),
+        "msgpack+zstd": MsgpackCodec(compress=True),
+    }
+    cases = {
+        "executor ns=1": executor_msg(1),
+        "executor ns=3": executor_msg(3),
+        "orchestrator ns=1 msgs=10": orchestrator_msg(1, 10),
+        "orchestrator ns=3 msgs=50": orchestrator_msg(3, 50),
+    }
+    print(f"{'case':<28}{'codec':<14}{'bytes':>8}{'encode µs':>12}{'decode µs':>12}")
+    for case, msg in cases.items():
+        for name, codec in codecs.items():
+            # include the input, which the executor prepares with the codec,
+            # eg. the json codec embeds input serialized by the checkpointer
+            def encode(codec: Any = codec, msg: Any = msg) -> bytes:
+                if msg.get("input") is None:
+                    return codec.dumps(msg)
+                input = codec.dumps_input(serde.SERIALIZER, msg["input"])
+                return codec.dumps({**msg, "input": input})
+
+            data = encode()
+            enc = timeit.timeit(encode, number=args.number)
+            dec = timeit.timeit(partial(codec.loads, data), number=args.number)
+            print(
+                f"{case:<28}{name:<14}{len(data):>8}"
+                f"{enc / args.number * 1e6:>12.1f}{dec / args.number * 1e6:>12.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
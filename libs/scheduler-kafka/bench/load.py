@@ -0,0 +1,226 @@
+"""Load test orchestrators and executors on the in-memory broker.
+
+Runs many threads of a graph fanning out to a subgraph through the distributed
+path, and reports throughput and end-to-end latency. Run with
+`python -m bench.load --help` from this directory.
+"""
+
+import argparse
+import asyncio
+import operator
+import statistics
+import time
+from typing import Annotated, Any, Optional
+from uuid import uuid4
+
+from typing_extensions import TypedDict
+
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.constants import END, START, Send
+from langgraph.graph import StateGraph
+from langgraph.pregel import Pregel
+from langgraph.scheduler.kafka.codec import MsgpackCodec
+from langgraph.scheduler.kafka.executor import AsyncKafkaExecutor
+from langgraph.scheduler.kafka.memory import InMemoryBroker
+from langgraph.scheduler.kafka.orchestrator import AsyncKafkaOrchestrator
+from langgraph.scheduler.kafka.serde import JsonCodec
+from langgraph.scheduler.kafka.types import (
+    Codec,
+    MessageToOrchestrator,
+    Sendable,
+    Topics,
+)
+
+DONE_TOPIC = "done"
+
+
+def fanout_to_subgraph(bumps: int) -> Pregel:
+    class OverallState(TypedDict):
+        subjects: list[str]
+        jokes: Annotated[list[str], operator.add]
+
+    async def continue_to_jokes(state: OverallState) -> list[Send]:
+        return [Send("generate_joke", {"subject": s}) for s in state["subjects"]]
+
+    class JokeInput(TypedDict):
+        subject: str
+
+    class JokeOutput(TypedDict):
+        jokes: list[str]
+
+    class JokeState(JokeInput, JokeOutput): ...
+
+    async def edit(state: JokeInput) -> JokeInput:
+        return {"subject": f"{state['subject']} - hohoho"}
+
+    async def generate(state: JokeInput) -> JokeOutput:
+        return {"jokes": [f"Joke about {state['subject']}"]}
+
+    async def bump(state: JokeOutput) -> JokeOutput:
+        return {"jokes": [state["jokes"][0] + " a"]}
+
+    async def bump_loop(state: JokeOutput) -> str:
+        return END if state["jokes"][0].endswith(" a" * bumps) else "bump"
+
+    subgraph = StateGraph(JokeState, input=JokeInput, output=JokeOutput)
+    subgraph.add_node("edit", edit)
+    subgraph.add_node("generate", generate)
+    subgraph.add_node("bump", bump)
+    subgraph.set_entry_point("edit")
+    subgraph.add_edge("edit", "generate")
+    subgraph.add_edge("generate", "bump")
+    subgraph.add_conditional_edges("bump", bump_loop)
+
+    builder = StateGraph(OverallState)
+    builder.add_node("generate_joke", subgraph.compile())
+    builder.add_conditional_edges(START, continue_to_jokes)
+    builder.add_edge("generate_joke", END)
+    return builder.compile(checkpointer=InMemorySaver())
+
+
+def percentile(values: list[float], p: float) -> float:
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+
+async def run(
+    *,
+    runs: int,
+    subjects: int,
+    bumps: int,
+    partitions: int,
+    orchestrators: int,
+    executors: int,
+    max_concurrency: int,
+    codec: Codec,
+    timeout: float,
+) -> dict[str, Any]:
+    graph = fanout_to_subgraph(bumps)
+    broker = InMemoryBroker(num_partitions=partitions)
+    topics = Topics(orchestrator="orchestrator", executor="executor", error="error")
+    for topic in (*topics, DONE_TOPIC):
+        broker.create_topic(topic)
+
+    async def orchestrate() -> None:
+        async with AsyncKafkaOrchestrator(
+            graph,
+            topics,
+            batch_max_ms=50,
+            codec=codec,
+            consumer=broker.async_consumer(topics.orchestrator, group_id="o"),
+            producer=broker.async_producer(),
+        ) as orch:
+            async for _ in orch:
+                pass
+
+    async def execute() -> None:
+        async with AsyncKafkaExecutor(
+            graph,
+            topics,
+            batch_max_ms=50,
+            max_concurrency=max_concurrency,
+            codec=codec,
+            consumer=broker.async_consumer(topics.executor, group_id="e"),
+            producer=broker.async_producer(),
+        ) as executor:
+            await executor.run()
+
+    workers = [asyncio.create_task(orchestrate()) for _ in range(orchestrators)]
+    workers += [asyncio.create_task(execute()) for _ in range(executors)]
+
+    started: dict[str, float] = {}
+    latencies: list[float] = []
+    producer = broker.async_producer()
+    done = broker.async_consumer(DONE_TOPIC, group_id="load")
+    error: Optional[BaseException] = None
+    start = time.perf_counter()
+    try:
+        for _ in range(runs):
+            thread_id = str(uuid4())
+            msg = MessageToOrchestrator(
+                input={"subjects": [f"subject {i}" for i in range(subjects)]},
+                config={"configurable": {"thread_id": thread_id}},
+                finally_send=[
+                    Sendable(topic=DONE_TOPIC, value={"thread_id": thread_id}, key=None)
+                ],
+            )
+            started[thread_id] = time.perf_counter()
+            await producer.send(topics.orchestrator, value=codec.dumps(msg))
+        deadline = start + timeout
+        while len(latencies) < runs and time.perf_counter() < deadline:
+            if failed := [w for w in workers if w.done()]:
+                error = failed[0].exception()
+                break
+            recs = await done.getmany(timeout_ms=100, max_records=runs)
+            now = time.perf_counter()
+            for records in recs.values():
+                for rec in records:
+                    thread_id = codec.loads(rec.value)["thread_id"]
+                    if thread_id in started:
+                        latencies.append(now - started.pop(thread_id))
+        elapsed = time.perf_counter() - start
+    finally:
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        await done.close()
+
+    messages = sum(
+        len(broker.records(t)) for t in (topics.orchestrator, topics.executor)
+    )
+    return {
+        "runs": len(latencies),
+        "errors": len(broker.records(topics.error)),
+        "worker_error": repr(error) if error else None,
+        "elapsed_s": elapsed,
+        "messages": messages,
+        "messages_per_s": messages / elapsed,
+        "runs_per_s": len(latencies) / elapsed,
+        "latency_ms": {
+            "mean": statistics.fmean(latencies) * 1000 if latencies else float("nan"),
+            "p50": percentile(latencies, 50) * 1000,
+            "p90": percentile(latencies, 90) * 1000,
+            "p99": percentile(latencies, 99) * 1000,
+            "max": max(latencies, default=float("nan")) * 1000,
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--subjects", type=int, default=5)
+    parser.add_argument("--bumps", type=int, default=2)
+    parser.add_argument("--partitions", type=int, default=4)
+    parser.add_argument("--orchestrators", type=int, default=2)
+    parser.add_argument("--executors", type=int, default=2)
+    parser.add_argument("--max-concurrency", type=int, default=16)
+    parser.add_argument("--codec", choices=["json", "msgpack"], default="json")
+    parser.add_argument("--timeout", type=float, default=120)
+    args = parser.parse_args()
+
+    result = asyncio.run(
+        run(
+            runs=args.runs,
+            subjects=args.subjects,
+            bumps=args.bumps,
+            partitions=args.partitions,
+            orchestrators=args.orchestrators,
+            executors=args.executors,
+            max_concurrency=args.max_concurrency,
+            codec=MsgpackCodec() if args.codec == "msgpack" else JsonCodec(),
+            timeout=args.timeout,
+        )
+    )
+    latency = result.pop("latency_ms")
+    for key, value in result.items():
+        print(
+            f"{key:<16}{value:.2f}" if isinstance(value, float) else f"{key:<16}{value}"
+        )
+    print("latency ms      " + "  ".join(f"{k} {v:.1f}" for k, v in latency.items()))
+
+
+if __name__ == "__main__":
+    main()
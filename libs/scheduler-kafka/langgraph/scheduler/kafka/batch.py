@@ -0,0 +1,111 @@
+import threading
+from collections import OrderedDict
+from collections.abc import Hashable, Sequence
+from typing import Optional, Union
+
+from langgraph.constants import (
+    CONF,
+    CONFIG_KEY_CHECKPOINT_ID,
+    CONFIG_KEY_CHECKPOINT_NS,
+    CONFIG_KEY_ENSURE_LATEST,
+    CONFIG_KEY_THREAD_ID,
+)
+from langgraph.scheduler.kafka.types import MessageToExecutor, MessageToOrchestrator
+
+ThreadKey = tuple[Optional[str], str]
+
+
+def thread_key(msg: Union[MessageToOrchestrator, MessageToExecutor]) -> ThreadKey:
+    """Return the (thread_id, checkpoint_ns) a message applies to. This matches
+    the partition key used when producing messages to the orchestrator topic."""
+    configurable = msg["config"].get(CONF, {})
+    return (
+        configurable.get(CONFIG_KEY_THREAD_ID),
+        configurable.get(CONFIG_KEY_CHECKPOINT_NS, ""),
+    )
+
+
+def checkpoint_id(
+    msg: Union[MessageToOrchestrator, MessageToExecutor],
+) -> Optional[str]:
+    """Return the id of the checkpoint a message was sent for, if any. Messages
+    to executors with the same checkpoint id are tasks of the same step."""
+    return msg["config"].get(CONF, {}).get(CONFIG_KEY_CHECKPOINT_ID)
+
+
+def tick_target(msg: MessageToOrchestrator) -> Optional[str]:
+    """Return the checkpoint id a message expects to be the latest, or None if
+    the message doesn't require it, eg. if it carries new input."""
+    if msg["input"] is not None:
+        return None
+    configurable = msg["config"].get(CONF, {})
+    if not configurable.get(CONFIG_KEY_ENSURE_LATEST):
+        return None
+    return configurable.get(CONFIG_KEY_CHECKPOINT_ID)
+
+
+def group_by_thread(
+    msgs: Sequence[MessageToOrchestrator], raw: Sequence[bytes]
+) -> list[list[MessageToOrchestrator]]:
+    """Group messages by (thread_id, checkpoint_ns), preserving their order
+    within each group, and coalescing ticks that target the same checkpoint.
+
+    Several executors finishing tasks from the same step each send a tick for
+    the same checkpoint. A single tick consumes the writes of all of them, so
+    only the first of these is kept. Ticks that also carry messages to send are
+    only coalesced if their encoded bytes, given in `raw`, are identical, as the
+    decoded messages may not encode back to distinct values."""
+    groups: dict[ThreadKey, list[MessageToOrchestrator]] = {}
+    seen: set[Hashable] = set()
+    for msg, data in zip(msgs, raw):
+        key = thread_key(msg)
+        if target := tick_target(msg):
+            coalesce_key = (key, target, data if msg.get("finally_send") else None)
+            if coalesce_key in seen:
+                continue
+            seen.add(coalesce_key)
+        groups.setdefault(key, []).append(msg)
+    return list(groups.values())
+
+
+class LatestCheckpoints:
+    """LRU cache of the most recent checkpoint id known for each recently
+    active (thread_id, checkpoint_ns).
+
+    Checkpoint ids increase monotonically, so a tick targeting an older
+    checkpoint than the one recorded here is known to be stale, and can be
+    dropped without loading the checkpoint. Pending writes are saved by
+    executors in other processes, so checkpoints themselves are not cached."""
+
+    def __init__(self, maxsize: int = 256) -> None:
+        self.maxsize = maxsize
+        self._data: OrderedDict[ThreadKey, str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: ThreadKey) -> Optional[str]:
+        with self._lock:
+            if (checkpoint_id := self._data.get(key)) is not None:
+                self._data.move_to_end(key)
+            return checkpoint_id
+
+    def update(self, key: ThreadKey, checkpoint_id: Optional[str]) -> None:
+        if checkpoint_id is None or self.maxsize <= 0:
+            return
+        with self._lock:
+            current = self._data.get(key)
+            if current is None or current < checkpoint_id:
+                self._data[key] = checkpoint_id
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def is_stale(self, msg: MessageToOrchestrator) -> bool:
+        """Return True if the message targets a checkpoint that is known to
+        have been superseded."""
+        if target := tick_target(msg):
+            latest = self.get(thread_key(msg))
+            return latest is not None and target < latest
+        return False
@@ -0,0 +1,394 @@
+"""Compact binary encoding for scheduler messages.
+
+Messages are encoded as a 3-byte header followed by a msgpack body:
+
+- byte 0 is `MAGIC`, which can't start a JSON document, so consumers can tell
+  binary messages apart from JSON ones and decode both during a rolling upgrade
+- byte 1 is the codec version
+- byte 2 holds flags, eg. whether the body is compressed with zstd
+
+The body is `[segments, message]`, where `segments` is a table of the checkpoint
+namespace segments used in the message, and `message` is one of
+
+- `[0, input, config, finally_send]` for a `MessageToOrchestrator`
+- `[1, config, task_id, task_path, finally_send]` for a `MessageToExecutor`
+  sent in the `finally_send` of another message
+- `[2, value]` for anything else, including top-level `MessageToExecutor`s,
+  which are small enough that rewriting them takes longer than it saves
+
+String keys of `config`, `config["configurable"]` and `config["metadata"]` are
+replaced with their index in `KEYS` when listed there. Mappings with keys other
+than strings are sent as they are: under their original key for the nested
+ones, or wrapped in a list for `config` itself. Checkpoint namespaces are
+replaced with lists of indexes into `segments`, so that a namespace repeated in
+`checkpoint_ns`, `checkpoint_map` and nested `finally_send` messages is only
+sent once. Checkpoint ids are sent as 16 bytes rather than 36 characters.
+"""
+
+import struct
+from collections.abc import Mapping
+from typing import Any, Optional
+
+import ormsgpack
+
+from langgraph.checkpoint.serde.base import SerializerProtocol
+from langgraph.constants import NS_SEP
+from langgraph.scheduler.kafka.serde import SERIALIZER
+from langgraph.scheduler.kafka.serde import loads as loads_json
+
+MAGIC = 0xC1
+"""First byte of binary messages. 0xC1 is never used by msgpack, and isn't valid
+at the start of a JSON document."""
+VERSION = 1
+FLAG_ZSTD = 0b1
+
+HEADER = struct.Struct("!BBB")
+
+KIND_ORCHESTRATOR = 0
+KIND_EXECUTOR = 1
+KIND_OTHER = 2
+
+# Interned keys, the index of each key is part of the wire format,
+# so new keys can only be appended to the end of this list
+KEYS: tuple[str, ...] = (
+    # RunnableConfig
+    "configurable",
+    "metadata",
+    "tags",
+    "run_name",
+    "run_id",
+    "recursion_limit",
+    "max_concurrency",
+    "callbacks",
+    # configurable
+    "thread_id",
+    "checkpoint_ns",
+    "checkpoint_id",
+    "checkpoint_map",
+    "__pregel_dedupe_tasks",
+    "__pregel_ensure_latest",
+    "__pregel_resuming",
+    "__pregel_task_id",
+    "__pregel_delegate",
+    "__pregel_checkpoint_during",
+    "__pregel_resume_map",
+    "checkpoint_during",
+    "user_id",
+    "assistant_id",
+    "graph_id",
+    # metadata
+    "langgraph_step",
+    "langgraph_node",
+    "langgraph_triggers",
+    "langgraph_path",
+    "langgraph_checkpoint_ns",
+    "source",
+    "step",
+    "parents",
+)
+KEY_CODES = {k: i for i, k in enumerate(KEYS)}
+
+CODE_CONFIGURABLE = KEY_CODES["configurable"]
+CODE_METADATA = KEY_CODES["metadata"]
+CODE_CHECKPOINT_NS = KEY_CODES["checkpoint_ns"]
+CODE_CHECKPOINT_ID = KEY_CODES["checkpoint_id"]
+CODE_CHECKPOINT_MAP = KEY_CODES["checkpoint_map"]
+
+PACK_OPTIONS = ormsgpack.OPT_NON_STR_KEYS
+
+
+def _default(v: Any) -> Any:
+    # things we don't know how to serialize (eg. functions) ignore
+    return None
+
+
+class MsgpackCodec:
+    """Encodes scheduler messages as compact msgpack, see module docs.
+
+    Decodes both binary and JSON messages, so producers can switch codecs
+    without coordinating with consumers.
+
+    Args:
+        compress: Whether to compress messages with zstd.
+        compress_min_size: Only compress messages at least this large, in bytes.
+        compress_level: The zstd compression level.
+
+    Tip:
+        Compression requires the [zstandard](https://pypi.org/project/zstandard/)
+        package. To compress whole batches instead, configure the producer with
+        `compression_type="zstd"`.
+    """
+
+    def __init__(
+        self,
+        *,
+        compress: bool = False,
+        compress_min_size: int = 512,
+        compress_level: int = 3,
+    ) -> None:
+        self.compress = compress
+        self.compress_min_size = compress_min_size
+        self.compress_level = compress_level
+        self._compressor: Optional[Any] = None
+        self._decompressor: Optional[Any] = None
+        if compress:
+            self._compressor = _zstd().ZstdCompressor(level=compress_level)
+
+    def dumps(self, value: Any) -> bytes:
+        """Encode a message."""
+        segments: dict[str, int] = {}
+        if _is_executor_message(value):
+            # interning the keys and namespaces of these small messages takes
+            # several times longer than packing them as they are
+            body = [KIND_OTHER, value]
+        else:
+            body = _encode_message(value, segments)
+        data = ormsgpack.packb(
+            [list(segments), body], default=_default, option=PACK_OPTIONS
+        )
+        flags = 0
+        if self._compressor is not None and len(data) >= self.compress_min_size:
+            data = self._compressor.compress(data)
+            flags |= FLAG_ZSTD
+        return HEADER.pack(MAGIC, VERSION, flags) + data
+
+    def loads(self, data: bytes) -> Any:
+        """Decode a message encoded by any codec."""
+        if not is_binary(data):
+            return loads_json(data)
+        _, version, flags = HEADER.unpack_from(data)
+        if version > VERSION:
+            raise ValueError(f"Unsupported message codec version {version}")
+        body = memoryview(data)[HEADER.size :]
+        if flags & FLAG_ZSTD:
+            if self._decompressor is None:
+                self._decompressor = _zstd().ZstdDecompressor()
+            body = self._decompressor.decompress(body)
+        segments, message = ormsgpack.unpackb(body, option=ormsgpack.OPT_NON_STR_KEYS)
+        return _decode_message(message, segments)
+
+    def dumps_input(self, serde: SerializerProtocol, value: Any) -> Any:
+        """Prepare the input of a `MessageToOrchestrator`. The input is encoded
+        with the scheduler's own serializer, the same one used to decode it."""
+        return value
+
+
+def is_binary(data: Optional[bytes]) -> bool:
+    """Whether the message was encoded with a binary codec."""
+    return bool(data) and data[0] == MAGIC
+
+
+def loads(data: bytes) -> Any:
+    """Decode a binary message, with a codec using the default settings."""
+    return _DEFAULT.loads(data)
+
+
+def _zstd() -> Any:
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError(
+            "zstandard is required for compressed messages, "
+            "install it with `pip install zstandard`"
+        ) from None
+    return zstandard
+
+
+# encoding
+
+
+def _is_executor_message(value: Any) -> bool:
+    return (
+        isinstance(value, dict)
+        and isinstance(value.get("config"), dict)
+        and isinstance(value.get("task"), dict)
+    )
+
+
+def _encode_message(value: Any, segments: dict[str, int]) -> list[Any]:
+    if isinstance(value, dict) and isinstance(value.get("config"), dict):
+        if "task" in value and isinstance(value["task"], dict):
+            return [
+                KIND_EXECUTOR,
+                _encode_config(value["config"], segments),
+                value["task"].get("id"),
+                value["task"].get("path"),
+                _encode_finally_send(value.get("finally_send"), segments),
+            ]
+        elif "input" in value:
+            return [
+                KIND_ORCHESTRATOR,
+                _encode_input(value["input"]),
+                _encode_config(value["config"], segments),
+                _encode_finally_send(value.get("finally_send"), segments),
+            ]
+    return [KIND_OTHER, value]
+
+
+def _encode_input(value: Any) -> Optional[tuple[str, bytes]]:
+    if value is None:
+        return None
+    return SERIALIZER.dumps_typed(value)
+
+
+def _encode_ns(ns: str, segments: dict[str, int]) -> list[int]:
+    if not ns:
+        return []
+    setdefault = segments.setdefault
+    return [setdefault(part, len(segments)) for part in ns.split(NS_SEP)]
+
+
+def _encode_id(id: Any) -> Any:
+    # only ids in canonical form can be restored exactly
+    if (
+        type(id) is str
+        and len(id) == 36
+        and id[8] == id[13] == id[18] == id[23] == "-"
+        and id == id.lower()
+    ):
+        try:
+            raw = bytes.fromhex(id.replace("-", ""))
+        except ValueError:
+            return id
+        # fromhex skips whitespace, which would make it shorter
+        if len(raw) == 16:
+            return raw
+    return id
+
+
+def _format_id(raw: bytes) -> str:
+    h = raw.hex()
+    return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+
+
+def _encode_keys(d: Mapping[Any, Any]) -> Optional[dict[Any, Any]]:
+    """Replace the keys listed in `KEYS` with their index, or return None if `d`
+    has keys other than strings, which could be mistaken for interned ones."""
+    for k in d:
+        if type(k) is not str:
+            return None
+    get = KEY_CODES.get
+    return {get(k, k): v for k, v in d.items()}
+
+
+def _encode_config(config: Mapping[str, Any], segments: dict[str, int]) -> Any:
+    encoded = _encode_keys(config)
+    if encoded is None:
+        # sent as is, wrapped in a list to tell it apart
+        return [config]
+    if isinstance(configurable := config.get("configurable"), dict):
+        conf = _encode_keys(configurable)
+        if conf is None:
+            # keep the key as is, so the decoder leaves the value alone
+            encoded["configurable"] = encoded.pop(CODE_CONFIGURABLE)
+        else:
+            encoded[CODE_CONFIGURABLE] = conf
+            if isinstance(ns := configurable.get("checkpoint_ns"), str):
+                conf[CODE_CHECKPOINT_NS] = _encode_ns(ns, segments)
+            if CODE_CHECKPOINT_ID in conf:
+                conf[CODE_CHECKPOINT_ID] = _encode_id(conf[CODE_CHECKPOINT_ID])
+            if isinstance(ns_map := configurable.get("checkpoint_map"), dict):
+                conf[CODE_CHECKPOINT_MAP] = [
+                    [_encode_ns(k, segments), _encode_id(v)] for k, v in ns_map.items()
+                ]
+    if isinstance(metadata := config.get("metadata"), dict):
+        meta = _encode_keys(metadata)
+        if meta is None:
+            encoded["metadata"] = encoded.pop(CODE_METADATA)
+        else:
+            encoded[CODE_METADATA] = meta
+    return encoded
+
+
+def _encode_finally_send(
+    sendables: Optional[Any], segments: dict[str, int]
+) -> Optional[list[list[Any]]]:
+    if sendables is None:
+        return None
+    return [
+        [
+            s["topic"],
+            _encode_message(s["value"], segments)
+            if s.get("value") is not None
+            else None,
+            s.get("key"),
+        ]
+        for s in sendables
+    ]
+
+
+# decoding
+
+
+def _decode_message(message: list[Any], segments: list[str]) -> Any:
+    kind = message[0]
+    if kind == KIND_EXECUTOR:
+        _, config, task_id, task_path, finally_send = message
+        return {
+            "config": _decode_config(config, segments),
+            "task": {"id": task_id, "path": task_path},
+            "finally_send": _decode_finally_send(finally_send, segments),
+        }
+    elif kind == KIND_ORCHESTRATOR:
+        _, input, config, finally_send = message
+        return {
+            "input": SERIALIZER.loads_typed(input) if input is not None else None,
+            "config": _decode_config(config, segments),
+            "finally_send": _decode_finally_send(finally_send, segments),
+        }
+    elif kind == KIND_OTHER:
+        return message[1]
+    else:
+        raise ValueError(f"Unknown message kind {kind}")
+
+
+def _decode_ns(parts: list[int], segments: list[str]) -> str:
+    return NS_SEP.join(segments[i] for i in parts)
+
+
+def _decode_id(id: Any) -> Any:
+    if type(id) is bytes and len(id) == 16:
+        return _format_id(id)
+    return id
+
+
+def _decode_keys(d: Mapping[Any, Any]) -> dict[Any, Any]:
+    return {KEYS[k] if type(k) is int else k: v for k, v in d.items()}
+
+
+def _decode_config(config: Any, segments: list[str]) -> dict:
+    if isinstance(config, list):
+        # sent as is, see _encode_config
+        return config[0]
+    decoded = _decode_keys(config)
+    if isinstance(conf := config.get(CODE_CONFIGURABLE), dict):
+        decoded["configurable"] = configurable = _decode_keys(conf)
+        if isinstance(ns := conf.get(CODE_CHECKPOINT_NS), list):
+            configurable["checkpoint_ns"] = _decode_ns(ns, segments)
+        if CODE_CHECKPOINT_ID in conf:
+            configurable["checkpoint_id"] = _decode_id(conf[CODE_CHECKPOINT_ID])
+        if isinstance(ns_map := conf.get(CODE_CHECKPOINT_MAP), list):
+            configurable["checkpoint_map"] = {
+                _decode_ns(k, segments): _decode_id(v) for k, v in ns_map
+            }
+    if isinstance(metadata := config.get(CODE_METADATA), dict):
+        decoded["metadata"] = _decode_keys(metadata)
+    return decoded
+
+
+def _decode_finally_send(
+    sendables: Optional[list[list[Any]]], segments: list[str]
+) -> Optional[list[dict[str, Any]]]:
+    if sendables is None:
+        return None
+    return [
+        {
+            "topic": topic,
+            "value": _decode_message(value, segments) if value is not None else None,
+            "key": key,
+        }
+        for topic, value, key in sendables
+    ]
+
+
+_DEFAULT = MsgpackCodec()
@@ -2,7 +2,7 @@ import asyncio
 import binascii
 import concurrent.futures
 import weakref
-from collections.abc import Sequence
+from collections.abc import Hashable, Sequence
 from contextlib import (
     AbstractAsyncContextManager,
     AbstractContextManager,
@@ -10,15 +10,14 @@ from contextlib import (
     ExitStack,
 )
 from functools import partial
-from typing import Any, Optional
+from typing import Any, NamedTuple, Optional
 from uuid import UUID
 
-import orjson
 from langchain_core.runnables import RunnableConfig
 from typing_extensions import Self
 
 import langgraph.scheduler.kafka.serde as serde
-from langgraph.constants import CONFIG_KEY_DELEGATE, ERROR
+from langgraph.constants import CONFIG_KEY_DELEGATE, CONFIG_KEY_RESUMING, ERROR
 from langgraph.errors import CheckpointNotLatest, GraphDelegate, TaskNotFound
 from langgraph.pregel import Pregel
 from langgraph.pregel.algo import checkpoint_null_version, prepare_single_task
@@ -29,16 +28,22 @@ from langgraph.pregel.executor import (
 )
 from langgraph.pregel.manager import AsyncChannelsManager, ChannelsManager
 from langgraph.pregel.runner import PregelRunner
+from langgraph.scheduler.kafka.batch import checkpoint_id, thread_key
+from langgraph.scheduler.kafka.offsets import OffsetTracker
 from langgraph.scheduler.kafka.retry import aretry, retry
+from langgraph.scheduler.kafka.serde import JsonCodec
 from langgraph.scheduler.kafka.types import (
     AsyncConsumer,
     AsyncProducer,
+    Codec,
     Consumer,
     ErrorMessage,
+    ExecutorMetrics,
     MessageToExecutor,
     MessageToOrchestrator,
     Producer,
     Sendable,
+    TopicPartition,
     Topics,
 )
 from langgraph.types import LoopProtocol, PregelExecutableTask, RetryPolicy
@@ -58,6 +63,8 @@ class AsyncKafkaExecutor(AbstractAsyncContextManager):
         batch_max_n: int = 10,
         batch_max_ms: int = 1000,
         retry_policy: Optional[RetryPolicy] = None,
+        max_concurrency: int = 16,
+        codec: Optional[Codec] = None,
         consumer: Optional[AsyncConsumer] = None,
         producer: Optional[AsyncProducer] = None,
         **kwargs: Any,
@@ -71,6 +78,12 @@ class AsyncKafkaExecutor(AbstractAsyncContextManager):
         self.batch_max_n = batch_max_n
         self.batch_max_ms = batch_max_ms
         self.retry_policy = retry_policy
+        self.codec = codec or JsonCodec()
+        self.max_concurrency = max_concurrency
+        self.offsets = OffsetTracker()
+        self.in_flight = 0
+        self.queued = 0
+        self.processed = 0
 
     async def __aenter__(self) -> Self:
         loop = asyncio.get_running_loop()
@@ -113,7 +126,7 @@ class AsyncKafkaExecutor(AbstractAsyncContextManager):
             timeout_ms=self.batch_max_ms, max_records=self.batch_max_n
         )
         msgs: list[MessageToExecutor] = [
-            serde.loads(msg.value) for msgs in recs.values() for msg in msgs
+            self.codec.loads(msg.value) for msgs in recs.values() for msg in msgs
         ]
         # process batch
         await asyncio.gather(*(self.each(msg) for msg in msgs))
@@ -122,6 +135,116 @@ class AsyncKafkaExecutor(AbstractAsyncContextManager):
         # return message
         return msgs
 
+    async def run(self) -> None:
+        """Fetch and execute messages until cancelled or a message fails.
+
+        Messages run concurrently, up to `max_concurrency` at a time, except that
+        messages with the same key (the record key, or else the thread_id and
+        checkpoint_ns of the message) run one after another, in the order they
+        were fetched. Consecutive messages without a record key for the same
+        checkpoint, ie. the tasks of one step, still run concurrently with each
+        other, once the messages of the previous step have finished. The offset
+        of a message is committed only once it and all messages before it in the
+        same partition have finished, ie. their writes were saved and the
+        orchestrator was notified."""
+        slots = asyncio.Semaphore(self.max_concurrency)
+        tails: dict[Hashable, _Step] = {}
+        tasks: set[asyncio.Task] = set()
+        failed: list[BaseException] = []
+
+        def on_done(key: Hashable, task: asyncio.Task) -> None:
+            tasks.discard(task)
+            if (tail := tails.get(key)) and all(t.done() for t in tail.tasks):
+                del tails[key]
+            if not task.cancelled() and (exc := task.exception()):
+                failed.append(exc)
+
+        try:
+            while not failed:
+                # wait for next batch
+                recs = await self.consumer.getmany(
+                    timeout_ms=self.batch_max_ms, max_records=self.batch_max_n
+                )
+                # schedule each message after the previous step with the same key
+                for tp, records in recs.items():
+                    for rec in records:
+                        msg: MessageToExecutor = self.codec.loads(rec.value)
+                        if rec.key is not None:
+                            key, step = rec.key, None
+                        else:
+                            key = thread_key(msg)
+                            step = checkpoint_id(msg)
+                        tail = tails.get(key)
+                        if tail is not None and step is not None and tail.id == step:
+                            previous = tail.previous
+                        else:
+                            previous = tail.tasks if tail is not None else []
+                            tail = tails[key] = _Step(step, previous, [])
+                        self.offsets.add(tp, rec.offset)
+                        task = asyncio.create_task(
+                            self._each_in_order(previous, slots, msg, tp, rec.offset)
+                        )
+                        task.add_done_callback(partial(on_done, key))
+                        tail.tasks.append(task)
+                        tasks.add(task)
+                # commit offsets of finished messages
+                await self._commit()
+                # wait for a free slot before fetching more messages
+                while len(tasks) >= self.max_concurrency and not failed:
+                    await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            # let messages in flight finish, and commit them
+            if tasks:
+                await asyncio.wait(tasks)
+            await self._commit()
+        raise failed[0]
+
+    def metrics(self) -> ExecutorMetrics:
+        """Return a snapshot of the messages in flight, and of the lag of each
+        partition seen by `run()`."""
+        lag: dict[TopicPartition, int] = {}
+        if highwater := getattr(self.consumer, "highwater", None):
+            for tp in self.offsets.partitions:
+                hw = highwater(tp)
+                position = self.offsets.position(tp)
+                if hw is not None and position is not None:
+                    lag[tp] = max(hw - position, 0)
+        return ExecutorMetrics(
+            in_flight=self.in_flight,
+            queued=self.queued,
+            processed=self.processed,
+            lag=lag,
+        )
+
+    async def _each_in_order(
+        self,
+        previous: Sequence[asyncio.Task],
+        slots: asyncio.Semaphore,
+        msg: MessageToExecutor,
+        tp: TopicPartition,
+        offset: int,
+    ) -> None:
+        self.queued += 1
+        try:
+            # wait for the messages of the previous step with the same key
+            if previous:
+                await asyncio.wait(previous)
+            await slots.acquire()
+        finally:
+            self.queued -= 1
+        self.in_flight += 1
+        try:
+            await self.each(msg)
+        finally:
+            self.in_flight -= 1
+            slots.release()
+        self.offsets.done(tp, offset)
+        self.processed += 1
+
+    async def _commit(self) -> None:
+        if offsets := self.offsets.committable():
+            await self.consumer.commit(offsets)
+
     async def each(self, msg: MessageToExecutor) -> None:
         try:
             await aretry(self.retry_policy, self.attempt, msg)
@@ -131,14 +254,16 @@ class AsyncKafkaExecutor(AbstractAsyncContextManager):
             for arg in exc.args:
                 fut = await self.producer.send(
                     self.topics.orchestrator,
-                    value=serde.dumps(
+                    value=self.codec.dumps(
                         MessageToOrchestrator(
                             config=arg["config"],
-                            input=orjson.Fragment(
-                                self.graph.checkpointer.serde.dumps(arg["input"])
+                            input=self.codec.dumps_input(
+                                self.graph.checkpointer.serde, arg["input"]
                             ),
                             finally_send=[
-                                Sendable(topic=self.topics.executor, value=msg)
+                                Sendable(
+                                    topic=self.topics.executor, value=_resuming(msg)
+                                )
                             ],
                         )
                     ),
@@ -154,7 +279,7 @@ class AsyncKafkaExecutor(AbstractAsyncContextManager):
         except Exception as exc:
             fut = await self.producer.send(
                 self.topics.error,
-                value=serde.dumps(
+                value=self.codec.dumps(
                     ErrorMessage(
                         topic=self.topics.executor,
                         msg=msg,
@@ -234,7 +359,7 @@ class AsyncKafkaExecutor(AbstractAsyncContextManager):
         # notify orchestrator
         fut = await self.producer.send(
             self.topics.orchestrator,
-            value=serde.dumps(
+            value=self.codec.dumps(
                 MessageToOrchestrator(
                     input=None,
                     config=msg["config"],
@@ -282,6 +407,7 @@ class KafkaExecutor(AbstractContextManager):
         batch_max_n: int = 10,
         batch_max_ms: int = 1000,
         retry_policy: Optional[RetryPolicy] = None,
+        codec: Optional[Codec] = None,
         consumer: Optional[Consumer] = None,
         producer: Optional[Producer] = None,
         **kwargs: Any,
@@ -295,6 +421,7 @@ class KafkaExecutor(AbstractContextManager):
         self.batch_max_n = batch_max_n
         self.batch_max_ms = batch_max_ms
         self.retry_policy = retry_policy
+        self.codec = codec or JsonCodec()
 
     def __enter__(self) -> Self:
         self.subgraphs = dict(self.graph.get_subgraphs(recurse=True))
@@ -333,7 +460,7 @@ class KafkaExecutor(AbstractContextManager):
             timeout_ms=self.batch_max_ms, max_records=self.batch_max_n
         )
         msgs: list[MessageToExecutor] = [
-            serde.loads(msg.value) for msgs in recs.values() for msg in msgs
+            self.codec.loads(msg.value) for msgs in recs.values() for msg in msgs
         ]
         # process batch
         concurrent.futures.wait(self.submit(self.each, msg) for msg in msgs)
@@ -351,14 +478,16 @@ class KafkaExecutor(AbstractContextManager):
             for arg in exc.args:
                 fut = self.producer.send(
                     self.topics.orchestrator,
-                    value=serde.dumps(
+                    value=self.codec.dumps(
                         MessageToOrchestrator(
                             config=arg["config"],
-                            input=orjson.Fragment(
-                                self.graph.checkpointer.serde.dumps(arg["input"])
+                            input=self.codec.dumps_input(
+                                self.graph.checkpointer.serde, arg["input"]
                             ),
                             finally_send=[
-                                Sendable(topic=self.topics.executor, value=msg)
+                                Sendable(
+                                    topic=self.topics.executor, value=_resuming(msg)
+                                )
                             ],
                         )
                     ),
@@ -374,7 +503,7 @@ class KafkaExecutor(AbstractContextManager):
         except Exception as exc:
             fut = self.producer.send(
                 self.topics.error,
-                value=serde.dumps(
+                value=self.codec.dumps(
                     ErrorMessage(
                         topic=self.topics.executor,
                         msg=msg,
@@ -452,7 +581,7 @@ class KafkaExecutor(AbstractContextManager):
         # notify orchestrator
         fut = self.producer.send(
             self.topics.orchestrator,
-            value=serde.dumps(
+            value=self.codec.dumps(
                 MessageToOrchestrator(
                     input=None,
                     config=msg["config"],
@@ -485,3 +614,22 @@ class KafkaExecutor(AbstractContextManager):
         writes: list[tuple[str, Any]],
     ) -> None:
         return submit(self.graph.checkpointer.put_writes, config, writes, task_id)
+
+
+class _Step(NamedTuple):
+    """The messages scheduled for one step of a thread in `AsyncKafkaExecutor.run`."""
+
+    id: Optional[str]
+    """The checkpoint id of the step, or None if its messages run one at a time."""
+    previous: Sequence[asyncio.Task]
+    """The messages of the previous step, which must finish first."""
+    tasks: list[asyncio.Task]
+
+
+def _resuming(msg: MessageToExecutor) -> MessageToExecutor:
+    # once the subgraph is done, the task runs again and should resume the
+    # subgraph from its last checkpoint, rather than start it over
+    return {
+        **msg,
+        "config": patch_configurable(msg["config"], {CONFIG_KEY_RESUMING: True}),
+    }
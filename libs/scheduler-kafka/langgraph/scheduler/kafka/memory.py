@@ -0,0 +1,408 @@
+"""In-memory stand-in for a Kafka cluster, for tests and load tests.
+
+The broker supports topics with several partitions, record keys, offsets and
+consumer groups, and implements the `Consumer`, `AsyncConsumer`, `Producer` and
+`AsyncProducer` protocols, so orchestrators and executors can run against it
+in a single process without a Kafka cluster:
+
+```python
+broker = InMemoryBroker(num_partitions=4)
+orchestrator = AsyncKafkaOrchestrator(
+    graph,
+    topics,
+    consumer=broker.async_consumer(topics.orchestrator, group_id="orchestrator"),
+    producer=broker.async_producer(),
+)
+executor = AsyncKafkaExecutor(
+    graph,
+    topics,
+    consumer=broker.async_consumer(topics.executor, group_id="executor"),
+    producer=broker.async_producer(),
+)
+```
+
+Records are kept in memory until the broker is discarded.
+"""
+
+import asyncio
+import concurrent.futures
+import threading
+import time
+import zlib
+from collections.abc import Sequence
+from typing import Any, NamedTuple, Optional
+
+from typing_extensions import Self
+
+
+class TopicPartition(NamedTuple):
+    topic: str
+    partition: int
+
+
+class ConsumerRecord(NamedTuple):
+    topic: str
+    partition: int
+    offset: int
+    timestamp: int
+    timestamp_type: int
+    key: Optional[bytes]
+    value: Optional[bytes]
+
+
+class RecordMetadata(NamedTuple):
+    topic: str
+    partition: int
+    offset: int
+    timestamp: int
+
+
+class _Group:
+    def __init__(self) -> None:
+        self.members: list[_BaseConsumer] = []
+        self.committed: dict[TopicPartition, int] = {}
+
+
+class InMemoryBroker:
+    """Holds topics, records and consumer group state.
+
+    Args:
+        num_partitions: Number of partitions of topics created on first use.
+    """
+
+    def __init__(self, *, num_partitions: int = 1) -> None:
+        self.num_partitions = num_partitions
+        self._topics: dict[str, list[list[ConsumerRecord]]] = {}
+        self._groups: dict[str, _Group] = {}
+        self._round_robin: dict[str, int] = {}
+        self._cond = threading.Condition()
+        self._async_waiters: set[tuple[asyncio.AbstractEventLoop, asyncio.Event]] = (
+            set()
+        )
+
+    # topics
+
+    def create_topic(self, topic: str, num_partitions: Optional[int] = None) -> None:
+        """Create a topic, if it doesn't exist yet."""
+        with self._cond:
+            self._create_topic(topic, num_partitions)
+
+    def _create_topic(
+        self, topic: str, num_partitions: Optional[int] = None
+    ) -> list[list[ConsumerRecord]]:
+        if topic not in self._topics:
+            self._topics[topic] = [
+                [] for _ in range(num_partitions or self.num_partitions)
+            ]
+        return self._topics[topic]
+
+    def partitions(self, topic: str) -> list[TopicPartition]:
+        with self._cond:
+            return [
+                TopicPartition(topic, p) for p in range(len(self._create_topic(topic)))
+            ]
+
+    def highwater(self, tp: TopicPartition) -> int:
+        """Return the offset of the next record produced to the partition."""
+        with self._cond:
+            return len(self._create_topic(tp.topic)[tp.partition])
+
+    def records(self, topic: str) -> list[ConsumerRecord]:
+        """Return all records of a topic, ordered by partition and offset."""
+        with self._cond:
+            return [r for p in self._create_topic(topic) for r in p]
+
+    def committed(self, group_id: str, tp: TopicPartition) -> Optional[int]:
+        with self._cond:
+            if group := self._groups.get(group_id):
+                return group.committed.get(tp)
+            return None
+
+    # producing
+
+    def produce(
+        self, topic: str, *, key: Optional[bytes] = None, value: Optional[bytes] = None
+    ) -> RecordMetadata:
+        """Append a record to a topic. Records with the same key always go to the
+        same partition, records without a key are spread across partitions."""
+        with self._cond:
+            partitions = self._create_topic(topic)
+            if key is not None:
+                partition = zlib.crc32(key) % len(partitions)
+            else:
+                partition = self._round_robin.get(topic, 0) % len(partitions)
+                self._round_robin[topic] = partition + 1
+            records = partitions[partition]
+            record = ConsumerRecord(
+                topic=topic,
+                partition=partition,
+                offset=len(records),
+                timestamp=int(time.time() * 1000),
+                timestamp_type=0,
+                key=key,
+                value=value,
+            )
+            records.append(record)
+            self._notify()
+        return RecordMetadata(topic, partition, record.offset, record.timestamp)
+
+    def _notify(self) -> None:
+        self._cond.notify_all()
+        for loop, event in self._async_waiters:
+            loop.call_soon_threadsafe(event.set)
+
+    # consumer groups
+
+    def _join(self, consumer: "_BaseConsumer") -> None:
+        with self._cond:
+            for topic in consumer.topics:
+                self._create_topic(topic)
+            group = self._groups.setdefault(consumer.group_id, _Group())
+            group.members.append(consumer)
+            self._rebalance(group)
+
+    def _leave(self, consumer: "_BaseConsumer") -> None:
+        with self._cond:
+            group = self._groups[consumer.group_id]
+            if consumer in group.members:
+                group.members.remove(consumer)
+                self._rebalance(group)
+
+    def _rebalance(self, group: _Group) -> None:
+        # assign each partition to one member of the group, round robin
+        previous = {m: m._assignment for m in group.members}
+        for member in group.members:
+            member._assignment = {}
+        if not group.members:
+            return
+        topics = sorted({t for m in group.members for t in m.topics})
+        for topic in topics:
+            subscribed = [m for m in group.members if topic in m.topics]
+            for p in range(len(self._topics[topic])):
+                tp = TopicPartition(topic, p)
+                member = subscribed[p % len(subscribed)]
+                if tp in previous[member]:
+                    # partition stays with the same member
+                    position = previous[member][tp]
+                elif tp in group.committed:
+                    position = group.committed[tp]
+                elif member.auto_offset_reset == "latest":
+                    position = len(self._topics[topic][p])
+                else:
+                    position = 0
+                member._assignment[tp] = position
+
+    def _fetch(
+        self, consumer: "_BaseConsumer", max_records: int
+    ) -> dict[TopicPartition, list[ConsumerRecord]]:
+        fetched: dict[TopicPartition, list[ConsumerRecord]] = {}
+        remaining = max_records
+        # start from a different partition each time, so none of them starve
+        assigned = list(consumer._assignment.items())
+        consumer._fetch_start += 1
+        start = consumer._fetch_start % len(assigned) if assigned else 0
+        for tp, position in assigned[start:] + assigned[:start]:
+            if remaining <= 0:
+                break
+            records = self._topics[tp.topic][tp.partition][
+                position : position + remaining
+            ]
+            if records:
+                fetched[tp] = records
+                consumer._assignment[tp] = position + len(records)
+                remaining -= len(records)
+        return fetched
+
+    def _commit(
+        self, consumer: "_BaseConsumer", offsets: Optional[dict[Any, int]]
+    ) -> None:
+        with self._cond:
+            group = self._groups[consumer.group_id]
+            if offsets is None:
+                offsets = consumer._assignment
+            for tp, offset in offsets.items():
+                group.committed[TopicPartition(*tp)] = offset
+
+    # clients
+
+    def consumer(
+        self,
+        *topics: str,
+        group_id: str,
+        auto_offset_reset: str = "earliest",
+    ) -> "InMemoryConsumer":
+        return InMemoryConsumer(
+            self, *topics, group_id=group_id, auto_offset_reset=auto_offset_reset
+        )
+
+    def async_consumer(
+        self,
+        *topics: str,
+        group_id: str,
+        auto_offset_reset: str = "earliest",
+    ) -> "InMemoryAsyncConsumer":
+        return InMemoryAsyncConsumer(
+            self, *topics, group_id=group_id, auto_offset_reset=auto_offset_reset
+        )
+
+    def producer(self) -> "InMemoryProducer":
+        return InMemoryProducer(self)
+
+    def async_producer(self) -> "InMemoryAsyncProducer":
+        return InMemoryAsyncProducer(self)
+
+
+class _BaseConsumer:
+    def __init__(
+        self,
+        broker: InMemoryBroker,
+        *topics: str,
+        group_id: str,
+        auto_offset_reset: str = "earliest",
+    ) -> None:
+        self.broker = broker
+        self.topics = topics
+        self.group_id = group_id
+        self.auto_offset_reset = auto_offset_reset
+        self._assignment: dict[TopicPartition, int] = {}
+        self._fetch_start = 0
+        self.broker._join(self)
+
+    def assignment(self) -> set[TopicPartition]:
+        return set(self._assignment)
+
+    def highwater(self, tp: TopicPartition) -> int:
+        return self.broker.highwater(tp)
+
+    def position(self, tp: TopicPartition) -> int:
+        return self._assignment[tp]
+
+    def _try_fetch(self, max_records: int) -> dict[TopicPartition, list[Any]]:
+        with self.broker._cond:
+            return self.broker._fetch(self, max_records)
+
+
+class InMemoryConsumer(_BaseConsumer):
+    """Synchronous consumer, part of a consumer group of an `InMemoryBroker`."""
+
+    def getmany(
+        self, timeout_ms: int, max_records: int
+    ) -> dict[TopicPartition, Sequence[ConsumerRecord]]:
+        deadline = time.monotonic() + timeout_ms / 1000
+        with self.broker._cond:
+            while True:
+                if fetched := self.broker._fetch(self, max_records):
+                    return fetched
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return {}
+                self.broker._cond.wait(remaining)
+
+    def commit(self, offsets: Optional[dict[TopicPartition, int]] = None) -> None:
+        self.broker._commit(self, offsets)
+
+    def close(self) -> None:
+        self.broker._leave(self)
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+
+class InMemoryAsyncConsumer(_BaseConsumer):
+    """Asynchronous consumer, part of a consumer group of an `InMemoryBroker`."""
+
+    async def getmany(
+        self, timeout_ms: int, max_records: int
+    ) -> dict[TopicPartition, Sequence[ConsumerRecord]]:
+        if fetched := self._try_fetch(max_records):
+            return fetched
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout_ms / 1000
+        event = asyncio.Event()
+        waiter = (loop, event)
+        with self.broker._cond:
+            self.broker._async_waiters.add(waiter)
+        try:
+            while True:
+                # check again, in case a record arrived before we were notified
+                if fetched := self._try_fetch(max_records):
+                    return fetched
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    return {}
+                event.clear()
+                # not asyncio.wait_for, which can swallow a cancellation
+                # arriving just as the event is set
+                timer = loop.call_later(remaining, event.set)
+                try:
+                    await event.wait()
+                finally:
+                    timer.cancel()
+        finally:
+            with self.broker._cond:
+                self.broker._async_waiters.discard(waiter)
+
+    async def commit(self, offsets: Optional[dict[TopicPartition, int]] = None) -> None:
+        self.broker._commit(self, offsets)
+
+    async def close(self) -> None:
+        self.broker._leave(self)
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.close()
+
+
+class InMemoryProducer:
+    """Synchronous producer for an `InMemoryBroker`. Records are appended to the
+    topic before `send` returns."""
+
+    def __init__(self, broker: InMemoryBroker) -> None:
+        self.broker = broker
+
+    def send(
+        self,
+        topic: str,
+        *,
+        key: Optional[bytes] = None,
+        value: Optional[bytes] = None,
+    ) -> concurrent.futures.Future:
+        fut: concurrent.futures.Future = concurrent.futures.Future()
+        fut.set_result(self.broker.produce(topic, key=key, value=value))
+        return fut
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        pass
+
+
+class InMemoryAsyncProducer:
+    """Asynchronous producer for an `InMemoryBroker`. Records are appended to the
+    topic before `send` returns."""
+
+    def __init__(self, broker: InMemoryBroker) -> None:
+        self.broker = broker
+
+    async def send(
+        self,
+        topic: str,
+        *,
+        key: Optional[bytes] = None,
+        value: Optional[bytes] = None,
+    ) -> asyncio.Future:
+        fut = asyncio.get_running_loop().create_future()
+        fut.set_result(self.broker.produce(topic, key=key, value=value))
+        return fut
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        pass
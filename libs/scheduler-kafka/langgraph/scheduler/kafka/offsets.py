@@ -0,0 +1,60 @@
+from collections import OrderedDict
+from typing import Optional
+
+from langgraph.scheduler.kafka.types import TopicPartition
+
+
+class OffsetTracker:
+    """Tracks the records in flight for each partition, to commit offsets only
+    once every record before them has been processed.
+
+    Records within a partition can finish out of order when processed
+    concurrently. The committable offset of a partition is one past the last
+    record of the longest prefix of finished records."""
+
+    def __init__(self) -> None:
+        # insertion order matches offset order, as records are fetched in order
+        self._pending: dict[TopicPartition, OrderedDict[int, bool]] = {}
+        self._committable: dict[TopicPartition, int] = {}
+        self._committed: dict[TopicPartition, int] = {}
+
+    def add(self, tp: TopicPartition, offset: int) -> None:
+        """Record that a record was fetched and is about to be processed."""
+        self._pending.setdefault(tp, OrderedDict())[offset] = False
+
+    def done(self, tp: TopicPartition, offset: int) -> None:
+        """Record that a record was processed, advancing the committable offset
+        of its partition if all records before it were processed too."""
+        pending = self._pending[tp]
+        pending[offset] = True
+        while pending:
+            first, finished = next(iter(pending.items()))
+            if not finished:
+                break
+            pending.popitem(last=False)
+            self._committable[tp] = first + 1
+
+    def pending(self, tp: TopicPartition) -> int:
+        """Return the number of records fetched but not yet committable."""
+        return len(self._pending.get(tp, ()))
+
+    def position(self, tp: TopicPartition) -> Optional[int]:
+        """Return the offset of the first record of this partition that hasn't
+        been processed, or None if no record was fetched yet."""
+        if pending := self._pending.get(tp):
+            return next(iter(pending))
+        return self._committable.get(tp)
+
+    @property
+    def partitions(self) -> list[TopicPartition]:
+        return list(self._pending)
+
+    def committable(self) -> dict[TopicPartition, int]:
+        """Return the offsets that advanced since the last call."""
+        offsets = {
+            tp: offset
+            for tp, offset in self._committable.items()
+            if self._committed.get(tp) != offset
+        }
+        self._committed.update(offsets)
+        return offsets
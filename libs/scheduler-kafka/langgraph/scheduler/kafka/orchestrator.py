@@ -13,6 +13,8 @@ from typing_extensions import Self
 
 import langgraph.scheduler.kafka.serde as serde
 from langgraph.constants import (
+    CONF,
+    CONFIG_KEY_CHECKPOINT_ID,
     CONFIG_KEY_DEDUPE_TASKS,
     CONFIG_KEY_ENSURE_LATEST,
     INTERRUPT,
@@ -22,10 +24,17 @@ from langgraph.errors import CheckpointNotLatest, GraphInterrupt
 from langgraph.pregel import Pregel
 from langgraph.pregel.executor import BackgroundExecutor, Submit
 from langgraph.pregel.loop import AsyncPregelLoop, SyncPregelLoop
+from langgraph.scheduler.kafka.batch import (
+    LatestCheckpoints,
+    group_by_thread,
+    thread_key,
+)
 from langgraph.scheduler.kafka.retry import aretry, retry
+from langgraph.scheduler.kafka.serde import JsonCodec
 from langgraph.scheduler.kafka.types import (
     AsyncConsumer,
     AsyncProducer,
+    Codec,
     Consumer,
     ErrorMessage,
     ExecutorTask,
@@ -50,6 +59,8 @@ class AsyncKafkaOrchestrator(AbstractAsyncContextManager):
         batch_max_n: int = 10,
         batch_max_ms: int = 1000,
         retry_policy: Optional[RetryPolicy] = None,
+        hot_threads: int = 256,
+        codec: Optional[Codec] = None,
         consumer: Optional[AsyncConsumer] = None,
         producer: Optional[AsyncProducer] = None,
         **kwargs: Any,
@@ -63,6 +74,8 @@ class AsyncKafkaOrchestrator(AbstractAsyncContextManager):
         self.batch_max_n = batch_max_n
         self.batch_max_ms = batch_max_ms
         self.retry_policy = retry_policy
+        self.codec = codec or JsonCodec()
+        self.latest = LatestCheckpoints(hot_threads)
 
     async def __aenter__(self) -> Self:
         loop = asyncio.get_running_loop()
@@ -105,15 +118,23 @@ class AsyncKafkaOrchestrator(AbstractAsyncContextManager):
             timeout_ms=self.batch_max_ms, max_records=self.batch_max_n
         )
         # dedupe messages, eg. if multiple nodes finish around same time
-        uniq = set(msg.value for msgs in recs.values() for msg in msgs)
-        msgs: list[MessageToOrchestrator] = [serde.loads(msg) for msg in uniq]
-        # process batch
-        await asyncio.gather(*(self.each(msg) for msg in msgs))
+        uniq = list(dict.fromkeys(msg.value for msgs in recs.values() for msg in msgs))
+        msgs: list[MessageToOrchestrator] = [self.codec.loads(msg) for msg in uniq]
+        # process batch, running messages for the same thread one after another
+        await asyncio.gather(
+            *(self.each_thread(g) for g in group_by_thread(msgs, uniq))
+        )
         # commit offsets
         await self.consumer.commit()
         # return message
         return msgs
 
+    async def each_thread(self, msgs: list[MessageToOrchestrator]) -> None:
+        for msg in msgs:
+            # skip ticks for checkpoints superseded since the message was sent
+            if not self.latest.is_stale(msg):
+                await self.each(msg)
+
     async def each(self, msg: MessageToOrchestrator) -> None:
         try:
             await aretry(self.retry_policy, self.attempt, msg)
@@ -124,7 +145,7 @@ class AsyncKafkaOrchestrator(AbstractAsyncContextManager):
         except Exception as exc:
             fut = await self.producer.send(
                 self.topics.error,
-                value=serde.dumps(
+                value=self.codec.dumps(
                     ErrorMessage(
                         topic=self.topics.orchestrator,
                         msg=msg,
@@ -161,6 +182,7 @@ class AsyncKafkaOrchestrator(AbstractAsyncContextManager):
             interrupt_after=graph.interrupt_after_nodes,
             interrupt_before=graph.interrupt_before_nodes,
             trigger_to_nodes=graph.trigger_to_nodes,
+            channel_update_plan=graph.channel_update_plan,
         ) as loop:
             if loop.tick(input_keys=graph.input_channels):
                 # wait for checkpoint to be saved
@@ -183,7 +205,7 @@ class AsyncKafkaOrchestrator(AbstractAsyncContextManager):
                         *(
                             self.producer.send(
                                 self.topics.executor,
-                                value=serde.dumps(
+                                value=self.codec.dumps(
                                     MessageToExecutor(
                                         config=config,
                                         task=ExecutorTask(id=task.id, path=task.path),
@@ -218,7 +240,9 @@ class AsyncKafkaOrchestrator(AbstractAsyncContextManager):
                     *(
                         self.producer.send(
                             m["topic"],
-                            value=serde.dumps(m["value"]) if m.get("value") else None,
+                            value=self.codec.dumps(m["value"])
+                            if m.get("value")
+                            else None,
                             key=serde.dumps(m["key"]) if m.get("key") else None,
                         )
                         for m in msg["finally_send"]
@@ -226,6 +250,10 @@ class AsyncKafkaOrchestrator(AbstractAsyncContextManager):
                 )
                 # wait for messages to be sent
                 await asyncio.gather(*futs)
+        # remember the latest checkpoint for this thread
+        self.latest.update(
+            thread_key(msg), loop.checkpoint_config[CONF].get(CONFIG_KEY_CHECKPOINT_ID)
+        )
 
 
 class KafkaOrchestrator(AbstractContextManager):
@@ -242,6 +270,8 @@ class KafkaOrchestrator(AbstractContextManager):
         batch_max_n: int = 10,
         batch_max_ms: int = 1000,
         retry_policy: Optional[RetryPolicy] = None,
+        hot_threads: int = 256,
+        codec: Optional[Codec] = None,
         consumer: Optional[Consumer] = None,
         producer: Optional[Producer] = None,
         **kwargs: Any,
@@ -255,6 +285,8 @@ class KafkaOrchestrator(AbstractContextManager):
         self.batch_max_n = batch_max_n
         self.batch_max_ms = batch_max_ms
         self.retry_policy = retry_policy
+        self.codec = codec or JsonCodec()
+        self.latest = LatestCheckpoints(hot_threads)
 
     def __enter__(self) -> Self:
         self.subgraphs = dict(self.graph.get_subgraphs(recurse=True))
@@ -293,15 +325,23 @@ class KafkaOrchestrator(AbstractContextManager):
             timeout_ms=self.batch_max_ms, max_records=self.batch_max_n
         )
         # dedupe messages, eg. if multiple nodes finish around same time
-        uniq = set(msg.value for msgs in recs.values() for msg in msgs)
-        msgs: list[MessageToOrchestrator] = [serde.loads(msg) for msg in uniq]
-        # process batch
-        concurrent.futures.wait(self.submit(self.each, msg) for msg in msgs)
+        uniq = list(dict.fromkeys(msg.value for msgs in recs.values() for msg in msgs))
+        msgs: list[MessageToOrchestrator] = [self.codec.loads(msg) for msg in uniq]
+        # process batch, running messages for the same thread one after another
+        concurrent.futures.wait(
+            [self.submit(self.each_thread, g) for g in group_by_thread(msgs, uniq)]
+        )
         # commit offsets
         self.consumer.commit()
         # return message
         return msgs
 
+    def each_thread(self, msgs: list[MessageToOrchestrator]) -> None:
+        for msg in msgs:
+            # skip ticks for checkpoints superseded since the message was sent
+            if not self.latest.is_stale(msg):
+                self.each(msg)
+
     def each(self, msg: MessageToOrchestrator) -> None:
         try:
             retry(self.retry_policy, self.attempt, msg)
@@ -312,7 +352,7 @@ class KafkaOrchestrator(AbstractContextManager):
         except Exception as exc:
             fut = self.producer.send(
                 self.topics.error,
-                value=serde.dumps(
+                value=self.codec.dumps(
                     ErrorMessage(
                         topic=self.topics.orchestrator,
                         msg=msg,
@@ -349,6 +389,7 @@ class KafkaOrchestrator(AbstractContextManager):
             interrupt_after=graph.interrupt_after_nodes,
             interrupt_before=graph.interrupt_before_nodes,
             trigger_to_nodes=graph.trigger_to_nodes,
+            channel_update_plan=graph.channel_update_plan,
         ) as loop:
             if loop.tick(input_keys=graph.input_channels):
                 # wait for checkpoint to be saved
@@ -370,7 +411,7 @@ class KafkaOrchestrator(AbstractContextManager):
                     futures = [
                         self.producer.send(
                             self.topics.executor,
-                            value=serde.dumps(
+                            value=self.codec.dumps(
                                 MessageToExecutor(
                                     config=config,
                                     task=ExecutorTask(id=task.id, path=task.path),
@@ -403,10 +444,14 @@ class KafkaOrchestrator(AbstractContextManager):
                 futs = [
                     self.producer.send(
                         m["topic"],
-                        value=serde.dumps(m["value"]) if m.get("value") else None,
+                        value=self.codec.dumps(m["value"]) if m.get("value") else None,
                         key=serde.dumps(m["key"]) if m.get("key") else None,
                     )
                     for m in msg["finally_send"]
                 ]
                 # wait for messages to be sent
                 concurrent.futures.wait(futs)
+        # remember the latest checkpoint for this thread
+        self.latest.update(
+            thread_key(msg), loop.checkpoint_config[CONF].get(CONFIG_KEY_CHECKPOINT_ID)
+        )
@@ -2,12 +2,18 @@ from typing import Any
 
 import orjson
 
+from langgraph.checkpoint.serde.base import SerializerProtocol
 from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
 
 SERIALIZER = JsonPlusSerializer()
 
 
 def loads(v: bytes) -> Any:
+    if v[:1] == b"\xc1":
+        # binary message, see langgraph.scheduler.kafka.codec
+        from langgraph.scheduler.kafka.codec import loads as loads_binary
+
+        return loads_binary(v)
     return SERIALIZER.loads(v)
 
 
@@ -18,3 +24,18 @@ def dumps(v: Any) -> bytes:
 def _default(v: Any) -> Any:
     # things we don't know how to serialize (eg. functions) ignore
     return None
+
+
+class JsonCodec:
+    """Encodes scheduler messages as JSON. This is the default codec.
+
+    Decodes both JSON and binary messages, see `MsgpackCodec`."""
+
+    def dumps(self, value: Any) -> bytes:
+        return dumps(value)
+
+    def loads(self, data: bytes) -> Any:
+        return loads(data)
+
+    def dumps_input(self, serde: SerializerProtocol, value: Any) -> Any:
+        return orjson.Fragment(serde.dumps(value))
@@ -76,7 +76,9 @@ class AsyncConsumer(Protocol):
         self, timeout_ms: int, max_records: int
     ) -> dict[TopicPartition, Sequence[ConsumerRecord]]: ...
 
-    async def commit(self) -> None: ...
+    async def commit(
+        self, offsets: Optional[dict[TopicPartition, int]] = None
+    ) -> None: ...
 
 
 class Producer(Protocol):
@@ -97,3 +99,22 @@ class AsyncProducer(Protocol):
         key: Optional[bytes] = None,
         value: Optional[bytes] = None,
     ) -> asyncio.Future: ...
+
+
+class ExecutorMetrics(NamedTuple):
+    in_flight: int
+    "Number of messages currently being executed"
+    queued: int
+    "Number of messages fetched and waiting to be executed"
+    processed: int
+    "Number of messages executed since the executor started"
+    lag: dict[TopicPartition, int]
+    "Number of records not yet processed in each partition, if the consumer reports highwater marks"
+
+
+class Codec(Protocol):
+    def dumps(self, value: Any) -> bytes: ...
+
+    def loads(self, data: bytes) -> Any: ...
+
+    def dumps_input(self, serde: Any, value: Any) -> Any: ...
@@ -0,0 +1,85 @@
+from typing import Any, Optional
+
+from langgraph.constants import CONFIG_KEY_ENSURE_LATEST
+from langgraph.scheduler.kafka.batch import LatestCheckpoints, group_by_thread
+from langgraph.scheduler.kafka.types import MessageToOrchestrator
+
+
+def _msg(
+    thread_id: str,
+    checkpoint_id: Optional[str] = None,
+    *,
+    checkpoint_ns: str = "",
+    input: Optional[dict[str, Any]] = None,
+    finally_send: Optional[list] = None,
+) -> MessageToOrchestrator:
+    configurable: dict[str, Any] = {
+        "thread_id": thread_id,
+        "checkpoint_ns": checkpoint_ns,
+    }
+    if checkpoint_id is not None:
+        configurable["checkpoint_id"] = checkpoint_id
+        configurable[CONFIG_KEY_ENSURE_LATEST] = True
+    return MessageToOrchestrator(
+        input=input,
+        config={"configurable": configurable},
+        finally_send=finally_send,
+    )
+
+
+def test_group_by_thread_coalesces_ticks() -> None:
+    msgs = [
+        _msg("1", input={"a": 1}),
+        _msg("1", "c1"),
+        _msg("2", "c1"),
+        _msg("1", "c1"),
+        _msg("1", "c1", checkpoint_ns="sub:x"),
+        _msg("1", "c2"),
+        _msg("1", "c1", finally_send=[{"topic": "t", "value": 1, "key": None}]),
+        _msg("1", input={"a": 1}),
+    ]
+
+    groups = group_by_thread(msgs, [b"%d" % i for i in range(len(msgs))])
+
+    assert groups == [
+        [msgs[0], msgs[1], msgs[5], msgs[6], msgs[7]],
+        [msgs[2]],
+        [msgs[4]],
+    ]
+
+
+def test_group_by_thread_keeps_distinct_finally_send() -> None:
+    # decoded values that don't encode back, eg. objects revived by the serializer
+    msgs = [
+        _msg("1", "c1", finally_send=[{"topic": "t", "value": object(), "key": None}]),
+        _msg("1", "c1", finally_send=[{"topic": "t", "value": object(), "key": None}]),
+        _msg("1", "c1", finally_send=[{"topic": "t", "value": object(), "key": None}]),
+    ]
+
+    groups = group_by_thread(msgs, [b"a", b"b", b"a"])
+
+    assert groups == [[msgs[0], msgs[1]]]
+
+
+def test_latest_checkpoints() -> None:
+    latest = LatestCheckpoints(maxsize=2)
+    latest.update(("1", ""), "c2")
+    # checkpoint ids only move forward
+    latest.update(("1", ""), "c1")
+    assert latest.get(("1", "")) == "c2"
+
+    assert latest.is_stale(_msg("1", "c1"))
+    assert not latest.is_stale(_msg("1", "c2"))
+    assert not latest.is_stale(_msg("1", "c3"))
+    # messages with input are never stale
+    assert not latest.is_stale(_msg("1", input={"a": 1}))
+    # other namespaces are tracked separately
+    assert not latest.is_stale(_msg("1", "c1", checkpoint_ns="sub:x"))
+
+    latest.update(("2", ""), "c1")
+    latest.get(("1", ""))
+    latest.update(("3", ""), "c1")
+    # least recently used thread is evicted
+    assert len(latest) == 2
+    assert latest.get(("2", "")) is None
+    assert latest.get(("1", "")) == "c2"
@@ -0,0 +1,102 @@
+import pytest
+from langchain_core.messages import HumanMessage
+
+import langgraph.scheduler.kafka.serde as serde
+from langgraph.scheduler.kafka.codec import FLAG_ZSTD, HEADER, MAGIC, MsgpackCodec
+from langgraph.scheduler.kafka.types import (
+    ExecutorTask,
+    MessageToExecutor,
+    MessageToOrchestrator,
+    Sendable,
+)
+
+NS = "parent:1ef6a0c2-0c2e-6b3c-8001-3b1f6f8c2d11|child:1ef6a0c2-0c2e-6b3c-8002-aa1f6f8c2d11"
+
+
+def _executor_msg() -> MessageToExecutor:
+    return MessageToExecutor(
+        config={
+            "tags": ["a"],
+            "metadata": {"langgraph_step": 1, "custom": "x"},
+            "recursion_limit": 25,
+            "configurable": {
+                "thread_id": "1",
+                "checkpoint_ns": NS,
+                "checkpoint_id": "1ef6a0c2-0c2e-6b3c-8003-3b1f6f8c2d11",
+                "checkpoint_map": {
+                    "": "1ef6a0c2-0c2e-6b3c-8004-3b1f6f8c2d11",
+                    NS.split("|")[0]: "1ef6a0c2-0c2e-6b3c-8005-3b1f6f8c2d11",
+                },
+                "__pregel_dedupe_tasks": True,
+                "__pregel_ensure_latest": True,
+                "other": {"nested": [1, 2]},
+            },
+        },
+        task=ExecutorTask(id="abc", path=["__pregel_pull", "node"]),
+        finally_send=None,
+    )
+
+
+def _orchestrator_msg() -> MessageToOrchestrator:
+    return MessageToOrchestrator(
+        input={"messages": [HumanMessage(content="hi", id="1")]},
+        config=_executor_msg()["config"],
+        finally_send=[Sendable(topic="executor", value=_executor_msg(), key=None)],
+    )
+
+
+def test_msgpack_codec_roundtrip() -> None:
+    codec = MsgpackCodec()
+    for msg in (_executor_msg(), _orchestrator_msg(), {"topic": "t", "error": "e"}):
+        data = codec.dumps(msg)
+        assert data[0] == MAGIC
+        assert codec.loads(data) == msg
+        # the default decoder recognizes binary messages too
+        assert serde.loads(data) == msg
+
+    # messages are smaller than their JSON encoding
+    assert len(codec.dumps(_executor_msg())) < len(serde.dumps(_executor_msg()))
+    orchestrator_msg = _orchestrator_msg()
+    orchestrator_msg["input"] = serde.SERIALIZER.dumps(orchestrator_msg["input"])
+    assert len(codec.dumps(_orchestrator_msg())) < len(serde.dumps(orchestrator_msg))
+
+
+def test_msgpack_codec_keeps_non_string_keys() -> None:
+    codec = MsgpackCodec()
+    executor_msg = _executor_msg()
+    executor_msg["config"]["metadata"] = {0: "zero", "langgraph_step": 1}
+    executor_msg["config"]["configurable"][1] = "one"
+    msg = MessageToOrchestrator(
+        input=None,
+        config={**executor_msg["config"], 2: "two"},
+        finally_send=[Sendable(topic="executor", value=executor_msg, key=None)],
+    )
+    assert codec.loads(codec.dumps(msg)) == msg
+    assert codec.loads(codec.dumps(executor_msg)) == executor_msg
+
+
+def test_msgpack_codec_decodes_json() -> None:
+    msg = MessageToOrchestrator(
+        input={"a": 1}, config={"configurable": {"thread_id": "1"}}, finally_send=None
+    )
+    assert MsgpackCodec().loads(serde.dumps(msg)) == msg
+
+
+def test_msgpack_codec_compression() -> None:
+    pytest.importorskip("zstandard")
+    codec = MsgpackCodec(compress=True, compress_min_size=64)
+    msg = _orchestrator_msg()
+    data = codec.dumps(msg)
+    assert HEADER.unpack_from(data)[2] & FLAG_ZSTD
+    # compressed messages can be decoded by any codec
+    assert MsgpackCodec().loads(data) == msg
+    # small messages are not compressed
+    small = codec.dumps({"a": 1})
+    assert not HEADER.unpack_from(small)[2] & FLAG_ZSTD
+
+
+def test_msgpack_codec_rejects_newer_versions() -> None:
+    data = bytearray(MsgpackCodec().dumps({"a": 1}))
+    data[1] = 99
+    with pytest.raises(ValueError, match="version"):
+        MsgpackCodec().loads(bytes(data))
@@ -0,0 +1,197 @@
+import asyncio
+from typing import Any, NamedTuple, Optional
+
+import pytest
+from aiokafka.structs import TopicPartition
+from typing_extensions import TypedDict
+
+import langgraph.scheduler.kafka.serde as serde
+from langgraph.graph import StateGraph
+from langgraph.scheduler.kafka.executor import AsyncKafkaExecutor
+from langgraph.scheduler.kafka.offsets import OffsetTracker
+from langgraph.scheduler.kafka.types import MessageToExecutor, Topics
+
+pytestmark = pytest.mark.anyio
+
+
+class Record(NamedTuple):
+    topic: str
+    partition: int
+    offset: int
+    timestamp: int
+    timestamp_type: int
+    key: Optional[bytes]
+    value: Optional[bytes]
+
+
+class FakeConsumer:
+    def __init__(self, batches: list[dict[TopicPartition, list[Record]]]) -> None:
+        self.batches = batches
+        self.commits: list[dict[TopicPartition, int]] = []
+
+    async def getmany(
+        self, timeout_ms: int, max_records: int
+    ) -> dict[TopicPartition, list[Record]]:
+        if self.batches:
+            return self.batches.pop(0)
+        await asyncio.sleep(timeout_ms / 1000)
+        return {}
+
+    async def commit(self, offsets: Optional[dict[TopicPartition, int]] = None) -> None:
+        self.commits.append(offsets)
+
+    def highwater(self, tp: TopicPartition) -> int:
+        return 6
+
+
+def _record(
+    tp: TopicPartition, offset: int, thread_id: str, checkpoint_id: str = "c1"
+) -> Record:
+    msg = MessageToExecutor(
+        config={
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": "",
+                "checkpoint_id": checkpoint_id,
+            }
+        },
+        task={"id": str(offset), "path": ("__pregel_pull", "node")},
+        finally_send=None,
+    )
+    return Record(tp.topic, tp.partition, offset, 0, 0, None, serde.dumps(msg))
+
+
+def _graph() -> Any:
+    class State(TypedDict):
+        value: int
+
+    builder = StateGraph(State)
+    builder.add_node("node", lambda s: s)
+    builder.set_entry_point("node")
+    return builder.compile()
+
+
+def test_offset_tracker() -> None:
+    tp = TopicPartition("t", 0)
+    tracker = OffsetTracker()
+    for offset in range(3):
+        tracker.add(tp, offset)
+
+    tracker.done(tp, 1)
+    assert tracker.committable() == {}
+    assert tracker.position(tp) == 0
+    tracker.done(tp, 0)
+    assert tracker.committable() == {tp: 2}
+    assert tracker.committable() == {}
+    assert tracker.position(tp) == 2
+    tracker.done(tp, 2)
+    assert tracker.committable() == {tp: 3}
+    assert tracker.pending(tp) == 0
+
+
+async def test_executor_run_orders_by_key() -> None:
+    tp0 = TopicPartition("e", 0)
+    tp1 = TopicPartition("e", 1)
+    consumer = FakeConsumer(
+        [
+            {
+                tp0: [_record(tp0, 0, "a"), _record(tp0, 1, "b")],
+                tp1: [_record(tp1, 0, "a")],
+            },
+            {tp0: [_record(tp0, 2, "a", "c2")]},
+        ]
+    )
+    topics = Topics(orchestrator="o", executor="e", error="z")
+    started: list[tuple[str, str]] = []
+    finished: list[tuple[str, str]] = []
+    running = 0
+    max_running = 0
+
+    async def each(msg: MessageToExecutor) -> None:
+        nonlocal running, max_running
+        item = (msg["config"]["configurable"]["thread_id"], msg["task"]["id"])
+        started.append(item)
+        running += 1
+        max_running = max(max_running, running)
+        # the first message of thread a is the slowest
+        await asyncio.sleep(0.05 if item == ("a", "0") else 0.01)
+        running -= 1
+        finished.append(item)
+
+    async with AsyncKafkaExecutor(
+        _graph(),
+        topics,
+        batch_max_ms=10,
+        max_concurrency=4,
+        consumer=consumer,
+        producer=object(),
+    ) as executor:
+        executor.each = each  # type: ignore[method-assign]
+        task = asyncio.create_task(executor.run())
+        while executor.processed < 4:
+            await asyncio.sleep(0.01)
+        metrics = executor.metrics()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    # the next step of thread a runs after both tasks of the first step
+    assert [i for i in finished if i[0] == "a"] == [("a", "0"), ("a", "0"), ("a", "2")]
+    # thread b doesn't wait for thread a
+    assert finished.index(("b", "1")) < finished.index(("a", "0"))
+    # the tasks of the first step of thread a run concurrently
+    assert max_running == 3
+    assert metrics.in_flight == 0
+    assert metrics.queued == 0
+    assert metrics.lag == {tp0: 3, tp1: 5}
+    # offsets are committed once all earlier messages of the partition finish
+    committed: dict[TopicPartition, int] = {}
+    for offsets in consumer.commits:
+        committed.update(offsets)
+    assert committed == {tp0: 3, tp1: 1}
+
+
+async def test_executor_run_overlaps_tasks_of_a_step() -> None:
+    tp = TopicPartition("e", 0)
+    consumer = FakeConsumer(
+        [
+            {
+                tp: [_record(tp, offset, "a") for offset in range(5)]
+                + [_record(tp, 5, "a", "c2")]
+            },
+        ]
+    )
+    topics = Topics(orchestrator="o", executor="e", error="z")
+    started: list[str] = []
+    finished: list[str] = []
+    running = 0
+    max_running = 0
+
+    async def each(msg: MessageToExecutor) -> None:
+        nonlocal running, max_running
+        started.append(msg["task"]["id"])
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.05)
+        running -= 1
+        finished.append(msg["task"]["id"])
+
+    async with AsyncKafkaExecutor(
+        _graph(),
+        topics,
+        batch_max_ms=10,
+        max_concurrency=10,
+        consumer=consumer,
+        producer=object(),
+    ) as executor:
+        executor.each = each  # type: ignore[method-assign]
+        task = asyncio.create_task(executor.run())
+        while executor.processed < 6:
+            await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    # the tasks of one step overlap, the next step starts once they all finish
+    assert max_running == 5
+    assert started.index("5") > max(finished.index(str(i)) for i in range(5))
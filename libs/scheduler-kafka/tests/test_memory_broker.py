@@ -0,0 +1,154 @@
+import asyncio
+import operator
+from typing import Annotated
+
+import pytest
+from typing_extensions import TypedDict
+
+import langgraph.scheduler.kafka.serde as serde
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.constants import START
+from langgraph.graph import StateGraph
+from langgraph.scheduler.kafka.executor import AsyncKafkaExecutor
+from langgraph.scheduler.kafka.memory import InMemoryBroker, TopicPartition
+from langgraph.scheduler.kafka.orchestrator import AsyncKafkaOrchestrator
+from langgraph.scheduler.kafka.types import MessageToOrchestrator, Sendable, Topics
+from langgraph.types import Send
+
+pytestmark = pytest.mark.anyio
+
+
+def test_broker_partitions_and_groups() -> None:
+    broker = InMemoryBroker(num_partitions=2)
+    producer = broker.producer()
+    for i in range(4):
+        producer.send("t", key=b"a", value=str(i).encode())
+    producer.send("t", key=b"b", value=b"x")
+
+    # records with the same key go to the same partition, in order
+    by_key = [r for r in broker.records("t") if r.key == b"a"]
+    assert [r.value for r in by_key] == [b"0", b"1", b"2", b"3"]
+    assert len({r.partition for r in by_key}) == 1
+    assert [r.offset for r in by_key] == [0, 1, 2, 3]
+
+    # partitions are split between members of a group
+    one = broker.consumer("t", group_id="g")
+    two = broker.consumer("t", group_id="g")
+    assert one.assignment() | two.assignment() == set(broker.partitions("t"))
+    assert not one.assignment() & two.assignment()
+
+    # other groups get all records
+    other = broker.consumer("t", group_id="other")
+    fetched = other.getmany(timeout_ms=0, max_records=10)
+    assert sum(len(r) for r in fetched.values()) == 5
+
+    # consumers resume from the committed offset
+    tp = by_key[0].partition
+    owner = one if TopicPartition("t", tp) in one.assignment() else two
+    assert len(owner.getmany(timeout_ms=0, max_records=2)[("t", tp)]) == 2
+    owner.commit({TopicPartition("t", tp): 1})
+    owner.close()
+    one.close() if owner is two else two.close()
+    with broker.consumer("t", group_id="g") as again:
+        records = again.getmany(timeout_ms=0, max_records=10)[("t", tp)]
+        hw = broker.highwater(TopicPartition("t", tp))
+        assert [r.offset for r in records] == list(range(1, hw))
+        assert again.getmany(timeout_ms=10, max_records=10) == {}
+
+
+async def test_broker_async_consumer_wakes_up() -> None:
+    broker = InMemoryBroker()
+    async with broker.async_consumer("t", group_id="g") as consumer:
+        task = asyncio.create_task(consumer.getmany(timeout_ms=5000, max_records=1))
+        await asyncio.sleep(0.01)
+        assert not task.done()
+        fut = await broker.async_producer().send("t", value=b"x")
+        assert (await fut).offset == 0
+        fetched = await asyncio.wait_for(task, 1)
+        assert [r.value for r in fetched[TopicPartition("t", 0)]] == [b"x"]
+        await consumer.commit()
+    assert broker.committed("g", TopicPartition("t", 0)) == 1
+
+
+@pytest.mark.parametrize("subgraph", [False, True])
+async def test_graph_runs_on_in_memory_broker(subgraph: bool) -> None:
+    class State(TypedDict):
+        subjects: list[str]
+        jokes: Annotated[list[str], operator.add]
+
+    class JokeState(TypedDict):
+        subject: str
+        jokes: list[str]
+
+    async def joke(state: dict) -> dict:
+        return {"jokes": [f"joke about {state['subject']}"]}
+
+    builder = StateGraph(State)
+    if subgraph:
+        # sends to a subgraph, which is delegated to the orchestrator
+        joke_builder = StateGraph(JokeState)
+        joke_builder.add_node("joke", joke)
+        joke_builder.add_edge(START, "joke")
+        builder.add_node("joke", joke_builder.compile())
+    else:
+        builder.add_node("joke", joke)
+    builder.add_conditional_edges(
+        START, lambda s: [Send("joke", {"subject": x}) for x in s["subjects"]]
+    )
+    graph = builder.compile(checkpointer=InMemorySaver())
+
+    broker = InMemoryBroker(num_partitions=2)
+    topics = Topics(orchestrator="o", executor="e", error="z")
+    config = {"configurable": {"thread_id": "1"}}
+    input = {"subjects": ["cats", "dogs", "birds"]}
+    await (
+        await broker.async_producer().send(
+            topics.orchestrator,
+            value=serde.dumps(
+                MessageToOrchestrator(
+                    input=input,
+                    config=config,
+                    finally_send=[Sendable(topic="done", value={"ok": True}, key=None)],
+                )
+            ),
+        )
+    )
+
+    async def orchestrate() -> None:
+        async with AsyncKafkaOrchestrator(
+            graph,
+            topics,
+            batch_max_ms=10,
+            consumer=broker.async_consumer(topics.orchestrator, group_id="o"),
+            producer=broker.async_producer(),
+        ) as orch:
+            async for _ in orch:
+                pass
+
+    async def execute() -> None:
+        async with AsyncKafkaExecutor(
+            graph,
+            topics,
+            batch_max_ms=10,
+            consumer=broker.async_consumer(topics.executor, group_id="e"),
+            producer=broker.async_producer(),
+        ) as executor:
+            await executor.run()
+
+    tasks = [asyncio.create_task(orchestrate()), asyncio.create_task(execute())]
+    try:
+        async with broker.async_consumer("done", group_id="d") as done:
+            assert await done.getmany(timeout_ms=5000, max_records=1)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    assert not broker.records(topics.error)
+    state = await graph.aget_state(config)
+    assert state.next == ()
+    assert sorted(state.values["jokes"]) == [
+        "joke about birds",
+        "joke about cats",
+        "joke about dogs",
+    ]
@@ -233,7 +233,7 @@ async def test_subgraph_w_interrupt(
                                     "configurable": {
                                         "__pregel_dedupe_tasks": True,
                                         "__pregel_ensure_latest": True,
-                                        "__pregel_resuming": False,
+                                        "__pregel_resuming": True,
                                         "checkpoint_id": history[0].config[
                                             "configurable"
                                         ]["checkpoint_id"],
@@ -301,7 +301,7 @@ async def test_subgraph_w_interrupt(
                                     "configurable": {
                                         "__pregel_dedupe_tasks": True,
                                         "__pregel_ensure_latest": True,
-                                        "__pregel_resuming": False,
+                                        "__pregel_resuming": True,
                                         "checkpoint_id": history[0].config[
                                             "configurable"
                                         ]["checkpoint_id"],
@@ -407,7 +407,7 @@ async def test_subgraph_w_interrupt(
                                     "configurable": {
                                         "__pregel_dedupe_tasks": True,
                                         "__pregel_ensure_latest": True,
-                                        "__pregel_resuming": False,
+                                        "__pregel_resuming": True,
                                         "checkpoint_id": history[0].config[
                                             "configurable"
                                         ]["checkpoint_id"],
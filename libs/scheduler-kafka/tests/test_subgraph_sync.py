@@ -232,7 +232,7 @@ def test_subgraph_w_interrupt(
                                     "configurable": {
                                         "__pregel_dedupe_tasks": True,
                                         "__pregel_ensure_latest": True,
-                                        "__pregel_resuming": False,
+                                        "__pregel_resuming": True,
                                         "checkpoint_id": history[0].config[
                                             "configurable"
                                         ]["checkpoint_id"],
@@ -300,7 +300,7 @@ def test_subgraph_w_interrupt(
                                     "configurable": {
                                         "__pregel_dedupe_tasks": True,
                                         "__pregel_ensure_latest": True,
-                                        "__pregel_resuming": False,
+                                        "__pregel_resuming": True,
                                         "checkpoint_id": history[0].config[
                                             "configurable"
                                         ]["checkpoint_id"],
@@ -406,7 +406,7 @@ def test_subgraph_w_interrupt(
                                     "configurable": {
                                         "__pregel_dedupe_tasks": True,
                                         "__pregel_ensure_latest": True,
-                                        "__pregel_resuming": False,
+                                        "__pregel_resuming": True,
                                         "checkpoint_id": history[0].config[
                                             "configurable"
                                         ]["checkpoint_id"],
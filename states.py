@@ -8,6 +8,8 @@ class QuestionState(BaseModel):
     questions: List[str]
 
 class DataState(BaseModel):
+    # Per-question dicts holding a row preview under "data" and a
+    # bigquery_tools.QueryResultHandle under "handle" for any remaining rows.
     retrieved_data: Any
     can_answer: bool
 
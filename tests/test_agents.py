@@ -59,19 +59,19 @@ def sample_question_state():
 
 @patch('agents.list_tables')
 @patch('agents.get_table_schema')
-@patch('agents.execute_sql_query')
-def test_retrieve_data_can_answer_one_question(mock_execute_sql, mock_get_schema, mock_list_tables, sample_question_state):
+@patch('agents.preview_sql_query')
+def test_retrieve_data_can_answer_one_question(mock_preview_sql, mock_get_schema, mock_list_tables, sample_question_state):
     # Mock BQ tool responses
     mock_list_tables.return_value = {"tables": ["capitals_data", "customer_details", "schema_info"]}
     # First question (capital) gets data
     # Second question (schema) also gets data via schema_info
-    def side_effect_execute_sql(query):
+    def side_effect_preview_sql(query):
         if "capitals_data" in query:
             return {"result": [{"country": "France", "capital": "Paris"}]}
         if "schema_info" in query and "customer_details" in query:
              return {"result": [{"table_name": "customer_details", "columns": ["id", "name", "email"]}]}
         return {"result": []}
-    mock_execute_sql.side_effect = side_effect_execute_sql
+    mock_preview_sql.side_effect = side_effect_preview_sql
     
     mock_get_schema.return_value = {"schema": {"country": "STRING", "capital": "STRING"}} # Not directly used by `can_answer` logic if execute_sql has results
 
@@ -85,10 +85,10 @@ def test_retrieve_data_can_answer_one_question(mock_execute_sql, mock_get_schema
 
 @patch('agents.list_tables')
 @patch('agents.get_table_schema')
-@patch('agents.execute_sql_query')
-def test_retrieve_data_cannot_answer_any_question(mock_execute_sql, mock_get_schema, mock_list_tables):
+@patch('agents.preview_sql_query')
+def test_retrieve_data_cannot_answer_any_question(mock_preview_sql, mock_get_schema, mock_list_tables):
     mock_list_tables.return_value = {"tables": ["generic_table"]}
-    mock_execute_sql.return_value = {"result": []} # No data from any query
+    mock_preview_sql.return_value = {"result": []} # No data from any query
     mock_get_schema.return_value = {"schema": {"some_col": "STRING"}}
 
     questions = QuestionState(questions=["An unanswerable query about dogs?", "Another irrelevant topic?"])
@@ -102,14 +102,14 @@ def test_retrieve_data_cannot_answer_any_question(mock_execute_sql, mock_get_sch
 
 @patch('agents.list_tables')
 @patch('agents.get_table_schema')
-@patch('agents.execute_sql_query')
-def test_retrieve_data_no_tables_found(mock_execute_sql, mock_get_schema, mock_list_tables):
+@patch('agents.preview_sql_query')
+def test_retrieve_data_no_tables_found(mock_preview_sql, mock_get_schema, mock_list_tables):
     # This test requires modifying how list_tables is called or its return if it can be empty for the agent
     # The agent currently doesn't explicitly handle an empty list from list_tables() before trying to use tables.
     # For now, assume list_tables always returns something, or the agent would need a guard.
     # Let's test the path where execute_sql_query is the one failing to find data.
     mock_list_tables.return_value = {"tables": ["capitals_data"]} # Has tables
-    mock_execute_sql.return_value = {"result": []} # But queries yield no data
+    mock_preview_sql.return_value = {"result": []} # But queries yield no data
     mock_get_schema.return_value = {"schema": {"country": "STRING"}}
     
     questions = QuestionState(questions=["What is Z?"]) # A question that won't match keywords in execute_sql
@@ -119,6 +119,39 @@ def test_retrieve_data_no_tables_found(mock_execute_sql, mock_get_schema, mock_l
     assert "No specific data found from simulation." in result_state.retrieved_data[0]["data"]
 
 
+@patch('agents.list_tables')
+@patch('agents.preview_sql_query')
+def test_retrieve_data_runs_queries_concurrently(mock_preview_sql, mock_list_tables):
+    import threading
+    mock_list_tables.return_value = {"tables": ["capitals_data", "order_summary"]}
+    # Both queries must be in flight at once for the barrier to let them through.
+    barrier = threading.Barrier(2, timeout=5)
+    def concurrent_query(query):
+        barrier.wait()
+        return {"result": [{"query": query}]}
+    mock_preview_sql.side_effect = concurrent_query
+
+    questions = QuestionState(questions=["What is the capital of France?", "Show me some recent orders."])
+    result_state = retrieve_data_agent(questions)
+
+    assert result_state.can_answer is True
+    assert [item["question"] for item in result_state.retrieved_data] == questions.questions
+    assert "capitals_data" in result_state.retrieved_data[0]["data"][0]["query"]
+    assert "order_summary" in result_state.retrieved_data[1]["data"][0]["query"]
+
+@patch('agents.list_tables')
+@patch('agents.preview_sql_query')
+def test_retrieve_data_keeps_preview_and_handle(mock_preview_sql, mock_list_tables):
+    from bigquery_tools import QueryResultHandle
+    mock_list_tables.return_value = {"tables": ["order_summary"]}
+    handle = QueryResultHandle("job_1", "project", "US", 1)
+    mock_preview_sql.return_value = {"result": [{"order_id": 1}], "handle": handle}
+
+    result_state = retrieve_data_agent(QuestionState(questions=["Show me some recent orders."]))
+
+    assert result_state.retrieved_data[0]["data"] == [{"order_id": 1}]
+    assert result_state.retrieved_data[0]["handle"] is handle
+
 # --- Tests for generate_answer_agent ---
 
 def test_generate_answer_can_answer_with_data():
@@ -0,0 +1,384 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import bigquery_tools
+from langgraph.cache.memory import InMemoryCache
+
+from bigquery_tools import (
+    BigQueryClientPool,
+    QueryResultCache,
+    SchemaCatalog,
+    aexecute_sql_queries,
+    configure_client_pool,
+    disable_query_cache,
+    enable_query_cache,
+    execute_sql_queries,
+    execute_sql_query,
+    get_query_cache_stats,
+    get_table_schema,
+    list_tables,
+    normalize_sql,
+    preview_sql_query,
+    stream_sql_query,
+)
+
+SAMPLE_SCHEMA = {
+    "project_a": {
+        "tables": {
+            "sales.ORDERS": {"columns": [{"name": "ORDER_ID", "data_type": "STRING"}]},
+            "sales.CUSTOMERS": {"columns": [{"name": "CUSTOMER_ID", "data_type": "INT64"}]},
+            "broken.BAD_COLUMNS": {"columns": [{"name": "NO_TYPE"}]},
+        }
+    },
+    "project_b": {
+        "tables": {
+            "archive.ORDERS": {"columns": [{"name": "LEGACY_ID", "data_type": "STRING"}]},
+            "archive.DIM_DATE": {"columns": [{"name": "DATE_DK", "data_type": "DATE"}]},
+        }
+    },
+}
+
+
+class FakeRowIterator(list):
+    def __init__(self, rows, page_size=None):
+        super().__init__(rows)
+        self.page_size = page_size or len(rows) or 1
+
+    @property
+    def pages(self):
+        for i in range(0, len(self), self.page_size):
+            yield self[i:i + self.page_size]
+
+
+class FakeQueryJob:
+    def __init__(self, rows):
+        self._rows = rows
+        self.job_id = f"job_{len(FakeClient.jobs)}"
+        self.project = "fake-project"
+        self.location = "US"
+        FakeClient.jobs[self.job_id] = self
+
+    def result(self, page_size=None, max_results=None, start_index=None):
+        rows = self._rows[start_index or 0:]
+        if max_results is not None:
+            rows = rows[:max_results]
+        return FakeRowIterator(rows, page_size)
+
+
+class FakeClient:
+    """Offline stand-in for bigquery.Client: echoes the SQL back after a delay."""
+    instances = 0
+    jobs = {}
+
+    def __init__(self, delay=0.0):
+        type(self).instances += 1
+        self.delay = delay
+
+    def query(self, sql):
+        if "FAIL" in sql:
+            raise RuntimeError("boom")
+        time.sleep(self.delay)
+        self.last_sql = sql
+        if "NUMBERS" in sql:
+            return FakeQueryJob([{"n": i, "square": i * i} for i in range(23)])
+        return FakeQueryJob([{"sql": sql}])
+
+    def get_job(self, job_id, project=None, location=None):
+        job = type(self).jobs[job_id]
+        assert (project, location) == (job.project, job.location)
+        return job
+
+
+@pytest.fixture
+def fake_pool(monkeypatch):
+    FakeClient.instances = 0
+    FakeClient.jobs = {}
+    monkeypatch.setattr(bigquery_tools, "_CLIENT_POOL", None)
+    pool = configure_client_pool(client_factory=lambda: FakeClient(delay=0.2), max_size=4)
+    yield pool
+    pool.close()
+
+
+@pytest.fixture
+def sample_catalog(monkeypatch):
+    catalog = SchemaCatalog(SAMPLE_SCHEMA)
+    monkeypatch.setattr(bigquery_tools, "_MAYODB_CATALOG", catalog)
+    return catalog
+
+
+# --- Tests for SchemaCatalog ---
+
+def test_catalog_indexes_qualified_and_project_qualified_names():
+    catalog = SchemaCatalog(SAMPLE_SCHEMA)
+    entry = catalog.lookup("sales.ORDERS")
+    assert entry.project_id == "project_a"
+    assert entry.schema == {"ORDER_ID": "STRING"}
+    assert catalog.lookup("project_b.archive.DIM_DATE").qualified_name == "archive.DIM_DATE"
+    assert catalog.lookup("sales.MISSING") is None
+
+def test_catalog_same_table_in_two_projects():
+    catalog = SchemaCatalog({
+        "project_a": {"tables": {"sales.ORDERS": {"columns": [{"name": "A", "data_type": "STRING"}]}}},
+        "project_b": {"tables": {"sales.ORDERS": {"columns": [{"name": "B", "data_type": "STRING"}]}}},
+    })
+    assert catalog.lookup("sales.ORDERS").project_id == "project_a"
+    assert catalog.lookup("project_a.sales.ORDERS").schema == {"A": "STRING"}
+    assert catalog.lookup("project_b.sales.ORDERS").schema == {"B": "STRING"}
+    assert catalog.find_by_table_name("ORDERS") == ["sales.ORDERS"]
+    assert catalog.all_tables == ("sales.ORDERS",)
+
+def test_catalog_bare_name_and_dataset_indexes():
+    catalog = SchemaCatalog(SAMPLE_SCHEMA)
+    assert catalog.find_by_table_name("ORDERS") == ["archive.ORDERS", "sales.ORDERS"]
+    assert catalog.find_by_table_name("MISSING") == []
+    assert catalog.tables_in_dataset("sales") == ("CUSTOMERS", "ORDERS")
+    assert catalog.all_tables == (
+        "archive.DIM_DATE", "archive.ORDERS", "broken.BAD_COLUMNS", "sales.CUSTOMERS", "sales.ORDERS"
+    )
+
+
+# --- Tests for get_table_schema ---
+
+def test_get_table_schema_qualified(sample_catalog):
+    assert get_table_schema("sales.CUSTOMERS") == {"schema": {"CUSTOMER_ID": "INT64"}}
+    assert get_table_schema("project_a.sales.CUSTOMERS") == {"schema": {"CUSTOMER_ID": "INT64"}}
+
+def test_get_table_schema_unqualified_unique(sample_catalog):
+    assert get_table_schema("DIM_DATE") == {"schema": {"DATE_DK": "DATE"}}
+
+def test_get_table_schema_unqualified_ambiguous(sample_catalog):
+    result = get_table_schema("ORDERS")
+    assert result["schema"] == {}
+    assert "Ambiguous" in result["error"]
+    assert result["matches"] == ["archive.ORDERS", "sales.ORDERS"]
+
+def test_get_table_schema_errors(sample_catalog):
+    assert "not found" in get_table_schema("sales.MISSING")["error"]
+    assert "Missing 'name' or 'data_type'" in get_table_schema("broken.BAD_COLUMNS")["error"]
+
+def test_get_table_schema_returns_copy(sample_catalog):
+    get_table_schema("sales.ORDERS")["schema"]["EXTRA"] = "STRING"
+    assert get_table_schema("sales.ORDERS") == {"schema": {"ORDER_ID": "STRING"}}
+
+
+# --- Tests for list_tables ---
+
+def test_list_tables(sample_catalog):
+    assert list_tables()["tables"] == list(sample_catalog.all_tables)
+    assert list_tables(dataset_id="archive") == {"tables": ["DIM_DATE", "ORDERS"]}
+    assert list_tables(dataset_id="missing") == {"tables": []}
+
+def test_list_tables_from_bundled_schema():
+    tables = list_tables()["tables"]
+    assert "phi_udpwh_etl_us_p.DIM_DATE" in tables
+    assert tables == sorted(tables)
+    assert get_table_schema("DIM_DATE")["schema"]
+
+
+# --- Tests for the client pool and query fan-out ---
+
+def test_execute_sql_query_reuses_pooled_client(fake_pool):
+    for _ in range(3):
+        assert execute_sql_query("SELECT 1") == {"result": [{"sql": "SELECT 1"}]}
+    assert FakeClient.instances == 1
+
+def test_execute_sql_query_reports_errors(fake_pool):
+    result = execute_sql_query("SELECT FAIL")
+    assert result["result"] == []
+    assert "boom" in result["error"]
+
+def test_client_pool_bounds_clients():
+    pool = BigQueryClientPool(client_factory=FakeClient, max_size=2)
+    in_flight = []
+    peak = []
+    lock = threading.Lock()
+
+    def borrow():
+        with pool.client():
+            with lock:
+                in_flight.append(1)
+                peak.append(len(in_flight))
+            time.sleep(0.05)
+            with lock:
+                in_flight.pop()
+
+    threads = [threading.Thread(target=borrow) for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert max(peak) == 2
+    with pytest.raises(ValueError):
+        BigQueryClientPool(client_factory=FakeClient, max_size=0)
+
+def test_configure_client_pool_closes_borrowed_clients(monkeypatch):
+    class ClosingClient(FakeClient):
+        closed = False
+
+        def close(self):
+            self.closed = True
+
+    monkeypatch.setattr(bigquery_tools, "_CLIENT_POOL", None)
+    old_pool = configure_client_pool(client_factory=ClosingClient, max_size=2)
+    with old_pool.client() as borrowed:
+        with old_pool.client() as idle:
+            pass
+        new_pool = configure_client_pool(client_factory=ClosingClient, max_size=2)
+        assert idle.closed
+        assert not borrowed.closed
+    assert borrowed.closed
+    new_pool.close()
+
+def test_execute_sql_queries_runs_concurrently_in_order(fake_pool):
+    queries = [f"SELECT {i}" for i in range(4)]
+    start = time.perf_counter()
+    results = execute_sql_queries(queries)
+    elapsed = time.perf_counter() - start
+    assert [r["result"][0]["sql"] for r in results] == queries
+    # Four 0.2s queries in parallel take about as long as one.
+    assert elapsed < 0.6
+
+def test_execute_sql_queries_custom_backend():
+    assert execute_sql_queries(["a", "b"], run_query=lambda q: {"result": [q.upper()]}) == [
+        {"result": ["A"]},
+        {"result": ["B"]},
+    ]
+
+def test_aexecute_sql_queries_bounded(fake_pool):
+    queries = [f"SELECT {i}" for i in range(4)]
+    results = asyncio.run(aexecute_sql_queries(queries, max_concurrency=4))
+    assert [r["result"][0]["sql"] for r in results] == queries
+
+
+# --- Tests for the query result cache ---
+
+@pytest.fixture
+def query_cache(fake_pool):
+    cache = enable_query_cache(QueryResultCache(max_bytes=10_000), ttl=60)
+    yield cache
+    disable_query_cache()
+
+def test_normalize_sql_keeps_literals():
+    assert normalize_sql("SELECT  a,\n  b FROM t WHERE x = 'a  b' ;") == "SELECT a, b FROM t WHERE x = 'a  b'"
+    assert normalize_sql("SELECT 'a  b'") != normalize_sql("SELECT 'a b'")
+
+def test_execute_sql_query_cache_hit_on_normalized_sql(query_cache):
+    first = execute_sql_query("SELECT 1 FROM t")
+    second = execute_sql_query("SELECT 1\n   FROM t;")
+    assert first == second == {"result": [{"sql": "SELECT 1 FROM t"}]}
+    assert FakeClient.instances == 1
+    assert get_query_cache_stats() == {"hits": 1, "misses": 1}
+    assert len(query_cache) == 1
+
+def test_execute_sql_query_does_not_cache_errors(query_cache):
+    execute_sql_query("SELECT FAIL")
+    execute_sql_query("SELECT FAIL")
+    assert get_query_cache_stats() == {"hits": 0, "misses": 2}
+    assert len(query_cache) == 0
+
+def test_query_result_cache_ttl(monkeypatch):
+    cache = QueryResultCache()
+    key = (("ns",), "k")
+    now = [100.0]
+    monkeypatch.setattr(bigquery_tools.time, "monotonic", lambda: now[0])
+    cache.set({key: ({"result": [1]}, 10)})
+    assert cache.get([key]) == {key: {"result": [1]}}
+    now[0] = 111.0
+    assert cache.get([key]) == {}
+    assert cache.total_bytes == 0
+
+def test_query_result_cache_lru_byte_budget():
+    cache = QueryResultCache()
+    size = len(cache.serde.dumps_typed({"result": ["x" * 100]})[1])
+    cache.max_bytes = size * 2
+    a, b, c = ((("ns",), k) for k in "abc")
+    cache.set({a: ({"result": ["x" * 100]}, None)})
+    cache.set({b: ({"result": ["y" * 100]}, None)})
+    cache.get([a])  # a is now most recently used
+    cache.set({c: ({"result": ["z" * 100]}, None)})
+    assert set(cache.get([a, b, c])) == {a, c}
+    assert cache.evictions == 1
+    assert cache.total_bytes <= cache.max_bytes
+    cache.set({b: ({"result": ["w" * 10_000]}, None)})  # larger than the whole budget
+    assert cache.get([b]) == {}
+    cache.clear([("ns",)])
+    assert len(cache) == 0 and cache.total_bytes == 0
+
+def test_execute_sql_query_with_in_memory_cache_backend(fake_pool):
+    enable_query_cache(InMemoryCache(), ttl=None)
+    try:
+        execute_sql_query("SELECT 2")
+        assert execute_sql_query("SELECT 2") == {"result": [{"sql": "SELECT 2"}]}
+        assert get_query_cache_stats() == {"hits": 1, "misses": 1}
+    finally:
+        disable_query_cache()
+
+
+# --- Tests for streaming results ---
+
+def test_stream_sql_query_pages(fake_pool):
+    pages = list(stream_sql_query("SELECT * FROM NUMBERS", page_size=10))
+    assert [len(page) for page in pages] == [10, 10, 3]
+    assert pages[2][-1] == {"n": 22, "square": 484}
+
+def test_stream_sql_query_limit_and_offset(fake_pool):
+    rows = [row for page in stream_sql_query("SELECT * FROM NUMBERS", page_size=4, max_rows=5, start_index=20) for row in page]
+    assert [row["n"] for row in rows] == [20, 21, 22]
+
+def test_stream_sql_query_projects_columns_server_side(fake_pool):
+    list(stream_sql_query("SELECT * FROM NUMBERS;", columns=["n"]))
+    with fake_pool.client() as client:
+        assert client.last_sql == "SELECT `n` FROM (SELECT * FROM NUMBERS)"
+    with pytest.raises(ValueError):
+        list(stream_sql_query("SELECT 1", columns=["bad`name"]))
+
+def test_preview_sql_query_returns_handle_for_remaining_rows(fake_pool):
+    result = preview_sql_query("SELECT * FROM NUMBERS", preview_rows=3)
+    assert [row["n"] for row in result["result"]] == [0, 1, 2]
+    handle = result["handle"]
+    assert handle.offset == 3
+    # The remaining rows are paged from the finished job, not a new query.
+    assert [row["n"] for row in handle.rows(page_size=7)] == list(range(3, 23))
+    assert list(FakeClient.jobs) == [handle.job_id]
+
+
+def test_stream_sql_query_holds_client_until_exhausted(monkeypatch):
+    FakeClient.jobs = {}
+    monkeypatch.setattr(bigquery_tools, "_CLIENT_POOL", None)
+    pool = configure_client_pool(client_factory=FakeClient, max_size=1)
+    try:
+        pages = stream_sql_query("SELECT * FROM NUMBERS", page_size=10)
+        next(pages)
+        assert not pool._slots.acquire(blocking=False)
+        pages.close()
+        assert pool._slots.acquire(blocking=False)
+        pool._slots.release()
+    finally:
+        pool.close()
+
+
+def test_preview_sql_query_uses_query_cache(fake_pool):
+    enable_query_cache()
+    try:
+        first = preview_sql_query("SELECT * FROM NUMBERS", preview_rows=3)
+        assert preview_sql_query("SELECT * FROM NUMBERS", preview_rows=3) == first
+        assert get_query_cache_stats() == {"hits": 1, "misses": 1}
+        # A different preview size or projection is a different entry.
+        preview_sql_query("SELECT * FROM NUMBERS", preview_rows=4)
+        preview_sql_query("SELECT * FROM NUMBERS", preview_rows=3, columns=["n"])
+        assert get_query_cache_stats() == {"hits": 1, "misses": 3}
+        assert len(FakeClient.jobs) == 3
+    finally:
+        disable_query_cache()
+
+def test_preview_sql_query_small_result_has_no_handle(fake_pool):
+    assert preview_sql_query("SELECT 1") == {"result": [{"sql": "SELECT 1"}], "handle": None}
+    failed = preview_sql_query("SELECT FAIL")
+    assert failed["result"] == [] and failed["handle"] is None and "boom" in failed["error"]
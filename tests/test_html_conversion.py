@@ -0,0 +1,93 @@
+import json
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from convert_to_md2 import UnifiedHTMLToMarkdownConverter
+from bs4 import BeautifulSoup
+
+from html_conversion import MANIFEST_NAME, DocumentIndex, convert_files, resolve_parser
+
+PAGE = """<html><body>
+<h1>{title}</h1>
+<h2 id="description">Description</h2>
+<p>{body}</p>
+</body></html>"""
+
+
+def write_page(path, title, body="Some text."):
+    path.write_text(PAGE.format(title=title, body=body), encoding='utf-8')
+
+
+def test_resolve_parser():
+    assert resolve_parser('html.parser') == 'html.parser'
+    assert resolve_parser('auto') in ('lxml', 'html.parser')
+
+
+def test_convert_all_is_incremental(tmp_path):
+    src, out = tmp_path / 'html', tmp_path / 'md'
+    src.mkdir()
+    write_page(src / 'a.html', 'Alpha')
+    write_page(src / 'b.html', 'Beta')
+    converter = UnifiedHTMLToMarkdownConverter(str(src), str(out))
+
+    assert converter.convert_all() == (2, 0)
+    assert (out / MANIFEST_NAME).exists()
+    assert (out / 'a.md').read_text(encoding='utf-8').startswith('# Alpha')
+
+    # Nothing changed: nothing is reconverted
+    assert converter.convert_all() == (0, 0)
+
+    # Touching without changing content is still a no-op, and the new mtime is
+    # recorded so the file isn't re-hashed on the next run
+    os.utime(src / 'a.html', ns=(0, 0))
+    assert converter.convert_all() == (0, 0)
+    manifest = json.loads((out / MANIFEST_NAME).read_text(encoding='utf-8'))
+    assert manifest['files']['a.html']['mtime_ns'] == 0
+
+    # Only the edited file is reconverted
+    write_page(src / 'b.html', 'Beta v2')
+    assert converter.convert_all() == (1, 0)
+    assert (out / 'b.md').read_text(encoding='utf-8').startswith('# Beta v2')
+
+    # A deleted output is regenerated, and force rebuilds everything
+    (out / 'a.md').unlink()
+    assert converter.convert_all() == (1, 0)
+    assert converter.convert_all(incremental=False) == (2, 0)
+
+
+def test_parser_change_invalidates_manifest(tmp_path):
+    src, out = tmp_path / 'html', tmp_path / 'md'
+    src.mkdir()
+    write_page(src / 'a.html', 'Alpha')
+    assert UnifiedHTMLToMarkdownConverter(str(src), str(out), parser='html.parser').convert_all() == (1, 0)
+    converter = UnifiedHTMLToMarkdownConverter(str(src), str(out), parser='lxml')
+    expected = (1, 0) if converter.parser == 'lxml' else (0, 0)
+    assert converter.convert_all() == expected
+
+
+def test_convert_files_in_process_pool(tmp_path):
+    src, out = tmp_path / 'html', tmp_path / 'md'
+    src.mkdir()
+    for i in range(4):
+        write_page(src / f'page{i}.html', f'Page {i}')
+    converter = UnifiedHTMLToMarkdownConverter(str(src), str(out))
+    assert convert_files(converter, sorted(src.glob('*.html')), workers=2) == (4, 0)
+    assert sorted(p.name for p in out.glob('*.md')) == [f'page{i}.md' for i in range(4)]
+
+
+def test_document_index_matches_find():
+    soup = BeautifulSoup("""<html><body>
+<h1>Title</h1><p>intro</p>
+<h2 id="notes">Notes</h2><p>one</p><ul><li>two</li></ul>
+<h2 id="key-points">Key Points</h2><p>three</p>
+<div><h2 id="notes">Nested duplicate</h2></div>
+</body></html>""", 'html.parser')
+    doc = DocumentIndex(soup)
+    assert doc.first('h1') is soup.find('h1')
+    assert doc.section('notes') is soup.find('h2', {'id': 'notes'})
+    assert doc.section('missing') is None
+    assert [tag.name for tag in doc.section_siblings('notes')] == ['p', 'ul']
+    assert [tag.name for tag in doc.section_siblings('key-points')] == ['p', 'div']
+    assert doc.section_siblings('missing') == []
+    assert DocumentIndex.of(doc) is doc